@@ -0,0 +1,80 @@
+"""
+Compare the memory footprint of the dict-of-dicts report structure with DependencyGraph
+
+Usage:
+    python benchmarks/bench_graph_memory.py [--tables 40000] [--edges 250000]
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from dataform_viz.graph import GraphBuilder
+
+
+def synthetic_records(table_count, edge_count, seed=7):
+    """Yield (name, info) records shaped like parse_dependencies_report output"""
+    rng = random.Random(seed)
+    names = [f"schema_{i % 400}.table_name_{i}" for i in range(table_count)]
+    deps = [[] for _ in range(table_count)]
+    for _ in range(edge_count):
+        src = rng.randrange(1, table_count)
+        deps[src].append(rng.randrange(0, src))
+    dependents = [[] for _ in range(table_count)]
+    for src, targets in enumerate(deps):
+        for dst in targets:
+            dependents[dst].append(src)
+    for i, name in enumerate(names):
+        dep_names = [f"schema_{d % 400}.table_name_{d}" for d in deps[i]]
+        join_info = {}
+        if dep_names:
+            join_info[dep_names[0]] = {'type': 'LEFT JOIN', 'condition': 'a.id = b.id'}
+        yield name, {
+            'type': 'table' if i % 3 else 'view',
+            'dependencies': dep_names,
+            'dependents': [f"schema_{d % 400}.table_name_{d}" for d in dependents[i]],
+            'join_info': join_info,
+        }
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+
+def build_dict(args):
+    return dict(synthetic_records(args.tables, args.edges))
+
+
+def build_graph(args):
+    builder = GraphBuilder()
+    for name, info in synthetic_records(args.tables, args.edges):
+        builder.add_table(name, info['type'], info['dependencies'],
+                          info['dependents'], info['join_info'])
+    return builder.build()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tables', type=int, default=40_000)
+    parser.add_argument('--edges', type=int, default=250_000)
+    args = parser.parse_args()
+
+    print(f"{args.tables} tables, {args.edges} edges")
+    for label, build in (("dict-of-dicts", build_dict), ("DependencyGraph", build_graph)):
+        result, current, peak, elapsed = measure(lambda: build(args))
+        print(f"{label:16s} retained {current / 1e6:8.1f} MB  peak {peak / 1e6:8.1f} MB  "
+              f"build {elapsed:6.2f} s")
+        del result
+
+
+if __name__ == '__main__':
+    main()
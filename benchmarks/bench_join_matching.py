@@ -0,0 +1,120 @@
+"""
+Benchmark JOIN reference resolution: indexed lookup vs. the previous linear scan
+
+Generates compiled-query-sized SQL (CTEs, dozens of joins, project-qualified
+names) over tables with many dependencies, checks that both matchers agree
+and times them, plus parse_joins_from_query end to end and on an adversarial
+query (a '(' literal in every CTE, which the old parenthesis scan handled in
+quadratic time).
+
+Usage:
+    python benchmarks/bench_join_matching.py [--queries 200] [--deps 60] [--joins 40]
+"""
+import argparse
+import random
+import re
+import time
+
+from dataform_viz.dataform_check import (DependencyNameIndex, dependency_search_names,
+                                         parse_joins_from_query)
+
+WORDS = ("customer order revenue payment invoice product stock fx rate daily weekly monthly agg "
+         "fact dim event session user account ledger refund casing tubing annulus barrier wellbore "
+         "pressure survey").split()
+JOIN_REF = re.compile(r'JOIN\s+([\w.-]+)', re.IGNORECASE)
+
+
+def legacy_match(dep_names, table_ref):
+    """Previous matcher: every search name, lowercased on every comparison"""
+    matched_dep = None
+    best_match_len = 0
+    for search_name, full_dep_name in dep_names:
+        if (search_name.lower() in table_ref.lower() or
+            table_ref.lower() in search_name.lower() or
+            search_name.lower() == table_ref.lower()):
+            if len(search_name) > best_match_len:
+                matched_dep = full_dep_name
+                best_match_len = len(search_name)
+    return matched_dep
+
+
+def synthetic_query(rng, dep_count, join_count):
+    """Dependencies plus a query joining them directly and through CTEs"""
+    dependencies = []
+    for i in range(dep_count):
+        name = '_'.join(rng.sample(WORDS, rng.randint(2, 5)))
+        if rng.random() < 0.2:
+            name = f"union_{name}"
+        dependencies.append({"database": "my-project", "schema": f"refined_{rng.choice(WORDS)}",
+                             "name": f"{name}_{i}"})
+
+    ctes = []
+    for i, dep in enumerate(rng.sample(dependencies, min(8, dep_count))):
+        ctes.append(f"cte_{i} AS (SELECT * FROM `my-project.{dep['schema']}.{dep['name']}` "
+                    f"WHERE x IN (SELECT id FROM t WHERE ROW_NUMBER() OVER (PARTITION BY a) = 1))")
+    lines = [f"WITH {', '.join(ctes)}", "SELECT *", "FROM cte_0 base"]
+    for j in range(join_count):
+        kind = rng.choice(["LEFT JOIN", "INNER JOIN", "JOIN", "FULL OUTER JOIN"])
+        if rng.random() < 0.3 and ctes:
+            ref = f"cte_{rng.randrange(len(ctes))}"
+        else:
+            dep = rng.choice(dependencies)
+            ref = rng.choice([f"`my-project.{dep['schema']}.{dep['name']}`",
+                              f"{dep['schema']}.{dep['name']}", dep['name']])
+        if rng.random() < 0.2:
+            lines.append(f"{kind} {ref} t{j} USING (id_{j})")
+        else:
+            lines.append(f"{kind} {ref} t{j} ON t{j}.id = base.id_{j} AND t{j}.day = base.day")
+    lines.append("WHERE base.active")
+    return "\n".join(lines), dependencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--deps', type=int, default=60)
+    parser.add_argument('--joins', type=int, default=40)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    corpus = [synthetic_query(rng, args.deps, args.joins) for _ in range(args.queries)]
+    refs = [[ref.replace('`', '') for ref in JOIN_REF.findall(query)] for query, _ in corpus]
+    print(f"{args.queries} queries, {args.deps} dependencies, {args.joins} joins, "
+          f"avg {sum(len(q) for q, _ in corpus) / len(corpus) / 1000:.1f} kB")
+
+    start = time.perf_counter()
+    legacy = []
+    for (_, dependencies), query_refs in zip(corpus, refs):
+        dep_names = dependency_search_names(dependencies)
+        legacy.append([legacy_match(dep_names, ref) for ref in query_refs])
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = []
+    for (_, dependencies), query_refs in zip(corpus, refs):
+        index = DependencyNameIndex(dependency_search_names(dependencies))
+        indexed.append([index.resolve(ref) for ref in query_refs])
+    indexed_time = time.perf_counter() - start
+
+    assert indexed == legacy, "matchers disagree"
+    print(f"  linear scan      {legacy_time / args.queries * 1000:8.3f} ms/query")
+    print(f"  indexed          {indexed_time / args.queries * 1000:8.3f} ms/query "
+          f"({legacy_time / indexed_time:.1f}x)")
+
+    start = time.perf_counter()
+    for query, dependencies in corpus:
+        parse_joins_from_query(query, dependencies, log=None)
+    print(f"  parse_joins_from_query {(time.perf_counter() - start) / args.queries * 1000:8.3f} ms/query")
+
+    ctes = ",\n".join(f"c{i} AS (SELECT '(' AS p, id FROM s.t{i})" for i in range(2000))
+    joins = "\n".join(f"LEFT JOIN c{i} ON c{i}.id = c0.id" for i in range(1, 50))
+    query = f"WITH {ctes}\nSELECT * FROM c0\n{joins}"
+    dependencies = [{"schema": "s", "name": f"t{i}"} for i in range(2000)]
+    start = time.perf_counter()
+    found = parse_joins_from_query(query, dependencies, log=None)
+    print(f"  adversarial ({len(query) / 1000:.0f} kB, {len(found)} joins) "
+          f"{(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark JOIN parsing in build_dependency_graph across worker processes
+
+Builds compiled tables with compiled-query-sized SQL (see
+bench_join_matching.synthetic_query), some with an empty query, and times
+build_dependency_graph for each --jobs value, checking that every run gives
+the sequential graph.
+
+Usage:
+    python benchmarks/bench_join_parallel.py [--tables 2000] [--jobs 1 2 4 8] [--chunk-size 32]
+"""
+import argparse
+import random
+import time
+
+from bench_join_matching import synthetic_query
+from dataform_viz.dataform_check import JOIN_CHUNK_SIZE, build_dependency_graph
+
+
+def synthetic_tables(table_count, seed=5):
+    """Compiled tables whose queries join 20-60 dependencies"""
+    rng = random.Random(seed)
+    tables = []
+    for i in range(table_count):
+        query, dependencies = synthetic_query(rng, rng.randint(20, 60), rng.randint(10, 40))
+        tables.append({
+            "target": {"database": "my-project", "schema": f"mart_{i % 20}", "name": f"table_{i}"},
+            "type": "table",
+            "dependencyTargets": dependencies,
+            "query": "" if i % 10 == 0 else query,
+        })
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tables', type=int, default=2000)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--chunk-size', type=int, default=JOIN_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    tables = synthetic_tables(args.tables)
+    size = sum(len(t["query"]) for t in tables)
+    print(f"{args.tables} compiled tables, {size / 1e6:.1f} MB of SQL")
+
+    baseline = None
+    baseline_time = None
+    for jobs in args.jobs:
+        start = time.perf_counter()
+        graph = build_dependency_graph(iter(tables), log=None, jobs=jobs, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline, baseline_time = graph, elapsed
+        assert graph == baseline, f"--jobs {jobs} differs from --jobs {args.jobs[0]}"
+        print(f"  jobs {jobs:2d}  {elapsed:7.2f} s  {args.tables / elapsed:8.0f} tables/s  "
+              f"{size / 1e6 / elapsed:6.2f} MB/s  ({baseline_time / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
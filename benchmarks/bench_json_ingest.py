@@ -0,0 +1,90 @@
+"""
+Compare the text round-trip with direct ingestion of `dataform compile --json` output
+
+Text path:   compiled JSON -> print_text_report -> report file -> regex parser -> graph
+Direct path: compiled JSON -> build_dependency_graph
+Streamed:    compiled JSON -> iter_compiled_json_tables -> build_dependency_graph
+
+Usage:
+    python benchmarks/bench_json_ingest.py [--tables 20000]
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from dataform_viz.dataform_check import (
+    build_dependency_graph, iter_compiled_json_tables, load_compiled_json, print_text_report,
+)
+from dataform_viz.graph import DependencyGraph
+
+
+def synthetic_compiled(table_count, seed=11):
+    """Build a compile result with a few joins per query"""
+    rng = random.Random(seed)
+    tables = []
+    for i in range(table_count):
+        deps = sorted({rng.randrange(0, i) for _ in range(min(i, 6))}) if i else []
+        targets = [{"database": "proj", "schema": f"schema_{d % 200}", "name": f"table_{d}"}
+                   for d in deps]
+        query = "SELECT *\nFROM `proj.schema_0.table_0` base\n"
+        for k, target in enumerate(targets[:3]):
+            query += (f"LEFT JOIN `proj.{target['schema']}.{target['name']}` t{k} "
+                      f"ON t{k}.id = base.id\n")
+        tables.append({
+            "target": {"database": "proj", "schema": f"schema_{i % 200}", "name": f"table_{i}"},
+            "type": "table" if i % 4 else "view",
+            "dependencyTargets": targets,
+            "query": query,
+        })
+    return {"tables": tables}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tables', type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / 'compiled.json'
+        report_path = Path(tmp) / 'dependencies_report.txt'
+        json_path.write_text('{"level":"INFO"} ' + json.dumps(synthetic_compiled(args.tables)),
+                             encoding='utf-8')
+
+        start = time.perf_counter()
+        compiled = load_compiled_json(str(json_path))
+        graph = build_dependency_graph(compiled["tables"], log=None)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            print_text_report(graph, file=f)
+        text_graph = DependencyGraph.from_report(str(report_path))
+        text_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        compiled = load_compiled_json(str(json_path))
+        direct_graph = build_dependency_graph(compiled["tables"], log=None)
+        direct_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        streamed_graph = build_dependency_graph(iter_compiled_json_tables(str(json_path)), log=None)
+        streamed_time = time.perf_counter() - start
+
+        # Same work minus the text serialization and regex re-parse
+        start = time.perf_counter()
+        with open(report_path, 'w', encoding='utf-8') as f:
+            print_text_report(direct_graph, file=f)
+        DependencyGraph.from_report(str(report_path))
+        round_trip_time = time.perf_counter() - start
+
+    assert text_graph == direct_graph, "direct ingestion differs from the text path"
+    assert streamed_graph == direct_graph, "streamed ingestion differs from json.loads"
+    print(f"{args.tables} compiled tables, {direct_graph.edge_count} edges")
+    print(f"text round-trip end to end : {text_time:6.2f} s")
+    print(f"direct ingestion end to end: {direct_time:6.2f} s")
+    print(f"streamed ingestion         : {streamed_time:6.2f} s")
+    print(f"saved (serialize + reparse): {round_trip_time:6.2f} s")
+
+
+if __name__ == '__main__':
+    main()
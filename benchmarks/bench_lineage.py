@@ -0,0 +1,54 @@
+"""
+Time upstream/downstream closure queries on a large synthetic graph
+
+Usage:
+    python benchmarks/bench_lineage.py [--tables 50000] [--queries 200]
+"""
+import argparse
+import random
+import time
+
+from dataform_viz.graph import GraphBuilder
+from dataform_viz.lineage import LineageIndex
+
+
+def layered_graph(table_count, seed=3):
+    """DAG where each table reads from up to 4 tables among the previous 2000"""
+    rng = random.Random(seed)
+    builder = GraphBuilder()
+    names = [f"schema_{i % 300}.table_{i}" for i in range(table_count)]
+    for i, name in enumerate(names):
+        low = max(0, i - 2000)
+        deps = {names[rng.randrange(low, i)] for _ in range(min(i, rng.randint(0, 4)))}
+        builder.add_table(name, 'table', sorted(deps), (), None)
+    return builder.build(derive_dependents=True), names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tables', type=int, default=50_000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    graph, names = layered_graph(args.tables)
+    lineage = LineageIndex(graph)
+    rng = random.Random(1)
+    sample = [rng.choice(names) for _ in range(args.queries)]
+
+    for label, query in (('upstream', lineage.upstream), ('downstream', lineage.downstream)):
+        sizes = []
+        start = time.perf_counter()
+        for name in sample:
+            sizes.append(len(query(name)))
+        cold = (time.perf_counter() - start) / len(sample)
+
+        start = time.perf_counter()
+        for name in sample:
+            query(name)
+        warm = (time.perf_counter() - start) / len(sample)
+        print(f"{label:10} avg closure {sum(sizes) / len(sizes):8.0f} nodes  "
+              f"cold {cold * 1000:7.2f} ms  memoized {warm * 1000:6.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark the streaming report parser against the previous implementation
+
+Usage:
+    python benchmarks/bench_parser.py [--lines 300000]
+"""
+import argparse
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from dataform_viz.parser import parse_dependencies_report
+
+
+def legacy_parse_dependencies_report(report_path):
+    """Previous parser: whole-file read, encoding loop, uncompiled re.match per line"""
+    tables = {}
+    current_table = None
+    current_dep = None
+
+    content = None
+    for encoding in ['utf-8', 'utf-16', 'cp1252', 'latin-1']:
+        try:
+            with open(report_path, 'r', encoding=encoding) as f:
+                content = f.read()
+            break
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+
+    for line in content.split('\n'):
+        line = line.rstrip()
+        table_match = re.match(r'^Table: (.+?) \((\w+)\)$', line)
+        if table_match:
+            current_table = table_match.group(1)
+            current_dep = None
+            tables[current_table] = {
+                'type': table_match.group(2),
+                'dependencies': [],
+                'dependents': [],
+                'join_info': {}
+            }
+            continue
+        if current_table and '<-' in line:
+            dep = line.strip().replace('<- ', '').strip()
+            if dep:
+                tables[current_table]['dependencies'].append(dep)
+                current_dep = dep
+        elif current_table and current_dep and 'JOIN' in line and 'ON' in line:
+            join_match = re.match(r'(\w+\s+JOIN)\s+ON\s+(.+)', line.strip())
+            if join_match:
+                tables[current_table]['join_info'][current_dep] = {
+                    'type': join_match.group(1),
+                    'condition': join_match.group(2)
+                }
+        elif current_table and '->' in line:
+            dep = line.strip().replace('-> ', '').strip()
+            if dep:
+                tables[current_table]['dependents'].append(dep)
+                current_dep = None
+    return tables
+
+
+def write_synthetic_report(path, target_lines):
+    """Write a report with roughly target_lines lines"""
+    lines = []
+    i = 0
+    while len(lines) < target_lines:
+        lines.append(f"Table: schema_{i % 50}.table_{i} (table)")
+        lines.append("  Dependencies (3):")
+        for k in range(1, 4):
+            lines.append(f"    <- schema_{(i + k) % 50}.table_{max(i - k, 0)}")
+            if k == 1:
+                lines.append(f"      LEFT JOIN ON a.id_{k} = b.id_{k}")
+        lines.append("  Dependents (2):")
+        for k in range(1, 3):
+            lines.append(f"    -> schema_{(i + k) % 50}.table_{i + k}")
+        lines.append("")
+        i += 1
+    Path(path).write_text('\n'.join(lines), encoding='utf-8')
+
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=300_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = Path(tmp) / 'dependencies_report.txt'
+        write_synthetic_report(report, args.lines)
+        size_mb = report.stat().st_size / 1e6
+
+        legacy_time, legacy = best_of(lambda: legacy_parse_dependencies_report(report), args.repeat)
+        stream_time, streamed = best_of(lambda: parse_dependencies_report(str(report)), args.repeat)
+
+    assert legacy == streamed, "streaming parser output differs from legacy parser"
+    print(f"report: {args.lines} lines, {size_mb:.1f} MB, {len(streamed)} tables")
+    print(f"legacy   : {legacy_time * 1000:8.1f} ms")
+    print(f"streaming: {stream_time * 1000:8.1f} ms  ({legacy_time / stream_time:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Build time and query throughput of the reachability index on a synthetic DAG
+
+Usage:
+    python benchmarks/bench_reachability.py [--tables 50000] [--queries 500000]
+"""
+import argparse
+import random
+import time
+
+from dataform_viz.graph import GraphBuilder
+from dataform_viz.reachability import ReachabilityIndex
+
+
+def synthetic_dag(table_count, window, seed=9):
+    """Each table reads from up to 4 tables among the previous `window`"""
+    rng = random.Random(seed)
+    builder = GraphBuilder()
+    names = [f"schema_{i % 300}.table_{i}" for i in range(table_count)]
+    for i, name in enumerate(names):
+        low = max(0, i - window)
+        deps = {names[rng.randrange(low, i)] for _ in range(min(i, rng.randint(0, 4)))}
+        builder.add_table(name, 'table', sorted(deps), (), None)
+    return builder.build(derive_dependents=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tables', type=int, default=50_000)
+    parser.add_argument('--window', type=int, default=2_000,
+                        help='How far back dependencies reach (controls closure size)')
+    parser.add_argument('--queries', type=int, default=500_000)
+    args = parser.parse_args()
+
+    graph = synthetic_dag(args.tables, args.window)
+
+    start = time.perf_counter()
+    index = ReachabilityIndex.build(graph)
+    build_time = time.perf_counter() - start
+    blob = index.to_bytes()
+
+    start = time.perf_counter()
+    ReachabilityIndex.from_bytes(graph, blob)
+    load_time = time.perf_counter() - start
+
+    rng = random.Random(2)
+    count = graph.node_count
+    pairs = [(rng.randrange(count), rng.randrange(count)) for _ in range(args.queries)]
+    reaches = index.reaches_ids
+    start = time.perf_counter()
+    positive = sum(1 for a, b in pairs if reaches(a, b))
+    query_time = time.perf_counter() - start
+
+    print(f"{args.tables} tables, {graph.edge_count} edges, {index.component_count} components")
+    print(f"build           : {build_time:8.2f} s")
+    print(f"serialized size : {len(blob) / 1e6:8.1f} MB (load {load_time * 1000:.1f} ms)")
+    print(f"queries         : {args.queries / query_time:10.0f} /s "
+          f"({positive} reachable of {args.queries})")
+
+
+if __name__ == '__main__':
+    main()
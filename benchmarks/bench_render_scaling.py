@@ -0,0 +1,70 @@
+"""
+Measure generate_all_schemas wall time for 1, 2, 4 and 8 render workers
+
+Usage:
+    python benchmarks/bench_render_scaling.py [--tables 5000] [--jobs 1 2 4 8]
+"""
+import argparse
+import hashlib
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from dataform_viz.dataform_check import print_text_report
+from dataform_viz.graph import GraphBuilder
+from dataform_viz.visualizer import DependencyVisualizer
+
+
+def synthetic_graph(table_count, seed=5):
+    """Tables spread over 50 schemas with up to 8 dependencies each"""
+    rng = random.Random(seed)
+    builder = GraphBuilder()
+    names = [f"schema_{i % 50}.table_{i}" for i in range(table_count)]
+    for i, name in enumerate(names):
+        deps = sorted({names[rng.randrange(0, i)] for _ in range(min(i, rng.randint(0, 8)))})
+        join_info = {dep: {'type': 'LEFT JOIN', 'condition': f't.id = d{k}.id'}
+                     for k, dep in enumerate(deps[:2])}
+        builder.add_table(name, 'table' if i % 3 else 'view', deps, (), join_info)
+    return builder.build(derive_dependents=True)
+
+
+def tree_digest(root):
+    """Hash every SVG under root so runs can be compared"""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(Path(root).rglob('*.svg')):
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tables', type=int, default=5_000)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = Path(tmp) / 'dependencies_report.txt'
+        with open(report_path, 'w', encoding='utf-8') as f:
+            print_text_report(synthetic_graph(args.tables), file=f)
+
+        baseline = None
+        digests = set()
+        print(f"{args.tables} tables")
+        for jobs in args.jobs:
+            output_dir = Path(tmp) / f'out_{jobs}'
+            viz = DependencyVisualizer(str(report_path), use_cache=False)
+            viz.load_report()
+            start = time.perf_counter()
+            viz.generate_all_schemas(output_dir=str(output_dir), exclude_patterns=[], jobs=jobs)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            digests.add(tree_digest(output_dir))
+            print(f"jobs={jobs:<3} {elapsed:7.2f} s  speedup {baseline / elapsed:5.2f}x")
+
+    assert len(digests) == 1, "output differs between worker counts"
+
+
+if __name__ == '__main__':
+    main()
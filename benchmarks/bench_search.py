@@ -0,0 +1,59 @@
+"""
+Measure trigram index build time, serialized size and fuzzy query latency
+
+Usage:
+    python benchmarks/bench_search.py [--names 50000] [--repeat 20]
+"""
+import argparse
+import json
+import random
+import time
+
+from dataform_viz.search import TrigramIndex
+
+PREFIXES = "raw stg int mart rpt ref tmp snap ods dwh".split()
+DOMAINS = ("sales finance marketing hr ops product billing crm erp web app ads support logistics "
+           "inventory payments risk fraud growth partner supply retail wholesale eu us apac latam "
+           "mobile search email social").split()
+WORDS = ("customer order revenue payment invoice product stock fx rate daily weekly monthly agg fact "
+         "dim event session user account ledger refund churn cohort campaign click impression "
+         "shipment warehouse vendor contract subscription plan price discount tax region store").split()
+
+QUERIES = ["customer", "cust 360", "revnue daily", "mart_sales.fact", "stg",
+           "ledger_refund_4999", "mart sales order", "zzzz"]
+
+
+def synthetic_names(count, seed=2):
+    """Warehouse-like names: prefix_domain.word_word[_word]_N"""
+    rng = random.Random(seed)
+    schemas = [f"{prefix}_{domain}" for prefix in PREFIXES for domain in DOMAINS]
+    return [f"{rng.choice(schemas)}.{'_'.join(rng.sample(WORDS, rng.randint(2, 4)))}_{i}"
+            for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--names', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    names = synthetic_names(args.names)
+    start = time.perf_counter()
+    index = TrigramIndex(names)
+    print(f"{len(names)} names  build {time.perf_counter() - start:6.2f} s")
+    compact = json.dumps(index.to_compact(), separators=(',', ':'))
+    print(f"compact index {len(compact) / 1e6:6.2f} MB  (names alone "
+          f"{len(json.dumps(names, separators=(',', ':'))) / 1e6:6.2f} MB)")
+
+    for query in QUERIES:
+        index.search(query)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            results = index.search(query)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        top = results[0][0] if results else '-'
+        print(f"  {query!r:22s} {elapsed * 1000:7.2f} ms  {len(results):3d} results  top {top}")
+
+
+if __name__ == "__main__":
+    main()
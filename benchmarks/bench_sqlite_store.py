@@ -0,0 +1,64 @@
+"""
+Compare the in-memory graph with the SQLite store: load time, retained memory and query latency
+
+Usage:
+    python benchmarks/bench_sqlite_store.py [--tables 40000] [--edges 250000] [--queries 500]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bench_graph_memory import build_graph, measure, synthetic_records
+from dataform_viz.lineage import LineageIndex
+from dataform_viz.sqlite_store import SqliteGraph, build_store
+
+
+def time_queries(label, query, names):
+    start = time.perf_counter()
+    total = 0
+    for name in names:
+        total += len(query(name))
+    elapsed = (time.perf_counter() - start) / len(names)
+    print(f"  {label:28s} {elapsed * 1000:8.3f} ms/query  (avg {total / len(names):8.1f} results)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tables', type=int, default=40_000)
+    parser.add_argument('--edges', type=int, default=250_000)
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{args.tables} tables, {args.edges} edges")
+    graph, current, peak, elapsed = measure(lambda: build_graph(args))
+    print(f"memory  load {elapsed:6.2f} s  retained {current / 1e6:7.1f} MB  peak {peak / 1e6:7.1f} MB")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'report.sqlite')
+        _, _, peak, elapsed = measure(
+            lambda: build_store(synthetic_records(args.tables, args.edges), db_path))
+        print(f"sqlite  load {elapsed:6.2f} s  peak {peak / 1e6:7.1f} MB  "
+              f"file {os.path.getsize(db_path) / 1e6:7.1f} MB")
+        store, current, _, elapsed = measure(lambda: SqliteGraph(db_path))
+        print(f"sqlite  open {elapsed * 1000:6.2f} ms  retained {current / 1e6:7.3f} MB")
+
+        rng = random.Random(5)
+        names = rng.sample(list(graph), min(args.queries, len(graph)))
+        lineage = LineageIndex(graph, cache_size=0)
+        print("queries (memory)")
+        time_queries("neighbors", lambda name: graph[name]['dependencies'], names)
+        time_queries("upstream depth 2", lambda name: lineage.upstream(name, 2), names)
+        time_queries("upstream", lineage.upstream, names[:50])
+        time_queries("downstream", lineage.downstream, names[:50])
+        print("queries (sqlite)")
+        time_queries("neighbors", lambda name: store[name]['dependencies'], names)
+        time_queries("upstream depth 2 (CTE)", lambda name: store.upstream(name, 2), names)
+        time_queries("upstream (CTE)", store.upstream, names[:50])
+        time_queries("downstream (CTE)", store.downstream, names[:50])
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
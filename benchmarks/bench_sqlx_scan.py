@@ -0,0 +1,84 @@
+"""
+Benchmark the static .sqlx scan against project size and worker count
+
+Writes a synthetic Dataform project (declarations, *_utils constants and
+.sqlx files with config blocks, refs in every supported form and a few
+joins each), then times scan_project plus build_dependency_graph for each
+--jobs value and checks that every run gives the same tables.
+
+Usage:
+    python benchmarks/bench_sqlx_scan.py [--files 5000] [--jobs 1 2 4]
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from dataform_viz.dataform_check import build_dependency_graph
+from dataform_viz.sqlx_scanner import scan_project
+
+
+def write_project(root, file_count, seed=9):
+    """Synthetic project where file i refs up to four earlier tables"""
+    rng = random.Random(seed)
+    (root / "includes").mkdir()
+    (root / "includes" / "proj_utils.js").write_text(
+        'const PROJECT_ID = "p";\n' + "".join(f'const SCHEMA_{s} = "schema_{s}";\n' for s in range(20)),
+        encoding='utf-8')
+    definitions = root / "definitions"
+    definitions.mkdir()
+    (definitions / "sources.js").write_text(
+        "".join(f'declare({{schema: "raw", name: "source_{i}"}});\n' for i in range(50)), encoding='utf-8')
+    for i in range(file_count):
+        schema = i % 20
+        refs = [f'${{ref("source_{rng.randrange(50)}")}}']
+        for j in rng.sample(range(i), min(i, rng.randint(0, 4))):
+            refs.append(rng.choice([f'${{ref("table_{j}")}}',
+                                    f'${{ref("schema_{j % 20}", "table_{j}")}}',
+                                    f'${{ref({{schema: proj_utils.SCHEMA_{j % 20}, name: "table_{j}"}})}}']))
+        joins = "\n".join(f"LEFT JOIN {ref} t{k} ON t{k}.id = base.id" for k, ref in enumerate(refs[1:]))
+        folder = definitions / f"schema_{schema}"
+        folder.mkdir(exist_ok=True)
+        (folder / f"table_{i}.sqlx").write_text(f"""config {{
+  type: "{rng.choice(['table', 'view', 'incremental'])}",
+  schema: proj_utils.SCHEMA_{schema},
+  description: "Synthetic table {i}",
+  columns: {{id: "Primary key"}},
+}}
+
+SELECT base.*
+FROM {refs[0]} base
+{joins}
+WHERE base.day > "2024-01-01"
+""", encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=5000)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_project(root, args.files)
+        print(f"{args.files} .sqlx files")
+
+        baseline = None
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            result = scan_project(str(root), jobs=jobs)
+            scan_time = time.perf_counter() - start
+            graph = build_dependency_graph(result.tables, log=None)
+            total_time = time.perf_counter() - start
+            if baseline is None:
+                baseline = result
+            assert result == baseline, f"--jobs {jobs} differs"
+            print(f"  jobs {jobs:2d}  scan {scan_time:6.2f} s  with graph {total_time:6.2f} s  "
+                  f"({len(result.tables)} tables, {graph.edge_count} edges, "
+                  f"{len(result.unresolved)} unresolved)")
+
+
+if __name__ == "__main__":
+    main()
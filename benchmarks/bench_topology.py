@@ -0,0 +1,63 @@
+"""
+Time cycle detection and topological levelling on a synthetic project
+
+Usage:
+    python benchmarks/bench_topology.py [--tables 40000] [--edges 250000]
+"""
+import argparse
+import random
+import time
+
+from dataform_viz.graph import GraphBuilder
+from dataform_viz.topology import (
+    find_cycles, level_widths, strongly_connected_components, topological_levels,
+)
+
+
+def synthetic_graph(table_count, edge_count, cycles, seed=4):
+    """Mostly acyclic graph with a few injected back edges"""
+    rng = random.Random(seed)
+    deps = [set() for _ in range(table_count)]
+    for _ in range(edge_count):
+        src = rng.randrange(1, table_count)
+        deps[src].add(rng.randrange(max(0, src - 3000), src))
+    for _ in range(cycles):
+        src = rng.randrange(0, table_count - 10)
+        dst = src + rng.randint(1, 10)
+        deps[src].add(dst)
+        deps[dst].add(src)
+    builder = GraphBuilder()
+    for i, targets in enumerate(deps):
+        builder.add_table(f"schema_{i % 400}.table_{i}", 'table',
+                          [f"schema_{d % 400}.table_{d}" for d in sorted(targets)], (), None)
+    return builder.build(derive_dependents=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tables', type=int, default=40_000)
+    parser.add_argument('--edges', type=int, default=250_000)
+    parser.add_argument('--cycles', type=int, default=20)
+    args = parser.parse_args()
+
+    graph = synthetic_graph(args.tables, args.edges, args.cycles)
+
+    start = time.perf_counter()
+    component, _ = strongly_connected_components(graph)
+    scc_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cycles = find_cycles(graph, component)
+    levels = topological_levels(graph, component)
+    widths = level_widths(levels)
+    level_time = time.perf_counter() - start
+
+    print(f"{args.tables} tables, {graph.edge_count} edges")
+    print(f"SCC (Tarjan)       : {scc_time:6.3f} s, {len(cycles)} cycle(s)")
+    print(f"cycles + levels    : {level_time:6.3f} s, {len(widths)} levels, "
+          f"max width {max(widths)}")
+    print(f"total              : {scc_time + level_time:6.3f} s")
+
+
+if __name__ == '__main__':
+    main()
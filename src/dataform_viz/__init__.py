@@ -9,6 +9,6 @@ __author__ = "Your Name"
 __email__ = "your.email@example.com"
 
 from .visualizer import DependencyVisualizer
-from .parser import parse_dependencies_report
+from .parser import parse_dependencies_report, iter_dependencies_report
 
-__all__ = ["DependencyVisualizer", "parse_dependencies_report"]
+__all__ = ["DependencyVisualizer", "parse_dependencies_report", "iter_dependencies_report"]
@@ -0,0 +1,162 @@
+"""
+Changed files -> minimal set of Dataform actions to rebuild
+
+Compiled tables carry the ``fileName`` of the definition that produced
+them. Changed files are mapped to their targets, the downstream closure is
+taken over the dependents adjacency, and the result is ordered
+topologically so it can be passed to ``dataform run --actions``.
+
+Only the ``tables`` array of the compile output is read. Files that define
+operations or assertions are reported as unmatched, and assertions
+downstream of a changed table are not selected; run them separately (e.g.
+with ``dataform run --include-dependents``) when they matter.
+"""
+import subprocess
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
+
+from .graph import DependencyGraph
+from .topology import strongly_connected_components
+
+# Changes here can alter any compiled action
+GLOBAL_PREFIXES = ('includes/',)
+GLOBAL_FILES = ('dataform.json', 'workflow_settings.yaml', 'package.json', 'package-lock.json')
+
+
+class AffectedActions(NamedTuple):
+    """Result of affected_actions"""
+    actions: List[str]
+    changed_targets: List[str]
+    unmatched_files: List[str]
+    full_rebuild: bool
+
+
+def normalize_file_name(path: str, project_dir: Optional[str] = None) -> str:
+    """
+    Turn a changed-file path into the project-relative POSIX form used by fileName
+
+    Args:
+        path: Path as given by the user or git (absolute, ./relative or with backslashes)
+        project_dir: Dataform project root for absolute paths (default: cwd)
+
+    Returns:
+        Normalized relative path
+    """
+    path = path.strip().replace('\\', '/')
+    if path.startswith('/') or (len(path) > 1 and path[1] == ':'):
+        root = Path(project_dir or '.').resolve()
+        try:
+            path = Path(path).resolve().relative_to(root).as_posix()
+        except ValueError:
+            pass
+    # Cheap string cleanup; called once per compiled table
+    while path.startswith('./'):
+        path = path[2:]
+    if '/./' in path or '//' in path:
+        path = PurePosixPath(path).as_posix()
+    return '' if path == '.' else path
+
+
+def index_file_targets(tables: Iterable[dict], file_targets: Dict[str, List[str]]) -> Iterator[dict]:
+    """
+    Pass compiled tables through while recording fileName -> target names
+
+    Lets build_dependency_graph consume the stream while the file map is
+    filled in the same pass.
+
+    Args:
+        tables: Compiled table objects
+        file_targets: Dict that receives normalized fileName -> ["schema.name", ...]
+
+    Yields:
+        The same table objects
+    """
+    for table in tables:
+        file_name = table.get('fileName')
+        if file_name:
+            target = table.get('target') or {}
+            name = f"{target.get('schema', '')}.{target.get('name', '')}"
+            file_targets.setdefault(normalize_file_name(file_name), []).append(name)
+        yield table
+
+
+def git_changed_files(ref: str = 'origin/main', cwd: Optional[str] = None) -> List[str]:
+    """
+    List files changed since the merge base with ref (`git diff --name-only --relative ref...HEAD`)
+
+    Paths are relative to cwd, the Dataform project root, like fileName;
+    changes outside it are left out, so a project in a subdirectory of the
+    repository (monorepo) matches its compiled actions.
+
+    Raises:
+        RuntimeError: If git fails
+    """
+    result = subprocess.run(['git', 'diff', '--name-only', '--relative', f'{ref}...HEAD'],
+                            capture_output=True, text=True, cwd=cwd)
+    if result.returncode != 0:
+        raise RuntimeError(f"git diff failed: {result.stderr.strip()}")
+    return [line for line in result.stdout.splitlines() if line.strip()]
+
+
+def affected_actions(graph: DependencyGraph, file_targets: Dict[str, List[str]],
+                     changed_files: Iterable[str],
+                     project_dir: Optional[str] = None) -> AffectedActions:
+    """
+    Compute the actions to rebuild for a set of changed files
+
+    Args:
+        graph: Graph built from the same compile output as file_targets
+        file_targets: fileName -> target names (from index_file_targets)
+        changed_files: Changed paths (any form accepted by normalize_file_name)
+        project_dir: Dataform project root for absolute paths
+
+    Returns:
+        AffectedActions with the changed tables plus everything downstream of
+        them in topological order (dependencies first). If a shared file such
+        as includes/* or dataform.json changed, every table is returned and
+        full_rebuild is set.
+    """
+    changed = sorted({normalize_file_name(path, project_dir) for path in changed_files} - {''})
+    full_rebuild = any(path.startswith(GLOBAL_PREFIXES) or path in GLOBAL_FILES
+                       for path in changed)
+
+    seeds = []
+    unmatched = []
+    for path in changed:
+        path_targets = file_targets.get(path)
+        if path_targets:
+            seeds.extend(path_targets)
+        elif not (path.startswith(GLOBAL_PREFIXES) or path in GLOBAL_FILES):
+            unmatched.append(path)
+
+    if full_rebuild:
+        selected = list(graph.record_ids())
+    else:
+        # Multi-source BFS over dependents
+        offsets, targets = graph.dependent_csr()
+        seen: Set[int] = set()
+        frontier: List[int] = []
+        for name in seeds:
+            node_id = graph.node_id(name)
+            if node_id is not None and node_id not in seen:
+                seen.add(node_id)
+                frontier.append(node_id)
+        while frontier:
+            next_frontier: List[int] = []
+            for node_id in frontier:
+                for pos in range(offsets[node_id], offsets[node_id + 1]):
+                    reader = targets[pos]
+                    if reader not in seen:
+                        seen.add(reader)
+                        next_frontier.append(reader)
+            frontier = next_frontier
+        selected = [node_id for node_id in seen if graph.has_record(node_id)]
+
+    component, _ = strongly_connected_components(graph)
+    selected.sort(key=lambda node_id: (component[node_id], node_id))
+    return AffectedActions(
+        actions=[graph.name(node_id) for node_id in selected],
+        changed_targets=sorted(set(seeds)),
+        unmatched_files=unmatched,
+        full_rebuild=full_rebuild,
+    )
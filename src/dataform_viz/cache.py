@@ -0,0 +1,202 @@
+"""
+On-disk cache of parsed dependency graphs
+
+The cache lives next to the report (``<report>.graphcache``) and is keyed by
+the report's size, modification time and BLAKE2b content hash, plus the JOIN
+parser version (join_info of compiled JSON reports comes from that parser).
+"""
+import hashlib
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from .graph import DependencyGraph
+
+CACHE_SUFFIX = '.graphcache'
+
+_MAGIC = b'DFVC'
+_CACHE_VERSION = 2
+# magic, version, JOIN parser version, report size, report mtime_ns, 16-byte content digest
+_HEADER = struct.Struct('<4sHHQq16s')
+
+_HASH_CHUNK = 1 << 20
+
+
+def cache_path_for(report_path: str) -> Path:
+    """Return the cache file path that belongs to a report"""
+    report = Path(report_path)
+    return report.with_name(report.name + CACHE_SUFFIX)
+
+
+def hash_file(path: str) -> bytes:
+    """
+    Hash a file's contents
+
+    Args:
+        path: File to hash
+
+    Returns:
+        16-byte BLAKE2b digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _parser_version() -> int:
+    # Imported here: dataform_check imports compile_cache, which imports this module
+    from .dataform_check import JOIN_PARSER_VERSION
+    return JOIN_PARSER_VERSION
+
+
+def report_stat_key(path: str) -> Tuple[int, int]:
+    """Return the (size, mtime_ns) pair used as the quick validity check"""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class ReportCache:
+    """Reads, validates and (re)writes the parsed-graph cache of one report"""
+
+    def __init__(self, report_path: str, stats: Optional[Dict[str, int]] = None):
+        """
+        Initialize cache
+
+        Args:
+            report_path: Path to dependencies report file
+            stats: Optional dict that receives hits, misses, writes and errors counters
+        """
+        self.report_path = Path(report_path)
+        self.cache_path = cache_path_for(report_path)
+        self.stats = stats if stats is not None else {}
+        for key in ('hits', 'misses', 'writes', 'errors'):
+            self.stats.setdefault(key, 0)
+        self._writer: Optional[threading.Thread] = None
+
+    def load(self) -> Optional[DependencyGraph]:
+        """
+        Return the cached graph if the cache matches the current report
+
+        Size and mtime are compared first; if only the mtime differs the
+        content hash decides (e.g. after a checkout that rewrote the file),
+        and on a match the new mtime is stored so later loads skip the hash.
+
+        Returns:
+            DependencyGraph on a hit, None on a miss
+        """
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = f.read()
+            magic, version, parser_version, size, mtime_ns, digest = _HEADER.unpack_from(data, 0)
+            if magic != _MAGIC or version != _CACHE_VERSION or parser_version != _parser_version():
+                raise ValueError("stale cache format")
+
+            current_size, current_mtime = report_stat_key(str(self.report_path))
+            if current_size != size:
+                raise ValueError("report size changed")
+            touched = current_mtime != mtime_ns
+            if touched and hash_file(str(self.report_path)) != digest:
+                raise ValueError("report content changed")
+
+            graph = DependencyGraph.from_bytes(data[_HEADER.size:])
+        except (OSError, ValueError, KeyError, struct.error):
+            self.stats['misses'] += 1
+            return None
+
+        if touched:
+            self._refresh_mtime(size, current_mtime, digest)
+        self.stats['hits'] += 1
+        return graph
+
+    def _refresh_mtime(self, size: int, mtime_ns: int, digest: bytes) -> None:
+        """Store the report's new mtime after a content-hash hit (the header is rewritten in place)"""
+        try:
+            with open(self.cache_path, 'r+b') as f:
+                f.write(_HEADER.pack(_MAGIC, _CACHE_VERSION, _parser_version(), size, mtime_ns, digest))
+        except OSError:
+            self.stats['errors'] += 1
+
+    def save(self, graph: DependencyGraph, stat_key: Tuple[int, int],
+             background: bool = True) -> None:
+        """
+        Write the cache for a freshly parsed graph
+
+        The report is hashed and the file written atomically via a temporary
+        file. If the report changed since stat_key was taken the write is
+        abandoned.
+
+        Args:
+            graph: Graph parsed from the report
+            stat_key: (size, mtime_ns) of the report taken before parsing
+            background: Write from a worker thread so the caller does not wait
+        """
+        if background:
+            self._writer = threading.Thread(
+                target=self._write, args=(graph, stat_key), name='dataform-viz-cache-writer'
+            )
+            self._writer.start()
+        else:
+            self._write(graph, stat_key)
+
+    def wait(self) -> None:
+        """Block until a background cache write has finished"""
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+
+    def _write(self, graph: DependencyGraph, stat_key: Tuple[int, int]) -> None:
+        tmp_path = self.cache_path.with_name(self.cache_path.name + f'.{os.getpid()}.tmp')
+        try:
+            digest = hash_file(str(self.report_path))
+            if report_stat_key(str(self.report_path)) != stat_key:
+                return
+            header = _HEADER.pack(_MAGIC, _CACHE_VERSION, _parser_version(),
+                                  stat_key[0], stat_key[1], digest)
+            with open(tmp_path, 'wb') as f:
+                f.write(header)
+                f.write(graph.to_bytes())
+            os.replace(tmp_path, self.cache_path)
+            self.stats['writes'] += 1
+        except OSError:
+            self.stats['errors'] += 1
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+
+def load_graph(report_path: str, use_cache: bool = True,
+               cache: Optional[ReportCache] = None,
+               loader: Optional[Callable[[str], DependencyGraph]] = None) -> DependencyGraph:
+    """
+    Load a report as a DependencyGraph, going through the cache when enabled
+
+    On a miss the report is parsed and the cache rebuilt in the background.
+
+    Args:
+        report_path: Path to dependencies report file
+        use_cache: Set False to always parse the report and leave the cache alone
+        cache: Existing ReportCache to use (keeps its stats)
+        loader: Function that builds the graph from the file on a miss
+            (default: DependencyGraph.from_report)
+
+    Returns:
+        DependencyGraph
+    """
+    loader = loader or DependencyGraph.from_report
+    if not use_cache:
+        return loader(report_path)
+
+    cache = cache or ReportCache(report_path)
+    graph = cache.load()
+    if graph is not None:
+        return graph
+
+    stat_key = report_stat_key(report_path)
+    graph = loader(report_path)
+    cache.save(graph, stat_key)
+    return graph
@@ -23,6 +23,36 @@ def parse_utils_file(utils_file_path):
     
     return constants
 
+def find_config_blocks(text, keyword="config"):
+    """
+    Find all `<keyword> { ... }` blocks, handling nested braces.
+    Returns a list of (start, end, block_text) tuples; blocks whose braces
+    never balance are skipped.
+    """
+    results = []
+    pattern = re.compile(rf'\b{keyword}\s*\{{')
+    
+    for match in pattern.finditer(text):
+        start = match.start()
+        brace_start = match.end() - 1
+        
+        # Count braces to find matching closing brace
+        brace_count = 1
+        pos = brace_start + 1
+        
+        while pos < len(text) and brace_count > 0:
+            if text[pos] == '{':
+                brace_count += 1
+            elif text[pos] == '}':
+                brace_count -= 1
+            pos += 1
+        
+        if brace_count == 0:
+            end = pos
+            results.append((start, end, text[start:end]))
+    
+    return results
+
 def cleanup_database_lines(directory="definitions"):
     """
     Remove database lines from config sections in .sqlx files, dependencies.js files,
@@ -112,33 +142,6 @@ def cleanup_database_lines(directory="definitions"):
                 content
             )
             
-            # Find config blocks with proper brace matching
-            def find_config_blocks(text):
-                """Find all config blocks handling nested braces."""
-                results = []
-                pattern = re.compile(r'config\s*\{')
-                
-                for match in pattern.finditer(text):
-                    start = match.start()
-                    brace_start = match.end() - 1
-                    
-                    # Count braces to find matching closing brace
-                    brace_count = 1
-                    pos = brace_start + 1
-                    
-                    while pos < len(text) and brace_count > 0:
-                        if text[pos] == '{':
-                            brace_count += 1
-                        elif text[pos] == '}':
-                            brace_count -= 1
-                        pos += 1
-                    
-                    if brace_count == 0:
-                        end = pos
-                        results.append((start, end, text[start:end]))
-                
-                return results
-            
             # Find and process all config blocks
             config_blocks = find_config_blocks(content)
             
@@ -7,18 +7,70 @@ from pathlib import Path
 from .visualizer import DependencyVisualizer
 
 
+def print_cache_stats(viz):
+    """Print report cache hit/miss counters"""
+    stats = viz.cache_stats
+    if not viz.use_cache or not (stats['hits'] or stats['misses']):
+        return
+    print(f"  Report cache: {stats['hits']} hit(s), {stats['misses']} miss(es)")
+
+
+def print_render_failures(viz):
+    """Print the tables that failed to render"""
+    failures = viz.render_failures
+    if not failures:
+        return
+    print(f"⚠ {len(failures)} table(s) failed to render:", file=sys.stderr)
+    for table_name, error in failures:
+        print(f"  - {table_name}: {error}", file=sys.stderr)
+
+
+def print_render_stats(viz):
+    """Print how many diagrams were rendered, skipped as unchanged and removed"""
+    stats = viz.render_stats
+    print(f"  Diagrams: {stats['rendered']} rendered, {stats['skipped']} unchanged, "
+          f"{stats['removed']} removed")
+
+
+def make_visualizer(args, use_index=False):
+    """Create the visualizer for --report, or from a fresh compile with --compile"""
+    if args.compile:
+        from .dataform_check import iter_project_tables
+        return DependencyVisualizer.from_compiled(iter_project_tables(
+            use_cache=not args.no_cache,
+            recompile=getattr(args, 'recompile', False),
+            verbose=getattr(args, 'verbose', False)
+        ), jobs=getattr(args, 'jobs', 1))
+    return DependencyVisualizer(args.report, use_cache=not args.no_cache, use_index=use_index,
+                                backend=getattr(args, 'backend', 'memory'))
+
+
+def critical_styles(viz, args):
+    """Edge styles of the critical path from --durations, or None without it"""
+    durations = getattr(args, 'durations', None)
+    if not durations:
+        return None
+    from .critical_path import critical_edge_styles, critical_path, load_run_stats
+    return critical_edge_styles(critical_path(viz.load_graph(), load_run_stats(durations)))
+
+
 def cmd_generate(args):
     """Generate SVGs for a specific schema"""
-    viz = DependencyVisualizer(args.report)
-    
     try:
+        viz = make_visualizer(args, use_index=True)
         count = viz.generate_schema_svgs(
             args.schema,
-            output_dir=args.output
+            output_dir=args.output,
+            jobs=args.jobs,
+            force=args.force,
+            edge_styles=critical_styles(viz, args)
         )
         print(f"✓ Generated {count} SVG diagrams for {args.schema}")
         print(f"  Output: {args.output}/dependencies_{args.schema}/")
-        return 0
+        print_render_stats(viz)
+        print_cache_stats(viz)
+        print_render_failures(viz)
+        return 1 if viz.render_failures else 0
     except Exception as e:
         print(f"✗ Error: {e}", file=sys.stderr)
         return 1
@@ -26,12 +78,14 @@ def cmd_generate(args):
 
 def cmd_generate_all(args):
     """Generate SVGs for all schemas"""
-    viz = DependencyVisualizer(args.report)
-    
     try:
+        viz = make_visualizer(args)
         results = viz.generate_all_schemas(
             output_dir=args.output,
-            exclude_patterns=args.exclude or ['refined_*']
+            exclude_patterns=args.exclude or ['refined_*'],
+            jobs=args.jobs,
+            force=args.force,
+            edge_styles=critical_styles(viz, args)
         )
         
         total = sum(results.values())
@@ -39,18 +93,395 @@ def cmd_generate_all(args):
         for schema, count in sorted(results.items()):
             print(f"  - {schema}: {count} tables")
         print(f"\nOutput directory: {args.output}/")
+        print_render_stats(viz)
+        print_cache_stats(viz)
+        print_render_failures(viz)
+        return 1 if viz.render_failures else 0
+    except Exception as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        return 1
+
+
+def cmd_lineage(args):
+    """Show everything upstream and/or downstream of a table"""
+    import json
+    
+    try:
+        viz = make_visualizer(args)
+        show_up = args.direction in ('upstream', 'both')
+        show_down = args.direction in ('downstream', 'both')
+        
+        if args.format == 'svg':
+            safe_name = args.table.replace('.', '_').replace('-', '_')
+            svg_file = args.out or Path(args.output) / f"lineage_{safe_name}.svg"
+            path = viz.generate_lineage_svg(
+                args.table, svg_file, depth=args.depth,
+                upstream=show_up, downstream=show_down
+            )
+            print(f"✓ Lineage diagram created: {path}")
+            return 0
+        
+        tables = viz.load_report()
+        sections = {}
+        if show_up:
+            sections['upstream'] = viz.upstream(args.table, args.depth)
+        if show_down:
+            sections['downstream'] = viz.downstream(args.table, args.depth)
+        
+        if args.format == 'json':
+            result = {'table': args.table}
+            for direction, entries in sections.items():
+                result[direction] = [
+                    {'name': name, 'distance': distance,
+                     'type': tables.get(name, {}).get('type', 'unknown')}
+                    for name, distance in entries
+                ]
+            print(json.dumps(result, indent=2))
+            return 0
+        
+        for direction, entries in sections.items():
+            print(f"{direction.capitalize()} of {args.table} ({len(entries)}):")
+            for name, distance in entries:
+                print(f"  {distance:>3}  {name}")
+        return 0
+    except Exception as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        return 1
+
+
+def cmd_levels(args):
+    """Report dependency cycles and the number of tables per execution level"""
+    import json
+    from .topology import find_cycles, level_widths, strongly_connected_components, topological_levels
+    
+    try:
+        viz = make_visualizer(args)
+        graph = viz.load_graph()
+        component, _ = strongly_connected_components(graph)
+        cycles = find_cycles(graph, component)
+        levels = topological_levels(graph, component)
+        widths = level_widths(levels)
+        
+        if args.format == 'json':
+            result = {'widths': widths, 'cycles': cycles}
+            if args.tables:
+                result['levels'] = {
+                    graph.name(node_id): levels[node_id] for node_id in graph.record_ids()
+                }
+            print(json.dumps(result, indent=2))
+            return 0
+        
+        by_level = {}
+        if args.tables:
+            for node_id in graph.record_ids():
+                by_level.setdefault(levels[node_id], []).append(graph.name(node_id))
+        
+        print(f"{len(graph)} tables in {len(widths)} levels "
+              f"(max parallelism {max(widths, default=0)})")
+        print(f"{'Level':>6}  {'Tables':>7}")
+        for level, width in enumerate(widths):
+            print(f"{level:>6}  {width:>7}")
+            for name in by_level.get(level, ()):
+                print(f"          {name}")
+        
+        if cycles:
+            print(f"\n⚠ {len(cycles)} dependency cycle(s):")
+            for members in cycles:
+                print(f"  - {' <-> '.join(members)}")
+        return 0
+    except Exception as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        return 1
+
+
+def cmd_critical_path(args):
+    """Join run durations onto the graph and show the chain that bounds wall-clock time"""
+    import json
+    from .critical_path import (critical_path, critical_path_json, format_bytes, format_duration,
+                                load_run_stats, render_critical_path_svgs)
+    
+    try:
+        viz = make_visualizer(args)
+        graph = viz.load_graph()
+        result = critical_path(graph, load_run_stats(args.durations))
+        
+        if result.unmatched:
+            print(f"⚠ {len(result.unmatched)} run statistic(s) matched no table in the graph",
+                  file=sys.stderr)
+        
+        if args.format == 'json':
+            print(json.dumps(critical_path_json(result, top=args.top), indent=2))
+            return 0
+        
+        if args.format == 'svg':
+            out_dir = Path(args.output) / 'critical_path'
+            chain, count = render_critical_path_svgs(graph, result, str(out_dir))
+            print(f"✓ Critical path diagram created: {chain}")
+            print(f"  {count} table diagrams in {out_dir}/")
+            return 0
+        
+        path_bytes = sum(result.timings[name].bytes_processed for name in result.path)
+        print(f"Critical path: {len(result.path)} of {len(result.timings)} tables, "
+              f"{format_duration(result.makespan)} wall clock ({format_bytes(path_bytes)} processed)")
+        print(f"{'Start':>10}  {'Duration':>10}  {'Bytes':>10}  Table")
+        for name in result.path:
+            timing = result.timings[name]
+            print(f"{format_duration(timing.start):>10}  {format_duration(timing.duration):>10}  "
+                  f"{format_bytes(timing.bytes_processed):>10}  {name}")
+        
+        closest = result.least_slack(args.top)
+        if closest:
+            print("\nClosest to critical (slack):")
+            for name, timing in closest:
+                print(f"  {format_duration(timing.slack):>10}  {name} ({format_duration(timing.duration)})")
+        if result.missing:
+            print(f"\n⚠ {len(result.missing)} table(s) without run statistics were counted as 0s")
+        return 0
+    except Exception as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        return 1
+
+
+def cmd_affected(args):
+    """Print the minimal set of actions to rebuild for changed files"""
+    import json
+    from .affected import affected_actions, git_changed_files, index_file_targets
+    from .dataform_check import build_dependency_graph, iter_compiled_json_tables, iter_project_tables
+    
+    try:
+        changed = list(args.files)
+        if args.git_diff:
+            changed.extend(git_changed_files(args.git_diff))
+        if not args.files and not args.git_diff and not sys.stdin.isatty():
+            changed.extend(line for line in sys.stdin.read().splitlines() if line.strip())
+        
+        if args.compile:
+            # Progress goes to stderr: stdout is the action list
+            tables = iter_project_tables(
+                use_cache=not args.no_cache,
+                recompile=args.recompile,
+                verbose=args.verbose,
+                log=lambda message: print(message, file=sys.stderr)
+            )
+        elif Path(args.report).suffix.lower() == '.json':
+            tables = iter_compiled_json_tables(args.report)
+        else:
+            raise ValueError("affected needs fileName from compile output: "
+                             "use --compile or a --report ending in .json")
+        
+        file_targets = {}
+        graph = build_dependency_graph(index_file_targets(tables, file_targets),
+                                       log=None, parse_joins=False)
+        result = affected_actions(graph, file_targets, changed)
+        
+        for path in result.unmatched_files:
+            print(f"  (no compiled action for {path})", file=sys.stderr)
+        if result.full_rebuild:
+            print("  Shared project files changed: every action is affected", file=sys.stderr)
+        
+        if args.format == 'json':
+            print(json.dumps(result._asdict(), indent=2))
+        elif args.format == 'list':
+            for action in result.actions:
+                print(action)
+        elif result.actions:
+            print("--actions " + " ".join(result.actions))
+        return 0
+    except Exception as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        return 1
+
+
+def cmd_diff(args):
+    """Stream the differences between two dependency reports"""
+    import json
+    from .graph_diff import format_event, iter_report_diff, render_diff_svgs
+    
+    try:
+        counts = {}
+        events = [] if args.render else None
+        for event in iter_report_diff(args.old, args.new):
+            counts[event.kind] = counts.get(event.kind, 0) + 1
+            if events is not None:
+                events.append(event)
+            if args.format == 'json':
+                print(json.dumps(event._asdict()))
+            else:
+                print(format_event(event))
+        
+        if args.format == 'text':
+            summary = ", ".join(f"{n} {kind.replace('_', ' ')}" for kind, n in sorted(counts.items()))
+            print(f"\n{summary or 'No differences'}")
+        
+        if args.render:
+            old_tables = DependencyVisualizer(args.old, use_cache=not args.no_cache).load_report()
+            new_tables = DependencyVisualizer(args.new, use_cache=not args.no_cache).load_report()
+            written = render_diff_svgs(old_tables, new_tables, events, args.render)
+            print(f"✓ Rendered {written} changed diagrams to {args.render}/", file=sys.stderr)
+        return 0
+    except Exception as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        return 1
+
+
+def cmd_schema_graph(args):
+    """Aggregate tables into schemas and show or render the weighted schema graph"""
+    import json
+    
+    try:
+        viz = make_visualizer(args)
+        schema_graph = viz.schema_graph()
+        
+        if args.format == 'svg':
+            overview, count = viz.generate_schema_graph_svgs(
+                output_dir=args.output,
+                schemas=args.schema or None,
+                exclude_patterns=args.exclude
+            )
+            print(f"✓ Schema overview created: {overview}")
+            print(f"  {count} schema neighbor diagrams in {Path(args.output) / 'schema_neighbors'}/")
+            return 0
+        
+        edges = schema_graph.edges()
+        if args.schema:
+            wanted = set(args.schema)
+            edges = [edge for edge in edges if edge[0] in wanted or edge[1] in wanted]
+        
+        if args.format == 'json':
+            result = {
+                'schemas': {
+                    schema: {'tables': schema_graph.table_counts.get(schema, 0),
+                             'internal_edges': schema_graph.weight(schema, schema)}
+                    for schema in schema_graph.schemas()
+                    if not args.schema or schema in args.schema
+                },
+                'edges': [{'source': source, 'reader': reader, 'weight': weight}
+                          for source, reader, weight in edges],
+            }
+            print(json.dumps(result, indent=2))
+            return 0
+        
+        print(f"{len(schema_graph.schemas())} schemas, {len(edges)} schema edges")
+        for source, reader, weight in sorted(edges, key=lambda edge: (-edge[2], edge[0], edge[1])):
+            print(f"  {weight:>6}  {source} -> {reader}")
+        return 0
+    except Exception as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        return 1
+
+
+def cmd_search(args):
+    """Fuzzy-search table names"""
+    import json
+    from .search import TrigramIndex
+    
+    try:
+        viz = make_visualizer(args)
+        tables = viz.load_report()
+        results = TrigramIndex(tables).search(args.query, limit=args.limit)
+        
+        if args.format == 'json':
+            print(json.dumps([
+                {'name': name, 'type': tables[name]['type'], 'score': score}
+                for name, score in results
+            ], indent=2))
+            return 0
+        
+        if not results:
+            print(f"No tables match '{args.query}'")
+            return 0
+        for name, score in results:
+            print(f"  {score:6.3f}  {name} ({tables[name]['type']})")
         return 0
     except Exception as e:
         print(f"✗ Error: {e}", file=sys.stderr)
         return 1
 
 
+def cmd_scan(args):
+    """Build the graph from the .sqlx sources without running Node"""
+    import time
+    from .dataform_check import build_dependency_graph, iter_compiled_json_tables, print_text_report
+    from .graph_diff import format_event, iter_graph_diff
+    from .sqlx_scanner import scan_project
+    
+    try:
+        start = time.perf_counter()
+        result = scan_project(args.project_dir, jobs=args.jobs)
+        graph = build_dependency_graph(result.tables, log=None, jobs=args.jobs)
+        print(f"✓ Scanned {result.file_count} files: {len(result.tables)} tables, "
+              f"{graph.edge_count} edges in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+        for file_name, message in result.unresolved:
+            print(f"  (unresolved) {file_name}: {message}", file=sys.stderr)
+        
+        if args.compare:
+            compiled = build_dependency_graph(iter_compiled_json_tables(args.compare), log=None)
+            counts = {}
+            for event in iter_graph_diff(compiled, graph):
+                counts[event.kind] = counts.get(event.kind, 0) + 1
+                print(format_event(event))
+            summary = ", ".join(f"{n} {kind.replace('_', ' ')}" for kind, n in sorted(counts.items()))
+            print(f"\n{summary or 'Static scan matches the compiled graph'}")
+        elif args.save:
+            with open(args.save, 'w', encoding='utf-8') as f:
+                print_text_report(graph, file=f)
+            print(f"✓ Wrote {args.save}", file=sys.stderr)
+        else:
+            print_text_report(graph)
+        return 0
+    except Exception as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        return 1
+
+
+def cmd_serve(args):
+    """Keep the graph in memory and answer queries over local HTTP"""
+    from .server import GraphService, make_server
+    
+    try:
+        if getattr(args, 'backend', 'memory') != 'memory':
+            # Handler threads cannot share the SQLite store's connection
+            raise ValueError("serve keeps the graph in memory; drop --backend sqlite")
+        if args.compile:
+            service = GraphService(visualizer=make_visualizer(args), svg_cache_size=args.cache_size)
+        else:
+            service = GraphService(args.report, use_cache=not args.no_cache,
+                                   svg_cache_size=args.cache_size)
+        server = make_server(service, host=args.host, port=args.port,
+                             socket_path=args.socket, quiet=args.quiet)
+    except Exception as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        return 1
+    
+    if args.socket:
+        address = f"unix:{args.socket}"
+    else:
+        host, port = server.server_address[:2]
+        address = f"http://{host}:{port}"
+    print(f"✓ Serving {len(service.graph)} tables on {address} (Ctrl+C to stop)")
+    if service.report_path:
+        print(f"  Reloading when {service.report_path} changes")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
 def cmd_index(args):
     """Generate master index"""
-    viz = DependencyVisualizer(args.report)
+    viz = DependencyVisualizer(args.report, use_cache=not args.no_cache)
     
     try:
-        index_file = viz.generate_master_index(output_dir=args.output)
+        critical = None
+        durations = getattr(args, 'durations', None)
+        if durations:
+            from .critical_path import critical_path, index_labels, load_run_stats
+            critical = index_labels(critical_path(viz.load_graph(), load_run_stats(durations)))
+        index_file = viz.generate_master_index(output_dir=args.output, critical=critical)
         print(f"✓ Master index created: {index_file}")
         
         if args.open:
@@ -98,6 +529,12 @@ def cmd_setup(args):
     args_all = argparse.Namespace(
         report=args.report,
         output=args.output,
+        no_cache=args.no_cache,
+        compile=args.compile,
+        recompile=args.recompile,
+        verbose=args.verbose,
+        jobs=args.jobs,
+        force=args.force,
         exclude=args.exclude
     )
     if cmd_generate_all(args_all) != 0:
@@ -107,6 +544,11 @@ def cmd_setup(args):
     args_idx = argparse.Namespace(
         report=args.report,
         output=args.output,
+        no_cache=args.no_cache,
+        compile=args.compile,
+        recompile=args.recompile,
+        verbose=args.verbose,
+        durations=None,
         open=True
     )
     return cmd_index(args_idx)
@@ -122,7 +564,34 @@ def main():
     parser.add_argument(
         '--report',
         default='dependencies_report.txt',
-        help='Path to dependencies report file (default: dependencies_report.txt)'
+        help='Path to dependencies report file, or a saved `dataform compile --json` '
+             'output ending in .json (default: dependencies_report.txt)'
+    )
+    
+    parser.add_argument(
+        '--compile',
+        action='store_true',
+        help='Run `dataform compile --json` and use its graph directly instead of --report'
+    )
+    
+    parser.add_argument(
+        '--backend',
+        choices=['memory', 'sqlite'],
+        default='memory',
+        help='Keep the parsed graph in memory (default) or in an indexed <report>.sqlite '
+             'file queried lazily (for very large projects)'
+    )
+    
+    parser.add_argument(
+        '--recompile',
+        action='store_true',
+        help='With --compile, ignore the compile cache and run dataform compile'
+    )
+    
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='With --compile, show which files invalidated the compile cache'
     )
     
     parser.add_argument(
@@ -131,11 +600,37 @@ def main():
         help='Output directory (default: output)'
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always reparse the report instead of using <report>.graphcache '
+             '(with --compile: skip the compile cache)'
+    )
+    
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=None,
+        help='Worker processes for SVG rendering and, with --compile, JOIN parsing '
+             '(default: CPU count)'
+    )
+    
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-render every diagram, even those unchanged since the last run'
+    )
+    
     subparsers = parser.add_subparsers(dest='command', help='Commands')
     
     # Generate command
     gen_parser = subparsers.add_parser('generate', help='Generate SVGs for a schema')
     gen_parser.add_argument('schema', help='Schema name to generate')
+    gen_parser.add_argument(
+        '--durations',
+        metavar='FILE',
+        help='Run statistics (CSV/JSON) for highlighting the critical path'
+    )
     gen_parser.set_defaults(func=cmd_generate)
     
     # Generate-all command
@@ -143,10 +638,219 @@ def main():
     gen_all_parser.add_argument(
         '--exclude',
         nargs='+',
-        help='Schema patterns to exclude (default: refined_*)'
+        help='Schema glob patterns to exclude, e.g. refined_* tmp_? (default: refined_*)'
+    )
+    gen_all_parser.add_argument(
+        '--durations',
+        metavar='FILE',
+        help='Run statistics (CSV/JSON) for highlighting the critical path'
     )
     gen_all_parser.set_defaults(func=cmd_generate_all)
     
+    # Lineage command
+    lineage_parser = subparsers.add_parser('lineage', help='Show transitive upstream/downstream tables')
+    lineage_parser.add_argument('table', help='Full table name (schema.table)')
+    lineage_parser.add_argument(
+        '--direction',
+        choices=['upstream', 'downstream', 'both'],
+        default='both',
+        help='Which side of the lineage to show (default: both)'
+    )
+    lineage_parser.add_argument(
+        '--depth',
+        type=int,
+        default=None,
+        help='Maximum number of hops (default: unlimited)'
+    )
+    lineage_parser.add_argument(
+        '--format',
+        choices=['list', 'json', 'svg'],
+        default='list',
+        help='Output format (default: list)'
+    )
+    lineage_parser.add_argument(
+        '--out',
+        help='SVG path for --format svg (default: <output>/lineage_<table>.svg)'
+    )
+    lineage_parser.set_defaults(func=cmd_lineage)
+    
+    # Levels command
+    levels_parser = subparsers.add_parser('levels', help='Show execution levels, parallelism and cycles')
+    levels_parser.add_argument(
+        '--tables',
+        action='store_true',
+        help='List the tables on each level'
+    )
+    levels_parser.add_argument(
+        '--format',
+        choices=['text', 'json'],
+        default='text',
+        help='Output format (default: text)'
+    )
+    levels_parser.set_defaults(func=cmd_levels)
+    
+    # Critical path command
+    critical_parser = subparsers.add_parser(
+        'critical-path',
+        help='Chain of tables that bounds the run time, from per-table durations'
+    )
+    critical_parser.add_argument(
+        '--durations',
+        required=True,
+        metavar='FILE',
+        help='CSV/JSON export of per-table run durations and bytes processed'
+    )
+    critical_parser.add_argument(
+        '--top',
+        type=int,
+        default=10,
+        help='Off-path tables with the least slack to list (default: 10)'
+    )
+    critical_parser.add_argument(
+        '--format',
+        choices=['text', 'json', 'svg'],
+        default='text',
+        help='Output format; svg writes to <output>/critical_path/ (default: text)'
+    )
+    critical_parser.set_defaults(func=cmd_critical_path)
+    
+    # Affected command
+    affected_parser = subparsers.add_parser(
+        'affected',
+        help='Actions to rebuild for changed files (needs --compile or a .json --report)'
+    )
+    affected_parser.add_argument(
+        'files',
+        nargs='*',
+        help='Changed files (also read from stdin, e.g. `git diff --name-only | ...`)'
+    )
+    affected_parser.add_argument(
+        '--git-diff',
+        metavar='REF',
+        help='Add the files changed between REF and HEAD (git diff --name-only REF...HEAD)'
+    )
+    affected_parser.add_argument(
+        '--format',
+        choices=['actions', 'list', 'json'],
+        default='actions',
+        help='Print "--actions a b c" (default), one action per line, or JSON'
+    )
+    affected_parser.set_defaults(func=cmd_affected)
+    
+    # Diff command
+    diff_parser = subparsers.add_parser('diff', help='Compare two dependency reports')
+    diff_parser.add_argument('old', help='Baseline report (text, or compiled .json loaded whole)')
+    diff_parser.add_argument('new', help='New report (text, or compiled .json loaded whole)')
+    diff_parser.add_argument(
+        '--format',
+        choices=['text', 'json'],
+        default='text',
+        help='Text lines or one JSON object per line (default: text)'
+    )
+    diff_parser.add_argument(
+        '--render',
+        metavar='DIR',
+        help='Also render the changed tables to DIR with added/removed edges highlighted'
+    )
+    diff_parser.set_defaults(func=cmd_diff)
+    
+    # Schema graph command
+    schema_parser = subparsers.add_parser(
+        'schema-graph',
+        help='Collapse tables into schemas with weighted edges (overview and neighbor SVGs)'
+    )
+    schema_parser.add_argument(
+        '--schema',
+        action='append',
+        help='Only this schema (repeatable)'
+    )
+    schema_parser.add_argument(
+        '--exclude',
+        action='append',
+        help='Schema globs to skip for neighbor diagrams (repeatable)'
+    )
+    schema_parser.add_argument(
+        '--format',
+        choices=['svg', 'text', 'json'],
+        default='svg',
+        help='Render SVGs to --output (default), or list the weighted edges'
+    )
+    schema_parser.set_defaults(func=cmd_schema_graph)
+    
+    # Search command
+    search_parser = subparsers.add_parser('search', help='Fuzzy-search table names')
+    search_parser.add_argument('query', help='Part of a table name, typos allowed (e.g. "cust 360")')
+    search_parser.add_argument(
+        '--limit',
+        type=int,
+        default=20,
+        help='Maximum number of results (default: 20)'
+    )
+    search_parser.add_argument(
+        '--format',
+        choices=['text', 'json'],
+        default='text',
+        help='Output format (default: text)'
+    )
+    search_parser.set_defaults(func=cmd_search)
+    
+    # Scan command
+    scan_parser = subparsers.add_parser(
+        'scan',
+        help='Build the graph from the .sqlx sources without Node (static approximation)'
+    )
+    scan_parser.add_argument(
+        'project_dir',
+        nargs='?',
+        default='.',
+        help='Dataform project root (default: .)'
+    )
+    scan_parser.add_argument(
+        '--save',
+        metavar='FILE',
+        help='Write the text report to FILE (usable as --report) instead of stdout'
+    )
+    scan_parser.add_argument(
+        '--compare',
+        metavar='COMPILED_JSON',
+        help='List the differences from a saved `dataform compile --json` output instead'
+    )
+    scan_parser.set_defaults(func=cmd_scan)
+    
+    # Serve command
+    serve_parser = subparsers.add_parser(
+        'serve',
+        help='Keep the graph in memory and answer neighbor/lineage/search/SVG queries over HTTP'
+    )
+    serve_parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='Interface to bind (default: 127.0.0.1)'
+    )
+    serve_parser.add_argument(
+        '--port',
+        type=int,
+        default=8765,
+        help='TCP port, 0 for any free port (default: 8765)'
+    )
+    serve_parser.add_argument(
+        '--socket',
+        metavar='PATH',
+        help='Listen on a Unix socket instead of TCP'
+    )
+    serve_parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=256,
+        help='Rendered diagrams kept in memory (default: 256)'
+    )
+    serve_parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help='Do not log requests'
+    )
+    serve_parser.set_defaults(func=cmd_serve)
+    
     # Index command
     idx_parser = subparsers.add_parser('index', help='Generate master index')
     idx_parser.add_argument(
@@ -154,6 +858,11 @@ def main():
         action='store_true',
         help='Open index in browser'
     )
+    idx_parser.add_argument(
+        '--durations',
+        metavar='FILE',
+        help='Run statistics (CSV/JSON) for highlighting the critical path'
+    )
     idx_parser.set_defaults(func=cmd_index)
     
     # Cleanup command
@@ -175,7 +884,7 @@ def main():
     setup_parser.add_argument(
         '--exclude',
         nargs='+',
-        help='Schema patterns to exclude (default: refined_*)'
+        help='Schema glob patterns to exclude, e.g. refined_* tmp_? (default: refined_*)'
     )
     setup_parser.set_defaults(func=cmd_setup)
     
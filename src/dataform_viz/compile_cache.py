@@ -0,0 +1,207 @@
+"""
+Content-addressed cache of `dataform compile --json` results
+
+The key is a hash over every file under ``definitions/`` and ``includes/``
+plus the project settings file. Compiled tables are stored under
+``.dataform_viz_cache/`` in the project, one file per key, so a hit skips
+the Node subprocess entirely.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cache import hash_file
+
+CACHE_DIR = '.dataform_viz_cache'
+SOURCE_DIRS = ('definitions', 'includes')
+SETTINGS_FILES = ('dataform.json', 'workflow_settings.yaml')
+
+_MANIFEST = 'compile_manifest.json'
+_ENTRY_PREFIX = 'compiled-'
+_MAX_ENTRIES = 4
+
+
+def collect_project_files(project_dir: str = '.') -> List[str]:
+    """
+    List the files that determine the compile result
+
+    Args:
+        project_dir: Dataform project root
+
+    Returns:
+        Sorted project-relative POSIX paths
+    """
+    root = Path(project_dir)
+    files = [name for name in SETTINGS_FILES if (root / name).is_file()]
+    for source_dir in SOURCE_DIRS:
+        base = root / source_dir
+        if not base.is_dir():
+            continue
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            for filename in filenames:
+                files.append(Path(dirpath, filename).relative_to(root).as_posix())
+    return sorted(files)
+
+
+def hash_project_files(project_dir: str = '.', files: Optional[Iterable[str]] = None,
+                       jobs: Optional[int] = None) -> Dict[str, str]:
+    """
+    Hash project files on a thread pool
+
+    Args:
+        project_dir: Dataform project root
+        files: Project-relative paths (default: collect_project_files())
+        jobs: Worker threads (default: ThreadPoolExecutor's default)
+
+    Returns:
+        Dict of relative path -> hex digest
+    """
+    root = Path(project_dir)
+    files = list(collect_project_files(project_dir) if files is None else files)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        digests = pool.map(lambda name: hash_file(str(root / name)).hex(), files)
+        return dict(zip(files, digests))
+
+
+def project_key(file_hashes: Dict[str, str]) -> str:
+    """Combine per-file digests into the cache key"""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in sorted(file_hashes):
+        digest.update(f"{name}\0{file_hashes[name]}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def diff_file_hashes(old: Dict[str, str], new: Dict[str, str]) -> List[Tuple[str, str]]:
+    """
+    Compare two fingerprints
+
+    Returns:
+        Sorted (status, path) pairs with status 'added', 'removed' or 'modified'
+    """
+    changes = [('added', name) for name in new if name not in old]
+    changes += [('removed', name) for name in old if name not in new]
+    changes += [('modified', name) for name in new if name in old and old[name] != new[name]]
+    return sorted(changes, key=lambda change: change[1])
+
+
+class CompileCache:
+    """Stores compiled tables per project fingerprint"""
+
+    def __init__(self, project_dir: str = '.', cache_dir: Optional[str] = None,
+                 jobs: Optional[int] = None, stats: Optional[Dict[str, int]] = None):
+        """
+        Initialize cache
+
+        Args:
+            project_dir: Dataform project root
+            cache_dir: Where results are stored (default: <project>/.dataform_viz_cache)
+            jobs: Hashing threads
+            stats: Optional dict that receives hits, misses and writes counters
+        """
+        self.project_dir = Path(project_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.project_dir / CACHE_DIR
+        self.jobs = jobs
+        self.stats = stats if stats is not None else {}
+        for key in ('hits', 'misses', 'writes'):
+            self.stats.setdefault(key, 0)
+
+    def fingerprint(self) -> Tuple[str, Dict[str, str]]:
+        """Return (cache key, per-file digests) for the current project state"""
+        hashes = hash_project_files(str(self.project_dir), jobs=self.jobs)
+        return project_key(hashes), hashes
+
+    def entry_path(self, key: str) -> Path:
+        """Return the file that holds the compile result for a key"""
+        return self.cache_dir / f"{_ENTRY_PREFIX}{key}.json"
+
+    def load_manifest(self) -> Dict[str, str]:
+        """Per-file digests of the most recently stored compile"""
+        try:
+            with open(self.cache_dir / _MANIFEST, 'r', encoding='utf-8') as f:
+                return json.load(f).get('files', {})
+        except (OSError, ValueError):
+            return {}
+
+    def iter_tables(self, compile_tables: Callable[[], Iterable[dict]],
+                    force: bool = False, verbose: bool = False,
+                    log: Optional[Callable[[str], None]] = print) -> Iterator[dict]:
+        """
+        Yield compiled tables from the cache, or compile and store them
+
+        Args:
+            compile_tables: Runs the compiler, e.g. dataform_check.iter_dataform_tables
+            force: Recompile even on a hit (the cache is refreshed)
+            verbose: Log which files invalidated the cache
+            log: Message sink (None to stay quiet)
+
+        Yields:
+            Compiled table objects
+        """
+        from .dataform_check import iter_compiled_json_tables
+
+        log = log or (lambda message: None)
+        key, hashes = self.fingerprint()
+        entry = self.entry_path(key)
+
+        if not force and entry.is_file():
+            self.stats['hits'] += 1
+            os.utime(entry)  # keep recently used results when pruning
+            log(f"Using cached compile result ({len(hashes)} files unchanged)")
+            yield from iter_compiled_json_tables(str(entry))
+            return
+
+        self.stats['misses'] += 1
+        if force:
+            log("Recompiling (forced)")
+        elif verbose:
+            changes = diff_file_hashes(self.load_manifest(), hashes)
+            log(f"Compile cache invalidated by {len(changes)} file(s):")
+            for status, name in changes:
+                log(f"  {status:8} {name}")
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry.with_name(entry.name + f'.{os.getpid()}.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write('{"tables": [')
+                for i, table in enumerate(compile_tables()):
+                    if i:
+                        f.write(',\n')
+                    f.write(json.dumps(table, separators=(',', ':')))
+                    yield table
+                f.write(']}\n')
+
+            # Sources edited while compiling: the result may not match the key
+            if self.fingerprint()[0] != key:
+                log("Project changed during compile; result not cached")
+                return
+            os.replace(tmp_path, entry)
+            self._write_manifest(key, hashes)
+            self.stats['writes'] += 1
+            self._prune(keep=entry)
+        finally:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+    def _write_manifest(self, key: str, hashes: Dict[str, str]) -> None:
+        tmp_path = self.cache_dir / f"{_MANIFEST}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'files': hashes}, f)
+        os.replace(tmp_path, self.cache_dir / _MANIFEST)
+
+    def _prune(self, keep: Path) -> None:
+        """Drop the oldest results beyond _MAX_ENTRIES"""
+        entries = sorted(self.cache_dir.glob(f"{_ENTRY_PREFIX}*.json"),
+                         key=lambda p: p.stat().st_mtime_ns, reverse=True)
+        for path in entries[_MAX_ENTRIES:]:
+            if path != keep:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
@@ -0,0 +1,346 @@
+"""
+Build-time-weighted critical path of a dependency graph
+
+Per-table run statistics (duration and bytes processed, e.g. exported from
+BigQuery's INFORMATION_SCHEMA.JOBS) are joined onto the graph by table name.
+Assuming every table starts as soon as its dependencies finish, one forward
+pass gives each table's earliest finish and one backward pass its latest
+finish; the difference is its slack. Tables without slack form the critical
+path, the chain that determines the wall-clock time of a full run.
+
+Members of a dependency cycle are treated as one unit whose duration is the
+sum of theirs. Both passes run in O(V + E) over the dependency CSR.
+"""
+import csv
+import json
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from .graph import ID_TYPECODE, DependencyGraph
+from .svg_generator import generate_layered_svg, generate_svg_manual
+from .topology import component_members, strongly_connected_components
+
+# Accepted column / key names, first match wins
+NAME_FIELDS = ('table', 'table_name', 'name', 'target', 'destination_table')
+SECONDS_FIELDS = ('duration_seconds', 'duration_s', 'duration', 'seconds', 'elapsed_seconds')
+MILLISECONDS_FIELDS = ('duration_ms', 'elapsed_ms', 'total_ms')
+BYTES_FIELDS = ('bytes_processed', 'total_bytes_processed', 'bytes')
+
+# Slack below this many seconds counts as none (float rounding)
+SLACK_TOLERANCE = 1e-6
+
+
+class TableRun(NamedTuple):
+    """Run statistics of one table"""
+    duration: float
+    bytes_processed: int = 0
+
+
+class TableTiming(NamedTuple):
+    """Schedule of one table when everything starts as early as possible"""
+    duration: float
+    bytes_processed: int
+    start: float
+    finish: float
+    slack: float
+
+    @property
+    def critical(self) -> bool:
+        return self.slack <= SLACK_TOLERANCE
+
+
+class CriticalPath(NamedTuple):
+    """Result of critical_path()"""
+    # Recorded table -> timing
+    timings: Dict[str, TableTiming]
+    # Critical tables from the first to run to the last (cycle members grouped)
+    path: List[str]
+    # Wall-clock time of a full run with unlimited parallelism
+    makespan: float
+    # Recorded tables without run statistics (counted as 0 s)
+    missing: List[str]
+    # Run statistics that matched no table in the graph
+    unmatched: List[str]
+
+    def path_edges(self) -> List[Tuple[str, str]]:
+        """(dependency, reader) pairs along the path"""
+        return list(zip(self.path, self.path[1:]))
+
+    def least_slack(self, limit: int) -> List[Tuple[str, TableTiming]]:
+        """Tables off the critical path closest to becoming critical"""
+        on_path = set(self.path)
+        rest = [(name, timing) for name, timing in self.timings.items() if name not in on_path]
+        rest.sort(key=lambda item: (item[1].slack, -item[1].duration, item[0]))
+        return rest[:limit]
+
+
+def format_duration(seconds: float) -> str:
+    """Short human-readable duration, e.g. '45.2s', '12m 30s', '1h 02m'"""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, secs = divmod(int(round(seconds)), 60)
+    if minutes < 60:
+        return f"{minutes}m {secs:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+def format_bytes(count: int) -> str:
+    """Human-readable byte count in powers of 1024, e.g. '1.5 GiB'"""
+    value = float(count)
+    for unit in ('B', 'KiB', 'MiB', 'GiB', 'TiB'):
+        if value < 1024 or unit == 'TiB':
+            break
+        value /= 1024
+    return f"{value:.0f} {unit}" if unit == 'B' else f"{value:.1f} {unit}"
+
+
+def _field(row: Mapping, fields: Iterable[str]):
+    for field in fields:
+        value = row.get(field)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00').replace(' UTC', '+00:00'))
+
+
+def _row_run(row: Mapping) -> Tuple[str, TableRun]:
+    name = _field(row, NAME_FIELDS)
+    if isinstance(name, Mapping):
+        # BigQuery job JSON: {"projectId": ..., "datasetId": ..., "tableId": ...}
+        name = f"{name.get('datasetId', name.get('dataset_id'))}.{name.get('tableId', name.get('table_id'))}"
+    if not name:
+        raise ValueError(f"Row without a table name (expected one of {', '.join(NAME_FIELDS)}): {dict(row)}")
+
+    seconds = _field(row, SECONDS_FIELDS)
+    if seconds is not None:
+        duration = float(seconds)
+    else:
+        milliseconds = _field(row, MILLISECONDS_FIELDS)
+        if milliseconds is not None:
+            duration = float(milliseconds) / 1000
+        elif row.get('start_time') and row.get('end_time'):
+            duration = (_parse_time(row['end_time']) - _parse_time(row['start_time'])).total_seconds()
+        else:
+            raise ValueError(f"Row without a duration for {name}")
+    bytes_processed = _field(row, BYTES_FIELDS)
+    return str(name), TableRun(duration, int(float(bytes_processed)) if bytes_processed is not None else 0)
+
+
+def load_run_stats(path: str) -> Dict[str, TableRun]:
+    """
+    Read per-table run statistics from a CSV or JSON export
+
+    CSV files need a header. JSON may be a list of rows, {"tables": [rows]},
+    or an object mapping table names to a row or a number of seconds.
+    Durations come from a seconds or milliseconds column, or from
+    start_time/end_time. Several rows for one table (e.g. retries or
+    assertions) are added up.
+
+    Args:
+        path: .csv or .json file
+
+    Returns:
+        Dict of table name -> TableRun
+    """
+    file_path = Path(path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"Run statistics file not found: {path}")
+
+    if file_path.suffix.lower() == '.json':
+        with open(file_path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, Mapping) and 'tables' in data:
+            data = data['tables']
+        if isinstance(data, Mapping):
+            rows = [{'table': name, 'duration': value} if not isinstance(value, Mapping)
+                    else {'table': name, **value}
+                    for name, value in data.items()]
+        else:
+            rows = data
+    else:
+        with open(file_path, encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+
+    runs: Dict[str, TableRun] = {}
+    for row in rows:
+        name, run = _row_run(row)
+        previous = runs.get(name)
+        if previous is not None:
+            run = TableRun(previous.duration + run.duration, previous.bytes_processed + run.bytes_processed)
+        runs[name] = run
+    return runs
+
+
+def _match_runs(graph: DependencyGraph, runs: Mapping[str, TableRun]) -> Tuple[Dict[int, TableRun], List[str]]:
+    """Map run statistics to node ids; project-qualified names fall back to dataset.table"""
+    matched: Dict[int, TableRun] = {}
+    unmatched = []
+    for name, run in runs.items():
+        node_id = graph.node_id(name)
+        if node_id is None and name.count('.') >= 2:
+            node_id = graph.node_id(name.split('.', 1)[1])
+        if node_id is None or not graph.has_record(node_id):
+            unmatched.append(name)
+            continue
+        previous = matched.get(node_id)
+        if previous is not None:
+            run = TableRun(previous.duration + run.duration, previous.bytes_processed + run.bytes_processed)
+        matched[node_id] = run
+    return matched, unmatched
+
+
+def critical_path(graph: DependencyGraph, runs: Mapping[str, TableRun]) -> CriticalPath:
+    """
+    Earliest schedule, slack and critical path of a full run
+
+    Args:
+        graph: Parsed dependency graph
+        runs: Table name -> TableRun (from load_run_stats)
+
+    Returns:
+        CriticalPath
+    """
+    matched, unmatched = _match_runs(graph, runs)
+    component, count = strongly_connected_components(graph)
+    members = component_members(component, count)
+    offsets, targets = graph.dependency_csr()
+
+    weight = array('d', [0.0]) * count
+    for node_id, run in matched.items():
+        weight[component[node_id]] += run.duration
+
+    # Forward pass: components are numbered in data-flow order
+    finish = array('d', [0.0]) * count
+    previous = array(ID_TYPECODE, [-1]) * count
+    for comp, nodes in enumerate(members):
+        best = 0.0
+        for node_id in nodes:
+            for pos in range(offsets[node_id], offsets[node_id + 1]):
+                dep_comp = component[targets[pos]]
+                # Dependencies that finish at 0 s (no statistics) do not hold anything up
+                if dep_comp != comp and finish[dep_comp] > best:
+                    best = finish[dep_comp]
+                    previous[comp] = dep_comp
+        finish[comp] = best + weight[comp]
+    makespan = max(finish, default=0.0)
+
+    # Backward pass: readers have larger numbers, so their latest finish is final
+    latest = array('d', [makespan]) * count
+    for comp in range(count - 1, -1, -1):
+        latest_start = latest[comp] - weight[comp]
+        for node_id in members[comp]:
+            for pos in range(offsets[node_id], offsets[node_id + 1]):
+                dep_comp = component[targets[pos]]
+                if dep_comp != comp and latest_start < latest[dep_comp]:
+                    latest[dep_comp] = latest_start
+
+    timings: Dict[str, TableTiming] = {}
+    missing: List[str] = []
+    for node_id in graph.record_ids():
+        comp = component[node_id]
+        matched_run = matched.get(node_id)
+        if matched_run is None:
+            missing.append(graph.name(node_id))
+        run = matched_run or TableRun(0.0)
+        slack = max(latest[comp] - finish[comp], 0.0)
+        timings[graph.name(node_id)] = TableTiming(
+            run.duration, run.bytes_processed, finish[comp] - weight[comp], finish[comp], slack
+        )
+
+    path: List[str] = []
+    if count and makespan > 0:
+        # Last component to finish (the first one on ties), then the predecessors that held it up
+        comp = max(range(count), key=lambda c: (finish[c], -c))
+        while comp >= 0:
+            names = sorted(graph.name(node_id) for node_id in members[comp] if graph.has_record(node_id))
+            path.extend(reversed(names))
+            comp = previous[comp]
+        path.reverse()
+
+    return CriticalPath(timings, path, makespan, missing, unmatched)
+
+
+def timing_labels(all_tables: Mapping, result: CriticalPath) -> Dict[str, dict]:
+    """Neighbor lookup for the SVG generators: the type badge shows duration and slack"""
+    labels = {}
+    for name, timing in result.timings.items():
+        table_type = all_tables.get(name, {}).get('type', 'unknown')
+        detail = 'critical' if timing.critical else f"slack {format_duration(timing.slack)}"
+        labels[name] = {'type': f"{table_type} · {format_duration(timing.duration)} · {detail}"}
+    return labels
+
+
+def render_critical_path_svgs(all_tables: Mapping, result: CriticalPath, output_dir: str) -> Tuple[Path, int]:
+    """
+    Draw the critical path and the neighborhood of every table on it
+
+    Writes critical_path.svg (the chain, one column per table) and one
+    neighbor diagram per critical table with the path edges highlighted.
+
+    Args:
+        all_tables: Graph (name -> table info)
+        result: From critical_path()
+        output_dir: Directory receiving the SVGs
+
+    Returns:
+        (path of the chain diagram, number of neighbor diagrams)
+    """
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    labels = timing_labels(all_tables, result)
+    edges = result.path_edges()
+
+    chain_file = out / 'critical_path.svg'
+    generate_layered_svg(
+        None, {level: [name] for level, name in enumerate(result.path)} or {0: []}, edges, labels, chain_file,
+        edge_labels={(dep, reader): format_duration(result.timings[reader].duration) for dep, reader in edges}
+    )
+
+    styles = critical_edge_styles(result)
+    count = 0
+    for name in result.path:
+        info = all_tables[name]
+        table_info = {
+            'type': labels[name]['type'],
+            'dependencies': list(info['dependencies']),
+            'dependents': list(info['dependents']),
+            'join_info': dict(info.get('join_info', {})),
+        }
+        safe_name = name.replace('.', '_').replace('-', '_')
+        generate_svg_manual(name, table_info, labels, out / f"{safe_name}.svg", edge_styles=styles)
+        count += 1
+    return chain_file, count
+
+
+def critical_edge_styles(result: CriticalPath) -> Dict[Tuple[str, str], str]:
+    """Edge styles that highlight the path edges in neighbor diagrams"""
+    return {edge: 'critical' for edge in result.path_edges()}
+
+
+def index_labels(result: CriticalPath) -> Dict[str, str]:
+    """Critical table -> duration text, in path order, for the master index"""
+    return {name: format_duration(result.timings[name].duration) for name in result.path}
+
+
+def critical_path_json(result: CriticalPath, top: Optional[int] = None) -> dict:
+    """JSON-serializable summary: the path, totals and the least-slack tables"""
+    def row(name, timing):
+        return {'name': name, 'duration': timing.duration, 'bytes_processed': timing.bytes_processed,
+                'start': timing.start, 'finish': timing.finish, 'slack': timing.slack}
+
+    summary = {
+        'makespan': result.makespan,
+        'path': [row(name, result.timings[name]) for name in result.path],
+        'path_bytes_processed': sum(result.timings[name].bytes_processed for name in result.path),
+        'missing': result.missing,
+        'unmatched': result.unmatched,
+    }
+    if top is not None:
+        summary['least_slack'] = [row(name, timing) for name, timing in result.least_slack(top)]
+    return summary
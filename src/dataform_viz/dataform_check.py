@@ -1,10 +1,24 @@
+import argparse
 import subprocess
 import json
 import sys
 import os
 import re
+import threading
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
+from .compile_cache import CompileCache
+from .graph import GraphBuilder
+from .join_cache import DEFAULT_MAX_BYTES, JoinCache, join_cache_key
+from .json_stream import CHUNK_SIZE, iter_json_array
+from .parser import sniff_encoding
+from .rendering import default_jobs
+from .sql_lexer import scan_query_spans
+
 def cleanup_sqlx_files(definitions_dir="definitions", backup=True):
     """
     Clean up .sqlx files by removing *_utils.PROJECT_ID references in config section only.
@@ -185,9 +199,53 @@ def check_prerequisites():
         print("  Install with: npm install -g @dataform/cli")
         return False
 
-def get_dataform_graph():
-    print("Compiling Dataform graph (this may take a moment)...")
+def extract_compiled_json(output):
+    """Extract the compiled graph from `dataform compile --json` output.
+    
+    Dataform outputs log messages then JSON on the same line, e.g.
+    {"level":"INFO",...} { "tables": ...}
+    
+    Args:
+        output: Raw stdout of dataform compile (or a saved copy of it)
+        
+    Returns:
+        Parsed graph dict, or None if no compilation result was found
+    """
+    # Find the position where the actual compilation result starts
+    # Look for '{ "tables"' or '{\n    "tables"'
+    tables_pos = output.find('"tables"')
+    if tables_pos == -1:
+        print("Could not find 'tables' key in dataform output")
+        return None
     
+    # Walk backwards to find the opening brace of this object
+    brace_pos = output.rfind('{', 0, tables_pos)
+    if brace_pos == -1:
+        print("Could not find JSON object start")
+        return None
+    
+    try:
+        return json.loads(output[brace_pos:])
+    except json.JSONDecodeError as e:
+        print(f"Error decoding dataform output: {e}")
+        print("First 500 chars of attempted parse:", output[brace_pos:brace_pos + 500])
+        return None
+
+def load_compiled_json(json_path):
+    """Load a saved `dataform compile --json` output file.
+    
+    Args:
+        json_path: Path to the saved compile output
+        
+    Returns:
+        Parsed graph dict, or None if no compilation result was found
+    """
+    encoding = sniff_encoding(json_path) or 'utf-8'
+    with open(json_path, 'r', encoding=encoding, errors='ignore') as f:
+        return extract_compiled_json(f.read())
+
+def dataform_compile_command():
+    """Build the shell command that runs `dataform compile --json`"""
     # Try to find local dataform binary first (most reliable)
     dataform_cmd = "dataform"
     local_bin = os.path.join(os.getcwd(), "node_modules", ".bin", "dataform.cmd")
@@ -213,53 +271,102 @@ def get_dataform_graph():
         
         dataform_cmd = f"{npx_cmd} dataform"
 
-    cmd = f"{dataform_cmd} compile --json"
+    return f"{dataform_cmd} compile --json"
+
+def iter_dataform_tables(cmd=None, chunk_size=CHUNK_SIZE, log=print):
+    """Run `dataform compile --json` and yield compiled table objects one by one.
     
-    # Run dataform compile and capture JSON output
-    # shell=True is often required on Windows to find npx.cmd
-    try:
-        # We assume npx is in the path.
-        result = subprocess.run(cmd, 
-                                capture_output=True, 
-                                text=True,
-                                encoding='utf-8',
-                                errors='ignore',
-                                shell=True, 
-                                check=True)
-        if not result.stdout:
-            print("No output from dataform compile")
-            return None
-        
-        # Dataform outputs log message then JSON on the same line
-        # Format: {"level":"INFO",...} { "tables": ...}
-        # We need to find the part that starts with { "tables"
-        output = result.stdout
-        
-        # Find the position where the actual compilation result starts
-        # Look for '{ "tables"' or '{\n    "tables"'
-        tables_pos = output.find('"tables"')
-        if tables_pos == -1:
-            print("Could not find 'tables' key in dataform output")
-            return None
+    The subprocess pipe is read in chunks and decoded incrementally, so peak
+    memory is bounded by the largest single table rather than the full output.
+    Leading log lines are skipped.
+    
+    Args:
+        cmd: Shell command to run (default: dataform_compile_command())
+        chunk_size: Characters read from the pipe per chunk
+        log: Progress message sink (None to stay quiet)
         
-        # Walk backwards to find the opening brace of this object
-        brace_pos = output.rfind('{', 0, tables_pos)
-        if brace_pos == -1:
-            print("Could not find JSON object start")
-            return None
+    Yields:
+        Compiled table objects (graph["tables"] elements)
         
-        json_str = output[brace_pos:]
-        return json.loads(json_str)
+    Raises:
+        RuntimeError: If dataform exits with an error or its output holds no tables
+    """
+    if log:
+        log("Compiling Dataform graph (this may take a moment)...")
+    cmd = cmd or dataform_compile_command()
+    
+    # shell=True is often required on Windows to find npx.cmd
+    proc = subprocess.Popen(cmd,
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE,
+                            text=True,
+                            encoding='utf-8',
+                            errors='ignore',
+                            shell=True)
+    # Drain stderr on a thread so a chatty compiler cannot block on a full pipe
+    stderr_chunks = []
+    stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()))
+    stderr_reader.start()
+    try:
+        try:
+            yield from iter_json_array(proc.stdout, "tables", chunk_size)
+        except ValueError as e:
+            proc.stdout.read()
+            proc.wait()
+            stderr_reader.join()
+            if proc.returncode:
+                raise RuntimeError(f"Error running dataform: {''.join(stderr_chunks)}") from e
+            raise RuntimeError(f"Error decoding dataform output: {e}") from e
+        proc.wait()
+        stderr_reader.join()
+        if proc.returncode:
+            raise RuntimeError(f"Error running dataform: {''.join(stderr_chunks)}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        stderr_reader.join()
+        proc.stderr.close()
+
+def iter_compiled_json_tables(json_path, chunk_size=CHUNK_SIZE):
+    """Stream the table objects of a saved `dataform compile --json` output file.
+    
+    Args:
+        json_path: Path to the saved compile output
+        chunk_size: Characters read per chunk
         
-    except subprocess.CalledProcessError as e:
-        print(f"Error running dataform: {e.stderr}")
-        return None
-    except json.JSONDecodeError as e:
-        print(f"Error decoding dataform output: {e}")
-        print("First 500 chars of attempted parse:", json_str[:500] if 'json_str' in locals() else "N/A")
-        return None
-    except Exception as e:
-        print(f"Error processing dataform output: {e}")
+    Yields:
+        Compiled table objects
+    """
+    encoding = sniff_encoding(json_path) or 'utf-8'
+    with open(json_path, 'r', encoding=encoding, errors='ignore') as f:
+        yield from iter_json_array(f, "tables", chunk_size)
+
+def iter_project_tables(use_cache=True, recompile=False, verbose=False, project_dir='.', log=print):
+    """Yield compiled tables, reusing the compile cache when sources are unchanged.
+    
+    Args:
+        use_cache: Set False to always compile and leave the cache alone
+        recompile: Compile even if a cached result matches (refreshes the cache)
+        verbose: Print the files that invalidated the cache
+        project_dir: Dataform project root
+        log: Progress message sink (None to stay quiet)
+        
+    Yields:
+        Compiled table objects
+    """
+    if not use_cache:
+        return iter_dataform_tables(log=log)
+    return CompileCache(project_dir).iter_tables(partial(iter_dataform_tables, log=log), force=recompile,
+                                                  verbose=verbose, log=log)
+
+def get_dataform_graph():
+    """Compile the project and return {"tables": [...]}, or None on failure"""
+    try:
+        return {"tables": list(iter_dataform_tables())}
+    except RuntimeError as e:
+        print(e)
         return None
 
 def normalize_name(target):
@@ -269,82 +376,17 @@ def normalize_name(target):
         return "UNKNOWN"
     return f"{target.get('schema', '')}.{target.get('name', '')}"
 
-def parse_joins_from_query(query, dependencies):
-    """Extract JOIN information from SQL query.
+def dependency_search_names(dependencies):
+    """List the names a JOIN may use to refer to each dependency.
     
     Args:
-        query: SQL query string
         dependencies: List of dependency target objects
         
     Returns:
-        Dictionary mapping dependency name to join info: {dep_name: {'type': 'LEFT JOIN', 'condition': 'a.id = b.id'}}
+        (search name, full dependency name) pairs in priority order: the
+        full name, the table name and partial names for CTEs
     """
-    if not query:
-        return {}
-    
-    join_info = {}
-    
-    # Normalize query - remove backticks and newlines for easier parsing
-    query_normalized = query.replace('`', '').replace('\n', ' ').replace('\r', '')
-    
-    # Extract CTE definitions to map CTE names to their source tables
-    # For CTEs with complex content (window functions, nested parentheses), we need a better approach
-    # Pattern: WITH cte_name AS (... FROM schema.table_name ...)
-    cte_to_source = {}  # Maps CTE name to source table
-    
-    # Find all CTE definitions (WITH or , followed by cte_name AS ()
-    cte_start_pattern = r'(?:WITH|,)\s+(\w+)\s+AS\s*\('
-    cte_starts = list(re.finditer(cte_start_pattern, query_normalized, re.IGNORECASE))
-    
-    for i, match in enumerate(cte_starts):
-        cte_name = match.group(1).strip()
-        start_pos = match.end()  # Position after the opening (
-        
-        # Find the closing parenthesis for this CTE by tracking paren depth
-        paren_depth = 1
-        pos = start_pos
-        cte_end_pos = start_pos
-        
-        while pos < len(query_normalized) and paren_depth > 0:
-            if query_normalized[pos] == '(':
-                paren_depth += 1
-            elif query_normalized[pos] == ')':
-                paren_depth -= 1
-                if paren_depth == 0:
-                    cte_end_pos = pos
-                    break
-            pos += 1
-        
-        # Extract the CTE content
-        cte_content = query_normalized[start_pos:cte_end_pos]
-        
-        # Look for FROM clauses in the CTE content
-        # Pattern: FROM schema.table_name or FROM table_name
-        from_pattern = r'FROM\s+([\w.-]+)'
-        from_matches = list(re.finditer(from_pattern, cte_content, re.IGNORECASE))
-        
-        if from_matches:
-            # Use the first FROM clause (primary table)
-            source_table = from_matches[0].group(1).strip()
-            cte_to_source[cte_name.lower()] = source_table
-    
-    # Recursively resolve CTEs that reference other CTEs
-    # (e.g., annulus_level -> extracted_casing_size -> refined_wisdom_v_csg_tbg)
-    max_iterations = 10  # Prevent infinite loops
-    for _ in range(max_iterations):
-        resolved_any = False
-        for cte_name, source_table in list(cte_to_source.items()):
-            # Check if source_table is itself a CTE
-            if source_table.lower() in cte_to_source:
-                # Resolve it
-                cte_to_source[cte_name] = cte_to_source[source_table.lower()]
-                resolved_any = True
-        if not resolved_any:
-            break
-    
-    # Build list of dependency table names to look for
     dep_names = []
-    dep_name_parts = []  # Store partial name matches for CTEs
     for dep in dependencies:
         if isinstance(dep, dict):
             schema = dep.get('schema', '')
@@ -366,80 +408,135 @@ def parse_joins_from_query(query, dependencies):
                     for i in range(1, len(parts)):
                         partial = '_'.join(parts[i:])
                         dep_names.append((partial, full_name))
+    return dep_names
+
+class DependencyNameIndex:
+    """Resolve JOIN table references to dependencies, built once per query.
+    
+    A search name matches a reference when either contains the other
+    (case-insensitive); the longest matching search name wins, the first
+    one on ties. Any search name containing the reference is at least as
+    long as one contained in it, so those are looked up first: all
+    lowercased search names are joined into one string that str.find scans
+    for the reference. Otherwise each position of the reference is looked
+    up in a dict of search names by their first three characters (names
+    shorter than that are tested directly), which is linear in the length
+    of the reference. Resolutions are memoized, as queries join the same
+    tables repeatedly.
+    """
     
-    # Regex pattern to match JOIN clauses with ON
-    # Captures: (join_type) table_ref [alias] ON condition
-    join_on_pattern = r'((?:INNER|LEFT|RIGHT|FULL|CROSS)?\s*(?:OUTER)?\s*JOIN)\s+([\w.-]+)(?:\s+(?:AS\s+)?([\w]+))?\s+ON\s+([^\r\n]+?)(?=\s+(?:WHERE|GROUP|HAVING|ORDER|LIMIT|UNION|FROM|SELECT|INNER\s+JOIN|LEFT\s+JOIN|RIGHT\s+JOIN|FULL\s+JOIN|CROSS\s+JOIN|JOIN|\)|;)\s*|$)'
+    def __init__(self, search_names):
+        """Index (search name, full dependency name) pairs from dependency_search_names"""
+        # Lowercased search name -> full name of its first occurrence
+        self._exact = {}
+        for search_name, full_name in search_names:
+            key = search_name.lower()
+            if key and key not in self._exact:
+                self._exact[key] = full_name
+        self._keys = list(self._exact)
+        self._rank = {key: rank for rank, key in enumerate(self._keys)}
+        # Search names by their first three characters, in rank order
+        self._by_prefix = {}
+        self._short = []
+        for key in self._keys:
+            if len(key) < 3:
+                self._short.append(key)
+            else:
+                self._by_prefix.setdefault(key[:3], []).append(key)
+        self._starts = []
+        offset = 0
+        for key in self._keys:
+            self._starts.append(offset)
+            offset += len(key) + 1
+        self._joined = '\0'.join(self._keys)
+        self._resolved = {}
+    
+    def resolve(self, table_ref):
+        """Return the full name of the best matching dependency, or None"""
+        ref = table_ref.lower()
+        if ref in self._resolved:
+            return self._resolved[ref]
+        
+        best = None
+        if ref:
+            # Search names containing the reference; keys are scanned in rank order
+            pos = self._joined.find(ref)
+            while pos >= 0:
+                index = bisect_right(self._starts, pos) - 1
+                if best is None or len(self._keys[index]) > len(self._keys[best]):
+                    best = index
+                if index + 1 == len(self._keys):
+                    break
+                pos = self._joined.find(ref, self._starts[index + 1])
+        if best is not None:
+            match = self._exact[self._keys[best]]
+        else:
+            # Search names contained in (and so shorter than) the reference
+            found = None
+            for i in range(len(ref) - 2):
+                for key in self._by_prefix.get(ref[i:i + 3], ()):
+                    if ref.startswith(key, i) and (
+                            found is None or len(key) > len(found) or
+                            (len(key) == len(found) and self._rank[key] < self._rank[found])):
+                        found = key
+            if found is None:
+                for key in self._short:
+                    if key in ref and (found is None or len(key) > len(found)):
+                        found = key
+            match = None if found is None else self._exact[found]
+        self._resolved[ref] = match
+        return match
+
+# Bump when parse_joins_from_query can return different join_info for the
+# same input, so cached results are not reused
+JOIN_PARSER_VERSION = 1
+
+
+def parse_joins_from_query(query, dependencies, log=print):
+    """Extract JOIN information from SQL query.
+    
+    Args:
+        query: SQL query string
+        dependencies: List of dependency target objects
+        log: Callable receiving debug messages, or None to stay silent
+        
+    Returns:
+        Dictionary mapping dependency name to join info: {dep_name: {'type': 'LEFT JOIN', 'condition': 'a.id = b.id'}}
+    """
+    if not query:
+        return {}
     
-    # Regex pattern to match JOIN clauses with USING
-    # Captures: (join_type) table_ref [alias] USING (columns)
-    join_using_pattern = r'((?:INNER|LEFT|RIGHT|FULL|CROSS)?\s*(?:OUTER)?\s*JOIN)\s+([\w.-]+)(?:\s+(?:AS\s+)?([\w]+))?\s+USING\s*\(([^)]+)\)'
+    # One pass over the tokens: CTE name -> first FROM source, and JOIN clauses
+    cte_to_source, joins, query_text = scan_query_spans(query)
+    
+    # Recursively resolve CTEs that reference other CTEs
+    # (e.g., annulus_level -> extracted_casing_size -> refined_wisdom_v_csg_tbg)
+    max_iterations = 10  # Prevent infinite loops
+    for _ in range(max_iterations):
+        resolved_any = False
+        for cte_name, source_table in list(cte_to_source.items()):
+            # Check if source_table is itself a CTE
+            if source_table.lower() in cte_to_source:
+                # Resolve it
+                cte_to_source[cte_name] = cte_to_source[source_table.lower()]
+                resolved_any = True
+        if not resolved_any:
+            break
     
-    # Process ON joins
-    matches = re.finditer(join_on_pattern, query_normalized, re.IGNORECASE)
+    # Index the dependency table names to look for
+    dep_index = DependencyNameIndex(dependency_search_names(dependencies))
     
-    # Debug: Count matches
-    match_list = list(matches)
-    if len(match_list) > 0:
-        print(f"DEBUG parse_joins: Found {len(match_list)} ON joins in query")
-    matches = iter(match_list)  # Convert back to iterator
+    on_joins = [join for join in joins if not join.using]
+    if on_joins and log:
+        log(f"DEBUG parse_joins: Found {len(on_joins)} ON joins in query")
     
-    for match in matches:
-        join_type = match.group(1).strip().upper()  # e.g., "LEFT JOIN"
-        table_ref = match.group(2).strip()  # e.g., "schema.table_name" or "table_name"
-        # alias = match.group(3)  # Optional alias
-        condition = match.group(4).strip() if match.group(4) else ""  # ON condition
-        
-        # Check if table_ref is a CTE - if so, resolve it to the actual source table
-        resolved_table_ref = table_ref
-        if table_ref.lower() in cte_to_source:
-            resolved_table_ref = cte_to_source[table_ref.lower()]
-        
-        # Normalize resolved_table_ref - remove database prefix (e.g., database.schema.table -> schema.table)
-        # Format: database-name.schema.table or just schema.table
-        resolved_parts = resolved_table_ref.split('.')
-        if len(resolved_parts) == 3:
-            # Has database prefix, remove it
-            resolved_table_ref = f"{resolved_parts[1]}.{resolved_parts[2]}"
-        
-        # Try to match this table_ref to one of our dependencies
-        matched_dep = None
-        best_match_len = 0
-        
-        for search_name, full_dep_name in dep_names:
-            # Check if the search_name matches the resolved table_ref in the JOIN
-            # Use case-insensitive comparison and check both directions
-            if (search_name.lower() in resolved_table_ref.lower() or 
-                resolved_table_ref.lower() in search_name.lower() or
-                search_name.lower() == resolved_table_ref.lower()):
-                # Prefer longer matches (more specific)
-                if len(search_name) > best_match_len:
-                    matched_dep = full_dep_name
-                    best_match_len = len(search_name)
-        
-        if matched_dep and condition:
-            # Clean up condition - remove extra whitespace
-            condition = ' '.join(condition.split())
-            join_info[matched_dep] = {
-                'type': join_type,
-                'condition': condition
-            }
-            # Debug output
-            print(f"DEBUG: Matched JOIN: {join_type} {table_ref} -> {matched_dep}")
-    
-    # Process USING joins
-    matches = re.finditer(join_using_pattern, query_normalized, re.IGNORECASE)
-    
-    for match in matches:
-        join_type = match.group(1).strip().upper()  # e.g., "LEFT JOIN"
-        table_ref = match.group(2).strip()  # e.g., "schema.table_name" or "table_name"
-        # alias = match.group(3)  # Optional alias
-        columns = match.group(4).strip() if match.group(4) else ""  # USING columns
-        
+    # ON joins first, then USING joins (a later clause for the same dependency wins).
+    # Condition text is cut only for the winners: nested ON conditions contain
+    # each other, so cutting all of them is quadratic.
+    matched = {}
+    for join in on_joins + [join for join in joins if join.using]:
         # Check if table_ref is a CTE - if so, resolve it to the actual source table
-        resolved_table_ref = table_ref
-        if table_ref.lower() in cte_to_source:
-            resolved_table_ref = cte_to_source[table_ref.lower()]
+        resolved_table_ref = cte_to_source.get(join.table.lower(), join.table)
         
         # Normalize resolved_table_ref - remove database prefix (e.g., database.schema.table -> schema.table)
         resolved_parts = resolved_table_ref.split('.')
@@ -448,44 +545,172 @@ def parse_joins_from_query(query, dependencies):
             resolved_table_ref = f"{resolved_parts[1]}.{resolved_parts[2]}"
         
         # Try to match this table_ref to one of our dependencies
-        matched_dep = None
-        best_match_len = 0
-        
-        for search_name, full_dep_name in dep_names:
-            if (search_name.lower() in resolved_table_ref.lower() or 
-                resolved_table_ref.lower() in search_name.lower() or
-                search_name.lower() == resolved_table_ref.lower()):
-                if len(search_name) > best_match_len:
-                    matched_dep = full_dep_name
-                    best_match_len = len(search_name)
+        matched_dep = dep_index.resolve(resolved_table_ref)
+        if not matched_dep or query_text.is_blank(join.start, join.end):
+            continue
         
-        if matched_dep and columns:
-            # Format as "USING (columns)"
-            condition = f"USING ({columns})"
-            join_info[matched_dep] = {
-                'type': join_type,
-                'condition': condition
-            }
+        matched[matched_dep] = join
+        # Debug output
+        if log and not join.using:
+            log(f"DEBUG: Matched JOIN: {join.join_type} {join.table} -> {matched_dep}")
     
+    join_info = {}
+    for dep, join in matched.items():
+        condition = query_text.text(join.start, join.end)
+        join_info[dep] = {
+            'type': join.join_type,
+            'condition': f"USING ({condition})" if join.using else condition
+        }
     return join_info
 
-def main():
-    print("DEBUG: main() started")
-    graph = get_dataform_graph()
-    if not graph:
-        print("DEBUG: No graph returned from get_dataform_graph")
-        return
-    print("DEBUG: Graph loaded successfully")
+# Compiled tables per process pool submission when parsing joins in parallel
+JOIN_CHUNK_SIZE = 32
+# Chunks submitted ahead per worker; bounds how much of the table stream is held
+_CHUNKS_PER_WORKER = 2
+
+
+def _debug_table_message(full_name, short_name, query, deps):
+    # Debug: Check if query exists for specific table
+    if 'cmt_perf' in short_name:
+        return f"DEBUG main: Processing {full_name}, query length: {len(query)}, deps: {len(deps)}"
+    return None
+
+
+def _parse_join_chunk(chunk, collect_log=False):
+    """Parse the joins of (query, dependencies) pairs in a worker process.
+    
+    Returns:
+        (join_info, debug messages or None) per pair, in chunk order
+    """
+    results = []
+    for query, deps in chunk:
+        messages = [] if collect_log else None
+        join_info = parse_joins_from_query(query, deps, log=messages.append if collect_log else None)
+        results.append((join_info, messages))
+    return results
+
+
+def _parse_joins_cached(query, deps, log, join_cache):
+    """parse_joins_from_query through the join cache (when given)"""
+    if join_cache is None or not query:
+        return parse_joins_from_query(query, deps, log=log)
+    key = join_cache_key(query, deps, JOIN_PARSER_VERSION)
+    join_info = join_cache.get_many([key]).get(key)
+    if join_info is None:
+        join_info = parse_joins_from_query(query, deps, log=log)
+        join_cache.put_many([(key, join_info)])
+    return join_info
 
-    tables = graph.get("tables", [])
+
+def _add_tables_parallel(builder, tables, log, jobs, chunk_size, join_cache=None):
+    """Add compiled tables to the builder, parsing their joins on a process pool.
+    
+    Tables are read in chunks of chunk_size and at most jobs * _CHUNKS_PER_WORKER
+    chunks are in flight. Results are added, and their debug messages logged,
+    in input order, so the graph and the log match the sequential path. Tables
+    with an empty query or a join cache hit are never sent to a worker. Input
+    that fits in a single chunk is parsed in this process.
+    """
+    pool = None
+    in_flight = deque()
+    
+    def prepare(records):
+        # Cache keys and hits of a chunk, and the (query, deps) pairs left to parse
+        keys = [join_cache_key(query, deps, JOIN_PARSER_VERSION) if query and join_cache else None
+                for _, _, deps, query, _ in records]
+        cached = join_cache.get_many(key for key in keys if key) if join_cache else {}
+        work = [(query, deps) for (_, _, deps, query, _), key in zip(records, keys)
+                if query and key not in cached]
+        return keys, cached, work
+    
+    def add_chunk(records, keys, cached, results):
+        results = iter(results)
+        parsed = []
+        for (full_name, table_type, deps, query, message), key in zip(records, keys):
+            if message:
+                log(message)
+            if key in cached:
+                join_info = cached[key]
+            elif query:
+                join_info, messages = next(results)
+                for line in messages or ():
+                    log(line)
+                if key:
+                    parsed.append((key, join_info))
+            else:
+                join_info = {}
+            builder.add_table(full_name, table_type, [normalize_name(d) for d in deps],
+                              join_info=join_info)
+        if parsed:
+            join_cache.put_many(parsed)
+    
+    def finish_oldest():
+        records, keys, cached, future = in_flight.popleft()
+        add_chunk(records, keys, cached, future.result() if future else ())
+    
+    def submit(records):
+        nonlocal pool
+        keys, cached, work = prepare(records)
+        future = None
+        if work:
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=jobs)
+            future = pool.submit(_parse_join_chunk, work, log is not None)
+        in_flight.append((records, keys, cached, future))
+        while len(in_flight) > jobs * _CHUNKS_PER_WORKER:
+            finish_oldest()
+    
+    records = []
+    try:
+        for t in tables:
+            tgt = t.get("target", {})
+            full_name = normalize_name(tgt)
+            deps = t.get("dependencyTargets", [])
+            query = t.get("query", "")
+            message = _debug_table_message(full_name, tgt.get("name"), query, deps) if log else None
+            records.append((full_name, t.get("type"), deps, query, message))
+            if len(records) == chunk_size:
+                submit(records)
+                records = []
+        
+        while in_flight:
+            finish_oldest()
+        if records:
+            keys, cached, work = prepare(records)
+            add_chunk(records, keys, cached, _parse_join_chunk(work, log is not None))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def build_dependency_graph(tables, log=print, parse_joins=True, jobs=1,
+                           chunk_size=JOIN_CHUNK_SIZE, join_cache=None):
+    """Build a DependencyGraph straight from compiled table objects.
     
-    # build a mapping of standard_name -> table_info
-    # Dataform JSON output for 'target' usually has schema and name. 
-    # The 'dependencies' list is usually an array of strings representing the names of the targets.
+    Uses target, dependencyTargets and query from `dataform compile --json`
+    without going through the text report.
     
-    table_lookup = {}
+    Args:
+        tables: Iterable of compiled table objects (graph["tables"])
+        log: Callable receiving debug messages, or None to stay silent
+        parse_joins: Extract JOIN info from each query; skip it when only
+            the dependency structure is needed
+        jobs: Worker processes for JOIN parsing (None: CPU count, 1: parse
+            in this process). The graph and log do not depend on it.
+        chunk_size: Tables per worker submission when jobs > 1
+        join_cache: JoinCache to reuse join_info of unchanged queries from;
+            debug messages are only logged for queries that are parsed
+        
+    Returns:
+        DependencyGraph keyed by "schema.name"
+    """
+    builder = GraphBuilder()
+    jobs = default_jobs() if jobs is None else max(1, jobs)
+    if parse_joins and jobs > 1:
+        _add_tables_parallel(builder, tables, log, jobs, max(1, chunk_size), join_cache)
+        return builder.build(derive_dependents=True)
     
-    # First pass: Index all tables by their full name and short name
+    # First pass: Index all tables by their full name
     for t in tables:
         tgt = t.get("target", {})
         full_name = normalize_name(tgt) # e.g. "dataset.table"
@@ -495,74 +720,109 @@ def main():
         deps = t.get("dependencyTargets", [])
         query = t.get("query", "")
         
-        # Debug: Check if query exists for specific table
-        if 'cmt_perf' in short_name:
-            print(f"DEBUG main: Processing {full_name}, query length: {len(query)}, deps: {len(deps)}")
+        if log:
+            message = _debug_table_message(full_name, short_name, query, deps)
+            if message:
+                log(message)
         
         # Parse JOIN information from query
-        join_info = parse_joins_from_query(query, deps)
-        
-        # Store using full name as key
-        table_lookup[full_name] = {
-            "type": t.get("type"),
-            "dependencies": deps,
-            "dependents": [],
-            "join_info": join_info
-        }
-        
-        # Also store short name pointer if it doesn't conflict? 
-        # For safety, let's just stick to iterating for search.
+        join_info = _parse_joins_cached(query, deps, log, join_cache) if parse_joins else None
+        
+        # Store using full name as key; dependencies are kept as name strings
+        builder.add_table(
+            full_name,
+            t.get("type"),
+            [normalize_name(d) for d in deps],
+            join_info=join_info
+        )
 
-    # Note: 'dependencies' key in the compiled JSON often contains the list of resolved target names.
-    # Let's inspect what we actually have. 
-    
-    # Calculate dependents
-    for t in tables:
-        tgt = t.get("target", {})
-        this_full_name = normalize_name(tgt)
-        
-        # 'dependencyTargets' is preferred in newer dataform, it's a list of {schema, name, database...}
-        deps = t.get("dependencyTargets") 
-        if deps is None:
-             # Fallback to 'dependencies' if dependencyTargets is missing (older CLI)
-             # But 'dependencies' might just be strings.
-             pass
-        
-        if deps:
-            for d in deps:
-                dep_full_name = normalize_name(d)
-                if dep_full_name in table_lookup:
-                    table_lookup[dep_full_name]["dependents"].append(this_full_name)
+    # Calculate dependents by reversing the dependency edges that point at
+    # compiled tables
+    return builder.build(derive_dependents=True)
 
-    # Search functionality
-    search_term = ""
-    if len(sys.argv) > 1:
-        search_term = sys.argv[1].lower()
+def print_text_report(table_lookup, search_term="", file=None):
+    """Print the dependencies text report read by parser.parse_dependencies_report.
     
+    Args:
+        table_lookup: Mapping of table name to info (e.g. a DependencyGraph)
+        search_term: Only print tables whose name contains this (lowercase) text
+        file: Stream to write to (default: sys.stdout)
+        
+    Returns:
+        Number of tables printed
+    """
+    out = file or sys.stdout
     found_count = 0
-    print(f"\n--- Dataform Dependency Analysis ---")
+    print(f"\n--- Dataform Dependency Analysis ---", file=out)
     
     for name, info in table_lookup.items():
         if not search_term or search_term in name.lower():
             found_count += 1
-            print(f"\nTable: {name} ({info['type']})")
+            print(f"\nTable: {name} ({info['type']})", file=out)
             
             deps = info['dependencies']
-            print(f"  Dependencies ({len(deps)}):")
-            for d in deps:
-                dep_name = normalize_name(d)
-                print(f"    <- {dep_name}")
+            print(f"  Dependencies ({len(deps)}):", file=out)
+            join_info = info.get('join_info', {})
+            for dep_name in deps:
+                print(f"    <- {dep_name}", file=out)
                 
                 # Print JOIN information if available
-                join_info = info.get('join_info', {})
                 if dep_name in join_info:
                     j = join_info[dep_name]
-                    print(f"      {j['type']} ON {j['condition']}")
+                    print(f"      {j['type']} ON {j['condition']}", file=out)
                 
             depts = info['dependents']
-            print(f"  Dependents ({len(depts)}):")
+            print(f"  Dependents ({len(depts)}):", file=out)
             for d in depts:
-                print(f"    -> {d}")
+                print(f"    -> {d}", file=out)
+    
+    return found_count
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Print Dataform table dependencies")
+    arg_parser.add_argument('search_term', nargs='?', default='',
+                            help='Only show tables whose name contains this text')
+    arg_parser.add_argument('--recompile', action='store_true',
+                            help='Ignore the compile cache and run dataform compile')
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help='Neither read nor write the compile and join caches')
+    arg_parser.add_argument('--verbose', action='store_true',
+                            help='Show which files invalidated the compile cache')
+    arg_parser.add_argument('--jobs', '-j', type=int, default=1,
+                            help='Worker processes for JOIN parsing (0: CPU count, default: 1)')
+    arg_parser.add_argument('--join-cache-mb', type=float, default=DEFAULT_MAX_BYTES / 2**20,
+                            help='Size cap of the JOIN analysis cache in MB (default: %(default)g)')
+    args = arg_parser.parse_args(argv)
+
+    print("DEBUG: main() started")
+    # JOINs of queries unchanged since an earlier run are taken from the join cache
+    join_cache = None if args.no_cache else JoinCache(max_bytes=int(args.join_cache_mb * 2**20))
+    # Tables are streamed from the compiler (or cache) straight into the graph builder
+    try:
+        table_lookup = build_dependency_graph(iter_project_tables(
+            use_cache=not args.no_cache, recompile=args.recompile, verbose=args.verbose),
+            jobs=args.jobs or None, join_cache=join_cache)
+    except RuntimeError as e:
+        print(e)
+        print("DEBUG: No graph returned from get_dataform_graph")
+        return
+    finally:
+        if join_cache is not None:
+            join_cache.close()
+    print("DEBUG: Graph loaded successfully")
+    if join_cache is not None and join_cache.hit_ratio() is not None:
+        stats = join_cache.stats
+        print(f"Join cache: {stats['hits']}/{stats['hits'] + stats['misses']} queries reused "
+              f"({join_cache.hit_ratio():.1%} hit ratio), {stats['evictions']} evicted",
+              file=sys.stderr)
+    if join_cache is not None and join_cache.error:
+        print(f"Join cache unavailable ({join_cache.error}); queries were parsed without it",
+              file=sys.stderr)
+
+    # Search functionality
+    search_term = args.search_term.lower()
+    
+    found_count = print_text_report(table_lookup, search_term)
 
     if found_count == 0 and search_term:
         print(f"No tables found matching '{search_term}'")
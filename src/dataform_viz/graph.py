@@ -0,0 +1,509 @@
+"""
+Compact dependency graph with interned names and CSR adjacency
+"""
+import json
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .parser import iter_dependencies_report
+
+# array typecode used for node ids, edge offsets and edge targets
+ID_TYPECODE = 'i'
+
+# Type id stored for nodes that are only referenced, never defined by a record
+NO_TYPE = -1
+
+# Binary serialization: magic, format version, array itemsize, byte order
+_MAGIC = b'DFVG'
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sHBB')
+_SECTION = struct.Struct('<Q')
+
+
+def _build_csr(node_count: int, sources: array, targets: array,
+               keep: Optional[array] = None) -> Tuple[array, array]:
+    """
+    Counting-sort an edge list into compressed sparse row arrays
+
+    Edges keep their relative order within each source node.
+
+    Args:
+        node_count: Number of nodes
+        sources: Source node id of each edge
+        targets: Target node id of each edge
+        keep: Optional 0/1 flag per edge; edges flagged 0 are dropped
+
+    Returns:
+        (offsets, targets) where the neighbors of node n are
+        targets[offsets[n]:offsets[n + 1]]
+    """
+    offsets = array(ID_TYPECODE, bytes(array(ID_TYPECODE).itemsize * (node_count + 1)))
+    for i, src in enumerate(sources):
+        if keep is None or keep[i]:
+            offsets[src + 1] += 1
+    for n in range(node_count):
+        offsets[n + 1] += offsets[n]
+
+    cursor = array(ID_TYPECODE, offsets[:-1])
+    csr_targets = array(ID_TYPECODE, bytes(array(ID_TYPECODE).itemsize * offsets[-1]))
+    for i, src in enumerate(sources):
+        if keep is None or keep[i]:
+            csr_targets[cursor[src]] = targets[i]
+            cursor[src] += 1
+    return offsets, csr_targets
+
+
+class GraphBuilder:
+    """Accumulates table records into flat edge arrays before freezing a DependencyGraph"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._types = array('h')
+        self._type_ids: Dict[object, int] = {}
+        self._type_names: List[object] = []
+        # Node id of each table record in first-seen order, and the
+        # sequence number of the latest record per node (-1 for none)
+        self._records = array(ID_TYPECODE)
+        self._latest = array(ID_TYPECODE)
+        self._record_count = 0
+        # Edge lists tagged with the record sequence that produced them
+        self._dep_src = array(ID_TYPECODE)
+        self._dep_dst = array(ID_TYPECODE)
+        self._dep_seq = array(ID_TYPECODE)
+        self._dept_src = array(ID_TYPECODE)
+        self._dept_dst = array(ID_TYPECODE)
+        self._dept_seq = array(ID_TYPECODE)
+        self._joins: Dict[Tuple[int, int], Tuple[str, str]] = {}
+
+    def _node(self, name: str) -> int:
+        node_id = self._ids.get(name)
+        if node_id is None:
+            name = sys.intern(name)
+            node_id = len(self._names)
+            self._ids[name] = node_id
+            self._names.append(name)
+            self._types.append(NO_TYPE)
+            self._latest.append(-1)
+        return node_id
+
+    def _type(self, table_type) -> int:
+        type_id = self._type_ids.get(table_type)
+        if type_id is None:
+            type_id = len(self._type_names)
+            self._type_ids[table_type] = type_id
+            self._type_names.append(table_type)
+        return type_id
+
+    def add_table(
+        self,
+        name: str,
+        table_type,
+        dependencies: Iterable[str] = (),
+        dependents: Iterable[str] = (),
+        join_info: Optional[dict] = None
+    ) -> int:
+        """
+        Add one table record
+
+        A later record for the same name replaces the earlier one, matching
+        dict assignment in parse_dependencies_report.
+
+        Args:
+            name: Full table name (schema.table)
+            table_type: Table type from the report or compiled graph
+            dependencies: Names this table reads from
+            dependents: Names that read from this table
+            join_info: Mapping of dependency name to {'type', 'condition'}
+
+        Returns:
+            Node id of the table
+        """
+        node_id = self._node(name)
+        seq = self._record_count
+        self._record_count += 1
+        replaced = self._latest[node_id] != -1
+        if not replaced:
+            self._records.append(node_id)
+        self._latest[node_id] = seq
+        self._types[node_id] = self._type(table_type)
+
+        for dep in dependencies:
+            self._dep_src.append(node_id)
+            self._dep_dst.append(self._node(dep))
+            self._dep_seq.append(seq)
+        for dept in dependents:
+            self._dept_src.append(node_id)
+            self._dept_dst.append(self._node(dept))
+            self._dept_seq.append(seq)
+
+        if replaced:
+            for key in [k for k in self._joins if k[0] == node_id]:
+                del self._joins[key]
+        for dep_name, info in (join_info or {}).items():
+            join_type = sys.intern(info['type']) if isinstance(info['type'], str) else info['type']
+            self._joins[(node_id, self._node(dep_name))] = (join_type, info['condition'])
+        return node_id
+
+    def build(self, derive_dependents: bool = False) -> 'DependencyGraph':
+        """
+        Freeze the accumulated records into a DependencyGraph
+
+        Args:
+            derive_dependents: Ignore explicit dependents and compute them by
+                reversing dependency edges, keeping only edges that point at
+                recorded tables (as dataform_check.main does)
+
+        Returns:
+            The frozen graph
+        """
+        node_count = len(self._names)
+        latest = self._latest
+        dep_keep = array('b', (latest[s] == q for s, q in zip(self._dep_src, self._dep_seq)))
+        dep_offsets, dep_targets = _build_csr(node_count, self._dep_src, self._dep_dst, dep_keep)
+
+        if derive_dependents:
+            # Reverse edges in record order so each dependents list follows
+            # the order in which its readers were added
+            rev_src = array(ID_TYPECODE)
+            rev_dst = array(ID_TYPECODE)
+            for node_id in self._records:
+                for i in range(dep_offsets[node_id], dep_offsets[node_id + 1]):
+                    target = dep_targets[i]
+                    if latest[target] != -1:
+                        rev_src.append(target)
+                        rev_dst.append(node_id)
+            dept_offsets, dept_targets = _build_csr(node_count, rev_src, rev_dst)
+        else:
+            dept_keep = array('b', (latest[s] == q for s, q in zip(self._dept_src, self._dept_seq)))
+            dept_offsets, dept_targets = _build_csr(
+                node_count, self._dept_src, self._dept_dst, dept_keep
+            )
+
+        # Attach join info to the first dependency edge it describes
+        joins: Dict[int, Tuple[str, str]] = {}
+        for (src, dst), info in self._joins.items():
+            for i in range(dep_offsets[src], dep_offsets[src + 1]):
+                if dep_targets[i] == dst:
+                    joins[i] = info
+                    break
+
+        return DependencyGraph(
+            self._names, self._ids, self._types, self._type_names, self._records,
+            dep_offsets, dep_targets, dept_offsets, dept_targets, joins
+        )
+
+
+class TableView(Mapping):
+    """Read-only view of one table in the parse_dependencies_report dict format"""
+
+    __slots__ = ('_graph', '_node_id')
+
+    _KEYS = ('type', 'dependencies', 'dependents', 'join_info')
+
+    def __init__(self, graph: 'DependencyGraph', node_id: int):
+        self._graph = graph
+        self._node_id = node_id
+
+    def __getitem__(self, key):
+        graph = self._graph
+        if key == 'type':
+            return graph.type_of(self._node_id)
+        if key == 'dependencies':
+            return [graph._names[i] for i in graph.dependency_ids(self._node_id)]
+        if key == 'dependents':
+            return [graph._names[i] for i in graph.dependent_ids(self._node_id)]
+        if key == 'join_info':
+            return graph.join_info(self._node_id)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def __repr__(self) -> str:
+        return f"TableView({self._graph._names[self._node_id]!r})"
+
+
+class DependencyGraph(Mapping):
+    """
+    Immutable dependency graph backed by arrays
+
+    Every table and every referenced name gets an integer node id. Names are
+    interned once; adjacency for dependencies and dependents is stored in
+    CSR form (offsets + targets arrays), and join info is kept per dependency
+    edge index. As a Mapping the graph behaves like the dict returned by
+    parse_dependencies_report: keys are the table names that have a record,
+    values are read-only TableView objects.
+    """
+
+    __slots__ = (
+        '_names', '_ids', '_types', '_type_names', '_records',
+        '_dep_offsets', '_dep_targets', '_dept_offsets', '_dept_targets', '_joins',
+        '_schemas'
+    )
+
+    def __init__(self, names, ids, types, type_names, records,
+                 dep_offsets, dep_targets, dept_offsets, dept_targets, joins):
+        self._names = names
+        self._ids = ids
+        self._types = types
+        self._type_names = type_names
+        self._records = records
+        self._dep_offsets = dep_offsets
+        self._dep_targets = dep_targets
+        self._dept_offsets = dept_offsets
+        self._dept_targets = dept_targets
+        self._joins = joins
+        self._schemas = self._partition_schemas()
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, dict]],
+                     derive_dependents: bool = False) -> 'DependencyGraph':
+        """
+        Build a graph from (table_name, info) records
+
+        Args:
+            records: Records as yielded by iter_dependencies_report
+            derive_dependents: See GraphBuilder.build
+
+        Returns:
+            DependencyGraph
+        """
+        builder = GraphBuilder()
+        for name, info in records:
+            builder.add_table(
+                name,
+                info.get('type'),
+                info.get('dependencies', ()),
+                info.get('dependents', ()),
+                info.get('join_info')
+            )
+        return builder.build(derive_dependents=derive_dependents)
+
+    @classmethod
+    def from_report(cls, report_path: str) -> 'DependencyGraph':
+        """
+        Parse a dependencies report straight into a graph
+
+        Args:
+            report_path: Path to dependencies report file
+
+        Returns:
+            DependencyGraph
+        """
+        return cls.from_records(iter_dependencies_report(report_path))
+
+    def _partition_schemas(self) -> Dict[str, array]:
+        """Group recorded node ids by schema (the name part before the first '.')"""
+        schemas: Dict[str, array] = {}
+        names = self._names
+        for node_id in self._records:
+            schema, dot, _ = names[node_id].partition('.')
+            if dot:
+                ids = schemas.get(schema)
+                if ids is None:
+                    ids = schemas[schema] = array(ID_TYPECODE)
+                ids.append(node_id)
+        return schemas
+
+    # Serialization -----------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the graph into a compact binary blob
+
+        String tables are stored as JSON, arrays as their raw machine bytes.
+
+        Returns:
+            Bytes accepted by from_bytes
+        """
+        join_edges = array(ID_TYPECODE, self._joins.keys())
+        join_values = list(self._joins.values())
+        strings = json.dumps({
+            'names': self._names,
+            'type_names': self._type_names,
+            'join_types': [v[0] for v in join_values],
+            'join_conditions': [v[1] for v in join_values],
+        }, separators=(',', ':')).encode('utf-8')
+
+        sections = [
+            strings,
+            self._types.tobytes(),
+            self._records.tobytes(),
+            self._dep_offsets.tobytes(),
+            self._dep_targets.tobytes(),
+            self._dept_offsets.tobytes(),
+            self._dept_targets.tobytes(),
+            join_edges.tobytes(),
+        ]
+        byteorder = 0 if sys.byteorder == 'little' else 1
+        parts = [_HEADER.pack(_MAGIC, _FORMAT_VERSION, join_edges.itemsize, byteorder)]
+        for section in sections:
+            parts.append(_SECTION.pack(len(section)))
+            parts.append(section)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'DependencyGraph':
+        """
+        Load a graph serialized by to_bytes
+
+        Args:
+            data: Serialized graph
+
+        Returns:
+            DependencyGraph
+
+        Raises:
+            ValueError: If the blob was written by another format version
+                or on a machine with a different array layout
+        """
+        view = memoryview(data)
+        magic, version, itemsize, byteorder = _HEADER.unpack_from(view, 0)
+        expected_order = 0 if sys.byteorder == 'little' else 1
+        if (magic != _MAGIC or version != _FORMAT_VERSION
+                or itemsize != array(ID_TYPECODE).itemsize or byteorder != expected_order):
+            raise ValueError("Unsupported graph serialization format")
+
+        pos = _HEADER.size
+        sections = []
+        while pos < len(view):
+            (length,) = _SECTION.unpack_from(view, pos)
+            pos += _SECTION.size
+            sections.append(view[pos:pos + length])
+            pos += length
+        if len(sections) != 8:
+            raise ValueError("Truncated graph serialization")
+
+        strings = json.loads(bytes(sections[0]))
+        names = [sys.intern(name) for name in strings['names']]
+        arrays = []
+        for typecode, section in zip('h' + ID_TYPECODE * 6, sections[1:]):
+            arr = array(typecode)
+            arr.frombytes(section)
+            arrays.append(arr)
+        types, records, dep_offsets, dep_targets, dept_offsets, dept_targets, join_edges = arrays
+
+        joins = {
+            edge: (sys.intern(t) if isinstance(t, str) else t, c)
+            for edge, t, c in zip(join_edges, strings['join_types'], strings['join_conditions'])
+        }
+        ids = {name: node_id for node_id, name in enumerate(names)}
+        return cls(names, ids, types, strings['type_names'], records,
+                   dep_offsets, dep_targets, dept_offsets, dept_targets, joins)
+
+    # Mapping interface -------------------------------------------------
+
+    def __getitem__(self, name: str) -> TableView:
+        node_id = self._ids.get(name)
+        if node_id is None or self._types[node_id] == NO_TYPE:
+            raise KeyError(name)
+        return TableView(self, node_id)
+
+    def __iter__(self) -> Iterator[str]:
+        names = self._names
+        return (names[node_id] for node_id in self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, name) -> bool:
+        node_id = self._ids.get(name)
+        return node_id is not None and self._types[node_id] != NO_TYPE
+
+    def __repr__(self) -> str:
+        return (f"DependencyGraph(tables={len(self._records)}, nodes={len(self._names)}, "
+                f"edges={len(self._dep_targets)})")
+
+    # Node and edge access ----------------------------------------------
+
+    @property
+    def node_count(self) -> int:
+        """Number of nodes, including names that are only referenced"""
+        return len(self._names)
+
+    @property
+    def edge_count(self) -> int:
+        """Number of dependency edges"""
+        return len(self._dep_targets)
+
+    def node_id(self, name: str) -> Optional[int]:
+        """Return the node id for a name, or None if it never appears"""
+        return self._ids.get(name)
+
+    def name(self, node_id: int) -> str:
+        """Return the name of a node id"""
+        return self._names[node_id]
+
+    def has_record(self, node_id: int) -> bool:
+        """True if the node was defined by a table record"""
+        return self._types[node_id] != NO_TYPE
+
+    def record_ids(self) -> array:
+        """Node ids of the recorded tables in report order"""
+        return self._records
+
+    def type_of(self, node_id: int):
+        """Return the table type of a node, or None for referenced-only nodes"""
+        type_id = self._types[node_id]
+        return None if type_id == NO_TYPE else self._type_names[type_id]
+
+    def dependency_ids(self, node_id: int) -> array:
+        """Node ids this node reads from"""
+        return self._dep_targets[self._dep_offsets[node_id]:self._dep_offsets[node_id + 1]]
+
+    def dependent_ids(self, node_id: int) -> array:
+        """Node ids that read from this node"""
+        return self._dept_targets[self._dept_offsets[node_id]:self._dept_offsets[node_id + 1]]
+
+    def dependency_csr(self) -> Tuple[array, array]:
+        """(offsets, targets) of the dependency adjacency, for bulk traversals"""
+        return self._dep_offsets, self._dep_targets
+
+    def dependent_csr(self) -> Tuple[array, array]:
+        """(offsets, targets) of the dependent adjacency, for bulk traversals"""
+        return self._dept_offsets, self._dept_targets
+
+    # Schema partition --------------------------------------------------
+
+    def schemas(self) -> List[str]:
+        """Schemas that have at least one recorded table, in order of first appearance"""
+        return list(self._schemas)
+
+    def schema_ids(self, schema: str) -> array:
+        """Node ids of the recorded tables in a schema, in report order"""
+        return self._schemas.get(schema, array(ID_TYPECODE))
+
+    def iter_schema(self, schema: str) -> Iterator[Tuple[str, TableView]]:
+        """
+        Iterate over the tables of one schema without scanning the others
+
+        Args:
+            schema: Schema name
+
+        Yields:
+            (table_name, TableView) tuples in report order
+        """
+        names = self._names
+        for node_id in self.schema_ids(schema):
+            yield names[node_id], TableView(self, node_id)
+
+    def join_info(self, node_id: int) -> Dict[str, dict]:
+        """Return join info of a node keyed by dependency name"""
+        result: Dict[str, dict] = {}
+        if not self._joins:
+            return result
+        for i in range(self._dep_offsets[node_id], self._dep_offsets[node_id + 1]):
+            info = self._joins.get(i)
+            if info is not None:
+                result[self._names[self._dep_targets[i]]] = {
+                    'type': info[0],
+                    'condition': info[1]
+                }
+        return result
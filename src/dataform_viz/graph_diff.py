@@ -0,0 +1,264 @@
+"""
+Streaming diff between two dependency reports
+
+Every table block is hashed first; only tables whose hashes differ are
+decoded and compared edge by edge, so the diff is linear in the size of
+the two reports. Events are yielded as they are found. Text reports are
+read through their offset index, one block at a time; a compiled .json
+report is loaded as a whole graph, because its dependents are only known
+once every table has been read.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from .report_index import ReportIndex
+from .svg_generator import generate_svg_manual
+
+TABLE_ADDED = 'table_added'
+TABLE_REMOVED = 'table_removed'
+TYPE_CHANGED = 'type_changed'
+EDGE_ADDED = 'edge_added'
+EDGE_REMOVED = 'edge_removed'
+JOIN_CHANGED = 'join_changed'
+
+
+class DiffEvent(NamedTuple):
+    """
+    One difference between the old and the new report
+
+    Edges point from the dependency to the table that reads it:
+    source is the dependency, table the reader.
+    """
+    kind: str
+    table: str
+    source: Optional[str] = None
+    old: Optional[object] = None
+    new: Optional[object] = None
+
+
+class _ReportSide:
+    """Block hashes and lazy decoding for a text report"""
+
+    def __init__(self, report_path: str):
+        self.index = ReportIndex.load_or_build(report_path, write=False)
+        self.digests = self.index.block_digests()
+
+    def names(self) -> List[str]:
+        return self.index.names()
+
+    def records(self, names) -> Iterator[Tuple[str, dict]]:
+        return self.index.iter_tables(names)
+
+    def record(self, name: str) -> Optional[dict]:
+        return self.index.get(name)
+
+
+class _GraphSide:
+    """Record hashes for a graph-like mapping (e.g. a compiled .json report)"""
+
+    def __init__(self, tables: Mapping):
+        self.tables = tables
+        self.digests = {}
+        for name, info in tables.items():
+            payload = json.dumps([
+                info['type'], list(info['dependencies']), list(info['dependents']),
+                sorted((dep, j['type'], j['condition']) for dep, j in info.get('join_info', {}).items()),
+            ], separators=(',', ':'))
+            self.digests[name] = hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest()
+
+    def names(self) -> List[str]:
+        return list(self.tables)
+
+    def records(self, names) -> Iterator[Tuple[str, dict]]:
+        for name in names:
+            yield name, self.tables[name]
+
+    def record(self, name: str) -> Optional[dict]:
+        return self.tables.get(name)
+
+
+def _open_side(report_path: str):
+    if not Path(report_path).exists():
+        raise FileNotFoundError(f"Report file not found: {report_path}")
+    if Path(report_path).suffix.lower() == '.json':
+        # Dependents are derived across all tables, so the whole graph is built
+        from .visualizer import DependencyVisualizer
+        return _GraphSide(DependencyVisualizer(report_path, use_cache=False).load_report())
+    return _ReportSide(report_path)
+
+
+def _compare_tables(name: str, old: Mapping, new: Mapping) -> Iterator[DiffEvent]:
+    if old['type'] != new['type']:
+        yield DiffEvent(TYPE_CHANGED, name, old=old['type'], new=new['type'])
+
+    old_deps = list(old['dependencies'])
+    new_deps = list(new['dependencies'])
+    old_set = set(old_deps)
+    new_set = set(new_deps)
+    for dep in old_deps:
+        if dep not in new_set:
+            yield DiffEvent(EDGE_REMOVED, name, source=dep)
+    for dep in new_deps:
+        if dep not in old_set:
+            yield DiffEvent(EDGE_ADDED, name, source=dep)
+
+    old_joins = old.get('join_info', {})
+    new_joins = new.get('join_info', {})
+    for dep in new_deps:
+        if dep in old_set and old_joins.get(dep) != new_joins.get(dep):
+            yield DiffEvent(JOIN_CHANGED, name, source=dep,
+                            old=old_joins.get(dep), new=new_joins.get(dep))
+
+
+def _iter_side_diff(old_side, new_side) -> Iterator[DiffEvent]:
+    old_digests = old_side.digests
+    new_digests = new_side.digests
+
+    removed = [name for name in old_side.names() if name not in new_digests]
+    changed = [name for name in old_side.names()
+               if name in new_digests and old_digests[name] != new_digests[name]]
+    added = [name for name in new_side.names() if name not in old_digests]
+
+    for name, info in old_side.records(removed):
+        yield DiffEvent(TABLE_REMOVED, name, old=info['type'])
+        for dep in info['dependencies']:
+            yield DiffEvent(EDGE_REMOVED, name, source=dep)
+
+    # Old records are streamed; each new one is decoded only when it is compared
+    for name, old_info in old_side.records(changed):
+        yield from _compare_tables(name, old_info, new_side.record(name))
+
+    for name, info in new_side.records(added):
+        yield DiffEvent(TABLE_ADDED, name, new=info['type'])
+        for dep in info['dependencies']:
+            yield DiffEvent(EDGE_ADDED, name, source=dep)
+
+
+def iter_report_diff(old_path: str, new_path: str) -> Iterator[DiffEvent]:
+    """
+    Stream the differences between two dependency reports
+
+    Args:
+        old_path: Baseline report (text or compiled .json; a .json
+            report is loaded whole)
+        new_path: Report to compare against the baseline
+
+    Yields:
+        DiffEvent tuples: removed and changed tables in old-report order,
+        then added tables in new-report order. Added and removed tables also
+        yield their dependency edges.
+    """
+    yield from _iter_side_diff(_open_side(old_path), _open_side(new_path))
+
+
+def iter_graph_diff(old_tables: Mapping, new_tables: Mapping) -> Iterator[DiffEvent]:
+    """
+    Differences between two in-memory graphs (e.g. DependencyGraph)
+
+    Yields:
+        DiffEvent tuples in the order of iter_report_diff
+    """
+    yield from _iter_side_diff(_GraphSide(old_tables), _GraphSide(new_tables))
+
+
+def format_event(event: DiffEvent) -> str:
+    """Render a DiffEvent as one line of text"""
+    if event.kind == TABLE_ADDED:
+        return f"+ table {event.table} ({event.new})"
+    if event.kind == TABLE_REMOVED:
+        return f"- table {event.table} ({event.old})"
+    if event.kind == TYPE_CHANGED:
+        return f"~ type  {event.table}: {event.old} -> {event.new}"
+    if event.kind == EDGE_ADDED:
+        return f"+ edge  {event.source} -> {event.table}"
+    if event.kind == EDGE_REMOVED:
+        return f"- edge  {event.source} -> {event.table}"
+
+    def join_text(join):
+        return f"{join['type']} ON {join['condition']}" if join else "(none)"
+    return (f"~ join  {event.source} -> {event.table}: "
+            f"{join_text(event.old)} => {join_text(event.new)}")
+
+
+def edge_styles_by_table(events) -> Dict[str, Dict[Tuple[str, str], str]]:
+    """
+    Collect 'added'/'removed' edge markers per changed table
+
+    Both endpoints of an edge get the marker, so the reader's and the
+    dependency's diagrams both highlight it.
+
+    Returns:
+        Dict of table name -> {(dependency, reader): 'added' | 'removed'}
+    """
+    styles: Dict[str, Dict[Tuple[str, str], str]] = {}
+    for event in events:
+        if event.kind in (EDGE_ADDED, EDGE_REMOVED):
+            status = 'added' if event.kind == EDGE_ADDED else 'removed'
+            edge = (event.source, event.table)
+            styles.setdefault(event.table, {})[edge] = status
+            styles.setdefault(event.source, {})[edge] = status
+        elif event.kind in (TYPE_CHANGED, JOIN_CHANGED, TABLE_ADDED):
+            styles.setdefault(event.table, {})
+    return styles
+
+
+def render_diff_svgs(old_tables: Mapping, new_tables: Mapping, events, output_dir: str) -> int:
+    """
+    Render diagrams for the tables touched by a diff, highlighting changed edges
+
+    Removed edges are drawn dashed red next to the remaining neighbors,
+    added edges solid green. Tables that only exist in the old report are
+    drawn from their old record.
+
+    Args:
+        old_tables: Baseline graph (e.g. DependencyVisualizer.load_report())
+        new_tables: New graph
+        events: DiffEvents from iter_report_diff
+        output_dir: Directory receiving one SVG per touched table
+
+    Returns:
+        Number of SVGs written
+    """
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    count = 0
+    for table, styles in edge_styles_by_table(events).items():
+        base = new_tables.get(table) or old_tables.get(table)
+        if base is None:
+            continue
+        dependencies = list(base['dependencies'])
+        dependents = list(base['dependents'])
+        for (source, reader), status in styles.items():
+            if status != 'removed':
+                continue
+            if reader == table and source not in dependencies:
+                dependencies.append(source)
+            elif source == table and reader not in dependents:
+                dependents.append(reader)
+        info = {
+            'type': base['type'],
+            'dependencies': dependencies,
+            'dependents': dependents,
+            'join_info': dict(base.get('join_info', {})),
+        }
+        neighbor_types = _FallbackTypes(new_tables, old_tables)
+        safe_name = table.replace('.', '_').replace('-', '_')
+        generate_svg_manual(table, info, neighbor_types, out / f"{safe_name}.svg", edge_styles=styles)
+        count += 1
+    return count
+
+
+class _FallbackTypes:
+    """Neighbor lookup that prefers the new graph and falls back to the old one"""
+
+    def __init__(self, primary: Mapping, fallback: Mapping):
+        self.primary = primary
+        self.fallback = fallback
+
+    def get(self, name, default=None):
+        info = self.primary.get(name)
+        if info is None:
+            info = self.fallback.get(name, default)
+        return info
@@ -0,0 +1,257 @@
+"""
+Persistent cache of JOIN analysis results per compiled query
+
+Entries map a SHA-256 over (parser version, query text, dependency targets)
+to the join_info extracted by dataform_check.parse_joins_from_query, so a
+warm run only parses queries whose SQL or dependencies changed. They live in
+one SQLite file (``.dataform_viz_cache/join_cache.sqlite`` by default) whose
+payload is capped at max_bytes: reads refresh an entry's last-used tick and
+writes past the cap evict the least recently used entries.
+
+Several runs can share the file. It uses WAL journaling, so lookups never
+wait for a writer. Each put_many() is one short write transaction, and the
+last-used ticks of hits are written with the next put_many() or by close().
+A run that cannot get the file within the busy timeout, or that hits any
+other SQLite error, carries on without the cache: lookups miss and writes
+are dropped.
+"""
+import hashlib
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .compile_cache import CACHE_DIR
+
+JOIN_CACHE_NAME = 'join_cache.sqlite'
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+_CACHE_VERSION = 1
+# Seconds to wait for another run's write transaction
+DEFAULT_TIMEOUT = 5.0
+
+# Eviction frees down to this fraction of the cap, so it runs rarely
+_LOW_WATER = 0.9
+# Per-row overhead counted against the cap next to the JSON payload
+_ROW_OVERHEAD = 48
+# Keeps IN (...) lists below SQLite's default variable limit
+_IN_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS entries (
+    key BLOB PRIMARY KEY,
+    join_info TEXT NOT NULL,   -- JSON
+    size INTEGER NOT NULL,     -- bytes counted against the cap
+    used INTEGER NOT NULL      -- last-used tick
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+"""
+
+
+def join_cache_key(query: str, dependencies: Sequence[dict], parser_version: int) -> bytes:
+    """
+    Hash everything that determines a query's join_info
+
+    Args:
+        query: Compiled SQL
+        dependencies: dependencyTargets of the compiled table
+        parser_version: Version of the JOIN parser (see dataform_check.JOIN_PARSER_VERSION)
+
+    Returns:
+        SHA-256 digest
+    """
+    payload = json.dumps([parser_version, dependencies, query], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).digest()
+
+
+class JoinCache:
+    """Size-capped LRU store of join_info per query key"""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 stats: Optional[Dict[str, int]] = None, timeout: float = DEFAULT_TIMEOUT):
+        """
+        Open (or create) the cache file
+
+        An unreadable file or one written by another cache version is
+        started over. A file that stays locked or a cache directory that
+        cannot be created leaves the cache disabled (see error).
+
+        Args:
+            path: SQLite file (default: .dataform_viz_cache/join_cache.sqlite)
+            max_bytes: Cap on the stored payload
+            stats: Optional dict that receives hits, misses, writes and evictions counters
+            timeout: Seconds to wait for another run holding the file
+        """
+        self.path = Path(path) if path else Path(CACHE_DIR) / JOIN_CACHE_NAME
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.stats = stats if stats is not None else {}
+        for key in ('hits', 'misses', 'writes', 'evictions'):
+            self.stats.setdefault(key, 0)
+        self.conn: Optional[sqlite3.Connection] = None
+        # Why the cache was disabled, or None while it works
+        self.error: Optional[str] = None
+        # Hits whose last-used tick is not written yet
+        self._touched: Dict[bytes, int] = {}
+        self.tick = 0
+        self.total_bytes = 0
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                self._open()
+            except sqlite3.OperationalError:
+                raise
+            except sqlite3.DatabaseError:
+                self.path.unlink()
+                self._open()
+        except (sqlite3.OperationalError, OSError) as e:
+            self._disable(e)
+
+    def _open(self) -> None:
+        conn = sqlite3.connect(str(self.path), timeout=self.timeout, isolation_level=None)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            meta = dict(conn.execute('SELECT key, value FROM meta'))
+            if meta.get('version') != _CACHE_VERSION:
+                with self._transaction(conn):
+                    conn.execute('DELETE FROM entries')
+                    conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (_CACHE_VERSION,))
+                meta['tick'] = 0
+            self.tick = int(meta.get('tick') or 0)
+            self.total_bytes = self._stored_bytes(conn)
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        self.conn = conn
+
+    @staticmethod
+    @contextmanager
+    def _transaction(conn: sqlite3.Connection) -> Iterator[None]:
+        """Short write transaction; the write lock is taken up front so it cannot deadlock"""
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _disable(self, error: Exception) -> None:
+        """Carry on without the file after a lock timeout, other SQLite error or OSError"""
+        self.error = str(error)
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    @staticmethod
+    def _stored_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, dict]:
+        """
+        Look up keys, marking the hits as recently used
+
+        Returns:
+            join_info per key that is present
+        """
+        keys = list(keys)
+        self.tick += 1
+        found: Dict[bytes, dict] = {}
+        conn = self.conn
+        if conn is not None:
+            try:
+                for i in range(0, len(keys), _IN_CHUNK):
+                    chunk = keys[i:i + _IN_CHUNK]
+                    rows = conn.execute(
+                        f"SELECT key, join_info FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    for key, join_info in rows:
+                        found[key] = json.loads(join_info)
+            except sqlite3.OperationalError as e:
+                self._disable(e)
+                found = {}
+        for key in found:
+            self._touched[key] = self.tick
+        hits = sum(1 for key in keys if key in found)
+        self.stats['hits'] += hits
+        self.stats['misses'] += len(keys) - hits
+        return found
+
+    def put_many(self, items: Iterable[Tuple[bytes, dict]]) -> None:
+        """Store join_info per key, evicting least recently used entries past the cap"""
+        self.tick += 1
+        rows = []
+        for key, join_info in items:
+            payload = json.dumps(join_info, separators=(',', ':'))
+            size = len(payload) + _ROW_OVERHEAD
+            if size <= self.max_bytes:
+                rows.append((key, payload, size, self.tick))
+        conn = self.conn
+        if conn is None:
+            return
+        try:
+            with self._transaction(conn):
+                self._write_touched(conn)
+                writes = 0
+                for row in rows:
+                    if conn.execute('INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)', row).rowcount:
+                        writes += 1
+                        self.total_bytes += row[2]
+                if self.total_bytes > self.max_bytes:
+                    # Other runs may have written or evicted since the last count
+                    self.total_bytes = self._stored_bytes(conn)
+                    if self.total_bytes > self.max_bytes:
+                        evictions = self._evict(conn, int(self.max_bytes * _LOW_WATER))
+                        self.stats['evictions'] += evictions
+            self.stats['writes'] += writes
+        except sqlite3.OperationalError as e:
+            self._disable(e)
+
+    def _write_touched(self, conn: sqlite3.Connection) -> None:
+        if self._touched:
+            conn.executemany('UPDATE entries SET used = ? WHERE key = ?',
+                                  ((tick, key) for key, tick in self._touched.items()))
+            self._touched.clear()
+
+    def _evict(self, conn: sqlite3.Connection, target_bytes: int) -> int:
+        victims: List[bytes] = []
+        for key, size in conn.execute('SELECT key, size FROM entries ORDER BY used'):
+            if self.total_bytes <= target_bytes:
+                break
+            victims.append(key)
+            self.total_bytes -= size
+        conn.executemany('DELETE FROM entries WHERE key = ?', ((key,) for key in victims))
+        return len(victims)
+
+    def hit_ratio(self) -> Optional[float]:
+        """Fraction of lookups that hit, or None before the first lookup"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else None
+
+    def close(self) -> None:
+        """Write the last-used ticks of this run's hits and close the file"""
+        conn = self.conn
+        if conn is None:
+            return
+        try:
+            with self._transaction(conn):
+                self._write_touched(conn)
+                # Ticks only grow, also when runs overlap
+                conn.execute("INSERT OR REPLACE INTO meta VALUES "
+                             "('tick', MAX(?, COALESCE((SELECT value FROM meta WHERE key = 'tick'), 0)))",
+                             (self.tick,))
+        except sqlite3.OperationalError as e:
+            self._disable(e)
+        else:
+            conn.close()
+            self.conn = None
+
+    def __enter__(self) -> 'JoinCache':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,173 @@
+"""
+Incremental decoding of large JSON arrays from a text stream
+
+Used for `dataform compile --json`, whose output can be hundreds of MB: the
+elements of the "tables" array are decoded and yielded one at a time, so
+only one element plus one read chunk is held in memory.
+"""
+import json
+import re
+from typing import Any, Iterator, TextIO
+
+CHUNK_SIZE = 1 << 20
+
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+# Body of a JSON string up to (not including) the closing quote; stops
+# before a trailing backslash whose escaped character has not arrived yet
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.S)
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+# _STRING_BODY and _WHITESPACE match the empty string, so match() always succeeds
+
+
+class _Reader:
+    """Chunked text buffer that only keeps the unconsumed tail"""
+
+    def __init__(self, stream: TextIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, keep_from: int) -> int:
+        """
+        Drop everything before keep_from and append the next chunk
+
+        Returns:
+            How far positions shifted (subtract from saved offsets)
+        """
+        if self.eof:
+            return 0
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.buf = self.buf[keep_from:] + chunk
+        self.pos -= keep_from
+        return keep_from
+
+    def skip_whitespace(self) -> str:
+        """Skip whitespace and return the next character ('' at end of stream)"""
+        while True:
+            match = _WHITESPACE.match(self.buf, self.pos)
+            self.pos = match.end() if match else self.pos
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ''
+            self.fill(self.pos)
+
+
+def _find_key(reader: _Reader, key: str) -> bool:
+    """Advance past the first occurrence of the quoted key, discarding what precedes it"""
+    needle = json.dumps(key)
+    while True:
+        found = reader.buf.find(needle, reader.pos)
+        if found != -1:
+            reader.pos = found + len(needle)
+            return True
+        if reader.eof:
+            return False
+        # Keep a tail in case the key straddles two chunks
+        reader.pos = max(reader.pos, len(reader.buf) - len(needle) + 1)
+        reader.fill(reader.pos)
+
+
+def _scan_value(reader: _Reader) -> str:
+    """Return the text of the object or array starting at reader.pos"""
+    start = reader.pos
+    pos = start
+    depth = 0
+    in_string = False
+    while True:
+        buf = reader.buf
+        if in_string:
+            body = _STRING_BODY.match(buf, pos)
+            pos = body.end() if body else pos
+            if pos < len(buf) and buf[pos] == '"':
+                in_string = False
+                pos += 1
+                continue
+        else:
+            match = _STRUCTURAL.search(buf, pos)
+            if match:
+                char = match.group()
+                pos = match.end()
+                if char == '"':
+                    in_string = True
+                elif char in '{[':
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        reader.pos = pos
+                        return buf[start:pos]
+                continue
+            pos = len(buf)
+
+        # Need more input to finish this value
+        if reader.eof:
+            raise ValueError("Unexpected end of JSON stream")
+        shift = reader.fill(start)
+        start -= shift
+        pos -= shift
+
+
+_DECODER = json.JSONDecoder()
+
+
+def _decode_value(reader: _Reader) -> Any:
+    """Decode the object or array starting at reader.pos"""
+    try:
+        # Fast path: the element is complete in the buffer
+        value, end = _DECODER.raw_decode(reader.buf, reader.pos)
+    except json.JSONDecodeError:
+        # Element straddles the chunk boundary: find its end, then decode it
+        return json.loads(_scan_value(reader))
+    reader.pos = end
+    return value
+
+
+def iter_json_array(stream: TextIO, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yield the elements of the array stored under `key`, one at a time
+
+    Anything before the key (log lines, the enclosing object's opening
+    brace) is skipped. The rest of the stream is consumed after the array
+    ends so a producing subprocess is never blocked on a full pipe.
+
+    Args:
+        stream: Text stream, e.g. a subprocess stdout
+        key: Object key whose array value should be streamed
+        chunk_size: Characters read per chunk
+
+    Yields:
+        Decoded array elements (objects or arrays)
+
+    Raises:
+        ValueError: If the key is missing or the JSON is malformed
+    """
+    reader = _Reader(stream, chunk_size)
+    if not _find_key(reader, key):
+        raise ValueError(f"Could not find '{key}' key in JSON stream")
+    if reader.skip_whitespace() != ':':
+        raise ValueError(f"Expected ':' after '{key}'")
+    reader.pos += 1
+    if reader.skip_whitespace() != '[':
+        raise ValueError(f"Expected an array for '{key}'")
+    reader.pos += 1
+
+    while True:
+        char = reader.skip_whitespace()
+        if char == ',':
+            reader.pos += 1
+            char = reader.skip_whitespace()
+        if char == ']':
+            break
+        if char not in ('{', '['):
+            raise ValueError(f"Unsupported element in '{key}' array: {char!r}")
+        yield _decode_value(reader)
+
+    # Drain the remainder without keeping it
+    reader.buf = ''
+    while stream.read(chunk_size):
+        pass
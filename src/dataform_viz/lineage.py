@@ -0,0 +1,137 @@
+"""
+Transitive lineage (upstream / downstream closure) queries
+
+Closures are computed with an iterative breadth-first search over the
+DependencyGraph CSR adjacency and memoized per (node, direction, depth) in
+a bounded LRU cache.
+"""
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .graph import DependencyGraph
+
+UPSTREAM = 'upstream'
+DOWNSTREAM = 'downstream'
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+class LineageIndex:
+    """Answers upstream/downstream queries on one DependencyGraph"""
+
+    def __init__(self, graph: DependencyGraph, cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Initialize index
+
+        Args:
+            graph: Graph to query
+            cache_size: Maximum number of memoized closures
+        """
+        self.graph = graph
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self.stats: Dict[str, int] = {'hits': 0, 'misses': 0}
+
+    def _node_id(self, name: str) -> int:
+        node_id = self.graph.node_id(name)
+        if node_id is None:
+            raise ValueError(f"Table not found: {name}")
+        return node_id
+
+    def closure_ids(self, node_id: int, direction: str,
+                    depth: Optional[int] = None) -> Tuple[Tuple[int, int], ...]:
+        """
+        Return (node_id, distance) for every node reachable from node_id
+
+        Args:
+            node_id: Start node (not included in the result)
+            direction: UPSTREAM follows dependencies, DOWNSTREAM follows dependents
+            depth: Maximum distance (None: unlimited)
+
+        Returns:
+            Pairs ordered by distance, then by discovery order
+        """
+        key = (node_id, direction, depth)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stats['hits'] += 1
+            return cached
+        self.stats['misses'] += 1
+
+        if direction == UPSTREAM:
+            offsets, targets = self.graph.dependency_csr()
+        elif direction == DOWNSTREAM:
+            offsets, targets = self.graph.dependent_csr()
+        else:
+            raise ValueError(f"Unknown direction: {direction}")
+
+        seen = {node_id}
+        result = []
+        frontier = [node_id]
+        distance = 0
+        while frontier and (depth is None or distance < depth):
+            distance += 1
+            next_frontier = []
+            for current in frontier:
+                for i in range(offsets[current], offsets[current + 1]):
+                    neighbor = targets[i]
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        next_frontier.append(neighbor)
+                        result.append((neighbor, distance))
+            frontier = next_frontier
+
+        closure = tuple(result)
+        self._cache[key] = closure
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return closure
+
+    def upstream(self, name: str, depth: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Everything the table reads from, directly or transitively
+
+        Args:
+            name: Full table name
+            depth: Maximum number of hops (None: unlimited)
+
+        Returns:
+            (table_name, distance) pairs ordered by distance
+        """
+        closure = self.closure_ids(self._node_id(name), UPSTREAM, depth)
+        return [(self.graph.name(n), d) for n, d in closure]
+
+    def downstream(self, name: str, depth: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Everything that reads from the table, directly or transitively
+
+        Args:
+            name: Full table name
+            depth: Maximum number of hops (None: unlimited)
+
+        Returns:
+            (table_name, distance) pairs ordered by distance
+        """
+        closure = self.closure_ids(self._node_id(name), DOWNSTREAM, depth)
+        return [(self.graph.name(n), d) for n, d in closure]
+
+    def induced_edges(self, names) -> List[Tuple[str, str]]:
+        """
+        Dependency edges between the given tables
+
+        Args:
+            names: Table names forming the subgraph
+
+        Returns:
+            (dependency, reader) pairs
+        """
+        graph = self.graph
+        node_ids = (graph.node_id(name) for name in names)
+        ids = {node_id for node_id in node_ids if node_id is not None}
+        edges = []
+        for node_id in sorted(ids):
+            for dep in graph.dependency_ids(node_id):
+                if dep in ids:
+                    edges.append((graph.name(dep), graph.name(node_id)))
+        return edges
@@ -3,8 +3,11 @@
 Generate a master index.html to view all dependency SVGs from all schemas
 """
 from pathlib import Path
+import json
 import re
 
+from .search import SEARCH_JS, TrigramIndex
+
 def collect_all_svgs():
     """Collect all SVG files from dependencies_* folders"""
     schemas = {}
@@ -38,8 +41,19 @@ def collect_all_svgs():
     
     return schemas
 
-def generate_master_index(schemas):
-    """Generate master index.html"""
+def _script_json(value):
+    """JSON that is safe inside a <script> element"""
+    return json.dumps(value, separators=(',', ':')).replace('</', '<\\/')
+
+def generate_master_index(schemas, critical=None):
+    """Generate master index.html
+    
+    critical optionally maps the tables of the critical path, in run order,
+    to a duration text; they are listed above the schemas and highlighted.
+    """
+    critical = critical or {}
+    # Sidebar names come from file names, so match on the underscored ids
+    critical_ids = {name.replace('.', '_').replace('-', '_') for name in critical}
     
     html_lines = [
         '<!DOCTYPE html>',
@@ -152,6 +166,36 @@ def generate_master_index(schemas):
         '            float: right;',
         '            font-size: 12px;',
         '        }',
+        '        .table-item.critical {',
+        '            border-left: 3px solid #e65100;',
+        '        }',
+        '        .critical-duration {',
+        '            float: right;',
+        '            color: #e65100;',
+        '            font-size: 11px;',
+        '        }',
+        '        .critical-title {',
+        '            color: #e65100;',
+        '            background: #fff3e0;',
+        '        }',
+        '        .search-box {',
+        '            width: 100%;',
+        '            padding: 8px;',
+        '            margin-bottom: 10px;',
+        '            border: 1px solid #ddd;',
+        '            border-radius: 4px;',
+        '            font-size: 13px;',
+        '        }',
+        '        .search-results {',
+        '            list-style: none;',
+        '            padding: 0;',
+        '            margin: 0 0 20px 0;',
+        '        }',
+        '        .search-result-schema {',
+        '            color: #999;',
+        '            font-size: 11px;',
+        '            margin-left: 6px;',
+        '        }',
         '    </style>',
         '</head>',
         '<body>',
@@ -167,6 +211,31 @@ def generate_master_index(schemas):
     html_lines.append(f'            <strong>{total_schemas}</strong> schemas<br>')
     html_lines.append(f'            <strong>{total_tables}</strong> tables')
     html_lines.append('        </div>')
+    html_lines.append('        <input type="search" class="search-box" id="search-box" '
+                      'placeholder="Search tables..." autocomplete="off">')
+    html_lines.append('        <ul class="search-results" id="search-results"></ul>')
+    
+    # Search entries follow the sidebar order: [file, name, schema, safe_id]
+    search_entries = []
+    
+    if critical:
+        locations = {svg['name'].replace('.', '_').replace('-', '_'): (svg['file'], svg['name'], schema_name)
+                     for schema_name, schema_data in schemas.items() for svg in schema_data['svgs']}
+        html_lines.append('        <div class="schema-section">')
+        html_lines.append(f'            <div class="schema-title critical-title">Critical path ({len(critical)} tables)</div>')
+        html_lines.append('            <ul class="table-list">')
+        for name, duration in critical.items():
+            safe_id = name.replace('.', '_').replace('-', '_')
+            if safe_id in locations:
+                file, item_name, schema_name = locations[safe_id]
+                html_lines.append(f'                <li class="table-item critical" '
+                                  f'onclick="showDiagram(\'{file}\', \'{item_name}\', \'{schema_name}\', \'{safe_id}\')">')
+            else:
+                html_lines.append('                <li class="table-item critical">')
+            html_lines.append(f'                    {name} <span class="critical-duration">{duration}</span>')
+            html_lines.append('                </li>')
+        html_lines.append('            </ul>')
+        html_lines.append('        </div>')
     
     # Generate schema sections
     for schema_name, schema_data in sorted(schemas.items()):
@@ -179,7 +248,9 @@ def generate_master_index(schemas):
         
         for svg in schema_data['svgs']:
             safe_id = svg['name'].replace('.', '_').replace('-', '_')
-            html_lines.append(f'                <li class="table-item" id="item-{safe_id}" ')
+            search_entries.append([svg['file'], svg['name'], schema_name, safe_id])
+            item_class = 'table-item critical' if safe_id in critical_ids else 'table-item'
+            html_lines.append(f'                <li class="{item_class}" id="item-{safe_id}" ')
             html_lines.append(f'                    onclick="showDiagram(\'{svg["file"]}\', \'{svg["name"]}\', \'{schema_name}\', \'{safe_id}\')">')
             html_lines.append(f'                    {svg["display_name"]}')
             html_lines.append(f'                </li>')
@@ -187,6 +258,7 @@ def generate_master_index(schemas):
         html_lines.append('            </ul>')
         html_lines.append('        </div>')
     
+    search_index = TrigramIndex(entry[1] for entry in search_entries)
     html_lines.extend([
         '    </div>',
         '    <div class="content">',
@@ -196,6 +268,9 @@ def generate_master_index(schemas):
         '        </div>',
         '    </div>',
         '    <script>',
+        f'        const SEARCH_INDEX = {_script_json(search_index.to_compact())};',
+        f'        const SEARCH_ENTRIES = {_script_json(search_entries)};',
+        SEARCH_JS,
         '        let currentItem = null;',
         '        ',
         '        function showDiagram(file, name, schema, itemId) {',
@@ -231,9 +306,33 @@ def generate_master_index(schemas):
         '            }',
         '        }',
         '        ',
+        '        function openEntry(id) {',
+        '            const entry = SEARCH_ENTRIES[id];',
+        '            const list = document.getElementById("list-" + entry[2]);',
+        '            if (list.classList.contains("collapsed")) toggleSchema(entry[2]);',
+        '            showDiagram(entry[0], entry[1], entry[2], entry[3]);',
+        '            document.getElementById("item-" + entry[3]).scrollIntoView({block: "nearest"});',
+        '        }',
+        '        ',
+        '        document.getElementById("search-box").addEventListener("input", function() {',
+        '            const results = document.getElementById("search-results");',
+        '            results.innerHTML = "";',
+        '            for (const id of SearchIndex.search(this.value, 20)) {',
+        '                const item = document.createElement("li");',
+        '                item.className = "table-item";',
+        '                item.textContent = SEARCH_ENTRIES[id][1];',
+        '                const schema = document.createElement("span");',
+        '                schema.className = "search-result-schema";',
+        '                schema.textContent = SEARCH_ENTRIES[id][2];',
+        '                item.appendChild(schema);',
+        '                item.addEventListener("click", function() { openEntry(id); });',
+        '                results.appendChild(item);',
+        '            }',
+        '        });',
+        '        ',
         '        // Auto-expand first schema and select first table',
         '        window.addEventListener("load", function() {',
-        '            const firstTable = document.querySelector(".table-item");',
+        '            const firstTable = document.querySelector(".table-item[id]");',
         '            if (firstTable) {',
         '                firstTable.click();',
         '            }',
@@ -1,87 +1,189 @@
 """
 Parser for Dataform dependencies report
 """
+import codecs
 import re
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+# Size of the buffered chunks read from the report file
+CHUNK_SIZE = 1 << 20
 
-def parse_dependencies_report(report_path: str) -> Dict[str, dict]:
+# Encodings tried, in order, when the report has no byte order mark.
+# latin-1 maps every byte so it always succeeds as the last resort.
+FALLBACK_ENCODINGS = ('utf-8', 'cp1252', 'latin-1')
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+_TABLE_RE = re.compile(r'^Table: (.+?) \((\w+)\)$')
+_JOIN_RE = re.compile(r'(\w+\s+JOIN)\s+ON\s+(.+)')
+
+
+def sniff_encoding(report_path: str) -> Optional[str]:
     """
-    Parse the dependencies_report.txt file
-    
+    Detect the report encoding from its byte order mark
+
     Args:
         report_path: Path to dependencies report file
-        
+
     Returns:
-        Dictionary mapping table names to their info (type, dependencies, dependents, join_info)
+        Encoding name if the file starts with a BOM, otherwise None
     """
-    tables = {}
-    current_table = None
-    current_dep = None
-    
-    # Try different encodings
-    encodings = ['utf-8', 'utf-16', 'cp1252', 'latin-1']
-    content = None
-    
-    report_file = Path(report_path)
-    if not report_file.exists():
-        raise FileNotFoundError(f"Report file not found: {report_path}")
-    
-    for encoding in encodings:
-        try:
-            with open(report_file, 'r', encoding=encoding) as f:
-                content = f.read()
-            break
-        except (UnicodeDecodeError, UnicodeError):
-            continue
-    
-    if content is None:
-        raise ValueError("Could not decode file with any supported encoding")
-    
-    for line in content.split('\n'):
+    with open(report_path, 'rb') as f:
+        head = f.read(4)
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+
+def parse_report_lines(lines: Iterable[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Parse report lines into table records
+
+    Args:
+        lines: Lines of a dependencies report (trailing newlines allowed)
+
+    Yields:
+        (table_name, info) tuples in report order, where info holds
+        type, dependencies, dependents and join_info
+    """
+    table_match_fn = _TABLE_RE.match
+    join_match_fn = _JOIN_RE.match
+    current_table = ''
+    current_info: Optional[Dict[str, Any]] = None
+    current_dep: Optional[str] = None
+
+    for line in lines:
         line = line.rstrip()
-        
+
         # Match table definition line
-        table_match = re.match(r'^Table: (.+?) \((\w+)\)$', line)
-        if table_match:
-            table_name = table_match.group(1)
-            table_type = table_match.group(2)
-            current_table = table_name
-            current_dep = None
-            tables[current_table] = {
-                'type': table_type,
-                'dependencies': [],
-                'dependents': [],
-                'join_info': {}
-            }
+        if line.startswith('Table: '):
+            table_match = table_match_fn(line)
+            if table_match:
+                if current_info is not None:
+                    yield current_table, current_info
+                current_table = table_match.group(1)
+                current_dep = None
+                current_info = {
+                    'type': table_match.group(2),
+                    'dependencies': [],
+                    'dependents': [],
+                    'join_info': {}
+                }
+                continue
+
+        if current_info is None:
             continue
-        
+
         # Match dependency line
-        if current_table and '<-' in line:
+        if '<-' in line:
             dep = line.strip().replace('<- ', '').strip()
             if dep:
-                tables[current_table]['dependencies'].append(dep)
+                current_info['dependencies'].append(dep)
                 current_dep = dep
-        
+
         # Match join info line (indented further, contains JOIN and ON)
-        elif current_table and current_dep and 'JOIN' in line and 'ON' in line:
-            join_line = line.strip()
-            # Parse join info: "LEFT JOIN ON condition"
-            join_match = re.match(r'(\w+\s+JOIN)\s+ON\s+(.+)', join_line)
+        elif current_dep and 'JOIN' in line and 'ON' in line:
+            join_match = join_match_fn(line.strip())
             if join_match:
-                join_type = join_match.group(1)
-                join_condition = join_match.group(2)
-                tables[current_table]['join_info'][current_dep] = {
-                    'type': join_type,
-                    'condition': join_condition
+                current_info['join_info'][current_dep] = {
+                    'type': join_match.group(1),
+                    'condition': join_match.group(2)
                 }
-        
+
         # Match dependent line
-        elif current_table and '->' in line:
+        elif '->' in line:
             dep = line.strip().replace('-> ', '').strip()
             if dep:
-                tables[current_table]['dependents'].append(dep)
+                current_info['dependents'].append(dep)
                 current_dep = None
-    
+
+    if current_info is not None:
+        yield current_table, current_info
+
+
+def iter_dependencies_report(
+    report_path: str,
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream table records from the dependencies report
+
+    The encoding is sniffed once from the byte order mark. Files without a
+    BOM are decoded in one pass with the first fallback encoding (UTF-8);
+    an invalid byte restarts the read with the next one. All fallbacks
+    agree on ASCII, so records read while every line so far was ASCII are
+    yielded at once and skipped after a restart; records after the first
+    non-ASCII line are held until the encoding is settled at the end of
+    the file, so no report is decoded with two encodings.
+
+    Args:
+        report_path: Path to dependencies report file
+        chunk_size: Size of the buffered reads in bytes
+
+    Yields:
+        (table_name, info) tuples in report order
+    """
+    report_file = Path(report_path)
+    if not report_file.exists():
+        raise FileNotFoundError(f"Report file not found: {report_path}")
+
+    encoding = sniff_encoding(str(report_file))
+    if encoding is not None:
+        try:
+            with open(report_file, 'r', encoding=encoding, buffering=chunk_size) as text:
+                yield from parse_report_lines(text)
+        except UnicodeError as e:
+            raise ValueError(f"Could not decode file as {encoding}: {e}") from e
+        return
+
+    non_ascii = False
+
+    def track(lines: Iterable[str]) -> Iterator[str]:
+        nonlocal non_ascii
+        for line in lines:
+            if not non_ascii and not line.isascii():
+                non_ascii = True
+            yield line
+
+    emitted = 0
+    # The last fallback (latin-1) decodes any byte sequence
+    for encoding in FALLBACK_ENCODINGS:
+        non_ascii = False
+        held: List[Tuple[str, Dict[str, Any]]] = []
+        skip = emitted
+        try:
+            with open(report_file, 'r', encoding=encoding, buffering=chunk_size) as text:
+                for record in parse_report_lines(track(text)):
+                    if skip:
+                        skip -= 1
+                    elif non_ascii:
+                        held.append(record)
+                    else:
+                        emitted += 1
+                        yield record
+        except UnicodeError:
+            continue
+        yield from held
+        return
+
+
+def parse_dependencies_report(report_path: str) -> Dict[str, dict]:
+    """
+    Parse the dependencies_report.txt file
+
+    Args:
+        report_path: Path to dependencies report file
+
+    Returns:
+        Dictionary mapping table names to their info (type, dependencies, dependents, join_info)
+    """
+    tables = {}
+    for table_name, info in iter_dependencies_report(report_path):
+        tables[table_name] = info
     return tables
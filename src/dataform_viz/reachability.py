@@ -0,0 +1,233 @@
+"""
+Precomputed reachability ("does A feed B") index
+
+Strongly connected components are condensed and numbered in topological
+order, so every component downstream of component c has a larger number.
+The descendant set of c is built as a Python int bitset where bit k stands
+for component c + 1 + k, then frozen into one bytes blob: a query is two
+array lookups and one byte test, independent of the graph size.
+
+The index can be stored next to the report as ``<report>.reachability``,
+validated like the graph cache.
+"""
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import List, Tuple
+
+from .cache import hash_file, report_stat_key
+from .graph import ID_TYPECODE, DependencyGraph
+from .topology import condensation_edges, strongly_connected_components
+
+REACHABILITY_SUFFIX = '.reachability'
+
+_MAGIC = b'DFVR'
+_INDEX_VERSION = 1
+# magic, version, id itemsize, report size, report mtime_ns, 16-byte digest,
+# node count, component count, bitset blob length
+_HEADER = struct.Struct('<4sHBQq16sQQQ')
+_OFFSET_TYPECODE = 'q'
+
+
+def reachability_path_for(report_path: str) -> Path:
+    """Return the sidecar path that belongs to a report"""
+    report = Path(report_path)
+    return report.with_name(report.name + REACHABILITY_SUFFIX)
+
+
+class ReachabilityIndex:
+    """Constant-time reachability queries over a DependencyGraph"""
+
+    def __init__(self, graph: DependencyGraph, component: array, cyclic: bytearray,
+                 offsets: array, bits: bytes):
+        self.graph = graph
+        self._component = component
+        self._cyclic = cyclic
+        self._offsets = offsets
+        self._bits = bits
+
+    @classmethod
+    def build(cls, graph: DependencyGraph) -> 'ReachabilityIndex':
+        """
+        Condense the graph and compute every component's descendant set
+
+        Args:
+            graph: Graph to index
+
+        Returns:
+            ReachabilityIndex
+        """
+        component, count = strongly_connected_components(graph)
+
+        cyclic = bytearray(count)
+        sizes = array(ID_TYPECODE, [0]) * count
+        for comp in component:
+            sizes[comp] += 1
+        for comp in range(count):
+            if sizes[comp] > 1:
+                cyclic[comp] = 1
+        offsets, targets = graph.dependency_csr()
+        for node_id in range(graph.node_count):
+            for pos in range(offsets[node_id], offsets[node_id + 1]):
+                if targets[pos] == node_id:
+                    cyclic[component[node_id]] = 1
+
+        readers: List[List[int]] = [[] for _ in range(count)]
+        for source, reader in condensation_edges(graph, component):
+            readers[source].append(reader)
+
+        # Bit k of descendants[c] is component c + 1 + k. Readers always have
+        # larger numbers, so walking components backwards sees them first.
+        descendants = [0] * count
+        for comp in range(count - 1, -1, -1):
+            bitset = 0
+            for reader in readers[comp]:
+                bitset |= ((descendants[reader] << 1) | 1) << (reader - comp - 1)
+            descendants[comp] = bitset
+
+        bit_offsets = array(_OFFSET_TYPECODE, [0]) * (count + 1)
+        chunks = []
+        total = 0
+        for comp, bitset in enumerate(descendants):
+            chunk = bitset.to_bytes((bitset.bit_length() + 7) // 8, 'little')
+            chunks.append(chunk)
+            total += len(chunk)
+            bit_offsets[comp + 1] = total
+        return cls(graph, component, cyclic, bit_offsets, b''.join(chunks))
+
+    @property
+    def component_count(self) -> int:
+        """Number of strongly connected components"""
+        return len(self._cyclic)
+
+    def component_of(self, node_id: int) -> int:
+        """Return the component id of a node"""
+        return self._component[node_id]
+
+    def reaches_ids(self, source: int, target: int) -> bool:
+        """
+        True if data flows from node source to node target
+
+        A node reaches itself; nodes of the same cycle reach each other.
+        """
+        source_comp = self._component[source]
+        target_comp = self._component[target]
+        if source_comp == target_comp:
+            return source == target or bool(self._cyclic[source_comp])
+        bit = target_comp - source_comp - 1
+        if bit < 0:
+            return False
+        start = self._offsets[source_comp]
+        byte = start + (bit >> 3)
+        if byte >= self._offsets[source_comp + 1]:
+            return False
+        return bool(self._bits[byte] >> (bit & 7) & 1)
+
+    def reaches(self, source: str, target: str) -> bool:
+        """
+        True if source feeds target, directly or transitively
+
+        Args:
+            source: Upstream table name
+            target: Downstream table name
+
+        Returns:
+            Whether target is downstream of source
+        """
+        source_id = self.graph.node_id(source)
+        if source_id is None:
+            raise ValueError(f"Table not found: {source}")
+        target_id = self.graph.node_id(target)
+        if target_id is None:
+            raise ValueError(f"Table not found: {target}")
+        return self.reaches_ids(source_id, target_id)
+
+    # Serialization -----------------------------------------------------
+
+    def to_bytes(self, stat_key: Tuple[int, int] = (0, 0), digest: bytes = bytes(16)) -> bytes:
+        """
+        Serialize the index
+
+        Args:
+            stat_key: (size, mtime_ns) of the report the graph came from
+            digest: Content hash of that report
+
+        Returns:
+            Bytes accepted by from_bytes
+        """
+        header = _HEADER.pack(_MAGIC, _INDEX_VERSION, self._component.itemsize,
+                              stat_key[0], stat_key[1], digest, len(self._component),
+                              len(self._cyclic), len(self._bits))
+        return b''.join([header, self._component.tobytes(), bytes(self._cyclic),
+                         self._offsets.tobytes(), self._bits])
+
+    @classmethod
+    def from_bytes(cls, graph: DependencyGraph, data: bytes) -> 'ReachabilityIndex':
+        """
+        Load an index serialized by to_bytes
+
+        Raises:
+            ValueError: If the blob has another format or does not fit the graph
+        """
+        (magic, version, itemsize, _, _, _, node_count, count,
+         bits_len) = _HEADER.unpack_from(data, 0)
+        if (magic != _MAGIC or version != _INDEX_VERSION
+                or itemsize != array(ID_TYPECODE).itemsize):
+            raise ValueError("Unsupported reachability index format")
+        if node_count != graph.node_count:
+            raise ValueError("Reachability index does not match the graph")
+
+        pos = _HEADER.size
+        component = array(ID_TYPECODE)
+        component.frombytes(data[pos:pos + node_count * itemsize])
+        pos += node_count * itemsize
+        cyclic = bytearray(data[pos:pos + count])
+        pos += count
+        offsets = array(_OFFSET_TYPECODE)
+        offsets.frombytes(data[pos:pos + (count + 1) * offsets.itemsize])
+        pos += (count + 1) * offsets.itemsize
+        bits = bytes(data[pos:pos + bits_len])
+        if len(offsets) != count + 1 or len(bits) != bits_len:
+            raise ValueError("Truncated reachability index")
+        return cls(graph, component, cyclic, offsets, bits)
+
+    @classmethod
+    def load_or_build(cls, report_path: str, graph: DependencyGraph,
+                      write: bool = True) -> 'ReachabilityIndex':
+        """
+        Load <report>.reachability if it matches the report, otherwise rebuild it
+
+        Args:
+            report_path: Report the graph was loaded from
+            graph: The loaded graph
+            write: Write a rebuilt index next to the report
+
+        Returns:
+            ReachabilityIndex
+        """
+        index_path = reachability_path_for(report_path)
+        try:
+            with open(index_path, 'rb') as f:
+                data = f.read()
+            size, mtime_ns, digest = _HEADER.unpack_from(data, 0)[3:6]
+            current_size, current_mtime = report_stat_key(report_path)
+            if current_size == size and (current_mtime == mtime_ns
+                                         or hash_file(report_path) == digest):
+                return cls.from_bytes(graph, data)
+        except (OSError, ValueError, struct.error):
+            pass
+
+        stat_key = report_stat_key(report_path)
+        index = cls.build(graph)
+        if write:
+            try:
+                digest = hash_file(report_path)
+                if report_stat_key(report_path) == stat_key:
+                    tmp_path = index_path.with_name(index_path.name + f'.{os.getpid()}.tmp')
+                    with open(tmp_path, 'wb') as f:
+                        f.write(index.to_bytes(stat_key, digest))
+                    os.replace(tmp_path, index_path)
+            except OSError:
+                pass
+        return index
@@ -0,0 +1,266 @@
+"""
+Batch SVG rendering, optionally spread over a process pool
+
+Each task renders one table with svg_generator.generate_svg_manual. Tasks
+are sent to workers in batches so the per-task pickling and scheduling
+overhead stays small; the neighbor lookup (all_tables) is shipped once per
+worker through the pool initializer.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .svg_generator import RENDERER_VERSION, generate_svg_manual
+
+# (table_name, table_info, svg_file)
+RenderTask = Tuple[str, dict, Path]
+# (table_name, error message)
+RenderFailure = Tuple[str, str]
+# (dependency, reader) -> svg_generator.EDGE_STYLES key
+EdgeStyles = Mapping[Tuple[str, str], str]
+
+_MAX_BATCH = 64
+
+MANIFEST_NAME = '.render_manifest.json'
+_MANIFEST_VERSION = 1
+
+_worker_tables: Optional[Mapping] = None
+_worker_edge_styles: Optional[EdgeStyles] = None
+
+
+def default_jobs() -> int:
+    """Number of worker processes used when --jobs is not given"""
+    return os.cpu_count() or 1
+
+
+def plain_info(table_info: Mapping) -> dict:
+    """Copy a table record (e.g. a TableView) into plain, picklable containers"""
+    return {
+        'type': table_info['type'],
+        'dependencies': list(table_info['dependencies']),
+        'dependents': list(table_info['dependents']),
+        'join_info': {dep: dict(join) for dep, join in table_info.get('join_info', {}).items()},
+    }
+
+
+def _render_batch(batch: Sequence[RenderTask], all_tables: Optional[Mapping] = None,
+                  edge_styles: Optional[EdgeStyles] = None) -> List[RenderFailure]:
+    if all_tables is None:
+        all_tables, edge_styles = _worker_tables, _worker_edge_styles
+    failures = []
+    for table_name, table_info, svg_file in batch:
+        try:
+            generate_svg_manual(table_name, table_info, all_tables, svg_file, edge_styles=edge_styles)
+        except Exception as e:
+            failures.append((table_name, f"{type(e).__name__}: {e}"))
+    return failures
+
+
+def _init_worker(all_tables: Mapping, edge_styles: Optional[EdgeStyles]) -> None:
+    global _worker_tables, _worker_edge_styles
+    _worker_tables = all_tables
+    _worker_edge_styles = edge_styles
+
+
+def _batches(tasks: Sequence[RenderTask], jobs: int, batch_size: Optional[int]):
+    if batch_size is None:
+        # About four batches per worker keeps the pool balanced
+        batch_size = max(1, min(_MAX_BATCH, -(-len(tasks) // (jobs * 4))))
+    return [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+
+
+def render_svgs(tasks: Sequence[RenderTask], all_tables: Mapping,
+                jobs: Optional[int] = 1,
+                batch_size: Optional[int] = None,
+                edge_styles: Optional[EdgeStyles] = None) -> List[RenderFailure]:
+    """
+    Render a list of table diagrams
+
+    Output does not depend on the number of workers: every task writes its
+    own file and failures are returned in task order.
+
+    Args:
+        tasks: (table_name, table_info, svg_file) tuples
+        all_tables: Mapping used to look up neighbor types
+        jobs: Worker processes (None: CPU count, 1: render in this process)
+        batch_size: Tasks per pool submission (default: derived from the task count)
+        edge_styles: Edges to highlight, e.g. the critical path
+
+    Returns:
+        (table_name, error) for every table that failed to render
+    """
+    jobs = default_jobs() if jobs is None else max(1, jobs)
+    if jobs == 1 or len(tasks) < 2:
+        return _render_batch(tasks, all_tables, edge_styles)
+
+    batches = _batches(list(tasks), jobs, batch_size)
+    failures: List[RenderFailure] = []
+    with ProcessPoolExecutor(max_workers=min(jobs, len(batches)),
+                             initializer=_init_worker, initargs=(all_tables, edge_styles)) as pool:
+        for batch_failures in pool.map(_render_batch, batches):
+            failures.extend(batch_failures)
+    return failures
+
+
+def diagram_fingerprint(table_name: str, table_info: Mapping, all_tables: Mapping,
+                        edge_styles: Optional[EdgeStyles] = None) -> str:
+    """
+    Hash everything that affects a table's diagram
+
+    Covers the table's type, its neighbor lists and their types, its join
+    info, the styles of its highlighted edges and RENDERER_VERSION.
+
+    Returns:
+        Hex digest
+    """
+    def neighbor_type(name):
+        return all_tables.get(name, {}).get('type', 'unknown')
+
+    dependencies = list(table_info['dependencies'])
+    dependents = list(table_info['dependents'])
+    join_info = table_info.get('join_info', {})
+    payload = [
+        RENDERER_VERSION,
+        table_name,
+        table_info['type'],
+        [(dep, neighbor_type(dep)) for dep in dependencies],
+        [(dept, neighbor_type(dept)) for dept in dependents],
+        sorted((dep, join['type'], join['condition']) for dep, join in join_info.items()),
+    ]
+    if edge_styles:
+        styled = [[dep, table_name, edge_styles[dep, table_name]] for dep in dependencies
+                  if (dep, table_name) in edge_styles]
+        styled += [[table_name, dept, edge_styles[table_name, dept]] for dept in dependents
+                   if (table_name, dept) in edge_styles]
+        # Left out when empty, so plain diagrams keep their fingerprint
+        if styled:
+            payload.append(styled)
+    data = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class RenderManifest:
+    """
+    Fingerprints of the diagrams in an output directory
+
+    Stored as <output>/.render_manifest.json, mapping each SVG path
+    (relative to the output directory) to its table and fingerprint.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_NAME
+        self.entries: Dict[str, dict] = {}
+
+    def load(self) -> 'RenderManifest':
+        """Read the manifest; a missing or unreadable one is treated as empty"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == _MANIFEST_VERSION:
+                self.entries = data['entries']
+        except (OSError, ValueError, KeyError):
+            self.entries = {}
+        return self
+
+    def save(self) -> None:
+        """Write the manifest atomically"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': _MANIFEST_VERSION, 'entries': self.entries}, f,
+                      separators=(',', ':'), sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def key(self, svg_file) -> str:
+        """Manifest key of an SVG file"""
+        return Path(svg_file).relative_to(self.output_dir).as_posix()
+
+    def is_current(self, svg_file, fingerprint: str) -> bool:
+        """True if svg_file exists and was rendered with this fingerprint"""
+        entry = self.entries.get(self.key(svg_file))
+        return (entry is not None and entry['fingerprint'] == fingerprint
+                and Path(svg_file).exists())
+
+    def record(self, svg_file, table_name: str, fingerprint: str) -> None:
+        self.entries[self.key(svg_file)] = {'table': table_name, 'fingerprint': fingerprint}
+
+    def forget(self, svg_file) -> None:
+        self.entries.pop(self.key(svg_file), None)
+
+    def remove_stale(self, existing_tables) -> int:
+        """
+        Delete SVGs recorded for tables that no longer exist
+
+        Args:
+            existing_tables: Container of current table names
+
+        Returns:
+            Number of SVG files removed
+        """
+        removed = 0
+        for key in [k for k, entry in self.entries.items() if entry['table'] not in existing_tables]:
+            svg_file = self.output_dir / key
+            try:
+                svg_file.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            del self.entries[key]
+            # Drop the schema folder once its last diagram is gone
+            try:
+                svg_file.parent.rmdir()
+            except OSError:
+                pass
+        return removed
+
+
+def render_incremental(tasks: Sequence[RenderTask], all_tables: Mapping, output_dir: str,
+                       jobs: Optional[int] = 1, force: bool = False,
+                       remove_stale: bool = True,
+                       edge_styles: Optional[EdgeStyles] = None) -> Tuple[Dict[str, int], List[RenderFailure]]:
+    """
+    Render only the diagrams whose fingerprint changed
+
+    Args:
+        tasks: (table_name, table_info, svg_file) tuples under output_dir
+        all_tables: Mapping used to look up neighbor types; also the set of
+            tables that still exist when removing stale diagrams
+        output_dir: Directory holding the manifest
+        jobs: Worker processes (None: CPU count, 1: render in this process)
+        force: Render every task regardless of the manifest
+        remove_stale: Delete SVGs of tables missing from all_tables
+        edge_styles: Edges to highlight, e.g. the critical path
+
+    Returns:
+        ({'rendered': n, 'skipped': n, 'removed': n}, failures)
+    """
+    manifest = RenderManifest(output_dir).load()
+    pending = []
+    fingerprints = []
+    for task in tasks:
+        table_name, table_info, svg_file = task
+        fingerprint = diagram_fingerprint(table_name, table_info, all_tables, edge_styles)
+        if force or not manifest.is_current(svg_file, fingerprint):
+            pending.append(task)
+            fingerprints.append(fingerprint)
+
+    failures = render_svgs(pending, all_tables, jobs=jobs, edge_styles=edge_styles)
+    failed = {name for name, _ in failures}
+    for (table_name, _, svg_file), fingerprint in zip(pending, fingerprints):
+        if table_name in failed:
+            manifest.forget(svg_file)
+        else:
+            manifest.record(svg_file, table_name, fingerprint)
+
+    removed = manifest.remove_stale(all_tables) if remove_stale else 0
+    manifest.save()
+    counts = {
+        'rendered': len(pending) - len(failures),
+        'skipped': len(tasks) - len(pending),
+        'removed': removed,
+    }
+    return counts, failures
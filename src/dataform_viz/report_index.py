@@ -0,0 +1,344 @@
+"""
+Random-access offset index over a dependencies report
+
+The index maps every ``Table:`` header to the byte offset and length of its
+block and is stored next to the report as ``<report>.tableindex``. Lookups
+map the report with mmap and decode only the blocks they need.
+"""
+import codecs
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .cache import hash_file, report_stat_key
+from .parser import FALLBACK_ENCODINGS, _TABLE_RE, parse_report_lines
+
+INDEX_SUFFIX = '.tableindex'
+
+_MAGIC = b'DFVI'
+_INDEX_VERSION = 1
+# magic, version, report size, report mtime_ns, 16-byte content digest, payload length
+_HEADER = struct.Struct('<4sHQq16sQ')
+
+# Byte order marks and the BOM-less codec used to decode individual blocks
+_BLOCK_CODECS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+
+def index_path_for(report_path: str) -> Path:
+    """Return the sidecar index path that belongs to a report"""
+    report = Path(report_path)
+    return report.with_name(report.name + INDEX_SUFFIX)
+
+
+def _detect_block_codec(data) -> Tuple[str, int]:
+    """Return (codec, bom_length) for decoding blocks of a mapped report"""
+    for bom, codec in _BLOCK_CODECS:
+        if data[:len(bom)] == bom:
+            return codec, len(bom)
+    for encoding in FALLBACK_ENCODINGS:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            for pos in range(0, len(data), 1 << 20):
+                decoder.decode(data[pos:pos + (1 << 20)])
+            decoder.decode(b'', final=True)
+            return encoding, 0
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("Could not decode file with any supported encoding")
+
+
+class TypeView(Mapping):
+    """Read-only name -> {'type': ...} mapping used for neighbor colors"""
+
+    __slots__ = ('_types',)
+
+    def __init__(self, types: Dict[str, str]):
+        self._types = types
+
+    def __getitem__(self, name):
+        return {'type': self._types[name]}
+
+    def __iter__(self):
+        return iter(self._types)
+
+    def __len__(self):
+        return len(self._types)
+
+    def __contains__(self, name):
+        return name in self._types
+
+
+class ReportIndex:
+    """Offsets of every table block in a dependencies report"""
+
+    def __init__(self, report_path: str, encoding: str, names: List[str],
+                 types: List[str], offsets: array, lengths: array):
+        self.report_path = Path(report_path)
+        self.encoding = encoding
+        self._names = names
+        self._types = types
+        self._offsets = offsets
+        self._lengths = lengths
+        self._positions = {name: i for i, name in enumerate(names)}
+
+    @classmethod
+    def build(cls, report_path: str) -> 'ReportIndex':
+        """
+        Scan the report once and record each table block
+
+        Args:
+            report_path: Path to dependencies report file
+
+        Returns:
+            ReportIndex
+        """
+        report_file = Path(report_path)
+        if not report_file.exists():
+            raise FileNotFoundError(f"Report file not found: {report_path}")
+
+        names: List[str] = []
+        types: List[str] = []
+        offsets = array('q')
+        lengths = array('q')
+        encoding = 'utf-8'
+
+        with open(report_file, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+            try:
+                encoding, start = _detect_block_codec(data)
+                unit = 2 if encoding.startswith('utf-16') else 1
+                newline = '\n'.encode(encoding)
+                header = 'Table: '.encode(encoding)
+                marker = newline + header
+
+                # Candidate header positions: file start and every newline + "Table: "
+                candidates = []
+                if data[start:start + len(header)] == header:
+                    candidates.append(start)
+                pos = data.find(marker, start)
+                while pos != -1:
+                    if (pos - start) % unit == 0:
+                        candidates.append(pos + len(newline))
+                    pos = data.find(marker, pos + unit)
+
+                latest: Dict[str, int] = {}
+                block_starts = []
+                for pos in candidates:
+                    end = data.find(newline, pos)
+                    while end != -1 and (end - start) % unit:
+                        end = data.find(newline, end + 1)
+                    if end == -1:
+                        end = len(data)
+                    line = bytes(data[pos:end]).decode(encoding).rstrip()
+                    match = _TABLE_RE.match(line)
+                    if match:
+                        block_starts.append((pos, match.group(1), match.group(2)))
+
+                for i, (pos, name, table_type) in enumerate(block_starts):
+                    end = block_starts[i + 1][0] if i + 1 < len(block_starts) else len(data)
+                    if name in latest:
+                        # A repeated header replaces the earlier block but keeps its position
+                        slot = latest[name]
+                        types[slot] = table_type
+                        offsets[slot] = pos
+                        lengths[slot] = end - pos
+                        continue
+                    latest[name] = len(names)
+                    names.append(name)
+                    types.append(table_type)
+                    offsets.append(pos)
+                    lengths.append(end - pos)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+
+        return cls(str(report_file), encoding, names, types, offsets, lengths)
+
+    @classmethod
+    def load_or_build(cls, report_path: str, write: bool = True) -> 'ReportIndex':
+        """
+        Load the sidecar index if it matches the report, otherwise rebuild it
+
+        Args:
+            report_path: Path to dependencies report file
+            write: Write a rebuilt index to <report>.tableindex
+
+        Returns:
+            ReportIndex
+        """
+        index_path = index_path_for(report_path)
+        try:
+            index = cls._load(report_path, index_path)
+            if index is not None:
+                return index
+        except (OSError, ValueError, KeyError, struct.error):
+            pass
+
+        stat_key = report_stat_key(report_path)
+        index = cls.build(report_path)
+        if write:
+            try:
+                index._save(index_path, stat_key)
+            except OSError:
+                pass
+        return index
+
+    @classmethod
+    def _load(cls, report_path: str, index_path: Path) -> Optional['ReportIndex']:
+        with open(index_path, 'rb') as f:
+            data = f.read()
+        magic, version, size, mtime_ns, digest, payload_len = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _INDEX_VERSION:
+            return None
+        current_size, current_mtime = report_stat_key(report_path)
+        if current_size != size:
+            return None
+        if current_mtime != mtime_ns and hash_file(report_path) != digest:
+            return None
+
+        pos = _HEADER.size
+        payload = json.loads(data[pos:pos + payload_len])
+        pos += payload_len
+        count = len(payload['names'])
+        offsets = array('q')
+        offsets.frombytes(data[pos:pos + count * offsets.itemsize])
+        pos += count * offsets.itemsize
+        lengths = array('q')
+        lengths.frombytes(data[pos:pos + count * lengths.itemsize])
+        if len(lengths) != count:
+            return None
+        return cls(report_path, payload['encoding'], payload['names'],
+                   payload['types'], offsets, lengths)
+
+    def _save(self, index_path: Path, stat_key: Tuple[int, int]) -> None:
+        digest = hash_file(str(self.report_path))
+        if report_stat_key(str(self.report_path)) != stat_key:
+            return
+        payload = json.dumps({
+            'encoding': self.encoding,
+            'names': self._names,
+            'types': self._types,
+        }, separators=(',', ':')).encode('utf-8')
+        tmp_path = index_path.with_name(index_path.name + f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _INDEX_VERSION, stat_key[0], stat_key[1],
+                                 digest, len(payload)))
+            f.write(payload)
+            f.write(self._offsets.tobytes())
+            f.write(self._lengths.tobytes())
+        os.replace(tmp_path, index_path)
+
+    # Lookups -------------------------------------------------------------
+
+    def __contains__(self, name) -> bool:
+        return name in self._positions
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def names(self) -> List[str]:
+        """Table names in report order"""
+        return list(self._names)
+
+    def block_span(self, name: str) -> Optional[Tuple[int, int]]:
+        """Return (offset, length) of a table block in bytes"""
+        slot = self._positions.get(name)
+        if slot is None:
+            return None
+        return self._offsets[slot], self._lengths[slot]
+
+    def table_type(self, name: str) -> Optional[str]:
+        """Return a table type straight from the index, without reading its block"""
+        slot = self._positions.get(name)
+        return None if slot is None else self._types[slot]
+
+    def type_view(self) -> TypeView:
+        """Mapping of every indexed table to {'type': ...}"""
+        return TypeView(dict(zip(self._names, self._types)))
+
+    def _read_blocks(self, slots: List[int]) -> Iterator[Tuple[str, dict]]:
+        if not slots:
+            return
+        with open(self.report_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for slot in slots:
+                    offset = self._offsets[slot]
+                    block = data[offset:offset + self._lengths[slot]].decode(self.encoding)
+                    for record in parse_report_lines(io.StringIO(block, newline=None)):
+                        yield record
+                        break
+
+    def get(self, name: str) -> Optional[dict]:
+        """
+        Decode one table block
+
+        Args:
+            name: Full table name
+
+        Returns:
+            Info dict as produced by parse_dependencies_report, or None
+        """
+        slot = self._positions.get(name)
+        if slot is None:
+            return None
+        for _, info in self._read_blocks([slot]):
+            return info
+        return None
+
+    def iter_tables(self, names) -> Iterator[Tuple[str, dict]]:
+        """
+        Decode the blocks of the given tables in one pass over the mapped report
+
+        Args:
+            names: Table names; unknown names are skipped
+
+        Yields:
+            (table_name, info) tuples in report order
+        """
+        slots = [self._positions[name] for name in names if name in self._positions]
+        slots.sort(key=self._offsets.__getitem__)
+        yield from self._read_blocks(slots)
+
+    def block_digests(self) -> Dict[str, bytes]:
+        """
+        Hash the raw bytes of every table block
+
+        Returns:
+            Dict of table name -> 16-byte BLAKE2b digest
+        """
+        digests: Dict[str, bytes] = {}
+        if not self._names:
+            return digests
+        with open(self.report_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for name, offset, length in zip(self._names, self._offsets, self._lengths):
+                    digests[name] = hashlib.blake2b(data[offset:offset + length],
+                                                    digest_size=16).digest()
+        return digests
+
+    def iter_schema(self, schema: str) -> Iterator[Tuple[str, dict]]:
+        """
+        Decode the blocks of every table in a schema, in report order
+
+        Args:
+            schema: Schema name
+
+        Yields:
+            (table_name, info) tuples
+        """
+        prefix = schema + '.'
+        slots = [i for i, name in enumerate(self._names) if name.startswith(prefix)]
+        slots.sort(key=self._offsets.__getitem__)
+        yield from self._read_blocks(slots)
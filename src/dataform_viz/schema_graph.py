@@ -0,0 +1,232 @@
+"""
+Schema-level condensation of a dependency graph
+
+Every table collapses into its schema (the name part before the first '.');
+an edge between two schemas carries the number of table-level dependency
+edges between them. The aggregate remembers the schema edges each table
+contributed, so replacing or removing one table adjusts the weights without
+recomputing the rest.
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .graph import DependencyGraph, GraphBuilder
+from .svg_generator import generate_layered_svg, generate_svg_manual
+from .topology import topological_levels
+
+SCHEMA_TYPE = 'schema'
+
+
+def schema_of(name: str) -> Optional[str]:
+    """Return the schema of a table name, or None for names without one"""
+    schema, dot, _ = name.partition('.')
+    return schema if dot else None
+
+
+class SchemaGraph:
+    """Weighted schema -> schema graph with per-table incremental updates"""
+
+    def __init__(self):
+        # source schema -> {reader schema: number of table-level edges}, and the reverse
+        self._readers: Dict[str, Dict[str, int]] = {}
+        self._sources: Dict[str, Dict[str, int]] = {}
+        # Recorded tables per schema
+        self.table_counts: Dict[str, int] = {}
+        # Table -> {source schema: edge count} it added to the weights
+        self._contributions: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_graph(cls, graph: DependencyGraph) -> 'SchemaGraph':
+        """
+        Aggregate a graph in one pass over its dependency edges
+
+        Args:
+            graph: Parsed dependency graph
+
+        Returns:
+            SchemaGraph
+        """
+        schema_graph = cls()
+        node_schemas = [schema_of(graph.name(node_id)) for node_id in range(graph.node_count)]
+        offsets, targets = graph.dependency_csr()
+        for node_id in graph.record_ids():
+            counts: Dict[str, int] = {}
+            for pos in range(offsets[node_id], offsets[node_id + 1]):
+                source = node_schemas[targets[pos]]
+                if source is not None:
+                    counts[source] = counts.get(source, 0) + 1
+            schema_graph._add(graph.name(node_id), node_schemas[node_id], counts)
+        return schema_graph
+
+    def _add(self, name: str, schema: Optional[str], counts: Dict[str, int]) -> None:
+        if schema is None:
+            return
+        self.table_counts[schema] = self.table_counts.get(schema, 0) + 1
+        sources = self._sources.setdefault(schema, {})
+        for source, count in counts.items():
+            readers = self._readers.setdefault(source, {})
+            readers[schema] = readers.get(schema, 0) + count
+            sources[source] = sources.get(source, 0) + count
+        self._contributions[name] = counts
+
+    def remove_table(self, name: str) -> bool:
+        """
+        Subtract a table and its dependency edges
+
+        Returns:
+            False if the table was not part of the aggregate
+        """
+        counts = self._contributions.pop(name, None)
+        schema = schema_of(name)
+        # Tables without a schema are never added
+        if counts is None or schema is None:
+            return False
+        self.table_counts[schema] -= 1
+        if not self.table_counts[schema]:
+            del self.table_counts[schema]
+        sources = self._sources[schema]
+        for source, count in counts.items():
+            readers = self._readers[source]
+            readers[schema] -= count
+            sources[source] -= count
+            if not readers[schema]:
+                del readers[schema]
+                del sources[source]
+        return True
+
+    def update_table(self, name: str, dependencies: Iterable[str]) -> None:
+        """
+        Add a table or replace its dependencies
+
+        Only the schema edges of this table are touched.
+
+        Args:
+            name: Full table name (schema.table)
+            dependencies: Names the table reads from
+        """
+        self.remove_table(name)
+        counts: Dict[str, int] = {}
+        for dep in dependencies:
+            source = schema_of(dep)
+            if source is not None:
+                counts[source] = counts.get(source, 0) + 1
+        self._add(name, schema_of(name), counts)
+
+    def schemas(self) -> List[str]:
+        """Every schema that holds a table or takes part in an edge, sorted"""
+        names = set(self.table_counts)
+        for source, readers in self._readers.items():
+            if readers:
+                names.add(source)
+                names.update(readers)
+        return sorted(names)
+
+    def edges(self, include_internal: bool = False) -> List[Tuple[str, str, int]]:
+        """
+        Schema edges with their weights
+
+        Args:
+            include_internal: Also return edges within one schema
+
+        Returns:
+            Sorted (source schema, reader schema, weight) tuples
+        """
+        return sorted((source, reader, weight)
+                      for source, readers in self._readers.items()
+                      for reader, weight in readers.items()
+                      if include_internal or source != reader)
+
+    def weight(self, source: str, reader: str) -> int:
+        """Number of table-level edges from one schema into another (or within one)"""
+        return self._readers.get(source, {}).get(reader, 0)
+
+    @staticmethod
+    def _heaviest_first(neighbors: Dict[str, int], schema: str) -> List[Tuple[str, int]]:
+        pairs = [(name, weight) for name, weight in neighbors.items() if name != schema]
+        return sorted(pairs, key=lambda pair: (-pair[1], pair[0]))
+
+    def upstream(self, schema: str) -> List[Tuple[str, int]]:
+        """Schemas a schema reads from, heaviest first"""
+        return self._heaviest_first(self._sources.get(schema, {}), schema)
+
+    def downstream(self, schema: str) -> List[Tuple[str, int]]:
+        """Schemas that read from a schema, heaviest first"""
+        return self._heaviest_first(self._readers.get(schema, {}), schema)
+
+    def node_labels(self) -> Dict[str, dict]:
+        """Neighbor lookup for the SVG generators: the type badge shows the table count"""
+        return {schema: {'type': f"{self.table_counts.get(schema, 0)} tables"}
+                for schema in self.schemas()}
+
+    def levels(self) -> Dict[str, int]:
+        """
+        Topological level of every schema
+
+        Schemas that depend on each other share a level.
+        """
+        builder = GraphBuilder()
+        upstream: Dict[str, List[str]] = {schema: [] for schema in self.schemas()}
+        for source, reader, _ in self.edges():
+            upstream[reader].append(source)
+        for schema, sources in upstream.items():
+            builder.add_table(schema, SCHEMA_TYPE, sources)
+        graph = builder.build()
+        levels = topological_levels(graph)
+        # Every schema was added as a table, so the records are exactly the schemas
+        return {graph.name(node_id): levels[node_id] for node_id in graph.record_ids()}
+
+
+def render_schema_overview(schema_graph: SchemaGraph, svg_file) -> Path:
+    """
+    Draw every schema in columns by topological level, edges labelled with their weight
+
+    Args:
+        schema_graph: Aggregated graph
+        svg_file: Output path
+
+    Returns:
+        Path to the SVG file
+    """
+    layers: Dict[int, List[str]] = {}
+    for schema, level in sorted(schema_graph.levels().items()):
+        layers.setdefault(level, []).append(schema)
+    edges = schema_graph.edges()
+    svg_path = Path(svg_file)
+    svg_path.parent.mkdir(parents=True, exist_ok=True)
+    generate_layered_svg(
+        None, layers or {0: []}, [(source, reader) for source, reader, _ in edges],
+        schema_graph.node_labels(), svg_path,
+        edge_labels={(source, reader): str(weight) for source, reader, weight in edges}
+    )
+    return svg_path
+
+
+def render_schema_neighbors(schema_graph: SchemaGraph, schema: str, svg_file,
+                            labels: Optional[Mapping] = None) -> Path:
+    """
+    Draw one schema between the schemas it reads from and the ones reading from it
+
+    Args:
+        schema_graph: Aggregated graph
+        schema: Schema in the center
+        svg_file: Output path
+        labels: Precomputed node_labels() (saves work when rendering many schemas)
+
+    Returns:
+        Path to the SVG file
+    """
+    upstream = schema_graph.upstream(schema)
+    downstream = schema_graph.downstream(schema)
+    labels = schema_graph.node_labels() if labels is None else labels
+    info = {
+        'type': labels.get(schema, {}).get('type', '0 tables'),
+        'dependencies': [source for source, _ in upstream],
+        'dependents': [reader for reader, _ in downstream],
+        'join_info': {},
+    }
+    edge_labels = {(source, schema): str(weight) for source, weight in upstream}
+    edge_labels.update({(schema, reader): str(weight) for reader, weight in downstream})
+    svg_path = Path(svg_file)
+    svg_path.parent.mkdir(parents=True, exist_ok=True)
+    generate_svg_manual(schema, info, labels, svg_path, edge_labels=edge_labels)
+    return svg_path
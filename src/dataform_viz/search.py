@@ -0,0 +1,255 @@
+"""
+Trigram index for fuzzy table-name search
+
+Names are lowercased, '.', '_' and '-' become spaces and the result is
+padded with one leading and trailing space, so "mart.customer_360" yields
+trigrams such as " cu" (word start) and "360" and "60 " (word end). A query
+is split the same way (without the trailing pad, so it matches prefixes);
+candidates are the names sharing the most trigrams, ranked by trigram
+similarity with bonuses for substring and word-prefix matches.
+
+Posting lists of very common trigrams (in more than a tenth of the names)
+are not scanned to find candidates when rarer ones are available; they are
+only checked, through cached bitmaps, for the best candidates. This keeps
+queries in the low milliseconds for 50k names.
+
+The index serializes into a compact dict (names plus delta-encoded,
+base-36 posting lists) that the master index embeds for in-browser search
+with the same ranking.
+"""
+import heapq
+import re
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+DEFAULT_LIMIT = 20
+
+# Candidates rescored per query, relative to the number of results wanted
+_CANDIDATE_FACTOR = 8
+_MIN_CANDIDATES = 200
+# Trigrams found in more names than this fraction only add to candidate scores
+_COMMON_FRACTION = 0.1
+_MIN_COMMON = 64
+
+_SEPARATORS = re.compile(r'[._\-\s]+')
+
+
+def normalize(text: str) -> str:
+    """Lowercase and turn name separators into single spaces"""
+    return _SEPARATORS.sub(' ', text.lower()).strip()
+
+
+def name_trigrams(name: str) -> List[str]:
+    """Distinct trigrams of a name, padded on both sides"""
+    padded = f" {normalize(name)} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+def query_trigrams(query: str) -> List[str]:
+    """Distinct trigrams of a query; only the start is padded so prefixes match"""
+    padded = f" {normalize(query)}"
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+def _to_base36(value: int) -> str:
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    if value == 0:
+        return '0'
+    out = []
+    while value:
+        value, rem = divmod(value, 36)
+        out.append(digits[rem])
+    return ''.join(reversed(out))
+
+
+class TrigramIndex:
+    """Inverted trigram index over a list of table names"""
+
+    def __init__(self, names: Iterable[str]):
+        """
+        Build the index
+
+        Args:
+            names: Table names; result order ties are broken by this order
+        """
+        self.names: List[str] = list(names)
+        self._normalized = [normalize(name) for name in self.names]
+        self._gram_counts = array('H')
+        postings: Dict[str, array] = {}
+        for name_id, name in enumerate(self.names):
+            grams = name_trigrams(name)
+            self._gram_counts.append(min(len(grams), 0xFFFF))
+            for gram in grams:
+                ids = postings.get(gram)
+                if ids is None:
+                    ids = postings[gram] = array('I')
+                ids.append(name_id)
+        self._postings = postings
+        self._common_cutoff = max(_MIN_COMMON, int(len(self.names) * _COMMON_FRACTION))
+        self._bitmaps: Dict[str, bytearray] = {}
+
+    def _bitmap(self, gram: str) -> bytearray:
+        bitmap = self._bitmaps.get(gram)
+        if bitmap is None:
+            bitmap = bytearray(len(self.names))
+            for name_id in self._postings[gram]:
+                bitmap[name_id] = 1
+            self._bitmaps[gram] = bitmap
+        return bitmap
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _score(self, name_id: int, shared: int, query_norm: str, query_grams: int) -> float:
+        """Trigram similarity plus substring / word-prefix bonuses (mirrored in the JS)"""
+        normalized = self._normalized[name_id]
+        score = shared / (query_grams + self._gram_counts[name_id] - shared)
+        position = normalized.find(query_norm)
+        if position >= 0:
+            score += 1.0
+            if position == 0 or normalized[position - 1] == ' ':
+                score += 0.5
+            if normalized.endswith(query_norm) and (position == 0 or normalized[position - 1] == ' '):
+                score += 0.5
+        return score
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[Tuple[str, float]]:
+        """
+        Ranked fuzzy matches
+
+        Args:
+            query: Free text, e.g. "cust 360" or "mart.revnue"
+            limit: Maximum number of results
+
+        Returns:
+            (name, score) pairs, best first. Scores above 1 mean the query
+            occurs in the name as written.
+        """
+        query_norm = normalize(query)
+        if not query_norm or limit <= 0:
+            return []
+        all_grams = query_trigrams(query)
+        grams = [gram for gram in all_grams if gram in self._postings]
+        if not grams:
+            return []
+
+        rare = [gram for gram in grams if len(self._postings[gram]) <= self._common_cutoff]
+        common = [gram for gram in grams if len(self._postings[gram]) > self._common_cutoff]
+        if not rare:
+            rare, common = grams, []
+
+        counts: Counter = Counter()
+        for gram in rare:
+            counts.update(self._postings[gram])
+        candidates = heapq.nlargest(max(_MIN_CANDIDATES, limit * _CANDIDATE_FACTOR),
+                                    counts.items(), key=lambda item: item[1])
+
+        # Names sharing few trigrams are noise for longer queries
+        threshold = max(1, len(all_grams) // 3)
+        bitmaps = [self._bitmap(gram) for gram in common]
+        query_grams = len(all_grams)
+        scored = []
+        for name_id, shared in candidates:
+            for bitmap in bitmaps:
+                shared += bitmap[name_id]
+            if shared >= threshold:
+                scored.append((self._score(name_id, shared, query_norm, query_grams), -name_id))
+        best = heapq.nlargest(limit, scored)
+        return [(self.names[-neg_id], round(score, 4)) for score, neg_id in best]
+
+    def to_compact(self) -> dict:
+        """
+        Serialize for embedding in a web page
+
+        Returns:
+            {'names': [...], 'grams': {trigram: "d0,d1,..."}} where each posting
+            list is written as base-36 deltas between ascending name ids
+        """
+        grams = {}
+        for gram, ids in self._postings.items():
+            previous = 0
+            parts = []
+            for name_id in ids:
+                parts.append(_to_base36(name_id - previous))
+                previous = name_id
+            grams[gram] = ','.join(parts)
+        return {'names': self.names, 'grams': grams}
+
+
+# Browser side of the index: decodes posting lists lazily and ranks with the
+# same score as TrigramIndex.search. Expects `SEARCH_INDEX` from to_compact().
+SEARCH_JS = r"""
+const SearchIndex = (function() {
+    const names = SEARCH_INDEX.names;
+    const normalized = names.map(normalize);
+    const decoded = {};
+    const gramCounts = new Uint16Array(names.length);
+    let gramCountsReady = false;
+
+    function normalize(text) {
+        return text.toLowerCase().replace(/[._\-\s]+/g, " ").trim();
+    }
+    function trigrams(padded) {
+        const seen = new Set();
+        for (let i = 0; i + 3 <= padded.length; i++) seen.add(padded.slice(i, i + 3));
+        return Array.from(seen);
+    }
+    function postings(gram) {
+        if (!(gram in decoded)) {
+            const raw = SEARCH_INDEX.grams[gram];
+            const ids = [];
+            if (raw !== undefined) {
+                let previous = 0;
+                for (const part of raw.split(",")) {
+                    previous += parseInt(part, 36);
+                    ids.push(previous);
+                }
+            }
+            decoded[gram] = ids;
+        }
+        return decoded[gram];
+    }
+    function ensureGramCounts() {
+        if (gramCountsReady) return;
+        for (let i = 0; i < names.length; i++) {
+            gramCounts[i] = Math.min(trigrams(" " + normalized[i] + " ").length, 65535);
+        }
+        gramCountsReady = true;
+    }
+    function score(id, shared, queryNorm, queryGrams) {
+        const text = normalized[id];
+        let value = shared / (queryGrams + gramCounts[id] - shared);
+        const position = text.indexOf(queryNorm);
+        if (position >= 0) {
+            value += 1.0;
+            const wordStart = position === 0 || text[position - 1] === " ";
+            if (wordStart) value += 0.5;
+            if (wordStart && text.endsWith(queryNorm)) value += 0.5;
+        }
+        return value;
+    }
+    function search(query, limit) {
+        const queryNorm = normalize(query);
+        if (!queryNorm) return [];
+        const allGrams = trigrams(" " + queryNorm);
+        const grams = allGrams.filter(g => g in SEARCH_INDEX.grams);
+        if (!grams.length) return [];
+        ensureGramCounts();
+        const counts = new Map();
+        for (const gram of grams) {
+            for (const id of postings(gram)) counts.set(id, (counts.get(id) || 0) + 1);
+        }
+        const threshold = Math.max(1, Math.floor(allGrams.length / 3));
+        const results = [];
+        for (const [id, shared] of counts) {
+            if (shared >= threshold) {
+                results.push([score(id, shared, queryNorm, allGrams.length), id]);
+            }
+        }
+        results.sort((a, b) => b[0] - a[0] || a[1] - b[1]);
+        return results.slice(0, limit || 20).map(r => r[1]);
+    }
+    return { search: search, names: names };
+})();
+"""
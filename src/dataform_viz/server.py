@@ -0,0 +1,409 @@
+"""
+Local query daemon that keeps the dependency graph in memory
+
+``dataform-deps serve`` loads the graph once and answers JSON queries
+(neighbors, lineage, search) and on-demand diagrams over HTTP on localhost
+or a Unix socket. Rendered SVGs are kept in an LRU cache and served with
+ETags, so repeated requests cost a dictionary lookup or a 304. The report
+file is re-checked (size and mtime) on every request and the graph is
+reloaded when it changed.
+
+Endpoints (all GET):
+    /health                                 table count and reload generation
+    /stats                                  cache and reload counters
+    /neighbors?table=T                      direct dependencies/dependents
+    /lineage?table=T&direction=D&depth=N    transitive closure
+    /search?q=TEXT&limit=N                  fuzzy-ranked table names
+    /svg/table?table=T                      neighbor diagram
+    /svg/lineage?table=T&direction=D&depth=N
+"""
+import hashlib
+import json
+import os
+import socketserver
+import stat
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+from .cache import report_stat_key
+from .rendering import plain_info
+from .search import TrigramIndex
+from .svg_generator import render_svg_manual
+from .visualizer import DependencyVisualizer
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_SVG_CACHE_SIZE = 256
+DEFAULT_SEARCH_LIMIT = 50
+
+_DIRECTIONS = ('upstream', 'downstream', 'both')
+
+
+class QueryError(Exception):
+    """A request that cannot be answered; carries the HTTP status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class SvgCache:
+    """Thread-safe LRU of rendered diagrams keyed by request, storing (etag, body)"""
+
+    def __init__(self, max_entries: int = DEFAULT_SVG_CACHE_SIZE):
+        self.max_entries = max(0, max_entries)
+        self._entries: 'OrderedDict[tuple, Tuple[str, bytes]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get_or_render(self, key: tuple, render: Callable[[], str]) -> Tuple[str, bytes]:
+        """
+        Return the cached diagram for key, rendering it on a miss
+
+        Returns:
+            (quoted ETag, UTF-8 SVG body)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry
+            self.stats['misses'] += 1
+
+        body = render().encode('utf-8')
+        entry = (f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', body)
+        with self._lock:
+            if self.max_entries:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats['evictions'] += 1
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class GraphService:
+    """The loaded graph plus reload logic and the query implementations"""
+
+    def __init__(self, report_path: Optional[str] = None, use_cache: bool = True,
+                 visualizer: Optional[DependencyVisualizer] = None,
+                 svg_cache_size: int = DEFAULT_SVG_CACHE_SIZE):
+        """
+        Initialize service
+
+        Args:
+            report_path: Report to load and watch for changes
+            use_cache: Use the on-disk graph cache when (re)loading
+            visualizer: Already loaded visualizer (e.g. from --compile); it
+                is not watched for changes
+            svg_cache_size: Rendered diagrams kept in memory
+        """
+        self.report_path = report_path
+        self.use_cache = use_cache
+        self.svg_cache = SvgCache(svg_cache_size)
+        self.generation = 0
+        self.reloads = 0
+        self._lock = threading.RLock()
+        self._stat_key: Optional[Tuple[int, int]] = None
+        self._search_index: Optional[TrigramIndex] = None
+        self.viz: DependencyVisualizer
+        if visualizer is not None:
+            self.viz = visualizer
+        elif report_path is not None:
+            self._load(report_path)
+        else:
+            raise ValueError("GraphService needs a report path or a visualizer")
+        self.viz.load_report()
+
+    def _load(self, report_path: str) -> None:
+        stat_key = report_stat_key(report_path)
+        viz = DependencyVisualizer(report_path, use_cache=self.use_cache)
+        viz.load_report()
+        self.viz = viz
+        self._stat_key = stat_key
+        self.generation += 1
+        self._search_index = None
+        self.svg_cache.clear()
+
+    def refresh(self) -> bool:
+        """
+        Reload the graph if the watched report changed
+
+        A report that disappears or fails to parse keeps the current graph.
+
+        Returns:
+            True if the graph was reloaded
+        """
+        report_path = self.report_path
+        if report_path is None:
+            return False
+        with self._lock:
+            try:
+                if report_stat_key(report_path) == self._stat_key:
+                    return False
+                self._load(report_path)
+            except (OSError, ValueError) as e:
+                print(f"⚠ Reload of {self.report_path} failed: {e}", file=sys.stderr)
+                return False
+            self.reloads += 1
+            return True
+
+    @property
+    def graph(self):
+        return self.viz.tables
+
+    @staticmethod
+    def _table(params: Dict[str, str], graph: Dict[str, dict]) -> str:
+        name = params.get('table')
+        if not name:
+            raise QueryError(400, "Missing parameter: table")
+        if name not in graph:
+            raise QueryError(404, f"Table not found: {name}")
+        return name
+
+    @staticmethod
+    def _depth(params: Dict[str, str]) -> Optional[int]:
+        depth = params.get('depth')
+        if depth is None or depth == '':
+            return None
+        try:
+            value = int(depth)
+        except ValueError:
+            raise QueryError(400, f"Invalid depth: {depth}")
+        if value < 0:
+            raise QueryError(400, f"Invalid depth: {depth}")
+        return value
+
+    @staticmethod
+    def _direction(params: Dict[str, str]) -> str:
+        direction = params.get('direction', 'both')
+        if direction not in _DIRECTIONS:
+            raise QueryError(400, f"Invalid direction: {direction}")
+        return direction
+
+    @staticmethod
+    def _type(graph: Dict[str, dict], name: str) -> str:
+        return graph.get(name, {}).get('type', 'unknown')
+
+    # Queries -----------------------------------------------------------
+
+    def health(self, params: Dict[str, str]) -> dict:
+        return {'status': 'ok', 'tables': len(self.graph), 'generation': self.generation}
+
+    def stats(self, params: Dict[str, str]) -> dict:
+        return {
+            'generation': self.generation,
+            'reloads': self.reloads,
+            'svg_cache': dict(self.svg_cache.stats, entries=len(self.svg_cache)),
+            'lineage_cache': dict(self.viz.lineage().stats),
+        }
+
+    def neighbors(self, params: Dict[str, str]) -> dict:
+        """Direct dependencies and dependents of a table"""
+        # One snapshot, so a reload cannot swap the graph between lookups
+        with self._lock:
+            graph = self.graph
+        name = self._table(params, graph)
+        info = plain_info(graph[name])
+        return {
+            'table': name,
+            'type': info['type'],
+            'dependencies': [{'name': dep, 'type': self._type(graph, dep)} for dep in info['dependencies']],
+            'dependents': [{'name': dept, 'type': self._type(graph, dept)} for dept in info['dependents']],
+            'join_info': info['join_info'],
+        }
+
+    def lineage(self, params: Dict[str, str]) -> dict:
+        """Transitive upstream/downstream tables, same shape as `lineage --format json`"""
+        direction = self._direction(params)
+        depth = self._depth(params)
+        with self._lock:
+            graph = self.graph
+            name = self._table(params, graph)
+            result: Dict[str, Any] = {'table': name}
+            lineage = self.viz.lineage()
+            if direction in ('upstream', 'both'):
+                result['upstream'] = lineage.upstream(name, depth)
+            if direction in ('downstream', 'both'):
+                result['downstream'] = lineage.downstream(name, depth)
+        for key in ('upstream', 'downstream'):
+            if key in result:
+                result[key] = [{'name': table, 'distance': distance, 'type': self._type(graph, table)}
+                               for table, distance in result[key]]
+        return result
+
+    def search(self, params: Dict[str, str]) -> dict:
+        """Table names ranked by fuzzy match, best first"""
+        query = params.get('q', '')
+        if not query:
+            raise QueryError(400, "Missing parameter: q")
+        try:
+            limit = int(params.get('limit', DEFAULT_SEARCH_LIMIT))
+        except ValueError:
+            raise QueryError(400, f"Invalid limit: {params['limit']}")
+        with self._lock:
+            # Built on first use after each (re)load
+            if self._search_index is None:
+                self._search_index = TrigramIndex(self.graph)
+            index = self._search_index
+        return {'query': query, 'results': [name for name, _ in index.search(query, limit)]}
+
+    def table_svg(self, params: Dict[str, str]) -> Tuple[str, bytes]:
+        """Neighbor diagram of a table as (etag, body)"""
+        # Graph and generation from the same load, so a reload in between
+        # cannot cache the old diagram under the new generation
+        with self._lock:
+            graph = self.graph
+            generation = self.generation
+        name = self._table(params, graph)
+        return self.svg_cache.get_or_render(
+            ('table', generation, name),
+            lambda: render_svg_manual(name, graph[name], graph)
+        )
+
+    def lineage_svg(self, params: Dict[str, str]) -> Tuple[str, bytes]:
+        """Lineage diagram of a table as (etag, body)"""
+        direction = self._direction(params)
+        depth = self._depth(params)
+        with self._lock:
+            viz = self.viz
+            graph = self.graph
+            generation = self.generation
+        name = self._table(params, graph)
+
+        def render():
+            with self._lock:
+                return viz.render_lineage_svg(
+                    name, depth,
+                    upstream=direction in ('upstream', 'both'),
+                    downstream=direction in ('downstream', 'both')
+                )
+        return self.svg_cache.get_or_render(('lineage', generation, name, direction, depth), render)
+
+
+_JSON_ROUTES = {
+    '/health': GraphService.health,
+    '/stats': GraphService.stats,
+    '/neighbors': GraphService.neighbors,
+    '/lineage': GraphService.lineage,
+    '/search': GraphService.search,
+}
+_SVG_ROUTES = {
+    '/svg/table': GraphService.table_svg,
+    '/svg/lineage': GraphService.lineage_svg,
+}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """Routes GET requests to the GraphService of the server"""
+
+    server_version = 'dataform-deps'
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        service: GraphService = self.server.service
+        try:
+            service.refresh()
+            if url.path in _JSON_ROUTES:
+                body = json.dumps(_JSON_ROUTES[url.path](service, params)).encode('utf-8')
+                self._send(200, 'application/json', body)
+            elif url.path in _SVG_ROUTES:
+                etag, body = _SVG_ROUTES[url.path](service, params)
+                if etag in self.headers.get('If-None-Match', ''):
+                    self._send(304, None, b'', etag)
+                else:
+                    self._send(200, 'image/svg+xml', body, etag)
+            else:
+                raise QueryError(404, f"Unknown endpoint: {url.path}")
+        except QueryError as e:
+            self._send(e.status, 'application/json', json.dumps({'error': str(e)}).encode('utf-8'))
+        except Exception as e:
+            body = json.dumps({'error': f"{type(e).__name__}: {e}"}).encode('utf-8')
+            self._send(500, 'application/json', body)
+
+    def _send(self, status: int, content_type: Optional[str], body: bytes,
+              etag: Optional[str] = None) -> None:
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if not getattr(self.server, 'quiet', False):
+            super().log_message(format, *args)
+
+
+class _TCPHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    service: GraphService
+    quiet: bool
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    service: GraphService
+    quiet: bool
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ('unix', 0)
+
+
+def make_server(service: GraphService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                socket_path: Optional[str] = None,
+                quiet: bool = False) -> Union[_TCPHTTPServer, _UnixHTTPServer]:
+    """
+    Create the HTTP server (not yet serving)
+
+    Args:
+        service: Graph to answer queries from
+        host: Interface to bind (ignored with socket_path)
+        port: TCP port; 0 picks a free one
+        socket_path: Listen on this Unix socket instead of TCP
+        quiet: Do not log requests to stderr
+
+    Returns:
+        Server object; call serve_forever() and later shutdown()/server_close()
+    """
+    if socket_path:
+        if not hasattr(socketserver, 'UnixStreamServer'):
+            raise ValueError("Unix sockets are not supported on this platform")
+        try:
+            mode = os.lstat(socket_path).st_mode
+        except FileNotFoundError:
+            mode = None
+        if mode is not None:
+            # Only a stale socket from an earlier run is removed
+            if not stat.S_ISSOCK(mode):
+                raise ValueError(f"{socket_path} exists and is not a socket")
+            os.unlink(socket_path)
+        server: Union[_TCPHTTPServer, _UnixHTTPServer] = _UnixHTTPServer(socket_path, QueryHandler)
+    else:
+        server = _TCPHTTPServer((host, port), QueryHandler)
+    server.service = service
+    server.quiet = quiet
+    return server
@@ -0,0 +1,311 @@
+"""
+Single-pass SQL scanner for CTE sources and JOIN clauses
+
+The tokenizer recognises comments (--, # and /* */), string literals
+(quoted, triple-quoted, raw/bytes prefixes), backtick-quoted identifiers
+and parentheses, so keywords inside them are never mistaken for SQL
+structure. Every alternative of the token pattern is decided by its first
+character and none can backtrack past its own token, so tokenizing is
+linear in the input; unterminated literals and comments simply run to the
+end (of the line, for single quotes).
+
+scan_query() walks the tokens once with a small state machine and
+collects the first FROM source of every CTE and every JOIN with an ON or
+USING clause. scan_query_spans() leaves each condition as an offset range,
+so scanning stays linear even when ON conditions nest (an outer condition
+contains every inner one); callers cut text only for the joins they keep.
+scan_query() cuts all of them.
+"""
+import re
+from bisect import bisect_left
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, cast
+
+WORD = 'word'
+STRING = 'string'
+COMMENT = 'comment'
+PUNCT = 'punct'
+OTHER = 'other'
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>--[^\n]*|\#[^\n]*|/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<string>[rRbB]{0,2}(?:'''[\s\S]*?(?:'''|\Z)|\"\"\"[\s\S]*?(?:\"\"\"|\Z)
+                            |'(?:[^'\\\n]|\\[\s\S])*(?:'|(?=\n)|\Z)
+                            |"(?:[^"\\\n]|\\[\s\S])*(?:"|(?=\n)|\Z)))
+  | (?P<word>(?:[\w.]|-(?!-)|`[^`]*(?:`|\Z))+)
+  | (?P<punct>[(),;])
+  | (?P<other>[\s\S])
+""", re.VERBOSE)
+
+# Keywords that end an ON condition at its own nesting level
+CLAUSE_KEYWORDS = frozenset({
+    'WHERE', 'GROUP', 'HAVING', 'ORDER', 'LIMIT', 'UNION', 'FROM', 'SELECT',
+    'QUALIFY', 'WINDOW', 'EXCEPT', 'INTERSECT',
+})
+JOIN_MODIFIERS = frozenset({'INNER', 'LEFT', 'RIGHT', 'FULL', 'CROSS', 'OUTER'})
+_KEYWORD_MAX_LEN = 9
+
+# Join parser states
+_NONE, _REF, _ALIAS, _USING, _USING_COLUMNS = range(5)
+# CTE header states: after WITH/','  ->  name  ->  AS  ->  '('
+_CTE_NAME, _CTE_AS, _CTE_OPEN = 1, 2, 3
+
+
+class JoinClause(NamedTuple):
+    """One JOIN with a condition, as written in the query"""
+    join_type: str
+    table: str
+    alias: Optional[str]
+    # ON condition, or the column list for USING (comments dropped, whitespace collapsed)
+    condition: str
+    using: bool = False
+
+
+class JoinSpan(NamedTuple):
+    """A JoinClause whose condition is still an offset range of the query"""
+    join_type: str
+    table: str
+    alias: Optional[str]
+    start: int
+    end: int
+    using: bool = False
+
+
+def iter_tokens(sql: str) -> Iterator[Tuple[str, str, int, int]]:
+    """
+    Split SQL into tokens, skipping whitespace
+
+    Yields:
+        (kind, text, start, end) with kind WORD (identifiers, keywords,
+        numbers and dotted or backtick-quoted paths), STRING, COMMENT,
+        PUNCT (parentheses, comma, semicolon) or OTHER (operators)
+    """
+    for match in _TOKEN.finditer(sql):
+        kind = cast(str, match.lastgroup)
+        if kind != 'space':
+            yield kind, match.group(), match.start(), match.end()
+
+
+def _keyword(text: str) -> str:
+    return text.upper() if len(text) <= _KEYWORD_MAX_LEN else ''
+
+
+_VISIBLE = re.compile(r'[^\s`]')
+
+
+class QueryText:
+    """Cuts condition text out of the query, leaving comments and backticks out"""
+
+    def __init__(self, sql: str, comments: List[Tuple[int, int]]):
+        self.sql = sql
+        self.comments = comments
+        self.comment_starts = [start for start, _ in comments]
+
+    def _pieces(self, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """(start, end) ranges of sql[start:end] outside comments"""
+        pos = start
+        index = bisect_left(self.comment_starts, start)
+        while index < len(self.comments) and self.comments[index][0] < end:
+            comment_start, comment_end = self.comments[index]
+            yield pos, comment_start
+            pos = comment_end
+            index += 1
+        yield pos, end
+
+    def text(self, start: int, end: int) -> str:
+        """Condition text with whitespace collapsed"""
+        pieces = ' '.join(self.sql[a:b] for a, b in self._pieces(start, end))
+        return ' '.join(pieces.replace('`', '').split())
+
+    def is_blank(self, start: int, end: int) -> bool:
+        """Whether text(start, end) would be empty, without building it"""
+        return not any(_VISIBLE.search(self.sql, a, b) for a, b in self._pieces(start, end) if a < b)
+
+
+def scan_query(sql: str) -> Tuple[Dict[str, str], List[JoinClause]]:
+    """
+    Extract CTE sources and JOIN clauses with their condition text
+
+    Cutting every condition is quadratic when ON conditions nest deeply;
+    use scan_query_spans() to cut only the joins that matter.
+
+    Args:
+        sql: Query text
+
+    Returns:
+        (lowercased CTE name -> source table as written without backticks,
+         JoinClause list in query order). CTE references are not resolved.
+    """
+    cte_sources, spans, query_text = scan_query_spans(sql)
+    joins = [JoinClause(span.join_type, span.table, span.alias,
+                        query_text.text(span.start, span.end), span.using)
+             for span in spans]
+    return cte_sources, joins
+
+
+def scan_query_spans(sql: str) -> Tuple[Dict[str, str], List[JoinSpan], QueryText]:
+    """
+    Extract CTE sources and JOIN clauses in one pass
+
+    A CTE's source is the first table after a FROM inside its body (FROM
+    inside EXTRACT(...) does not count). An ON condition ends at the next
+    clause keyword or JOIN on its own nesting level, at the parenthesis
+    closing that level, at ';' or at the end of the query.
+
+    Args:
+        sql: Query text
+
+    Returns:
+        (lowercased CTE name -> source table as written without backticks,
+         JoinSpan list in query order, QueryText that cuts a span's condition).
+        CTE references are not resolved.
+    """
+    cte_sources: Dict[str, str] = {}
+    slots: List[list] = []
+    comments: List[Tuple[int, int]] = []
+
+    depth = 0
+    # Word before each open parenthesis, to recognise EXTRACT(... FROM ...)
+    paren_words: List[str] = []
+    previous_word = ''
+    # CTE header recognition and CTE bodies: [name, body depth, has source]
+    cte_state = 0
+    cte_name = ''
+    open_ctes: List[list] = []
+    expect_from_table = False
+    # Join modifiers seen just before (INNER, LEFT OUTER, ...) and where they began
+    modifiers: List[str] = []
+    modifier_start = -1
+    # Join being parsed: [slot, type, table, alias]
+    join_state = _NONE
+    join: list = []
+    using_start = 0
+    using_depth = 0
+    # ON conditions still open: [slot, start, depth], depths ascending
+    open_conditions: List[list] = []
+
+    def close_conditions(level: int, end: int) -> None:
+        while open_conditions and open_conditions[-1][2] >= level:
+            slot, start, _ = open_conditions.pop()
+            slots[slot] = slots[slot] + [(start, end)]
+
+    for kind, text, start, end in iter_tokens(sql):
+        if kind == COMMENT:
+            comments.append((start, end))
+            continue
+
+        keyword = _keyword(text) if kind == WORD else ''
+
+        # Join modifiers only end a condition when a JOIN follows them
+        if keyword == 'JOIN':
+            join_start = modifier_start if modifiers else start
+            close_conditions(depth, join_start)
+            slots.append([' '.join(modifiers + ['JOIN'])])
+            join = [len(slots) - 1]
+            join_state = _REF
+            modifiers = []
+            previous_word = keyword
+            expect_from_table = False
+            cte_state = 0
+            continue
+        if keyword in JOIN_MODIFIERS:
+            if not modifiers:
+                modifier_start = start
+            modifiers.append(keyword)
+        else:
+            modifiers = []
+
+        # JOIN <table> [[AS] alias] ON ... | USING (...)
+        if join_state == _REF:
+            if kind == WORD:
+                join.append(text.replace('`', ''))
+                join.append(None)
+                join_state = _ALIAS
+                previous_word = keyword
+                continue
+            join_state = _NONE
+        elif join_state == _ALIAS:
+            if keyword == 'ON':
+                open_conditions.append([join[0], end, depth])
+                slots[join[0]] += [join[1], join[2], False]
+                join_state = _NONE
+                previous_word = keyword
+                continue
+            if keyword == 'USING':
+                join_state = _USING
+                continue
+            if keyword == 'AS':
+                continue
+            if kind == WORD and join[2] is None and keyword not in CLAUSE_KEYWORDS \
+                    and keyword not in JOIN_MODIFIERS:
+                join[2] = text.replace('`', '')
+                continue
+            join_state = _NONE
+        elif join_state == _USING:
+            if text == '(':
+                using_start = end
+                using_depth = depth + 1
+                join_state = _USING_COLUMNS
+            else:
+                join_state = _NONE
+        elif join_state == _USING_COLUMNS and text == ')' and depth == using_depth:
+            slots[join[0]] += [join[1], join[2], True, (using_start, start)]
+            join_state = _NONE
+
+        if kind == WORD:
+            if keyword in CLAUSE_KEYWORDS:
+                close_conditions(depth, start)
+            if expect_from_table:
+                source = text.replace('`', '')
+                for cte in reversed(open_ctes):
+                    if cte[2]:
+                        break
+                    cte[2] = True
+                    cte_sources[cte[0]] = source
+            expect_from_table = keyword == 'FROM' and not (paren_words and paren_words[-1] == 'EXTRACT')
+
+            if keyword in ('WITH', 'RECURSIVE'):
+                cte_state = _CTE_NAME
+            elif cte_state == _CTE_NAME:
+                cte_name = text.replace('`', '').lower()
+                cte_state = _CTE_AS
+            elif cte_state == _CTE_AS and keyword == 'AS':
+                cte_state = _CTE_OPEN
+            else:
+                cte_state = 0
+            previous_word = keyword or text
+            continue
+
+        expect_from_table = False
+        if text == '(':
+            depth += 1
+            paren_words.append(previous_word)
+            if cte_state == _CTE_OPEN:
+                open_ctes.append([cte_name, depth, False])
+            cte_state = 0
+        elif text == ')':
+            close_conditions(depth, start)
+            if open_ctes and open_ctes[-1][1] == depth:
+                open_ctes.pop()
+            if depth:
+                depth -= 1
+                paren_words.pop()
+            cte_state = 0
+        elif text == ',':
+            cte_state = _CTE_NAME
+        elif text == ';':
+            close_conditions(0, start)
+            cte_state = 0
+        else:
+            cte_state = 0
+        previous_word = ''
+
+    close_conditions(0, len(sql))
+
+    spans = []
+    for slot in slots:
+        # [type, table, alias, using, (start, end)]; shorter slots were abandoned
+        if len(slot) == 5:
+            join_type, table, alias, using, (start, end) = slot
+            spans.append(JoinSpan(join_type, table, alias, start, end, using))
+    return cte_sources, spans, QueryText(sql, comments)
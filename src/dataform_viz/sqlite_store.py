@@ -0,0 +1,485 @@
+"""
+SQLite-backed graph store
+
+An alternative to keeping the whole parsed report in memory: tables, edges
+and join info are bulk-loaded into an indexed SQLite file
+(``<report>.sqlite``) with batched ``executemany`` calls inside a single
+transaction, and SqliteGraph answers lookups lazily from it. It behaves
+like the in-memory DependencyGraph as a read-only Mapping of table name to
+info dict, and computes upstream/downstream closures with recursive CTEs.
+
+The file is validated against the report like the graph cache (size,
+mtime and content hash) and rebuilt when the report changed.
+"""
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .cache import hash_file, report_stat_key
+from .graph import DependencyGraph, GraphBuilder
+
+STORE_SUFFIX = '.sqlite'
+STORE_VERSION = 1
+
+_BATCH_SIZE = 20_000
+# Keeps IN (...) lists below SQLite's default variable limit
+_IN_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value) WITHOUT ROWID;
+CREATE TABLE nodes (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    schema TEXT,
+    type TEXT,              -- NULL for names that are only referenced
+    seq INTEGER             -- report order of recorded tables
+);
+CREATE TABLE dependencies (
+    reader INTEGER NOT NULL,
+    pos INTEGER NOT NULL,
+    source INTEGER NOT NULL,
+    join_type TEXT,
+    join_condition TEXT,
+    PRIMARY KEY (reader, pos)
+) WITHOUT ROWID;
+CREATE TABLE dependents (
+    target INTEGER NOT NULL,
+    pos INTEGER NOT NULL,
+    reader INTEGER NOT NULL,
+    PRIMARY KEY (target, pos)
+) WITHOUT ROWID;
+"""
+
+# Created after the bulk load, which is faster than maintaining them per row
+_INDEXES = """
+CREATE UNIQUE INDEX nodes_name ON nodes (name);
+CREATE INDEX nodes_schema ON nodes (schema, seq) WHERE type IS NOT NULL;
+CREATE INDEX nodes_seq ON nodes (seq) WHERE type IS NOT NULL;
+"""
+
+# Depth-limited closures keep the shortest distance per node. The walk
+# enumerates (node, path length) pairs, which is cheap for small depths.
+_UPSTREAM_SQL = """
+WITH RECURSIVE walk(id, distance) AS (
+    SELECT source, 1 FROM dependencies WHERE reader = :start
+    UNION
+    SELECT d.source, w.distance + 1 FROM walk w JOIN dependencies d ON d.reader = w.id
+    WHERE w.distance < :depth
+)
+SELECT n.name, MIN(w.distance) AS distance FROM walk w JOIN nodes n ON n.id = w.id
+WHERE w.id != :start GROUP BY w.id ORDER BY distance, n.name
+"""
+
+_DOWNSTREAM_SQL = """
+WITH RECURSIVE walk(id, distance) AS (
+    SELECT reader, 1 FROM dependents WHERE target = :start
+    UNION
+    SELECT d.reader, w.distance + 1 FROM walk w JOIN dependents d ON d.target = w.id
+    WHERE w.distance < :depth
+)
+SELECT n.name, MIN(w.distance) AS distance FROM walk w JOIN nodes n ON n.id = w.id
+WHERE w.id != :start GROUP BY w.id ORDER BY distance, n.name
+"""
+
+# Unlimited closures: the UNION keeps each node once, so the walk is linear
+# in the closure size; it returns the closure's edges, and distances are
+# assigned by a breadth-first pass over them.
+_UPSTREAM_EDGES_SQL = """
+WITH RECURSIVE walk(id) AS (
+    SELECT :start
+    UNION
+    SELECT d.source FROM walk w JOIN dependencies d ON d.reader = w.id
+)
+SELECT d.reader, d.source FROM walk w JOIN dependencies d ON d.reader = w.id ORDER BY d.reader, d.pos
+"""
+
+_DOWNSTREAM_EDGES_SQL = """
+WITH RECURSIVE walk(id) AS (
+    SELECT :start
+    UNION
+    SELECT d.reader FROM walk w JOIN dependents d ON d.target = w.id
+)
+SELECT d.target, d.reader FROM walk w JOIN dependents d ON d.target = w.id ORDER BY d.target, d.pos
+"""
+
+
+def store_path_for(report_path: str) -> Path:
+    """Return the SQLite file that belongs to a report"""
+    report = Path(report_path)
+    return report.with_name(report.name + STORE_SUFFIX)
+
+
+def build_store(records: Iterable[Tuple[str, Mapping]], db_path: str,
+                meta: Optional[Dict[str, object]] = None,
+                batch_size: int = _BATCH_SIZE) -> int:
+    """
+    Bulk-load table records into a new SQLite file
+
+    Rows are buffered and written with executemany in one transaction; the
+    lookup indexes are created once the data is in. A later record for the
+    same name replaces the earlier one, as in parse_dependencies_report.
+
+    Args:
+        records: (table_name, info) tuples, e.g. parser.iter_dependencies_report()
+        db_path: File to create (replaced if it exists)
+        meta: Extra key/value pairs stored in the meta table
+        batch_size: Rows buffered per executemany call
+
+    Returns:
+        Number of recorded tables
+    """
+    target = Path(db_path)
+    tmp_path = target.with_name(target.name + f'.{os.getpid()}.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    ids: Dict[str, int] = {}
+    names: List[str] = []
+    types: List[Optional[str]] = []
+    seqs: List[Optional[int]] = []
+
+    def node(name):
+        node_id = ids.get(name)
+        if node_id is None:
+            node_id = ids[name] = len(names)
+            names.append(name)
+            types.append(None)
+            seqs.append(None)
+        return node_id
+
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.executescript(_SCHEMA)
+        dep_rows: List[Tuple[int, int, int, Optional[str], Optional[str]]] = []
+        dept_rows: List[Tuple[int, int, int]] = []
+
+        def flush():
+            if dep_rows:
+                conn.executemany('INSERT INTO dependencies VALUES (?, ?, ?, ?, ?)', dep_rows)
+                dep_rows.clear()
+            if dept_rows:
+                conn.executemany('INSERT INTO dependents VALUES (?, ?, ?)', dept_rows)
+                dept_rows.clear()
+
+        conn.execute('BEGIN')
+        count = 0
+        for name, info in records:
+            node_id = node(name)
+            if types[node_id] is not None:
+                # Replaced record: drop the edges of the earlier one
+                flush()
+                conn.execute('DELETE FROM dependencies WHERE reader = ?', (node_id,))
+                conn.execute('DELETE FROM dependents WHERE target = ?', (node_id,))
+            else:
+                seqs[node_id] = count
+                count += 1
+            types[node_id] = info['type']
+
+            join_info = info.get('join_info') or {}
+            for pos, dep in enumerate(info['dependencies']):
+                join = join_info.get(dep)
+                dep_rows.append((node_id, pos, node(dep),
+                                 join['type'] if join else None,
+                                 join['condition'] if join else None))
+            for pos, dept in enumerate(info['dependents']):
+                dept_rows.append((node_id, pos, node(dept)))
+            if len(dep_rows) >= batch_size or len(dept_rows) >= batch_size:
+                flush()
+        flush()
+
+        conn.executemany(
+            'INSERT INTO nodes VALUES (?, ?, ?, ?, ?)',
+            ((node_id, name, name.partition('.')[0] if '.' in name else None,
+              types[node_id], seqs[node_id])
+             for node_id, name in enumerate(names))
+        )
+        meta_rows: Dict[str, object] = {'version': STORE_VERSION, 'tables': count}
+        meta_rows.update(meta or {})
+        conn.executemany('INSERT INTO meta VALUES (?, ?)', meta_rows.items())
+        conn.executescript(_INDEXES)
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, target)
+    return count
+
+
+def _read_meta(db_path: str) -> Dict[str, object]:
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        return dict(conn.execute('SELECT key, value FROM meta'))
+    finally:
+        conn.close()
+
+
+def load_store(report_path: str, records: Optional[Callable[[], Iterable[Tuple[str, Mapping]]]] = None,
+               db_path: Optional[str] = None, stats: Optional[Dict[str, int]] = None) -> 'SqliteGraph':
+    """
+    Open <report>.sqlite if it matches the report, otherwise (re)build it
+
+    Args:
+        report_path: Report the store is built from
+        records: Returns the report's (name, info) records
+            (default: parser.iter_dependencies_report)
+        db_path: Store location (default: next to the report)
+        stats: Optional dict that receives hits and misses counters
+
+    Returns:
+        SqliteGraph over the store
+    """
+    db_path = str(db_path or store_path_for(report_path))
+    stats = stats if stats is not None else {}
+    stats.setdefault('hits', 0)
+    stats.setdefault('misses', 0)
+    size, mtime_ns = report_stat_key(report_path)
+    try:
+        meta = _read_meta(db_path)
+        if (meta.get('version') == STORE_VERSION and meta.get('report_size') == size
+                and (meta.get('report_mtime_ns') == mtime_ns
+                     or meta.get('report_digest') == hash_file(report_path))):
+            stats['hits'] += 1
+            return SqliteGraph(db_path)
+    except (OSError, sqlite3.Error):
+        pass
+
+    stats['misses'] += 1
+    if records is None:
+        from .parser import iter_dependencies_report
+        records = lambda: iter_dependencies_report(report_path)
+    build_store(records(), db_path, meta={
+        'report_size': size,
+        'report_mtime_ns': mtime_ns,
+        'report_digest': hash_file(report_path),
+    })
+    return SqliteGraph(db_path)
+
+
+class TypeView(Mapping):
+    """Mapping of recorded table name -> {'type': ...}, one indexed lookup per access"""
+
+    def __init__(self, graph: 'SqliteGraph'):
+        self._graph = graph
+
+    def __getitem__(self, name: str) -> dict:
+        table_type = self._graph.type_of(name)
+        if table_type is None:
+            raise KeyError(name)
+        return {'type': table_type}
+
+    def __contains__(self, name) -> bool:
+        return self._graph.type_of(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._graph)
+
+    def __len__(self) -> int:
+        return len(self._graph)
+
+
+class SqliteGraph(Mapping):
+    """
+    Read-only Mapping of table name -> info dict backed by a store file
+
+    Only recorded tables are keys, like DependencyGraph. Pickling keeps just
+    the path, so render workers reopen the file instead of copying the graph.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = str(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._length: Optional[int] = None
+
+    def __getstate__(self):
+        return {'db_path': self.db_path}
+
+    def __setstate__(self, state):
+        self.__init__(state['db_path'])
+
+    def _query(self, sql: str, params=()) -> List[tuple]:
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True,
+                                             check_same_thread=False)
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        """Close the connection (it is reopened on the next query)"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _node(self, name: str) -> Optional[Tuple[int, Optional[str]]]:
+        rows = self._query('SELECT id, type FROM nodes WHERE name = ?', (name,))
+        return rows[0] if rows else None
+
+    def _info(self, node_id: int, table_type: str) -> dict:
+        dependencies = []
+        join_info = {}
+        for dep, join_type, condition in self._query(
+                'SELECT n.name, d.join_type, d.join_condition FROM dependencies d '
+                'JOIN nodes n ON n.id = d.source WHERE d.reader = ? ORDER BY d.pos', (node_id,)):
+            dependencies.append(dep)
+            if join_type is not None:
+                join_info[dep] = {'type': join_type, 'condition': condition}
+        dependents = [name for name, in self._query(
+            'SELECT n.name FROM dependents d JOIN nodes n ON n.id = d.reader '
+            'WHERE d.target = ? ORDER BY d.pos', (node_id,))]
+        return {
+            'type': table_type,
+            'dependencies': dependencies,
+            'dependents': dependents,
+            'join_info': join_info,
+        }
+
+    def __getitem__(self, name: str) -> dict:
+        node_id, table_type = self._node(name) or (None, None)
+        if node_id is None or table_type is None:
+            raise KeyError(name)
+        return self._info(node_id, table_type)
+
+    def __contains__(self, name) -> bool:
+        return isinstance(name, str) and self.type_of(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for name, in self._query('SELECT name FROM nodes WHERE type IS NOT NULL ORDER BY seq'):
+            yield name
+
+    def __len__(self) -> int:
+        if self._length is None:
+            self._length = self._query('SELECT COUNT(*) FROM nodes WHERE type IS NOT NULL')[0][0]
+        return self._length
+
+    def __repr__(self) -> str:
+        return f"SqliteGraph({self.db_path!r})"
+
+    def type_of(self, name: str) -> Optional[str]:
+        """Return the type of a recorded table, or None"""
+        node = self._node(name)
+        return node[1] if node else None
+
+    def type_view(self) -> TypeView:
+        """Neighbor-type lookup for rendering that skips the edge queries"""
+        return TypeView(self)
+
+    def schemas(self) -> List[str]:
+        """Schemas that have at least one recorded table, in order of first appearance"""
+        return [schema for schema, in self._query(
+            'SELECT schema FROM nodes WHERE type IS NOT NULL AND schema IS NOT NULL '
+            'GROUP BY schema ORDER BY MIN(seq)')]
+
+    def iter_schema(self, schema: str) -> Iterator[Tuple[str, dict]]:
+        """
+        Iterate over the tables of one schema
+
+        Yields:
+            (table_name, info) tuples in report order
+        """
+        for node_id, name, table_type in self._query(
+                'SELECT id, name, type FROM nodes WHERE schema = ? AND type IS NOT NULL '
+                'ORDER BY seq', (schema,)):
+            yield name, self._info(node_id, table_type)
+
+    def _closure(self, sql: str, edges_sql: str, name: str,
+                 depth: Optional[int]) -> List[Tuple[str, int]]:
+        node = self._node(name)
+        if node is None:
+            raise ValueError(f"Table not found: {name}")
+        start = node[0]
+        if depth is not None:
+            if depth <= 0:
+                return []
+            return [(table, distance) for table, distance in
+                    self._query(sql, {'start': start, 'depth': depth})]
+
+        adjacency: Dict[int, List[int]] = {}
+        for node_id, neighbor in self._query(edges_sql, {'start': start}):
+            adjacency.setdefault(node_id, []).append(neighbor)
+        distances = {start: 0}
+        frontier = [start]
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for node_id in frontier:
+                for neighbor in adjacency.get(node_id, ()):
+                    if neighbor not in distances:
+                        distances[neighbor] = distance
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        del distances[start]
+        if not distances:
+            return []
+
+        names: Dict[int, str] = {}
+        ids = list(distances)
+        for i in range(0, len(ids), _IN_CHUNK):
+            chunk = ids[i:i + _IN_CHUNK]
+            names.update(self._query(
+                f"SELECT id, name FROM nodes WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+        return sorted(((names[node_id], d) for node_id, d in distances.items()),
+                      key=lambda pair: (pair[1], pair[0]))
+
+    def upstream(self, name: str, depth: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Everything the table reads from, directly or transitively (recursive CTE)
+
+        Returns:
+            (table_name, distance) pairs ordered by distance, then name
+        """
+        return self._closure(_UPSTREAM_SQL, _UPSTREAM_EDGES_SQL, name, depth)
+
+    def downstream(self, name: str, depth: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Everything that reads from the table, directly or transitively (recursive CTE)
+
+        Returns:
+            (table_name, distance) pairs ordered by distance, then name
+        """
+        return self._closure(_DOWNSTREAM_SQL, _DOWNSTREAM_EDGES_SQL, name, depth)
+
+    def induced_edges(self, names) -> List[Tuple[str, str]]:
+        """(dependency, reader) edges between the given tables"""
+        wanted = set(names)
+        ordered = sorted(wanted)
+        edges = []
+        for i in range(0, len(ordered), _IN_CHUNK):
+            chunk = ordered[i:i + _IN_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            for source, reader in self._query(
+                    'SELECT s.name, r.name FROM nodes r '
+                    'JOIN dependencies d ON d.reader = r.id JOIN nodes s ON s.id = d.source '
+                    f'WHERE r.name IN ({placeholders}) ORDER BY r.id, d.pos', chunk):
+                if source in wanted:
+                    edges.append((source, reader))
+        return edges
+
+    def to_graph(self) -> DependencyGraph:
+        """Materialize the store as an in-memory DependencyGraph (for CSR-based algorithms)"""
+        builder = GraphBuilder()
+        rows = self._query('SELECT id, name, type FROM nodes WHERE type IS NOT NULL ORDER BY seq')
+        deps: Dict[int, List[Tuple[str, Optional[str], Optional[str]]]] = {}
+        for reader, dep, join_type, condition in self._query(
+                'SELECT d.reader, n.name, d.join_type, d.join_condition FROM dependencies d '
+                'JOIN nodes n ON n.id = d.source ORDER BY d.reader, d.pos'):
+            deps.setdefault(reader, []).append((dep, join_type, condition))
+        dependents: Dict[int, List[str]] = {}
+        for target, dept in self._query(
+                'SELECT d.target, n.name FROM dependents d '
+                'JOIN nodes n ON n.id = d.reader ORDER BY d.target, d.pos'):
+            dependents.setdefault(target, []).append(dept)
+        for node_id, name, table_type in rows:
+            edges = deps.get(node_id, ())
+            builder.add_table(
+                name, table_type,
+                [dep for dep, _, _ in edges],
+                dependents.get(node_id, ()),
+                {dep: {'type': join_type, 'condition': condition}
+                 for dep, join_type, condition in edges if join_type is not None}
+            )
+        return builder.build()
@@ -0,0 +1,449 @@
+"""
+Static scan of a Dataform project without Node
+
+Reads every ``.sqlx`` file under ``definitions/`` (on a process pool), takes
+type, schema and name from its ``config { ... }`` block and collects the
+``${ref(...)}`` and ``${resolve(...)}`` calls of the file. Arguments written
+as ``<name>_utils.CONSTANT`` are resolved with the constants that
+cleanup.parse_utils_file reads from ``includes/*_utils.js``; ``declare({...})``
+calls in ``.js`` files register source tables.
+
+The result mimics the ``tables`` of `dataform compile --json` (target, type,
+dependencyTargets, query with refs replaced by table names, fileName), so
+dataform_check.build_dependency_graph turns it into the usual graph.
+
+JavaScript is not executed: refs built from variables or in ``js { }``
+helpers, and publish()/operate() calls in ``.js`` files, are not seen. What
+cannot be resolved is reported instead of guessed, and scan output can be
+checked against a compiled graph with graph_diff.iter_graph_diff.
+"""
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .cleanup import find_config_blocks, parse_utils_file
+from .parser import sniff_encoding
+from .rendering import default_jobs
+
+# Types that `dataform compile --json` lists under "tables"
+TABLE_TYPES = ('table', 'view', 'incremental')
+
+# Blocks that are not part of the query; refs in the operations still count
+_BLOCK_KEYWORDS = ('config', 'js', 'pre_operations', 'post_operations')
+_OPERATION_BLOCKS = ('pre_operations', 'post_operations')
+
+_CALL = re.compile(r'\$\{\s*(ref|resolve)\s*\(')
+_CLOSE_PLACEHOLDER = re.compile(r'\s*\}')
+_SELF = re.compile(r'\$\{\s*self\s*\(\s*\)\s*\}')
+_UTILS_PLACEHOLDER = re.compile(r'\$\{\s*(\w+_utils)\.(\w+)\s*\}')
+_UTILS_CONSTANT = re.compile(r'^(\w+_utils)\.(\w+)$')
+_DECLARE = re.compile(r'\bdeclare\s*\(\s*\{')
+_UNSCANNED_JS = re.compile(r'\b(publish|operate|assert)\s*\(')
+_DEFAULT_DATASET = re.compile(r'^\s*defaultDataset\s*:\s*["\']?([\w-]+)', re.MULTILINE)
+
+_BATCH_SIZE = 64
+
+# (schema or None for "look up by name", name)
+Target = Tuple[Optional[str], str]
+
+
+class RefCall(NamedTuple):
+    """One ${ref(...)} or ${resolve(...)} call"""
+    kind: str
+    target: Optional[Target]   # None: arguments could not be evaluated statically
+    start: int                 # span of ${...} in the query, or -1 outside it
+    end: int
+    text: str
+
+
+class SqlxDefinition(NamedTuple):
+    """What the static scan read from one definition file"""
+    file_name: str
+    type: Optional[str]
+    schema: Optional[str]      # None: project default schema
+    name: str
+    dependencies: List[Tuple[str, Optional[Target]]]   # (source text, target)
+    refs: List[RefCall]
+    query: str
+    problems: List[str]
+
+
+class ScanResult(NamedTuple):
+    """Result of scan_project"""
+    tables: List[dict]                  # compiled-table-like objects
+    unresolved: List[Tuple[str, str]]   # (fileName, message)
+    file_count: int
+
+
+def _comment_end(text: str, pos: int) -> int:
+    """Index just past a // or /* */ comment starting at pos, or pos if none starts there"""
+    if text.startswith('//', pos):
+        end = text.find('\n', pos)
+        return len(text) if end < 0 else end
+    if text.startswith('/*', pos):
+        end = text.find('*/', pos + 2)
+        return len(text) if end < 0 else end + 2
+    return pos
+
+
+def _split_top_level(text: str, separator: str = ',') -> List[str]:
+    """Split JavaScript source at separators outside strings, comments, brackets and braces"""
+    parts = []
+    current: List[str] = []   # pieces of the current part, comments left out
+    depth = 0
+    quote = None
+    start = 0
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char == '/' and _comment_end(text, i) > i:
+            current.extend((text[start:i], ' '))
+            i = start = _comment_end(text, i)
+            continue
+        elif char in '"\'`':
+            quote = char
+        elif char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+        elif char == separator and depth == 0:
+            current.append(text[start:i])
+            parts.append(''.join(current))
+            current = []
+            start = i + 1
+        i += 1
+    current.append(text[start:])
+    parts.append(''.join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _object_entries(text: str) -> Dict[str, str]:
+    """Top-level key -> raw value source of a JavaScript object literal (braces included)"""
+    entries = {}
+    for part in _split_top_level(text.strip()[1:-1]):
+        key, colon, value = part.partition(':')
+        if colon:
+            entries[key.strip().strip('"\'')] = value.strip()
+    return entries
+
+
+def _string_value(text: str, constants: Dict[str, Dict[str, str]]) -> Optional[str]:
+    """Evaluate a string literal or <name>_utils.CONSTANT, or None if that needs JavaScript"""
+    text = text.strip()
+    match = _UTILS_CONSTANT.match(text)
+    if match:
+        return constants.get(match.group(1), {}).get(match.group(2))
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in '"\'`':
+        value = text[1:-1]
+        if text[0] == '`':
+            value = _UTILS_PLACEHOLDER.sub(
+                lambda m: constants.get(m.group(1), {}).get(m.group(2), m.group(0)), value)
+            if '${' in value:
+                return None
+        return value
+    return None
+
+
+def _target(args: List[str], constants: Dict[str, Dict[str, str]]) -> Optional[Target]:
+    """Evaluate ref()/resolve() arguments: ("name"), ("schema", "name") or ({schema, name})"""
+    if len(args) == 1 and args[0].startswith('{'):
+        entries = _object_entries(args[0])
+        name = _string_value(entries.get('name', ''), constants)
+        if not name:
+            return None
+        schema = None
+        if 'schema' in entries:
+            schema = _string_value(entries['schema'], constants)
+            if schema is None:
+                return None
+        return schema, name
+    values = [value for value in (_string_value(arg, constants) for arg in args) if value is not None]
+    if not values or len(values) > 2 or len(values) < len(args):
+        return None
+    return (None, values[0]) if len(values) == 1 else (values[0], values[1])
+
+
+def _closing_index(text: str, pos: int) -> int:
+    """Index just past the bracket closing the one opened before pos, or -1 (strings and comments skipped)"""
+    depth = 1
+    quote = None
+    while pos < len(text):
+        char = text[pos]
+        if quote:
+            if char == '\\':
+                pos += 1
+            elif char == quote:
+                quote = None
+        elif char == '/' and _comment_end(text, pos) > pos:
+            pos = _comment_end(text, pos)
+            continue
+        elif char in '"\'`':
+            quote = char
+        elif char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+            if not depth:
+                return pos + 1
+        pos += 1
+    return -1
+
+
+def _find_calls(text: str, constants: Dict[str, Dict[str, str]]) -> List[RefCall]:
+    """ref()/resolve() calls written as ${...} in text"""
+    calls = []
+    for match in _CALL.finditer(text):
+        close = _closing_index(text, match.end())
+        brace = _CLOSE_PLACEHOLDER.match(text, close) if close >= 0 else None
+        if not brace:
+            continue
+        args = _split_top_level(text[match.end():close - 1])
+        calls.append(RefCall(match.group(1), _target(args, constants), match.start(), brace.end(),
+                             text[match.start():brace.end()]))
+    return calls
+
+
+def scan_sqlx(path: str, file_name: str, constants: Dict[str, Dict[str, str]]) -> SqlxDefinition:
+    """
+    Read the config block, refs and query of one .sqlx file
+
+    Args:
+        path: File to read
+        file_name: Project-relative POSIX path (compiled fileName)
+        constants: {utils module name: {constant: value}}
+
+    Returns:
+        SqlxDefinition; schema is None when the config does not set one
+    """
+    encoding = sniff_encoding(path) or 'utf-8'
+    text = Path(path).read_text(encoding=encoding, errors='ignore').lstrip('\ufeff')
+    problems = []
+
+    blocks = sorted((start, end, keyword, block)
+                    for keyword in _BLOCK_KEYWORDS
+                    for start, end, block in find_config_blocks(text, keyword))
+    config: Dict[str, str] = {}
+    query_parts = []
+    operation_calls: List[RefCall] = []
+    pos = 0
+    for start, end, keyword, block in blocks:
+        if start < pos:
+            continue  # keyword inside an earlier block
+        query_parts.append(text[pos:start])
+        pos = end
+        if keyword == 'config' and not config:
+            config = _object_entries(block[block.index('{'):])
+        elif keyword in _OPERATION_BLOCKS:
+            operation_calls.extend(call._replace(start=-1, end=-1) for call in _find_calls(block, constants))
+    query_parts.append(text[pos:])
+    query = ''.join(query_parts).strip()
+
+    def config_string(key):
+        if key not in config:
+            return None
+        value = _string_value(config[key], constants)
+        if value is None:
+            problems.append(f"config {key} is not a constant: {config[key]}")
+        return value
+
+    table_type = config_string('type')
+    schema = config_string('schema')
+    name = config_string('name') or Path(file_name).stem
+    if table_type is None and 'type' not in config:
+        problems.append("config block has no type")
+
+    dependencies: List[Tuple[str, Optional[Target]]] = []
+    raw_dependencies = config.get('dependencies', '').strip()
+    if raw_dependencies:
+        items = _split_top_level(raw_dependencies[1:-1]) if raw_dependencies.startswith('[') \
+            else [raw_dependencies]
+        dependencies = [(item, _target([item], constants)) for item in items]
+
+    refs = _find_calls(query, constants) + operation_calls
+    return SqlxDefinition(file_name, table_type, schema, name, dependencies, refs, query, problems)
+
+
+def scan_declarations(path: str, file_name: str,
+                      constants: Dict[str, Dict[str, str]]) -> Tuple[List[Target], List[str]]:
+    """
+    Read declare({...}) calls of a definitions .js file
+
+    Returns:
+        (declared (schema or None, name) targets, problems)
+    """
+    encoding = sniff_encoding(path) or 'utf-8'
+    text = Path(path).read_text(encoding=encoding, errors='ignore')
+    targets = []
+    problems = []
+    for match in _DECLARE.finditer(text):
+        close = _closing_index(text, match.end())
+        target = _target([text[match.end() - 1:close]], constants) if close >= 0 else None
+        if target:
+            targets.append(target)
+        else:
+            problems.append(f"declare() at offset {match.start()} is not constant")
+    for call in sorted({match.group(1) for match in _UNSCANNED_JS.finditer(text)}):
+        problems.append(f"{call}() calls are not scanned")
+    return targets, problems
+
+
+def load_utils_constants(project_dir: str = '.') -> Dict[str, Dict[str, str]]:
+    """Constants of includes/*_utils.js keyed by module name (e.g. "wwim_utils")"""
+    constants = {}
+    for utils_file in sorted((Path(project_dir) / 'includes').glob('*_utils.js')):
+        values = parse_utils_file(utils_file)
+        if values:
+            constants[utils_file.stem] = values
+    return constants
+
+
+def project_default_schema(project_dir: str = '.') -> Optional[str]:
+    """defaultSchema of dataform.json or defaultDataset of workflow_settings.yaml"""
+    root = Path(project_dir)
+    try:
+        return json.loads((root / 'dataform.json').read_text(encoding='utf-8')).get('defaultSchema')
+    except (OSError, ValueError):
+        pass
+    try:
+        match = _DEFAULT_DATASET.search((root / 'workflow_settings.yaml').read_text(encoding='utf-8'))
+        return match.group(1) if match else None
+    except OSError:
+        return None
+
+
+# A scanned .sqlx file, or (file name, declared targets, problems) of a .js file
+_ScanResult = Union[SqlxDefinition, Tuple[str, List[Target], List[str]]]
+
+
+def _scan_batch(batch: List[Tuple[str, str]], constants: Dict[str, Dict[str, str]]) -> List[_ScanResult]:
+    results: List[_ScanResult] = []
+    for path, file_name in batch:
+        try:
+            if file_name.endswith('.sqlx'):
+                results.append(scan_sqlx(path, file_name, constants))
+            else:
+                results.append((file_name,) + scan_declarations(path, file_name, constants))
+        except OSError as e:
+            results.append((file_name, [], [f"unreadable: {e}"]))
+    return results
+
+
+def _definition_files(project_dir: str) -> List[Tuple[str, str]]:
+    root = Path(project_dir)
+    files = []
+    for path in sorted((root / 'definitions').rglob('*')):
+        if path.suffix in ('.sqlx', '.js') and path.is_file():
+            files.append((str(path), path.relative_to(root).as_posix()))
+    return files
+
+
+def scan_project(project_dir: str = '.', jobs: Optional[int] = 1,
+                 default_schema: Optional[str] = None) -> ScanResult:
+    """
+    Build compiled-table-like objects from the definitions, without Node
+
+    Args:
+        project_dir: Dataform project root
+        jobs: Worker processes for reading files (None: CPU count, 1: in this process)
+        default_schema: Schema of configs without one (default: from the project settings)
+
+    Returns:
+        ScanResult with tables in file order and everything left unresolved
+    """
+    constants = load_utils_constants(project_dir)
+    if default_schema is None:
+        default_schema = project_default_schema(project_dir)
+    files = _definition_files(project_dir)
+
+    jobs = default_jobs() if jobs is None else max(1, jobs)
+    batches = [files[i:i + _BATCH_SIZE] for i in range(0, len(files), _BATCH_SIZE)]
+    scan = partial(_scan_batch, constants=constants)
+    if jobs == 1 or len(batches) < 2:
+        results = [result for batch in batches for result in scan(batch)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(batches))) as pool:
+            results = [result for batch_results in pool.map(scan, batches) for result in batch_results]
+
+    unresolved: List[Tuple[str, str]] = []
+    definitions: List[SqlxDefinition] = []
+    # name -> schemas of every action and declaration, for ref("name")
+    schemas_by_name: Dict[str, List[str]] = {}
+
+    def register(schema, name):
+        schemas = schemas_by_name.setdefault(name, [])
+        if schema not in schemas:
+            schemas.append(schema)
+
+    for result in results:
+        if isinstance(result, SqlxDefinition):
+            definition = result._replace(schema=result.schema or default_schema)
+            definitions.append(definition)
+            register(definition.schema, definition.name)
+            unresolved.extend((definition.file_name, problem) for problem in definition.problems)
+        else:
+            file_name, targets, problems = result
+            for schema, name in targets:
+                register(schema or default_schema, name)
+            unresolved.extend((file_name, problem) for problem in problems)
+
+    def resolve(target: Optional[Target], file_name: str, text: str) -> Optional[Target]:
+        if target is None:
+            unresolved.append((file_name, f"cannot evaluate {text} statically"))
+            return None
+        schema, name = target
+        if schema is not None:
+            return schema, name
+        schemas = schemas_by_name.get(name, [])
+        if len(schemas) == 1 and schemas[0]:
+            return schemas[0], name
+        reason = "ambiguous" if len(schemas) > 1 else "unknown table"
+        unresolved.append((file_name, f"{reason} in {text}"))
+        return None
+
+    tables = []
+    for definition in definitions:
+        if definition.type not in TABLE_TYPES:
+            continue
+        file_name = definition.file_name
+        dependency_targets = []
+        seen = set()
+
+        def depend(target):
+            if target and target not in seen:
+                seen.add(target)
+                dependency_targets.append({"schema": target[0], "name": target[1]})
+
+        for text, dependency in definition.dependencies:
+            depend(resolve(dependency, file_name, f"dependencies entry {text}"))
+
+        query_parts = []
+        pos = 0
+        for call in definition.refs:
+            target = resolve(call.target, file_name, call.text)
+            if call.kind == 'ref':
+                depend(target)
+            if call.start >= 0:
+                query_parts.append(definition.query[pos:call.start])
+                query_parts.append(f"`{target[0]}.{target[1]}`" if target else call.text)
+                pos = call.end
+        query_parts.append(definition.query[pos:])
+        query = _SELF.sub(f"`{definition.schema}.{definition.name}`", ''.join(query_parts))
+        query = _UTILS_PLACEHOLDER.sub(
+            lambda m: constants.get(m.group(1), {}).get(m.group(2), m.group(0)), query)
+
+        tables.append({
+            "target": {"schema": definition.schema, "name": definition.name},
+            "type": definition.type,
+            "dependencyTargets": dependency_targets,
+            "query": query,
+            "fileName": file_name,
+        })
+    return ScanResult(tables, unresolved, len(files))
@@ -7,6 +7,9 @@ import re
 from pathlib import Path
 import sys
 
+# Bump whenever generate_svg_manual output changes so incremental runs re-render
+RENDERER_VERSION = 1
+
 def parse_dependencies_report(report_path):
     """Parse the dependencies_report.txt file"""
     tables = {}
@@ -87,8 +90,37 @@ def generate_table_svg(table_name, table_info, all_tables, output_dir):
     return True, svg_file
 
 
-def generate_svg_manual(table_name, table_info, all_tables, svg_file):
-    """Generate SVG manually without Graphviz dependency"""
+# Inline style of edge_labels text (kept out of <style> so unlabelled output is unchanged)
+EDGE_LABEL_STYLE = 'font-family="Arial, sans-serif" font-size="10" font-weight="bold" fill="#1565c0"'
+
+# Stroke attributes for edges highlighted by edge_styles
+EDGE_STYLES = {
+    'added': 'stroke="#2e7d32" stroke-width="2.5"',
+    'removed': 'stroke="#c62828" stroke-width="2" stroke-dasharray="6 4"',
+    'critical': 'stroke="#e65100" stroke-width="3"',
+}
+DEFAULT_EDGE_STYLE = 'stroke="#000" stroke-width="1.5"'
+
+
+def generate_svg_manual(table_name, table_info, all_tables, svg_file, edge_styles=None,
+                        edge_labels=None):
+    """Generate SVG manually without Graphviz dependency (see render_svg_manual)"""
+    svg = render_svg_manual(table_name, table_info, all_tables, edge_styles, edge_labels)
+    with open(svg_file, 'w', encoding='utf-8') as f:
+        f.write(svg)
+
+
+def render_svg_manual(table_name, table_info, all_tables, edge_styles=None, edge_labels=None):
+    """Build the SVG markup of a table diagram
+    
+    edge_styles optionally maps (dependency, reader) edges to 'added',
+    'removed' or 'critical' to highlight them, e.g. when rendering a report
+    diff or the critical path.
+    edge_labels maps (dependency, reader) edges to a short text drawn next
+    to the neighbor, e.g. an edge weight.
+    """
+    edge_styles = edge_styles or {}
+    edge_labels = edge_labels or {}
     
     # Layout parameters
     node_width = 200
@@ -191,7 +223,11 @@ def generate_svg_manual(table_name, table_info, all_tables, svg_file):
             y2 = nodes[table_name]['y']
             # Orthogonal path: horizontal then vertical
             mid_x = (x1 + x2) // 2
-            svg_lines.append(f'  <path d="M {x1} {y1} L {mid_x} {y1} L {mid_x} {y2} L {x2} {y2}" stroke="#000" stroke-width="1.5" fill="none" marker-end="url(#arrowhead)" />')
+            stroke = EDGE_STYLES.get(edge_styles.get((dep, table_name)), DEFAULT_EDGE_STYLE)
+            svg_lines.append(f'  <path d="M {x1} {y1} L {mid_x} {y1} L {mid_x} {y2} L {x2} {y2}" {stroke} fill="none" marker-end="url(#arrowhead)" />')
+            label = edge_labels.get((dep, table_name))
+            if label is not None:
+                svg_lines.append(f'  <text x="{(x1 + mid_x) // 2}" y="{y1 - 4}" text-anchor="middle" {EDGE_LABEL_STYLE}>{label}</text>')
     
     for dept in dependents:
         if dept in nodes:
@@ -201,7 +237,11 @@ def generate_svg_manual(table_name, table_info, all_tables, svg_file):
             y2 = nodes[dept]['y']
             # Orthogonal path: horizontal then vertical
             mid_x = (x1 + x2) // 2
-            svg_lines.append(f'  <path d="M {x1} {y1} L {mid_x} {y1} L {mid_x} {y2} L {x2} {y2}" stroke="#000" stroke-width="1.5" fill="none" marker-end="url(#arrowhead)" />')
+            stroke = EDGE_STYLES.get(edge_styles.get((table_name, dept)), DEFAULT_EDGE_STYLE)
+            svg_lines.append(f'  <path d="M {x1} {y1} L {mid_x} {y1} L {mid_x} {y2} L {x2} {y2}" {stroke} fill="none" marker-end="url(#arrowhead)" />')
+            label = edge_labels.get((table_name, dept))
+            if label is not None:
+                svg_lines.append(f'  <text x="{(mid_x + x2) // 2}" y="{y2 - 4}" text-anchor="middle" {EDGE_LABEL_STYLE}>{label}</text>')
     
     # Draw nodes
     for node_name, pos in nodes.items():
@@ -270,9 +310,96 @@ def generate_svg_manual(table_name, table_info, all_tables, svg_file):
                 svg_lines.append(f'  <text x="{pos["x"]}" y="{join_y}" text-anchor="middle" class="join-condition" fill="#666">{condition}</text>')
     
     svg_lines.append('</svg>')
-    
+    return '\n'.join(svg_lines)
+
+def generate_layered_svg(center, layers, edges, all_tables, svg_file, edge_labels=None):
+    """Draw a multi-column lineage diagram to svg_file (see render_layered_svg)"""
+    svg = render_layered_svg(center, layers, edges, all_tables, edge_labels)
     with open(svg_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(svg_lines))
+        f.write(svg)
+
+
+def render_layered_svg(center, layers, edges, all_tables, edge_labels=None):
+    """Build the SVG markup of a multi-column lineage diagram
+    
+    Args:
+        center: Name of the highlighted table (None: highlight nothing)
+        layers: Dict of column index -> node names; negative columns are
+            upstream, positive downstream, 0 holds the center
+        edges: (source, target) pairs meaning target reads from source
+        all_tables: Mapping used to look up node types
+        edge_labels: Optional (source, target) -> text drawn on the edge
+    """
+    edge_labels = edge_labels or {}
+    node_width = 200
+    node_height = 50
+    h_spacing = 120
+    v_spacing = 30
+    margin = 50
+    colors = {
+        'table': '#e1f5ff',
+        'view': '#fff3e0',
+        'operations': '#f3e5f5'
+    }
+    
+    columns = sorted(layers)
+    max_rows = max(max(len(layers[c]) for c in columns), 1)
+    canvas_width = margin * 2 + node_width * len(columns) + h_spacing * (len(columns) - 1)
+    canvas_height = margin * 2 + node_height * max_rows + v_spacing * (max_rows - 1)
+    
+    nodes = {}
+    for col_index, column in enumerate(columns):
+        names = layers[column]
+        x = margin + node_width // 2 + col_index * (node_width + h_spacing)
+        start_y = canvas_height // 2 - ((len(names) - 1) * (node_height + v_spacing)) // 2
+        for row, name in enumerate(names):
+            nodes[name] = (x, start_y + row * (node_height + v_spacing))
+    
+    svg_lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<svg width="{canvas_width}" height="{canvas_height}" xmlns="http://www.w3.org/2000/svg">',
+        '  <defs>',
+        '    <marker id="arrowhead" markerWidth="6" markerHeight="6" refX="5" refY="3" orient="auto">',
+        '      <polygon points="0 0, 6 3, 0 6" fill="#000" />',
+        '    </marker>',
+        '  </defs>',
+        '  <style>',
+        '    .node-text { font-family: Arial, sans-serif; font-size: 12px; fill: #333; }',
+        '    .type-badge { font-family: Arial, sans-serif; font-size: 10px; fill: #666; }',
+        '  </style>',
+    ]
+    
+    for source, target in edges:
+        if source in nodes and target in nodes:
+            x1, y1 = nodes[source]
+            x2, y2 = nodes[target]
+            x1 += node_width // 2
+            x2 -= node_width // 2
+            mid_x = (x1 + x2) // 2
+            svg_lines.append(f'  <path d="M {x1} {y1} L {mid_x} {y1} L {mid_x} {y2} L {x2} {y2}" stroke="#000" stroke-width="1.2" fill="none" opacity="0.6" marker-end="url(#arrowhead)" />')
+            label = edge_labels.get((source, target))
+            if label is not None:
+                svg_lines.append(f'  <text x="{mid_x + 4}" y="{(y1 + y2) // 2 - 3}" {EDGE_LABEL_STYLE}>{label}</text>')
+    
+    for name, (x, y) in nodes.items():
+        node_type = all_tables.get(name, {}).get('type', 'unknown')
+        if name == center:
+            fill, border, stroke_width = '#ffeb3b', '#f57f17', 3
+        else:
+            fill, border, stroke_width = colors.get(node_type, '#f5f5f5'), '#666', 1
+        svg_lines.append(f'  <rect x="{x - node_width // 2}" y="{y - node_height // 2}" width="{node_width}" height="{node_height}" '
+                        f'fill="{fill}" stroke="{border}" stroke-width="{stroke_width}" rx="5" />')
+        schema_name = name.split('.')[0] if '.' in name else ''
+        display_name = name.split('.')[-1]
+        if len(display_name) > 28:
+            display_name = display_name[:25] + '...'
+        if schema_name:
+            svg_lines.append(f'  <text x="{x}" y="{y - 10}" text-anchor="middle" class="type-badge" fill="#999">{schema_name}</text>')
+        svg_lines.append(f'  <text x="{x}" y="{y + 5}" text-anchor="middle" class="node-text">{display_name}</text>')
+        svg_lines.append(f'  <text x="{x}" y="{y + 19}" text-anchor="middle" class="type-badge">{node_type}</text>')
+    
+    svg_lines.append('</svg>')
+    return '\n'.join(svg_lines)
 
 def generate_index_html(tables, schema, output_dir):
     """Generate an index.html to view all SVGs"""
@@ -0,0 +1,196 @@
+"""
+Structural analysis of a DependencyGraph: strongly connected components,
+dependency cycles and topological levels
+
+Components are numbered in topological order of the data flow: a table's
+dependencies always belong to a component with a smaller (or the same)
+number than the table itself.
+"""
+from array import array
+from typing import List, Optional, Tuple
+
+from .graph import ID_TYPECODE, DependencyGraph
+
+
+def strongly_connected_components(graph: DependencyGraph) -> Tuple[array, int]:
+    """
+    Tarjan's algorithm over dependency edges, without recursion
+
+    Every node takes part, including names that are only referenced.
+
+    Args:
+        graph: Graph to analyse
+
+    Returns:
+        (component id per node id, number of components)
+    """
+    node_count = graph.node_count
+    offsets, targets = graph.dependency_csr()
+    unvisited = -1
+    index = array(ID_TYPECODE, [unvisited]) * node_count
+    low = array(ID_TYPECODE, [0]) * node_count
+    component = array(ID_TYPECODE, [unvisited]) * node_count
+    on_stack = bytearray(node_count)
+    stack: List[int] = []
+    counter = 0
+    component_count = 0
+
+    for root in range(node_count):
+        if index[root] != unvisited:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        # (node, next edge position) frames replace the recursion
+        work = [(root, offsets[root])]
+        while work:
+            node, pos = work[-1]
+            end = offsets[node + 1]
+            while pos < end:
+                neighbor = targets[pos]
+                pos += 1
+                if index[neighbor] == unvisited:
+                    work[-1] = (node, pos)
+                    index[neighbor] = low[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack[neighbor] = 1
+                    work.append((neighbor, offsets[neighbor]))
+                    break
+                if on_stack[neighbor] and index[neighbor] < low[node]:
+                    low[node] = index[neighbor]
+            else:
+                # All edges of node explored
+                work.pop()
+                if low[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component[member] = component_count
+                        if member == node:
+                            break
+                    component_count += 1
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+
+    return component, component_count
+
+
+def component_members(component: array, component_count: int) -> List[List[int]]:
+    """Group node ids by component id"""
+    members: List[List[int]] = [[] for _ in range(component_count)]
+    for node_id, comp in enumerate(component):
+        members[comp].append(node_id)
+    return members
+
+
+def condensation_edges(graph: DependencyGraph, component: array) -> List[Tuple[int, int]]:
+    """
+    Data-flow edges between components
+
+    Args:
+        graph: Graph to analyse
+        component: Component id per node id (from strongly_connected_components)
+
+    Returns:
+        Unique (source component, reader component) pairs; source < reader
+    """
+    offsets, targets = graph.dependency_csr()
+    edges = set()
+    for node_id in range(graph.node_count):
+        reader = component[node_id]
+        for pos in range(offsets[node_id], offsets[node_id + 1]):
+            source = component[targets[pos]]
+            if source != reader:
+                edges.add((source, reader))
+    return sorted(edges)
+
+
+def find_cycles(graph: DependencyGraph, component: Optional[array] = None) -> List[List[str]]:
+    """
+    List dependency cycles
+
+    Args:
+        graph: Graph to analyse
+        component: Precomputed component ids (default: computed here)
+
+    Returns:
+        One sorted list of table names per strongly connected component
+        with more than one member or a self-dependency, largest first
+    """
+    if component is None:
+        component, count = strongly_connected_components(graph)
+    else:
+        count = max(component, default=-1) + 1
+    members = component_members(component, count)
+    offsets, targets = graph.dependency_csr()
+
+    cycles = []
+    for nodes in members:
+        if len(nodes) == 1:
+            node_id = nodes[0]
+            if node_id not in targets[offsets[node_id]:offsets[node_id + 1]]:
+                continue
+        cycles.append(sorted(graph.name(node_id) for node_id in nodes))
+    cycles.sort(key=lambda names: (-len(names), names))
+    return cycles
+
+
+def topological_levels(graph: DependencyGraph, component: Optional[array] = None) -> array:
+    """
+    Execution level of every recorded table
+
+    Level 0 tables depend on no other recorded table; every other table sits
+    one level above its deepest recorded dependency. Names that are only
+    referenced (declarations, external sources) are ignored and get -1.
+    Members of a cycle share one level. Runs in O(V + E).
+
+    Args:
+        graph: Graph to analyse
+        component: Precomputed component ids (default: computed here)
+
+    Returns:
+        Level per node id
+    """
+    if component is None:
+        component, count = strongly_connected_components(graph)
+    else:
+        count = max(component, default=-1) + 1
+    offsets, targets = graph.dependency_csr()
+    members = component_members(component, count)
+
+    component_level = array(ID_TYPECODE, [0]) * count
+    levels = array(ID_TYPECODE, [-1]) * graph.node_count
+    # Components are numbered in topological order, so dependencies are done first
+    for comp, nodes in enumerate(members):
+        level = 0
+        for node_id in nodes:
+            if not graph.has_record(node_id):
+                continue
+            for pos in range(offsets[node_id], offsets[node_id + 1]):
+                dep = targets[pos]
+                dep_comp = component[dep]
+                if dep_comp != comp and graph.has_record(dep):
+                    candidate = component_level[dep_comp] + 1
+                    if candidate > level:
+                        level = candidate
+        component_level[comp] = level
+        for node_id in nodes:
+            if graph.has_record(node_id):
+                levels[node_id] = level
+    return levels
+
+
+def level_widths(levels: array) -> List[int]:
+    """Number of tables on each level, i.e. how many can run in parallel"""
+    widths: List[int] = []
+    for level in levels:
+        if level < 0:
+            continue
+        while len(widths) <= level:
+            widths.append(0)
+        widths[level] += 1
+    return widths
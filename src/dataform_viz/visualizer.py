@@ -1,56 +1,195 @@
 """
 Main visualizer class
 """
+import fnmatch
+import re
 from pathlib import Path
-from typing import Optional, List
-from .parser import parse_dependencies_report
-from .svg_generator import generate_table_svg, generate_svg_manual
+from typing import Callable, Dict, Iterable, Iterator, Mapping, Optional, List, Tuple, Union
+from .cache import ReportCache, load_graph
+from .dataform_check import build_dependency_graph, iter_compiled_json_tables
+from .graph import DependencyGraph
+from .lineage import LineageIndex
+from .reachability import ReachabilityIndex
+from .rendering import EdgeStyles, RenderFailure, RenderTask, plain_info, render_incremental
+from .report_index import ReportIndex
+from .schema_graph import SchemaGraph, render_schema_neighbors, render_schema_overview
+from .sqlite_store import SqliteGraph, load_store
+from .svg_generator import generate_table_svg, render_layered_svg
 from .master_index import collect_all_svgs, generate_master_index
 
+BACKENDS = ('memory', 'sqlite')
+
+
+def _load_compiled_graph(json_path: str):
+    """Build a DependencyGraph from a saved compile output file, streaming its tables"""
+    return build_dependency_graph(iter_compiled_json_tables(json_path), log=None)
+
+
+def compile_exclude_patterns(patterns: Iterable[str]) -> Callable[[str], bool]:
+    """
+    Compile schema exclude globs (e.g. 'refined_*', 'tmp_?', '[ab]_raw') into one matcher
+    
+    Args:
+        patterns: fnmatch-style patterns, matched case-sensitively against schema names
+        
+    Returns:
+        Function returning True for excluded schemas
+    """
+    patterns = list(patterns)
+    if not patterns:
+        return lambda schema: False
+    regex = re.compile('|'.join(f'(?:{fnmatch.translate(p)})' for p in patterns))
+    return lambda schema: regex.match(schema) is not None
+
 
 class DependencyVisualizer:
     """Main class for generating dependency visualizations"""
     
-    def __init__(self, report_path: str = "dependencies_report.txt"):
+    def __init__(
+        self,
+        report_path: str = "dependencies_report.txt",
+        use_cache: bool = True,
+        use_index: bool = False,
+        backend: str = 'memory'
+    ):
         """
         Initialize visualizer
         
         Args:
             report_path: Path to dependencies report file
+            use_cache: Load the parsed graph from <report>.graphcache when it is
+                valid, and rebuild the cache in the background when it is stale.
+                Also controls writing the <report>.tableindex sidecar.
+            use_index: Render single schemas from the offset index instead of
+                loading the whole report
+            backend: 'memory' keeps the parsed graph in this process; 'sqlite'
+                loads it into <report>.sqlite and queries it lazily
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend} (expected one of {', '.join(BACKENDS)})")
         self.report_path = Path(report_path)
-        self.tables = None
+        self.use_cache = use_cache
+        self.use_index = use_index
+        self.backend = backend
+        self.cache = ReportCache(str(self.report_path))
+        self.cache_stats = self.cache.stats
+        self.tables: Optional[Union[DependencyGraph, SqliteGraph]] = None
+        self._graph: Optional[DependencyGraph] = None
+        self._index: Optional[ReportIndex] = None
+        self._lineage: Optional[LineageIndex] = None
+        self._reachability: Optional[ReachabilityIndex] = None
+        # (graph it was built from, aggregate)
+        self._schema_graph: Optional[Tuple[DependencyGraph, SchemaGraph]] = None
+        self.render_failures: List[RenderFailure] = []
+        self.render_stats: Dict[str, int] = {'rendered': 0, 'skipped': 0, 'removed': 0}
+    
+    @classmethod
+    def from_compiled(cls, compiled, report_path: str = "dataform_compiled.json",
+                      jobs: Optional[int] = 1):
+        """
+        Create a visualizer from `dataform compile --json` output
+        
+        Args:
+            compiled: Graph dict (e.g. from dataform_check.get_dataform_graph())
+                or an iterable of table objects (e.g. iter_dataform_tables())
+            report_path: Nominal report path (not read)
+            jobs: Worker processes for JOIN parsing (None: CPU count, 1: no process pool)
+            
+        Returns:
+            DependencyVisualizer with the graph already loaded
+        """
+        tables = compiled.get("tables", []) if isinstance(compiled, dict) else compiled
+        viz = cls(report_path, use_cache=False)
+        viz.tables = build_dependency_graph(tables, log=None, jobs=jobs)
+        return viz
+    
+    @property
+    def is_compiled_json(self) -> bool:
+        """True if the report path is a saved `dataform compile --json` output"""
+        return self.report_path.suffix.lower() == '.json'
         
     def load_report(self):
-        """Load and parse the dependencies report"""
-        if self.tables is None:
-            self.tables = parse_dependencies_report(str(self.report_path))
+        """Load the dependencies report into a DependencyGraph (cached on disk)"""
+        if self.tables is None and self.backend == 'sqlite':
+            report = str(self.report_path)
+            records = (lambda: _load_compiled_graph(report).items()) if self.is_compiled_json else None
+            self.tables = load_store(report, records=records, stats=self.cache_stats)
+        elif self.tables is None:
+            loader = _load_compiled_graph if self.is_compiled_json else None
+            self.tables = load_graph(
+                str(self.report_path), use_cache=self.use_cache, cache=self.cache,
+                loader=loader
+            )
         return self.tables
     
-    def generate_schema_svgs(
-        self, 
-        schema: str, 
-        output_dir: str = "output",
-        exclude_patterns: Optional[List[str]] = None
-    ) -> int:
+    def load_graph(self):
         """
-        Generate SVG diagrams for all tables in a schema
+        Return the graph as an in-memory DependencyGraph
+        
+        Needed by the CSR-based algorithms (lineage memo, reachability,
+        topology, schema aggregation); the SQLite backend materializes it once.
+        """
+        graph = self.load_report()
+        if isinstance(graph, SqliteGraph):
+            if self._graph is None:
+                self._graph = graph.to_graph()
+            return self._graph
+        return graph
+    
+    def _neighbor_lookup(self):
+        """Mapping used for neighbor types while rendering"""
+        graph = self.load_report()
+        return graph.type_view() if isinstance(graph, SqliteGraph) else graph
+    
+    def load_index(self) -> ReportIndex:
+        """Load (or build) the table offset index of the report"""
+        if self._index is None:
+            self._index = ReportIndex.load_or_build(
+                str(self.report_path), write=self.use_cache
+            )
+        return self._index
+    
+    def get_table(self, name: str) -> Optional[dict]:
+        """
+        Look up a single table without parsing the whole report
         
         Args:
-            schema: Schema name to generate
-            output_dir: Base output directory
-            exclude_patterns: List of schema patterns to exclude (e.g., ['refined_*'])
+            name: Full table name (schema.table)
             
         Returns:
-            Number of SVGs generated
+            Table info (type, dependencies, dependents, join_info) or None
         """
-        self.load_report()
+        if self.tables is not None or self.is_compiled_json:
+            return self.load_report().get(name)
+        return self.load_index().get(name)
+    
+    def iter_schema(self, schema: str) -> Iterator[Tuple[str, dict]]:
+        """
+        Iterate over the tables of one schema, decoding only their blocks
         
-        # Filter to schema
-        schema_tables = {
-            k: v for k, v in self.tables.items() 
-            if k.startswith(schema + '.')
-        }
+        Args:
+            schema: Schema name
+            
+        Yields:
+            (table_name, table_info) tuples
+        """
+        if self.tables is not None or self.is_compiled_json:
+            yield from self.load_report().iter_schema(schema)
+            return
+        yield from self.load_index().iter_schema(schema)
+    
+    def _schema_tasks(self, schema: str, output_dir: str) -> Tuple[List[RenderTask], Mapping]:
+        """Create the schema's output folder and return (render tasks, neighbor lookup)"""
+        if (self.tables is None and self.use_index and not self.is_compiled_json
+                and self.backend == 'memory'):
+            # Only this schema's blocks are decoded; neighbor types come
+            # straight from the index
+            schema_tables = dict(self.iter_schema(schema))
+            all_tables = self.load_index().type_view()
+        else:
+            self.load_report()
+            schema_tables = dict(self.iter_schema(schema))
+            all_tables = self._neighbor_lookup()
         
         if not schema_tables:
             raise ValueError(f"No tables found for schema: {schema}")
@@ -61,66 +200,269 @@ class DependencyVisualizer:
         schema_output = base_output / f'dependencies_{schema}'
         schema_output.mkdir(exist_ok=True)
         
-        # Generate SVGs
-        count = 0
+        tasks = []
         for table_name, table_info in schema_tables.items():
             safe_name = table_name.replace('.', '_').replace('-', '_')
             svg_file = schema_output / f"{safe_name}.svg"
+            tasks.append((table_name, plain_info(table_info), svg_file))
+        return tasks, all_tables
+    
+    def generate_schema_svgs(
+        self, 
+        schema: str, 
+        output_dir: str = "output",
+        exclude_patterns: Optional[List[str]] = None,
+        jobs: Optional[int] = 1,
+        force: bool = False,
+        edge_styles: Optional[EdgeStyles] = None
+    ) -> int:
+        """
+        Generate SVG diagrams for all tables in a schema
+        
+        Args:
+            schema: Schema name to generate
+            output_dir: Base output directory
+            exclude_patterns: List of schema patterns to exclude (e.g., ['refined_*'])
+            jobs: Worker processes (None: CPU count, 1: no process pool)
+            force: Re-render diagrams the render manifest reports as unchanged
+            edge_styles: Edges to highlight, e.g. critical_path.critical_edge_styles()
             
-            generate_svg_manual(table_name, table_info, self.tables, svg_file)
-            count += 1
+        Returns:
+            Number of up-to-date SVGs (rendered or unchanged). Tables that
+            failed to render are listed in self.render_failures as
+            (table_name, error); rendered/skipped/removed counts are in
+            self.render_stats.
+        """
+        tasks, all_tables = self._schema_tasks(schema, output_dir)
         
-        return count
+        # Generate SVGs whose inputs changed since the last run
+        self.render_stats, self.render_failures = render_incremental(
+            tasks, all_tables, output_dir, jobs=jobs, force=force, edge_styles=edge_styles
+        )
+        
+        # The cache rebuild overlaps with rendering; make sure it is on disk
+        self.cache.wait()
+        return len(tasks) - len(self.render_failures)
     
     def generate_all_schemas(
         self, 
         output_dir: str = "output",
-        exclude_patterns: Optional[List[str]] = None
+        exclude_patterns: Optional[List[str]] = None,
+        jobs: Optional[int] = 1,
+        force: bool = False,
+        edge_styles: Optional[EdgeStyles] = None
     ) -> dict:
         """
         Generate SVG diagrams for all schemas
         
+        Tables of every schema go through a single process pool.
+        
         Args:
             output_dir: Base output directory
-            exclude_patterns: List of schema patterns to exclude (default: ['refined_*'])
+            exclude_patterns: Glob patterns of schemas to exclude (default: ['refined_*'])
+            jobs: Worker processes (None: CPU count, 1: no process pool)
+            force: Re-render diagrams the render manifest reports as unchanged
+            edge_styles: Edges to highlight, e.g. critical_path.critical_edge_styles()
             
         Returns:
-            Dictionary mapping schema names to number of tables generated
+            Dictionary mapping schema names to number of up-to-date diagrams.
+            Tables that failed to render are listed in self.render_failures,
+            rendered/skipped/removed counts are in self.render_stats.
         """
         if exclude_patterns is None:
             exclude_patterns = ['refined_*']
         
-        self.load_report()
-        
-        # Get all unique schemas
-        schemas = set()
-        for table_name in self.tables.keys():
-            if '.' in table_name:
-                schema = table_name.split('.')[0]
-                # Check exclusion patterns
-                excluded = False
-                for pattern in exclude_patterns:
-                    if pattern.endswith('*'):
-                        if schema.startswith(pattern[:-1]):
-                            excluded = True
-                            break
-                if not excluded:
-                    schemas.add(schema)
-        
-        # Generate for each schema
+        # Exclusions are checked once per schema, not once per table
+        is_excluded = compile_exclude_patterns(exclude_patterns)
+        schemas = [schema for schema in self.load_report().schemas() if not is_excluded(schema)]
+        
+        # Collect every schema's tasks, then render them together
+        tasks = []
         results = {}
         for schema in sorted(schemas):
-            count = self.generate_schema_svgs(schema, output_dir)
-            results[schema] = count
+            schema_tasks, _ = self._schema_tasks(schema, output_dir)
+            tasks.extend(schema_tasks)
+            results[schema] = len(schema_tasks)
         
+        self.render_stats, self.render_failures = render_incremental(
+            tasks, self._neighbor_lookup(), output_dir, jobs=jobs, force=force,
+            edge_styles=edge_styles
+        )
+        for table_name, _ in self.render_failures:
+            results[table_name.split('.')[0]] -= 1
+        
+        self.cache.wait()
         return results
     
-    def generate_master_index(self, output_dir: str = "output") -> Path:
+    def lineage(self) -> LineageIndex:
+        """Return the memoized lineage engine for the loaded graph"""
+        graph = self.load_graph()
+        if self._lineage is None or self._lineage.graph is not graph:
+            self._lineage = LineageIndex(graph)
+        return self._lineage
+    
+    def upstream(self, name: str, depth: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Tables the given table reads from, directly or transitively
+        
+        Args:
+            name: Full table name
+            depth: Maximum number of hops (None: unlimited)
+            
+        Returns:
+            (table_name, distance) pairs ordered by distance
+        """
+        graph = self.load_report()
+        if isinstance(graph, SqliteGraph):
+            return graph.upstream(name, depth)
+        return self.lineage().upstream(name, depth)
+    
+    def downstream(self, name: str, depth: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Tables that read from the given table, directly or transitively
+        
+        Args:
+            name: Full table name
+            depth: Maximum number of hops (None: unlimited)
+            
+        Returns:
+            (table_name, distance) pairs ordered by distance
+        """
+        graph = self.load_report()
+        if isinstance(graph, SqliteGraph):
+            return graph.downstream(name, depth)
+        return self.lineage().downstream(name, depth)
+    
+    def reachability(self) -> ReachabilityIndex:
+        """
+        Return the reachability index of the loaded graph
+        
+        With caching enabled it is read from (or written to) <report>.reachability.
+        """
+        graph = self.load_graph()
+        if self._reachability is None or self._reachability.graph is not graph:
+            if self.use_cache and self.report_path.exists():
+                self._reachability = ReachabilityIndex.load_or_build(str(self.report_path), graph)
+            else:
+                self._reachability = ReachabilityIndex.build(graph)
+        return self._reachability
+    
+    def reaches(self, source: str, target: str) -> bool:
+        """
+        True if source feeds target, directly or transitively (constant time)
+        
+        Args:
+            source: Upstream table name
+            target: Downstream table name
+        """
+        return self.reachability().reaches(source, target)
+    
+    def generate_lineage_svg(
+        self,
+        name: str,
+        svg_file: str,
+        depth: Optional[int] = None,
+        upstream: bool = True,
+        downstream: bool = True
+    ) -> Path:
+        """
+        Draw the lineage of a table as the subgraph induced by its closure
+        
+        Upstream tables are placed in columns left of the table by distance,
+        downstream tables to the right.
+        
+        Args:
+            name: Full table name
+            svg_file: Output path
+            depth: Maximum number of hops (None: unlimited)
+            upstream: Include upstream tables
+            downstream: Include downstream tables
+            
+        Returns:
+            Path to the SVG file
+        """
+        svg = self.render_lineage_svg(name, depth, upstream, downstream)
+        svg_path = Path(svg_file)
+        svg_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(svg_path, 'w', encoding='utf-8') as f:
+            f.write(svg)
+        return svg_path
+    
+    def render_lineage_svg(
+        self,
+        name: str,
+        depth: Optional[int] = None,
+        upstream: bool = True,
+        downstream: bool = True
+    ) -> str:
+        """Build the markup written by generate_lineage_svg"""
+        graph = self.load_report()
+        layers = {0: [name]}
+        if upstream:
+            for table_name, distance in self.upstream(name, depth):
+                layers.setdefault(-distance, []).append(table_name)
+        if downstream:
+            for table_name, distance in self.downstream(name, depth):
+                layers.setdefault(distance, []).append(table_name)
+        
+        names = [table_name for column in layers.values() for table_name in column]
+        edges = (graph if isinstance(graph, SqliteGraph) else self.lineage()).induced_edges(names)
+        return render_layered_svg(name, layers, edges, self._neighbor_lookup())
+    
+    def schema_graph(self) -> SchemaGraph:
+        """Return the schema-level aggregate of the loaded graph"""
+        graph = self.load_graph()
+        if self._schema_graph is None or self._schema_graph[0] is not graph:
+            self._schema_graph = (graph, SchemaGraph.from_graph(graph))
+        return self._schema_graph[1]
+    
+    def generate_schema_graph_svgs(
+        self,
+        output_dir: str = "output",
+        schemas: Optional[Iterable[str]] = None,
+        exclude_patterns: Optional[List[str]] = None
+    ) -> Tuple[Path, int]:
+        """
+        Render the schema overview and one "schema neighbors" diagram per schema
+        
+        Args:
+            output_dir: Output directory; the overview goes to schema_overview.svg,
+                neighbor diagrams to schema_neighbors/<schema>.svg
+            schemas: Only render neighbor diagrams for these schemas (default: all)
+            exclude_patterns: Schema globs to skip for neighbor diagrams
+            
+        Returns:
+            (overview path, number of neighbor diagrams)
+        """
+        schema_graph = self.schema_graph()
+        output_path = Path(output_dir)
+        overview = render_schema_overview(schema_graph, output_path / "schema_overview.svg")
+        
+        excluded = compile_exclude_patterns(exclude_patterns or [])
+        labels = schema_graph.node_labels()
+        names = schema_graph.schemas() if schemas is None else list(schemas)
+        count = 0
+        for schema in names:
+            if excluded(schema):
+                continue
+            if schema not in labels:
+                raise ValueError(f"Schema not found: {schema}")
+            safe_name = schema.replace('.', '_').replace('-', '_')
+            render_schema_neighbors(schema_graph, schema,
+                                    output_path / "schema_neighbors" / f"{safe_name}.svg",
+                                    labels=labels)
+            count += 1
+        return overview, count
+    
+    def generate_master_index(self, output_dir: str = "output",
+                              critical: Optional[Dict[str, str]] = None) -> Path:
         """
         Generate master index.html to view all diagrams
         
         Args:
             output_dir: Output directory containing schema folders
+            critical: Critical path tables in run order -> duration text,
+                highlighted in the sidebar (see critical_path.index_labels)
             
         Returns:
             Path to generated index file
@@ -131,7 +473,7 @@ class DependencyVisualizer:
         if not schemas:
             raise ValueError("No dependency folders found. Generate SVGs first.")
         
-        html_content = generate_master_index(schemas)
+        html_content = generate_master_index(schemas, critical)
         
         output_file = output_path / 'dependencies_master_index.html'
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -0,0 +1,176 @@
+"""Tests for affected module"""
+import json
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+import subprocess
+from dataform_viz.affected import affected_actions, git_changed_files, index_file_targets, normalize_file_name
+from dataform_viz import dataform_check
+from dataform_viz.cli import main
+from dataform_viz.dataform_check import build_dependency_graph
+
+
+def table(schema, name, file_name, deps=()):
+    return {
+        "target": {"database": "p", "schema": schema, "name": name},
+        "type": "table",
+        "fileName": file_name,
+        "dependencyTargets": [{"database": "p", "schema": s, "name": n} for s, n in deps],
+        "query": "SELECT 1",
+    }
+
+
+COMPILED = [
+    table("raw", "events", "definitions/raw/events.sqlx"),
+    table("stg", "orders", "definitions/stg/orders.sqlx", [("raw", "orders_src")]),
+    table("stg", "events", "definitions/stg/events.sqlx", [("raw", "events")]),
+    table("mart", "revenue", "definitions/mart/revenue.sqlx", [("stg", "orders"), ("stg", "events")]),
+    table("mart", "kpis", "definitions/mart/revenue.sqlx", [("mart", "revenue")]),
+    table("mart", "unrelated", "definitions/mart/unrelated.sqlx"),
+]
+
+
+def load(tables=COMPILED):
+    file_targets = {}
+    graph = build_dependency_graph(index_file_targets(tables, file_targets),
+                                   log=None, parse_joins=False)
+    return graph, file_targets
+
+
+class TestAffectedActions:
+    """Tests for the changed-files closure"""
+
+    def test_downstream_closure_in_topological_order(self):
+        """Test that changed tables and their readers are returned dependencies first"""
+        graph, file_targets = load()
+
+        result = affected_actions(graph, file_targets, ["definitions/raw/events.sqlx"])
+
+        assert result.actions == ["raw.events", "stg.events", "mart.revenue", "mart.kpis"]
+        assert not result.full_rebuild
+
+    def test_one_file_many_targets(self):
+        """Test that every target compiled from a file is selected"""
+        graph, file_targets = load()
+
+        result = affected_actions(graph, file_targets, ["./definitions/mart/revenue.sqlx"])
+
+        assert result.changed_targets == ["mart.kpis", "mart.revenue"]
+        assert result.actions == ["mart.revenue", "mart.kpis"]
+
+    def test_unmatched_and_global_files(self):
+        """Test that unrelated files are reported and includes trigger a full rebuild"""
+        graph, file_targets = load()
+
+        result = affected_actions(graph, file_targets, ["README.md"])
+        assert result.actions == [] and result.unmatched_files == ["README.md"]
+
+        result = affected_actions(graph, file_targets, ["includes/constants.js"])
+        assert result.full_rebuild
+        assert sorted(result.actions) == sorted(graph)
+
+    def test_git_changes_relative_to_project_in_subdirectory(self):
+        """Test that a project below the repository root gets fileName-relative paths"""
+        repo = tempfile.mkdtemp()
+        try:
+            project = Path(repo) / "proj"
+            (project / "definitions").mkdir(parents=True)
+            (project / "definitions" / "a.sqlx").write_text("SELECT 1\n", encoding='utf-8')
+            (Path(repo) / "README.md").write_text("repo\n", encoding='utf-8')
+            git = ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+            subprocess.run(git + ['init', '-q', '-b', 'main'], cwd=repo, check=True)
+            subprocess.run(git + ['add', '.'], cwd=repo, check=True)
+            subprocess.run(git + ['commit', '-q', '-m', 'base'], cwd=repo, check=True)
+            (project / "definitions" / "a.sqlx").write_text("SELECT 2\n", encoding='utf-8')
+            (Path(repo) / "README.md").write_text("changed\n", encoding='utf-8')
+            subprocess.run(git + ['commit', '-q', '-am', 'change'], cwd=repo, check=True)
+
+            changed = git_changed_files('main~1', cwd=str(project))
+        finally:
+            shutil.rmtree(repo)
+
+        assert changed == ["definitions/a.sqlx"]
+        graph, file_targets = load([table("s", "a", "definitions/a.sqlx")])
+        assert affected_actions(graph, file_targets, changed).actions == ["s.a"]
+
+    def test_normalize_file_name(self):
+        """Test path normalization"""
+        assert normalize_file_name(".\\definitions\\a.sqlx") == "definitions/a.sqlx"
+        assert normalize_file_name(str(Path.cwd() / "definitions" / "a.sqlx")) == "definitions/a.sqlx"
+
+
+class TestAffectedCommand:
+    """Tests for the affected subcommand"""
+
+    def setup_method(self):
+        """Write a saved compile output"""
+        self.test_dir = tempfile.mkdtemp()
+        self.compiled = Path(self.test_dir) / "compiled.json"
+        self.compiled.write_text('{"level":"INFO"} ' + json.dumps({"tables": COMPILED}),
+                                 encoding='utf-8')
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def test_actions_output(self, capsys, monkeypatch):
+        """Test the --actions line"""
+        monkeypatch.setattr('sys.argv', [
+            'dataform-deps', '--report', str(self.compiled),
+            'affected', 'definitions/stg/orders.sqlx'
+        ])
+
+        assert main() == 0
+
+        assert capsys.readouterr().out.strip() == (
+            "--actions stg.orders mart.revenue mart.kpis"
+        )
+
+    def test_compile_progress_stays_off_stdout(self, capsys, monkeypatch):
+        """Test that compile and cache messages go to stderr so stdout stays parseable"""
+        def fake_compile(cmd=None, chunk_size=None, log=print):
+            log("Compiling Dataform graph (this may take a moment)...")
+            return iter(COMPILED)
+
+        monkeypatch.chdir(self.test_dir)
+        monkeypatch.setattr(dataform_check, 'iter_dataform_tables', fake_compile)
+        argv = ['dataform-deps', '--compile', 'affected', 'definitions/stg/orders.sqlx', '--format', 'json']
+
+        for expected in ("Compiling Dataform graph", "Using cached compile result"):
+            monkeypatch.setattr('sys.argv', argv)
+            assert main() == 0
+            captured = capsys.readouterr()
+            assert json.loads(captured.out)["actions"] == ["stg.orders", "mart.revenue", "mart.kpis"]
+            assert expected in captured.err
+
+    def test_operations_and_assertions_not_selected(self, capsys, monkeypatch):
+        """Test the documented limitation: only the compiled tables array is read"""
+        compiled = json.loads(self.compiled.read_text(encoding='utf-8').split(' ', 1)[1])
+        compiled["operations"] = [table("ops", "grant", "definitions/ops/grant.sqlx")]
+        compiled["assertions"] = [table("mart", "revenue_check", "definitions/mart/revenue_check.sqlx",
+                                        [("mart", "revenue")])]
+        self.compiled.write_text(json.dumps(compiled), encoding='utf-8')
+        monkeypatch.setattr('sys.argv', [
+            'dataform-deps', '--report', str(self.compiled), 'affected', '--format', 'json',
+            'definitions/ops/grant.sqlx', 'definitions/mart/revenue.sqlx'
+        ])
+
+        assert main() == 0
+
+        result = json.loads(capsys.readouterr().out)
+        assert result["actions"] == ["mart.revenue", "mart.kpis"]
+        assert result["unmatched_files"] == ["definitions/ops/grant.sqlx"]
+
+    def test_text_report_rejected(self, capsys, monkeypatch):
+        """Test that a text report (without fileName) is an error"""
+        monkeypatch.setattr('sys.argv', [
+            'dataform-deps', '--report', 'dependencies_report.txt', 'affected', 'x.sqlx'
+        ])
+
+        assert main() == 1
+        assert "fileName" in capsys.readouterr().err
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
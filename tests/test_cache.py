@@ -0,0 +1,131 @@
+"""Tests for cache module"""
+import os
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+from dataform_viz import cache, dataform_check
+from dataform_viz.cache import ReportCache, cache_path_for, load_graph
+from dataform_viz.graph import DependencyGraph
+from dataform_viz.parser import parse_dependencies_report
+from dataform_viz.visualizer import DependencyVisualizer
+
+
+REPORT = """Table: staging.customers (table)
+  Dependencies (1):
+    <- source.raw_customers
+      LEFT JOIN ON c.id = r.id
+  Dependents (1):
+    -> analytics.summary
+
+Table: analytics.summary (view)
+  Dependencies (1):
+    <- staging.customers
+  Dependents (0):
+"""
+
+
+class TestReportCache:
+    """Tests for the parsed-graph cache"""
+
+    def setup_method(self):
+        """Create temporary report"""
+        self.test_dir = tempfile.mkdtemp()
+        self.report_file = Path(self.test_dir) / "report.txt"
+        self.report_file.write_text(REPORT, encoding='utf-8')
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def _load(self, **kwargs):
+        cache = ReportCache(str(self.report_file))
+        graph = load_graph(str(self.report_file), cache=cache, **kwargs)
+        cache.wait()
+        return graph, cache.stats
+
+    def test_serialization_roundtrip(self):
+        """Test that to_bytes/from_bytes preserves the graph"""
+        graph = DependencyGraph.from_report(str(self.report_file))
+
+        restored = DependencyGraph.from_bytes(graph.to_bytes())
+
+        assert restored == graph
+        assert restored.node_count == graph.node_count
+
+    def test_miss_then_hit(self):
+        """Test that the first load writes the cache and the second reads it"""
+        graph, stats = self._load()
+        assert stats['misses'] == 1 and stats['writes'] == 1
+        assert cache_path_for(str(self.report_file)).exists()
+
+        cached, stats = self._load()
+        assert stats['hits'] == 1 and stats['misses'] == 0
+        assert cached == parse_dependencies_report(str(self.report_file))
+
+    def test_stale_cache_is_rebuilt(self):
+        """Test that changing the report invalidates the cache"""
+        self._load()
+        self.report_file.write_text(REPORT + "\nTable: extra.table (table)\n", encoding='utf-8')
+
+        graph, stats = self._load()
+
+        assert stats['misses'] == 1 and stats['writes'] == 1
+        assert "extra.table" in graph
+
+    def test_touched_report_hits_by_content_hash(self):
+        """Test that a new mtime with identical content is still a hit"""
+        self._load()
+        st = self.report_file.stat()
+        os.utime(self.report_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000_000))
+
+        _, stats = self._load()
+
+        assert stats['hits'] == 1
+
+    def test_touched_report_is_hashed_once(self, monkeypatch):
+        """Test that a content-hash hit stores the new mtime for later loads"""
+        self._load()
+        st = self.report_file.stat()
+        os.utime(self.report_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000_000))
+        hashed = []
+        original = cache.hash_file
+        monkeypatch.setattr(cache, 'hash_file', lambda path: hashed.append(path) or original(path))
+
+        for _ in range(3):
+            _, stats = self._load()
+            assert stats['hits'] == 1
+
+        assert len(hashed) == 1
+
+    def test_parser_version_change_is_a_miss(self, monkeypatch):
+        """Test that graphs cached by another JOIN parser version are not reused"""
+        self._load()
+        monkeypatch.setattr(dataform_check, 'JOIN_PARSER_VERSION', dataform_check.JOIN_PARSER_VERSION + 1)
+
+        _, stats = self._load()
+        assert stats['misses'] == 1 and stats['writes'] == 1
+
+        _, stats = self._load()
+        assert stats['hits'] == 1
+
+    def test_corrupt_cache_is_a_miss(self):
+        """Test that an unreadable cache file falls back to parsing"""
+        cache_path_for(str(self.report_file)).write_bytes(b"garbage")
+
+        graph, stats = self._load()
+
+        assert stats['misses'] == 1
+        assert "staging.customers" in graph
+
+    def test_no_cache(self):
+        """Test that use_cache=False leaves no cache file behind"""
+        viz = DependencyVisualizer(str(self.report_file), use_cache=False)
+        viz.load_report()
+
+        assert not cache_path_for(str(self.report_file)).exists()
+        assert viz.cache_stats['misses'] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,125 @@
+"""Tests for compile_cache module"""
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+from dataform_viz.compile_cache import (
+    CompileCache, collect_project_files, diff_file_hashes, hash_project_files, project_key,
+)
+
+
+TABLES = [
+    {"target": {"schema": "s", "name": "a"}, "type": "table"},
+    {"target": {"schema": "s", "name": "b"}, "type": "view",
+     "dependencyTargets": [{"schema": "s", "name": "a"}]},
+]
+
+
+class TestCompileCache:
+    """Tests for the compile-result cache"""
+
+    def setup_method(self):
+        """Create a minimal Dataform project"""
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+        (self.root / "definitions" / "staging").mkdir(parents=True)
+        (self.root / "includes").mkdir()
+        (self.root / "workflow_settings.yaml").write_text("defaultProject: p\n")
+        (self.root / "definitions" / "staging" / "a.sqlx").write_text("config {}\nSELECT 1\n")
+        (self.root / "includes" / "utils.js").write_text("module.exports = {};\n")
+        (self.root / "README.md").write_text("not part of the key\n")
+        self.compiles = 0
+        self.messages = []
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def _compile(self):
+        self.compiles += 1
+        yield from TABLES
+
+    def _run(self, **kwargs):
+        cache = CompileCache(str(self.root))
+        tables = list(cache.iter_tables(self._compile, log=self.messages.append, **kwargs))
+        return tables, cache.stats
+
+    def test_collect_project_files(self):
+        """Test that only settings, definitions and includes are keyed"""
+        assert collect_project_files(str(self.root)) == [
+            "definitions/staging/a.sqlx",
+            "includes/utils.js",
+            "workflow_settings.yaml",
+        ]
+
+    def test_key_is_content_addressed(self):
+        """Test that the key follows file contents, not the hashing order"""
+        hashes = hash_project_files(str(self.root), jobs=4)
+        assert project_key(hashes) == project_key(dict(reversed(list(hashes.items()))))
+
+        (self.root / "includes" / "utils.js").write_text("module.exports = {x: 1};\n")
+        assert project_key(hash_project_files(str(self.root))) != project_key(hashes)
+
+    def test_hit_skips_compile(self):
+        """Test that an unchanged project is served from the cache"""
+        first, stats = self._run()
+        assert first == TABLES and stats['misses'] == 1 and stats['writes'] == 1
+
+        second, stats = self._run()
+
+        assert second == TABLES
+        assert stats['hits'] == 1
+        assert self.compiles == 1
+
+    def test_ignored_file_keeps_hit(self):
+        """Test that files outside the keyed trees do not invalidate"""
+        self._run()
+        (self.root / "README.md").write_text("changed\n")
+
+        _, stats = self._run()
+
+        assert stats['hits'] == 1
+
+    def test_change_invalidates_verbose(self):
+        """Test that a modified source recompiles and is reported in verbose mode"""
+        self._run()
+        (self.root / "definitions" / "staging" / "a.sqlx").write_text("config {}\nSELECT 2\n")
+        (self.root / "definitions" / "staging" / "b.sqlx").write_text("SELECT 3\n")
+
+        _, stats = self._run(verbose=True)
+
+        assert stats['misses'] == 1 and self.compiles == 2
+        report = "\n".join(self.messages)
+        assert "modified definitions/staging/a.sqlx" in report
+        assert "added    definitions/staging/b.sqlx" in report
+
+    def test_force_recompiles(self):
+        """Test that force ignores a valid entry"""
+        self._run()
+
+        _, stats = self._run(force=True)
+
+        assert stats['misses'] == 1 and self.compiles == 2
+
+    def test_failed_compile_is_not_cached(self):
+        """Test that a compile error leaves no entry behind"""
+        def broken():
+            yield TABLES[0]
+            raise RuntimeError("compile failed")
+
+        cache = CompileCache(str(self.root))
+        with pytest.raises(RuntimeError):
+            list(cache.iter_tables(broken, log=None))
+
+        assert not list(cache.cache_dir.glob("compiled-*"))
+        _, stats = self._run()
+        assert stats['misses'] == 1
+
+    def test_diff_file_hashes(self):
+        """Test fingerprint comparison"""
+        changes = diff_file_hashes({"a": "1", "b": "2"}, {"b": "3", "c": "4"})
+        assert changes == [("removed", "a"), ("modified", "b"), ("added", "c")]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,226 @@
+"""Tests for critical_path module"""
+import argparse
+import json
+import random
+import pytest
+from functools import lru_cache
+from pathlib import Path
+import tempfile
+import shutil
+from dataform_viz.critical_path import (TableRun, critical_path, index_labels, load_run_stats,
+                                         render_critical_path_svgs)
+from dataform_viz.graph import GraphBuilder
+from dataform_viz.master_index import generate_master_index
+from dataform_viz.visualizer import DependencyVisualizer
+from dataform_viz import cli
+from dataform_viz.cli import main
+
+
+REPORT = """Table: staging.customers (table)
+  Dependencies (1):
+    <- source.raw_customers
+  Dependents (1):
+    -> mart.customer_360
+
+Table: staging.orders (table)
+  Dependencies (1):
+    <- source.raw_orders
+  Dependents (2):
+    -> mart.customer_360
+    -> mart.kpis
+
+Table: mart.customer_360 (table)
+  Dependencies (2):
+    <- staging.customers
+    <- staging.orders
+  Dependents (1):
+    -> mart.revenue
+
+Table: mart.revenue (view)
+  Dependencies (1):
+    <- mart.customer_360
+  Dependents (0):
+
+Table: mart.kpis (table)
+  Dependencies (1):
+    <- staging.orders
+  Dependents (0):
+"""
+
+RUNS_CSV = """table,duration_seconds,total_bytes_processed
+my-project.staging.customers,120,1000
+staging.orders,300,5000
+mart.customer_360,600,200
+mart.revenue,30,10
+mart.kpis,100,1
+other.unknown,5,0
+"""
+
+
+class TestCriticalPath:
+    """Tests for the schedule, slack and path"""
+
+    def setup_method(self):
+        """Create a report and run statistics"""
+        self.test_dir = tempfile.mkdtemp()
+        self.report_file = Path(self.test_dir) / "report.txt"
+        self.report_file.write_text(REPORT, encoding='utf-8')
+        self.runs_file = Path(self.test_dir) / "runs.csv"
+        self.runs_file.write_text(RUNS_CSV, encoding='utf-8')
+        self.viz = DependencyVisualizer(str(self.report_file), use_cache=False)
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def test_path_and_slack(self):
+        """Test the critical chain, slack and unmatched statistics"""
+        result = critical_path(self.viz.load_graph(), load_run_stats(str(self.runs_file)))
+
+        assert result.path == ["staging.orders", "mart.customer_360", "mart.revenue"]
+        assert result.makespan == 930
+        # Project-qualified names match dataset.table
+        assert result.timings["staging.customers"].slack == 180
+        assert result.timings["mart.kpis"].slack == 530
+        assert result.timings["mart.customer_360"].start == 300
+        assert result.missing == []
+        assert result.unmatched == ["other.unknown"]
+        assert [name for name, _ in result.least_slack(1)] == ["staging.customers"]
+
+    def test_matches_brute_force(self):
+        """Test makespan and slack against longest paths on random DAGs"""
+        for seed in range(5):
+            rng = random.Random(seed)
+            names = [f"s.t{i}" for i in range(60)]
+            deps = {name: rng.sample(names[:i], min(i, rng.randrange(4))) for i, name in enumerate(names)}
+            runs = {name: TableRun(rng.randrange(1, 100)) for name in names}
+            builder = GraphBuilder()
+            for name in rng.sample(names, len(names)):
+                builder.add_table(name, "table", deps[name], [], None)
+            readers = {name: [n for n in names if name in deps[n]] for name in names}
+
+            @lru_cache(maxsize=None)
+            def finish(name):
+                return runs[name].duration + max((finish(dep) for dep in deps[name]), default=0)
+
+            @lru_cache(maxsize=None)
+            def tail(name):
+                return max((runs[r].duration + tail(r) for r in readers[name]), default=0)
+
+            result = critical_path(builder.build(), runs)
+            makespan = max(finish(name) for name in names)
+            assert result.makespan == makespan
+            for name in names:
+                assert result.timings[name].finish == finish(name)
+                assert result.timings[name].slack == makespan - finish(name) - tail(name)
+            assert sum(runs[name].duration for name in result.path) == makespan
+            assert all(result.timings[name].critical for name in result.path)
+
+    def test_cycles_and_missing_statistics(self):
+        """Test that cycle members run as one unit and missing tables count as 0 s"""
+        builder = GraphBuilder()
+        builder.add_table("a.x", "table", [], [], None)
+        builder.add_table("a.y", "table", ["a.x", "a.z"], [], None)
+        builder.add_table("a.z", "table", ["a.y"], [], None)
+        builder.add_table("a.w", "table", ["a.z"], [], None)
+
+        result = critical_path(builder.build(), {"a.x": TableRun(5), "a.y": TableRun(10), "a.z": TableRun(20)})
+
+        assert result.makespan == 35
+        assert result.path == ["a.x", "a.y", "a.z"]
+        assert result.timings["a.y"].finish == result.timings["a.z"].finish == 35
+        assert result.missing == ["a.w"]
+
+    def test_load_json_formats(self):
+        """Test JSON rows, name mappings, milliseconds, timestamps and repeated rows"""
+        rows_file = Path(self.test_dir) / "runs.json"
+        rows_file.write_text(json.dumps([
+            {"destination_table": {"projectId": "p", "datasetId": "mart", "tableId": "kpis"},
+             "start_time": "2024-05-01T02:00:00Z", "end_time": "2024-05-01T02:01:30Z",
+             "total_bytes_processed": "2048"},
+            {"name": "mart.kpis", "duration_ms": 500},
+        ]), encoding='utf-8')
+        mapping_file = Path(self.test_dir) / "durations.json"
+        mapping_file.write_text(json.dumps({"mart.revenue": 12.5, "mart.kpis": {"seconds": 3}}),
+                                encoding='utf-8')
+
+        assert load_run_stats(str(rows_file)) == {"mart.kpis": TableRun(90.5, 2048)}
+        assert load_run_stats(str(mapping_file)) == {"mart.revenue": TableRun(12.5), "mart.kpis": TableRun(3)}
+
+        bad_file = Path(self.test_dir) / "bad.csv"
+        bad_file.write_text("table,bytes\nmart.kpis,5\n", encoding='utf-8')
+        with pytest.raises(ValueError, match="without a duration"):
+            load_run_stats(str(bad_file))
+
+    def test_cli_json(self, capsys, monkeypatch):
+        """Test the critical-path subcommand's JSON output"""
+        monkeypatch.setattr('sys.argv', [
+            'dataform-deps', '--report', str(self.report_file), '--no-cache',
+            'critical-path', '--durations', str(self.runs_file), '--format', 'json', '--top', '1'
+        ])
+
+        assert main() == 0
+
+        captured = capsys.readouterr()
+        result = json.loads(captured.out)
+        assert [row['name'] for row in result['path']] == ["staging.orders", "mart.customer_360", "mart.revenue"]
+        assert result['path_bytes_processed'] == 5210
+        assert [row['name'] for row in result['least_slack']] == ["staging.customers"]
+        assert "matched no table" in captured.err
+
+    def test_svgs_and_index_highlight(self):
+        """Test the highlighted diagrams and master index entries"""
+        graph = self.viz.load_graph()
+        result = critical_path(graph, load_run_stats(str(self.runs_file)))
+
+        chain, count = render_critical_path_svgs(graph, result, str(Path(self.test_dir) / "critical"))
+
+        assert count == 3
+        assert "10m 00s" in chain.read_text(encoding='utf-8')
+        content = (Path(self.test_dir) / "critical" / "mart_customer_360.svg").read_text(encoding='utf-8')
+        assert content.count('stroke="#e65100"') == 2
+        assert "slack 3m 00s" in content
+
+        schemas = {'mart': {'svgs': [{'file': 'dependencies_mart/mart_customer_360.svg',
+                                      'name': 'mart.customer.360', 'display_name': '360'}]}}
+        html = generate_master_index(schemas, index_labels(result))
+        assert 'Critical path (3 tables)' in html
+        assert html.count('class="table-item critical"') == 4
+        assert "showDiagram('dependencies_mart/mart_customer_360.svg'" in html
+
+    def test_generate_all_highlights_path_edges(self, monkeypatch):
+        """Test generate-all --durations and that dropping it re-renders plain diagrams"""
+        output = Path(self.test_dir) / "output"
+        argv = ['dataform-deps', '--report', str(self.report_file), '--no-cache',
+                '--output', str(output), 'generate-all']
+        diagram = output / "dependencies_mart" / "mart_customer_360.svg"
+
+        monkeypatch.setattr('sys.argv', argv + ['--durations', str(self.runs_file)])
+        assert main() == 0
+        assert diagram.read_text(encoding='utf-8').count('stroke="#e65100"') == 2
+        kpis = (output / "dependencies_mart" / "mart_kpis.svg").read_text(encoding='utf-8')
+        assert 'stroke="#e65100"' not in kpis
+
+        monkeypatch.setattr('sys.argv', argv)
+        assert main() == 0
+        assert 'stroke="#e65100"' not in diagram.read_text(encoding='utf-8')
+
+    def test_setup_builds_index_without_durations(self, monkeypatch, capsys):
+        """Test that setup's index step works with the Namespace it builds"""
+        monkeypatch.setattr('dataform_viz.dataform_check.check_prerequisites', lambda: True)
+        monkeypatch.setattr('subprocess.run', lambda *args, **kwargs: None)
+        # The index collects diagrams from ./output
+        monkeypatch.chdir(self.test_dir)
+        output = Path(self.test_dir) / "output"
+        args = argparse.Namespace(report=str(self.report_file), output="output", no_cache=True,
+                                  compile=False, recompile=False, verbose=False, jobs=1,
+                                  force=False, exclude=[])
+
+        assert cli.cmd_setup(args) == 0
+
+        assert "✗ Error" not in capsys.readouterr().err
+        assert (output / "dependencies_master_index.html").is_file()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
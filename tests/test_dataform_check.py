@@ -3,7 +3,41 @@ import pytest
 from pathlib import Path
 import tempfile
 import shutil
-from dataform_viz.dataform_check import cleanup_sqlx_files, normalize_name
+import io
+import json
+import random
+from dataform_viz.dataform_check import (
+    cleanup_sqlx_files, normalize_name, build_dependency_graph, print_text_report,
+    extract_compiled_json, dependency_search_names, DependencyNameIndex, parse_joins_from_query
+)
+from dataform_viz.graph import DependencyGraph
+from dataform_viz.parser import parse_report_lines
+from dataform_viz.visualizer import DependencyVisualizer
+
+
+COMPILED_TABLES = [
+    {
+        "target": {"database": "proj", "schema": "staging", "name": "customers"},
+        "type": "table",
+        "dependencyTargets": [{"database": "proj", "schema": "source", "name": "raw_customers"}],
+        "query": "SELECT * FROM `proj.source.raw_customers`"
+    },
+    {
+        "target": {"database": "proj", "schema": "analytics", "name": "summary"},
+        "type": "view",
+        "dependencyTargets": [
+            {"database": "proj", "schema": "staging", "name": "customers"},
+            {"database": "proj", "schema": "staging", "name": "orders"}
+        ],
+        "query": "SELECT * FROM `proj.staging.orders` o\nLEFT JOIN `proj.staging.customers` c ON c.id = o.customer_id"
+    },
+    {
+        "target": {"database": "proj", "schema": "staging", "name": "orders"},
+        "type": "incremental",
+        "dependencyTargets": [],
+        "query": ""
+    },
+]
 
 
 class TestCleanupSqlxFiles:
@@ -262,5 +296,149 @@ class TestNormalizeName:
         assert result == "staging.customers"
 
 
+class TestBuildDependencyGraph:
+    """Tests for direct ingestion of compiled JSON"""
+    
+    def test_matches_text_report_path(self):
+        """Test that the direct graph equals the text report round-trip"""
+        direct = build_dependency_graph(COMPILED_TABLES, log=None)
+        
+        buffer = io.StringIO()
+        print_text_report(direct, file=buffer)
+        buffer.seek(0)
+        round_trip = DependencyGraph.from_records(parse_report_lines(buffer))
+        
+        assert direct == round_trip
+        assert direct["staging.customers"]["dependents"] == ["analytics.summary"]
+        assert direct["analytics.summary"]["join_info"] == {
+            "staging.customers": {"type": "LEFT JOIN", "condition": "c.id = o.customer_id"}
+        }
+    
+    def test_extract_compiled_json_skips_log_prefix(self):
+        """Test that leading log output is skipped"""
+        output = '{"level":"INFO","msg":"compiling"} ' + json.dumps({"tables": COMPILED_TABLES})
+        
+        graph = extract_compiled_json(output)
+        
+        assert len(graph["tables"]) == 3
+    
+    def test_visualizer_accepts_compiled_json(self):
+        """Test DependencyVisualizer with a .json report and from_compiled"""
+        test_dir = tempfile.mkdtemp()
+        try:
+            json_file = Path(test_dir) / "compiled.json"
+            json_file.write_text(json.dumps({"tables": COMPILED_TABLES}), encoding='utf-8')
+            
+            viz = DependencyVisualizer(str(json_file), use_cache=False)
+            count = viz.generate_schema_svgs('staging', output_dir=str(Path(test_dir) / "out"))
+            
+            assert count == 2
+            assert viz.get_table("staging.orders")["type"] == "incremental"
+            assert DependencyVisualizer.from_compiled({"tables": COMPILED_TABLES}).load_report() == viz.tables
+        finally:
+            shutil.rmtree(test_dir)
+
+    def test_parallel_join_parsing_matches_sequential(self):
+        """Test that the process pool gives the same graph and log in the same order"""
+        rng = random.Random(4)
+        tables = []
+        for i in range(23):
+            deps = [{"database": "proj", "schema": "s", "name": f"t{j}"} for j in range(i)]
+            joins = "\n".join(f"LEFT JOIN `proj.s.t{j}` j{j} ON j{j}.id = b.id" for j in range(i))
+            tables.append({
+                "target": {"database": "proj", "schema": "s", "name": f"cmt_perf_{i}" if i % 7 == 0 else f"t{i}"},
+                "type": "table",
+                "dependencyTargets": deps,
+                "query": "" if rng.random() < 0.3 else f"SELECT * FROM base b\n{joins}",
+            })
+        sequential_log, parallel_log = [], []
+
+        sequential = build_dependency_graph(tables, log=sequential_log.append)
+        parallel = build_dependency_graph(iter(tables), log=parallel_log.append, jobs=2, chunk_size=3)
+
+        assert parallel == sequential
+        assert parallel_log == sequential_log
+        assert any(line.startswith("DEBUG main: Processing s.cmt_perf_7") for line in parallel_log)
+        assert build_dependency_graph(tables, log=None, jobs=3, chunk_size=50) == sequential
+
+
+def linear_match(dep_names, table_ref):
+    """Reference matcher: every search name, both containment directions, longest first wins"""
+    matched_dep = None
+    best_match_len = 0
+    for search_name, full_dep_name in dep_names:
+        if (search_name.lower() in table_ref.lower() or
+            table_ref.lower() in search_name.lower()):
+            if len(search_name) > best_match_len:
+                matched_dep = full_dep_name
+                best_match_len = len(search_name)
+    return matched_dep
+
+
+class TestDependencyNameIndex:
+    """Tests for JOIN reference resolution"""
+    
+    def test_longest_match_wins(self):
+        """Test exact, contained, containing and unmatched references"""
+        dependencies = [
+            {"schema": "staging", "name": "orders"},
+            {"schema": "refined", "name": "union_a_ann_barrier"},
+            {"schema": "staging", "name": "orders_daily"},
+        ]
+        index = DependencyNameIndex(dependency_search_names(dependencies))
+        
+        assert index.resolve("STAGING.ORDERS_DAILY") == "staging.orders_daily"
+        assert index.resolve("staging.orders o") == "staging.orders"
+        # Contained in a longer search name: the longest containing one wins,
+        # as it always has (even over an exact match)
+        assert index.resolve("orders") == "staging.orders_daily"
+        assert index.resolve("staging.orders") == "staging.orders_daily"
+        # CTE named after a partial of the dependency name
+        assert index.resolve("a_ann_barrier_cte") == "refined.union_a_ann_barrier"
+        assert index.resolve("customers") is None
+    
+    def test_matches_linear_scan(self):
+        """Test random dependencies and references against the linear matcher"""
+        words = ["a", "ann", "barrier", "union", "orders", "cust", "x", "daily", "v2", "tbl"]
+        for seed in range(200):
+            rng = random.Random(seed)
+            dependencies = [
+                {"schema": rng.choice(["staging", "refined", "Mart", "s"]),
+                 "name": "_".join(rng.choice(words) for _ in range(rng.randint(1, 4)))}
+                for _ in range(rng.randint(1, 12))
+            ]
+            dep_names = dependency_search_names(dependencies)
+            index = DependencyNameIndex(dep_names)
+            for _ in range(30):
+                search_name = rng.choice(dep_names)[0] or "x"
+                start = rng.randrange(len(search_name))
+                ref = rng.choice([
+                    search_name,
+                    search_name[start:start + rng.randint(1, 6)],
+                    f"{rng.choice(words)}_{search_name}_{rng.choice(words)}",
+                    "_".join(rng.choice(words) for _ in range(rng.randint(1, 5))),
+                ])
+                if rng.random() < 0.3:
+                    ref = ref.upper()
+                assert index.resolve(ref) == linear_match(dep_names, ref), (dependencies, ref)
+    
+    def test_parse_joins_uses_index(self):
+        """Test ON and USING joins through CTEs"""
+        query = """WITH barrier AS (SELECT * FROM `proj.refined.union_a_ann_barrier`)
+SELECT * FROM `proj.staging.orders` o
+LEFT JOIN barrier b ON b.id = o.id
+INNER JOIN proj.staging.orders_daily USING (order_id)"""
+        dependencies = [
+            {"schema": "staging", "name": "orders"},
+            {"schema": "refined", "name": "union_a_ann_barrier"},
+            {"schema": "staging", "name": "orders_daily"},
+        ]
+        
+        assert parse_joins_from_query(query, dependencies, log=None) == {
+            "refined.union_a_ann_barrier": {"type": "LEFT JOIN", "condition": "b.id = o.id"},
+            "staging.orders_daily": {"type": "INNER JOIN", "condition": "USING (order_id)"},
+        }
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,138 @@
+"""Tests for graph module"""
+import pickle
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+from dataform_viz.graph import DependencyGraph, GraphBuilder
+from dataform_viz.parser import parse_dependencies_report
+
+
+REPORT = """Table: staging.customers (table)
+  Dependencies (1):
+    <- source.raw_customers
+  Dependents (2):
+    -> analytics.summary
+    -> reports.customer_report
+
+Table: analytics.summary (view)
+  Dependencies (2):
+    <- staging.customers
+      LEFT JOIN ON c.id = o.customer_id
+    <- staging.orders
+  Dependents (0):
+
+Table: staging.orders (incremental)
+  Dependencies (0):
+  Dependents (1):
+    -> analytics.summary
+"""
+
+
+class TestDependencyGraph:
+    """Tests for DependencyGraph"""
+
+    def setup_method(self):
+        """Create temporary report"""
+        self.test_dir = tempfile.mkdtemp()
+        self.report_file = Path(self.test_dir) / "report.txt"
+        self.report_file.write_text(REPORT, encoding='utf-8')
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def test_matches_parsed_dict(self):
+        """Test that the graph mapping view equals the parsed dict"""
+        graph = DependencyGraph.from_report(str(self.report_file))
+
+        assert graph == parse_dependencies_report(str(self.report_file))
+        assert list(graph) == ["staging.customers", "analytics.summary", "staging.orders"]
+
+    def test_referenced_names_are_not_keys(self):
+        """Test that names only referenced by edges are nodes but not tables"""
+        graph = DependencyGraph.from_report(str(self.report_file))
+
+        assert "source.raw_customers" not in graph
+        assert graph.get("source.raw_customers", {}).get('type', 'unknown') == 'unknown'
+        assert graph.node_id("source.raw_customers") is not None
+        assert len(graph) == 3
+        assert graph.node_count == 5
+
+    def test_join_info(self):
+        """Test join info lookup through the view"""
+        graph = DependencyGraph.from_report(str(self.report_file))
+
+        info = graph["analytics.summary"]
+        assert info['join_info'] == {
+            "staging.customers": {"type": "LEFT JOIN", "condition": "c.id = o.customer_id"}
+        }
+        assert graph["staging.customers"]['join_info'] == {}
+
+    def test_names_are_interned(self):
+        """Test that every occurrence of a name shares one string object"""
+        graph = DependencyGraph.from_report(str(self.report_file))
+
+        deps = graph["analytics.summary"]['dependencies']
+        dependents = graph["staging.orders"]['dependents']
+        assert dependents[0] is next(k for k in graph if k == "analytics.summary")
+        assert deps[0] is graph.name(graph.node_id("staging.customers"))
+
+    def test_duplicate_record_replaces_earlier(self):
+        """Test that a repeated table keeps its first position but latest data"""
+        builder = GraphBuilder()
+        builder.add_table("a.x", "table", ["a.y"], join_info={"a.y": {"type": "LEFT JOIN", "condition": "1=1"}})
+        builder.add_table("a.y", "view")
+        builder.add_table("a.x", "view", ["a.z"])
+        graph = builder.build()
+
+        assert list(graph) == ["a.x", "a.y"]
+        assert graph["a.x"]['type'] == "view"
+        assert graph["a.x"]['dependencies'] == ["a.z"]
+        assert graph["a.x"]['join_info'] == {}
+
+    def test_derive_dependents(self):
+        """Test dependents derived from dependency edges in record order"""
+        builder = GraphBuilder()
+        builder.add_table("a.b", "table", ["a.a"])
+        builder.add_table("a.a", "table", ["ext.src"])
+        builder.add_table("a.c", "view", ["a.a", "a.b"])
+        graph = builder.build(derive_dependents=True)
+
+        assert graph["a.a"]['dependents'] == ["a.b", "a.c"]
+        assert graph["a.b"]['dependents'] == ["a.c"]
+        # Only recorded tables receive dependents
+        assert graph.dependent_ids(graph.node_id("ext.src")).tolist() == []
+
+    def test_pickle_roundtrip(self):
+        """Test that the graph can be pickled for worker processes"""
+        graph = DependencyGraph.from_report(str(self.report_file))
+
+        restored = pickle.loads(pickle.dumps(graph))
+
+        assert restored == graph
+
+    def test_schema_partition(self):
+        """Test that tables are grouped by schema in report order"""
+        graph = DependencyGraph.from_report(str(self.report_file))
+
+        assert graph.schemas() == ["staging", "analytics"]
+        assert [name for name, _ in graph.iter_schema("staging")] == [
+            "staging.customers", "staging.orders"
+        ]
+        assert dict(graph.iter_schema("analytics"))["analytics.summary"]['type'] == 'view'
+        # Referenced-only schemas and unknown schemas are empty
+        assert list(graph.iter_schema("source")) == []
+        assert len(graph.schema_ids("missing")) == 0
+
+    def test_schema_partition_survives_serialization(self):
+        """Test that from_bytes rebuilds the partition"""
+        graph = DependencyGraph.from_report(str(self.report_file))
+
+        restored = DependencyGraph.from_bytes(graph.to_bytes())
+
+        assert restored.schemas() == graph.schemas()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,123 @@
+"""Tests for graph_diff module"""
+import json
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+from dataform_viz.cli import main
+from dataform_viz.graph_diff import (
+    EDGE_ADDED, EDGE_REMOVED, JOIN_CHANGED, TABLE_ADDED, TABLE_REMOVED, TYPE_CHANGED,
+    DiffEvent, iter_report_diff,
+)
+
+
+OLD = """Table: stg.orders (table)
+  Dependencies (1):
+    <- raw.orders
+  Dependents (1):
+    -> mart.revenue
+
+Table: mart.revenue (table)
+  Dependencies (2):
+    <- stg.orders
+      LEFT JOIN ON o.id = r.order_id
+    <- stg.refunds
+  Dependents (0):
+
+Table: stg.refunds (view)
+  Dependencies (0):
+  Dependents (1):
+    -> mart.revenue
+"""
+
+NEW = """Table: stg.orders (table)
+  Dependencies (1):
+    <- raw.orders
+  Dependents (1):
+    -> mart.revenue
+
+Table: mart.revenue (view)
+  Dependencies (2):
+    <- stg.orders
+      INNER JOIN ON o.id = r.order_id
+    <- stg.payments
+  Dependents (0):
+
+Table: stg.payments (table)
+  Dependencies (1):
+    <- raw.payments
+  Dependents (1):
+    -> mart.revenue
+"""
+
+
+class TestReportDiff:
+    """Tests for iter_report_diff and the diff subcommand"""
+
+    def setup_method(self):
+        """Write the two reports"""
+        self.test_dir = tempfile.mkdtemp()
+        self.old = Path(self.test_dir) / "old.txt"
+        self.new = Path(self.test_dir) / "new.txt"
+        self.old.write_text(OLD, encoding='utf-8')
+        self.new.write_text(NEW, encoding='utf-8')
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def test_events(self):
+        """Test every kind of difference"""
+        events = list(iter_report_diff(str(self.old), str(self.new)))
+
+        assert events == [
+            DiffEvent(TABLE_REMOVED, "stg.refunds", old="view"),
+            DiffEvent(TYPE_CHANGED, "mart.revenue", old="table", new="view"),
+            DiffEvent(EDGE_REMOVED, "mart.revenue", source="stg.refunds"),
+            DiffEvent(EDGE_ADDED, "mart.revenue", source="stg.payments"),
+            DiffEvent(JOIN_CHANGED, "mart.revenue", source="stg.orders",
+                      old={'type': 'LEFT JOIN', 'condition': 'o.id = r.order_id'},
+                      new={'type': 'INNER JOIN', 'condition': 'o.id = r.order_id'}),
+            DiffEvent(TABLE_ADDED, "stg.payments", new="table"),
+            DiffEvent(EDGE_ADDED, "stg.payments", source="raw.payments"),
+        ]
+
+    def test_identical_reports(self):
+        """Test that unchanged blocks are never decoded into events"""
+        assert list(iter_report_diff(str(self.old), str(self.old))) == []
+
+    def test_compiled_json_side(self):
+        """Test diffing a text report against a compiled .json report"""
+        compiled = Path(self.test_dir) / "compiled.json"
+        compiled.write_text(json.dumps({"tables": [
+            {"target": {"schema": "stg", "name": "orders"}, "type": "table",
+             "dependencyTargets": [{"schema": "raw", "name": "orders"}], "query": ""},
+        ]}), encoding='utf-8')
+
+        kinds = [(e.kind, e.table) for e in iter_report_diff(str(self.old), str(compiled))]
+
+        assert (TABLE_REMOVED, "mart.revenue") in kinds
+        assert all(table != "stg.orders" for _, table in kinds)
+
+    def test_cli_render(self, capsys, monkeypatch):
+        """Test text output and highlighted rendering"""
+        render_dir = Path(self.test_dir) / "diff"
+        monkeypatch.setattr('sys.argv', [
+            'dataform-deps', '--no-cache', 'diff', str(self.old), str(self.new),
+            '--render', str(render_dir)
+        ])
+
+        assert main() == 0
+
+        out = capsys.readouterr().out
+        assert "+ edge  stg.payments -> mart.revenue" in out
+        assert "~ join  stg.orders -> mart.revenue: LEFT JOIN ON o.id = r.order_id => INNER JOIN" in out
+        svg = (render_dir / "mart_revenue.svg").read_text(encoding='utf-8')
+        assert 'stroke-dasharray="6 4"' in svg   # removed stg.refunds edge
+        assert 'stroke="#2e7d32"' in svg          # added stg.payments edge
+        assert "refunds" in svg
+        assert (render_dir / "stg_refunds.svg").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,203 @@
+"""Tests for join_cache module"""
+import sqlite3
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+from dataform_viz import dataform_check
+from dataform_viz.dataform_check import build_dependency_graph
+from dataform_viz.join_cache import JOIN_CACHE_NAME, JoinCache, join_cache_key
+
+
+def compiled_tables(count, changed=()):
+    """Compiled tables each joining its two predecessors"""
+    tables = []
+    for i in range(count):
+        deps = [{"database": "proj", "schema": "s", "name": f"t{j}"} for j in range(max(0, i - 2), i)]
+        joins = "\n".join(f"JOIN `proj.s.t{j}` j{j} ON j{j}.id = b.id" for j in range(max(0, i - 2), i))
+        marker = " -- edited" if i in changed else ""
+        tables.append({
+            "target": {"database": "proj", "schema": "s", "name": f"t{i}"},
+            "type": "table",
+            "dependencyTargets": deps,
+            "query": f"SELECT * FROM base b\n{joins}{marker}" if i % 5 else "",
+        })
+    return tables
+
+
+class TestJoinCache:
+    """Tests for keys, persistence and LRU eviction"""
+
+    def setup_method(self):
+        """Create temporary directory"""
+        self.test_dir = tempfile.mkdtemp()
+        self.path = str(Path(self.test_dir) / JOIN_CACHE_NAME)
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def test_key_covers_query_dependencies_and_version(self):
+        """Test that every part of the key changes the hash"""
+        deps = [{"schema": "s", "name": "a"}]
+        key = join_cache_key("SELECT 1", deps, 1)
+
+        assert key == join_cache_key("SELECT 1", [{"name": "a", "schema": "s"}], 1)
+        assert key != join_cache_key("SELECT 2", deps, 1)
+        assert key != join_cache_key("SELECT 1", deps + [{"schema": "s", "name": "b"}], 1)
+        assert key != join_cache_key("SELECT 1", deps, 2)
+
+    def test_round_trip_across_runs(self):
+        """Test that entries are committed on close and counted as hits"""
+        join_info = {"s.a": {"type": "LEFT JOIN", "condition": "a.id = b.id"}}
+        with JoinCache(self.path) as cache:
+            cache.put_many([(b"k1", join_info), (b"k2", {})])
+
+        with JoinCache(self.path) as cache:
+            assert cache.get_many([b"k1", b"k2", b"k3"]) == {b"k1": join_info, b"k2": {}}
+            assert cache.hit_ratio() == pytest.approx(2 / 3)
+
+    def test_evicts_least_recently_used(self):
+        """Test that the cap holds and recently read entries survive"""
+        payload = {"s.a": {"type": "JOIN", "condition": "x" * 100}}
+        with JoinCache(self.path, max_bytes=1000) as cache:
+            cache.put_many([(b"old", payload), (b"read", payload)])
+            cache.put_many([(b"mid", payload)])
+            cache.get_many([b"read"])
+            # The third new entry passes the cap
+            for i in range(3):
+                cache.put_many([(f"new{i}".encode(), payload)])
+
+            assert cache.total_bytes <= 1000
+            assert cache.stats['evictions'] > 0
+            assert b"read" in cache.get_many([b"read"])
+            assert cache.get_many([b"old", b"mid"]) == {}
+
+        with JoinCache(self.path, max_bytes=1000) as cache:
+            assert b"new2" in cache.get_many([b"new2"])
+
+    def test_corrupt_file_is_replaced(self):
+        """Test that an unreadable file is started over"""
+        Path(self.path).write_bytes(b"not a database" * 100)
+
+        with JoinCache(self.path) as cache:
+            assert cache.get_many([b"k"]) == {}
+            cache.put_many([(b"k", {})])
+
+        with JoinCache(self.path) as cache:
+            assert cache.get_many([b"k"]) == {b"k": {}}
+
+    def test_concurrent_runs_share_the_file(self):
+        """Test that two open caches both read and write without locking each other out"""
+        with JoinCache(self.path, timeout=0.1) as first, JoinCache(self.path, timeout=0.1) as second:
+            first.put_many([(b"a", {})])
+            second.put_many([(b"b", {})])
+            assert first.get_many([b"a", b"b"]) == second.get_many([b"a", b"b"]) == {b"a": {}, b"b": {}}
+            assert first.error is None and second.error is None
+
+        with JoinCache(self.path) as cache:
+            assert cache.get_many([b"a", b"b"]) == {b"a": {}, b"b": {}}
+
+    def test_unwritable_directory_falls_back_to_no_cache(self):
+        """Test that a cache directory that cannot be created disables the cache"""
+        blocker = Path(self.test_dir) / "not_a_dir"
+        blocker.write_text("", encoding='utf-8')
+
+        with JoinCache(str(blocker / JOIN_CACHE_NAME)) as cache:
+            assert cache.error
+            cache.put_many([(b"k", {})])
+            assert cache.get_many([b"k"]) == {}
+
+    def test_locked_file_falls_back_to_no_cache(self):
+        """Test that a writer holding the file disables the cache instead of failing"""
+        with JoinCache(self.path) as cache:
+            cache.put_many([(b"k", {})])
+        holder = sqlite3.connect(self.path, isolation_level=None)
+        holder.execute('BEGIN IMMEDIATE')
+        try:
+            with JoinCache(self.path, timeout=0.05) as cache:
+                assert cache.get_many([b"k"]) == {b"k": {}}
+                cache.put_many([(b"new", {})])
+                assert "locked" in cache.error
+                assert cache.get_many([b"k"]) == {}
+                graph = build_dependency_graph(compiled_tables(10), log=None, join_cache=cache)
+        finally:
+            holder.execute('COMMIT')
+            holder.close()
+
+        assert graph == build_dependency_graph(compiled_tables(10), log=None)
+        with JoinCache(self.path) as cache:
+            assert cache.get_many([b"k", b"new"]) == {b"k": {}}
+
+
+class TestCachedGraphBuild:
+    """Tests for build_dependency_graph with a join cache"""
+
+    def setup_method(self):
+        """Create temporary directory"""
+        self.test_dir = tempfile.mkdtemp()
+        self.path = str(Path(self.test_dir) / JOIN_CACHE_NAME)
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def count_parses(self, monkeypatch):
+        calls = []
+        original = dataform_check.parse_joins_from_query
+
+        def counting(query, dependencies, log=print):
+            calls.append(query)
+            return original(query, dependencies, log=log)
+
+        monkeypatch.setattr(dataform_check, 'parse_joins_from_query', counting)
+        return calls
+
+    def test_warm_run_parses_only_changed_queries(self, monkeypatch):
+        """Test hits, misses and identical graphs on a second run"""
+        expected = build_dependency_graph(compiled_tables(20, changed={3}), log=None)
+        with JoinCache(self.path) as cache:
+            assert build_dependency_graph(compiled_tables(20), log=None, join_cache=cache)
+
+        calls = self.count_parses(monkeypatch)
+        with JoinCache(self.path) as cache:
+            graph = build_dependency_graph(compiled_tables(20, changed={3}), log=None, join_cache=cache)
+            assert cache.stats['hits'] == 15
+            assert cache.stats['misses'] == 1
+
+        assert graph == expected
+        parsed = [query for query in calls if query]
+        assert len(parsed) == 1 and parsed[0].endswith("-- edited")
+
+    def test_parallel_path_uses_cache(self):
+        """Test that hits skip the pool and misses are stored"""
+        expected = build_dependency_graph(compiled_tables(40), log=None)
+        with JoinCache(self.path) as cache:
+            assert build_dependency_graph(compiled_tables(40), log=None, jobs=2, chunk_size=4,
+                                          join_cache=cache) == expected
+            assert cache.stats['writes'] == 32
+
+        with JoinCache(self.path) as cache:
+            assert build_dependency_graph(compiled_tables(40), log=None, jobs=2, chunk_size=4,
+                                          join_cache=cache) == expected
+            assert cache.hit_ratio() == 1.0
+
+    def test_main_reports_hit_ratio(self, monkeypatch, capsys):
+        """Test the hit ratio line on stderr of a warm run"""
+        monkeypatch.chdir(self.test_dir)
+        monkeypatch.setattr(dataform_check, 'iter_project_tables', lambda **kwargs: iter(compiled_tables(10)))
+
+        dataform_check.main([])
+        capsys.readouterr()
+        dataform_check.main([])
+
+        captured = capsys.readouterr()
+        assert "Join cache: 8/8 queries reused (100.0% hit ratio)" in captured.err
+        assert "Table: s.t9 (table)" in captured.out
+
+        dataform_check.main(['--no-cache'])
+        assert "Join cache" not in capsys.readouterr().err
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,69 @@
+"""Tests for json_stream module"""
+import io
+import json
+import sys
+import pytest
+from dataform_viz.json_stream import iter_json_array
+from dataform_viz.dataform_check import iter_dataform_tables
+
+
+TABLES = [
+    {"target": {"schema": "s", "name": "a"}, "query": "SELECT '}' AS brace, \"q\\\\\"x\" FROM t"},
+    {"target": {"schema": "s", "name": "b"}, "dependencyTargets": [{"schema": "s", "name": "a"}],
+     "query": "SELECT [1, 2] -- ]]]\n"},
+    {"target": {"schema": "s", "name": "été"}, "nested": {"x": [{"y": "{["}]}},
+]
+
+
+class TestIterJsonArray:
+    """Tests for iter_json_array"""
+
+    def _output(self):
+        return ('{"level":"INFO","message":"Compiling..."}\n'
+                + json.dumps({"tables": TABLES, "operations": [{"x": 1}]}, indent=2))
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 20])
+    def test_yields_every_table(self, chunk_size):
+        """Test decoding across every chunk boundary"""
+        stream = io.StringIO(self._output())
+
+        result = list(iter_json_array(stream, "tables", chunk_size=chunk_size))
+
+        assert result == TABLES
+        # The remainder of the stream is drained
+        assert stream.read() == ''
+
+    def test_empty_array(self):
+        """Test an empty tables array"""
+        assert list(iter_json_array(io.StringIO('{"tables": []}'), "tables")) == []
+
+    def test_missing_key(self):
+        """Test output without a tables key"""
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO('{"level":"ERROR"}'), "tables"))
+
+    def test_truncated_output(self):
+        """Test output cut off in the middle of a table"""
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO('{"tables": [{"a": "b"'), "tables", chunk_size=4))
+
+    def test_subprocess_stream(self, tmp_path):
+        """Test streaming the stdout of a compile-like subprocess"""
+        script = tmp_path / "fake_compile.py"
+        script.write_text(f"import sys\nsys.stdout.write({self._output()!r})\n", encoding='utf-8')
+
+        tables = list(iter_dataform_tables(cmd=f'"{sys.executable}" "{script}"', chunk_size=16))
+
+        assert tables == TABLES
+
+    def test_subprocess_failure(self, tmp_path):
+        """Test that a failing compiler raises with its stderr"""
+        script = tmp_path / "fail.py"
+        script.write_text("import sys\nsys.stderr.write('boom')\nsys.exit(2)\n", encoding='utf-8')
+
+        with pytest.raises(RuntimeError, match="boom"):
+            list(iter_dataform_tables(cmd=f'"{sys.executable}" "{script}"'))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
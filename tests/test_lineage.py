@@ -0,0 +1,152 @@
+"""Tests for lineage module"""
+import json
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+from dataform_viz.graph import GraphBuilder
+from dataform_viz.lineage import LineageIndex, UPSTREAM
+from dataform_viz.visualizer import DependencyVisualizer
+from dataform_viz.cli import main
+
+
+REPORT = """Table: staging.customers (table)
+  Dependencies (1):
+    <- source.raw_customers
+  Dependents (1):
+    -> mart.customer_360
+
+Table: staging.orders (table)
+  Dependencies (1):
+    <- source.raw_orders
+  Dependents (1):
+    -> mart.customer_360
+
+Table: mart.customer_360 (table)
+  Dependencies (2):
+    <- staging.customers
+    <- staging.orders
+  Dependents (1):
+    -> mart.revenue
+
+Table: mart.revenue (view)
+  Dependencies (1):
+    <- mart.customer_360
+  Dependents (0):
+"""
+
+
+def chain_graph():
+    """a.t0 <- a.t1 <- a.t2 <- a.t3, plus a cycle a.t3 -> a.t1"""
+    builder = GraphBuilder()
+    builder.add_table("a.t0", "table", [], [], None)
+    builder.add_table("a.t1", "table", ["a.t0", "a.t3"], [], None)
+    builder.add_table("a.t2", "table", ["a.t1"], [], None)
+    builder.add_table("a.t3", "table", ["a.t2"], [], None)
+    return builder.build(derive_dependents=True)
+
+
+class TestLineageIndex:
+    """Tests for the closure engine"""
+
+    def test_upstream_distances(self):
+        """Test BFS distances, including tables that are only referenced"""
+        builder = GraphBuilder()
+        builder.add_table("m.r", "view", ["m.c"], [], None)
+        builder.add_table("m.c", "table", ["s.a", "s.b"], [], None)
+        builder.add_table("s.a", "table", ["raw.a"], [], None)
+        lineage = LineageIndex(builder.build(derive_dependents=True))
+
+        assert lineage.upstream("m.r") == [("m.c", 1), ("s.a", 2), ("s.b", 2), ("raw.a", 3)]
+        assert lineage.upstream("m.r", depth=2) == [("m.c", 1), ("s.a", 2), ("s.b", 2)]
+        assert lineage.downstream("s.a") == [("m.c", 1), ("m.r", 2)]
+
+    def test_cycle_terminates(self):
+        """Test that cycles are visited once and the start node is excluded"""
+        lineage = LineageIndex(chain_graph())
+
+        assert lineage.upstream("a.t1") == [("a.t0", 1), ("a.t3", 1), ("a.t2", 2)]
+        assert lineage.downstream("a.t1") == [("a.t2", 1), ("a.t3", 2)]
+
+    def test_memoized_with_lru_eviction(self):
+        """Test that repeated queries hit the cache and old entries are evicted"""
+        graph = chain_graph()
+        lineage = LineageIndex(graph, cache_size=2)
+
+        lineage.upstream("a.t3")
+        lineage.upstream("a.t3")
+        assert lineage.stats == {'hits': 1, 'misses': 1}
+
+        lineage.upstream("a.t2")
+        lineage.upstream("a.t1")
+        assert len(lineage._cache) == 2
+        assert (graph.node_id("a.t3"), UPSTREAM, None) not in lineage._cache
+
+    def test_unknown_table(self):
+        """Test that unknown names raise ValueError"""
+        with pytest.raises(ValueError):
+            LineageIndex(chain_graph()).upstream("missing.table")
+
+    def test_induced_edges(self):
+        """Test that only edges between the given tables are returned"""
+        lineage = LineageIndex(chain_graph())
+
+        assert sorted(lineage.induced_edges(["a.t1", "a.t2", "a.t3"])) == [
+            ("a.t1", "a.t2"), ("a.t2", "a.t3"), ("a.t3", "a.t1")
+        ]
+
+
+class TestLineageOutput:
+    """Tests for the visualizer API and the lineage subcommand"""
+
+    def setup_method(self):
+        """Create temporary report"""
+        self.test_dir = tempfile.mkdtemp()
+        self.report_file = Path(self.test_dir) / "report.txt"
+        self.report_file.write_text(REPORT, encoding='utf-8')
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def test_visualizer_api(self):
+        """Test upstream/downstream on the visualizer"""
+        viz = DependencyVisualizer(str(self.report_file), use_cache=False)
+
+        assert [name for name, _ in viz.upstream("mart.revenue")] == [
+            "mart.customer_360", "staging.customers", "staging.orders",
+            "source.raw_customers", "source.raw_orders"
+        ]
+        assert viz.downstream("staging.orders", depth=1) == [("mart.customer_360", 1)]
+
+    def test_lineage_svg(self):
+        """Test that the induced subgraph is drawn"""
+        viz = DependencyVisualizer(str(self.report_file), use_cache=False)
+
+        path = viz.generate_lineage_svg("mart.customer_360", Path(self.test_dir) / "l.svg")
+
+        content = path.read_text(encoding='utf-8')
+        assert content.startswith('<?xml')
+        for name in ("raw_customers", "customer_360", "revenue"):
+            assert name in content
+        # customers->360, orders->360, raw->customers, raw->orders, 360->revenue
+        assert content.count('<path ') == 5
+
+    def test_cli_json(self, capsys, monkeypatch):
+        """Test the lineage subcommand's JSON output"""
+        monkeypatch.setattr('sys.argv', [
+            'dataform-deps', '--report', str(self.report_file), '--no-cache',
+            'lineage', 'staging.customers', '--format', 'json'
+        ])
+
+        assert main() == 0
+
+        result = json.loads(capsys.readouterr().out)
+        assert result['upstream'] == [
+            {'name': 'source.raw_customers', 'distance': 1, 'type': 'unknown'}
+        ]
+        assert [d['name'] for d in result['downstream']] == ['mart.customer_360', 'mart.revenue']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
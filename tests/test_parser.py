@@ -2,7 +2,8 @@
 import pytest
 from pathlib import Path
 import tempfile
-from dataform_viz.parser import parse_dependencies_report
+from dataform_viz import parser
+from dataform_viz.parser import parse_dependencies_report, iter_dependencies_report
 
 
 class TestParseDependenciesReport:
@@ -108,6 +109,97 @@ Table: ops.operation (operation)
         assert result["analytics.view"]["type"] == "view"
         assert result["ops.operation"]["type"] == "operation"
 
+    def test_parse_join_info(self):
+        """Test parsing JOIN lines attached to the preceding dependency"""
+        report_file = Path(self.test_dir) / "report.txt"
+        content = """Table: analytics.combined (table)
+  Dependencies (2):
+    <- staging.customers
+      LEFT JOIN ON c.id = o.customer_id
+    <- staging.orders
+  Dependents (0):
+"""
+        report_file.write_text(content, encoding='utf-8')
+        
+        result = parse_dependencies_report(str(report_file))
+        
+        assert result["analytics.combined"]["join_info"] == {
+            "staging.customers": {"type": "LEFT JOIN", "condition": "c.id = o.customer_id"}
+        }
+    
+    def test_parse_utf16_with_bom(self):
+        """Test parsing a UTF-16 report (PowerShell redirection)"""
+        report_file = Path(self.test_dir) / "report.txt"
+        content = "Table: staging.customers (table)\r\n  Dependencies (0):\r\n  Dependents (1):\r\n    -> analytics.summary\r\n"
+        report_file.write_bytes(content.encode('utf-16'))
+        
+        result = parse_dependencies_report(str(report_file))
+        
+        assert result["staging.customers"]["dependents"] == ["analytics.summary"]
+    
+    def test_parse_cp1252_fallback(self):
+        """Test that a non UTF-8 byte falls back without duplicating tables"""
+        report_file = Path(self.test_dir) / "report.txt"
+        content = "Table: a.first (table)\n  Dependencies (0):\n\nTable: a.second (view)\n    <- a.caf\xe9\n"
+        report_file.write_bytes(content.encode('cp1252'))
+        
+        records = list(iter_dependencies_report(str(report_file), chunk_size=16))
+        
+        assert [name for name, _ in records] == ["a.first", "a.second"]
+        assert records[1][1]["dependencies"] == ["a.caf\xe9"]
+
+    def test_fallback_decodes_whole_file_once(self):
+        """Test that records before the first invalid UTF-8 byte use the fallback encoding too"""
+        report_file = Path(self.test_dir) / "report.txt"
+        # a.café is complete (and could be yielded as UTF-8) long before the cp1252 byte is read
+        padding = "".join(f"    <- a.dep{i}\n" for i in range(2000))
+        data = (f"Table: a.café (table)\n  Dependencies (0):\n\nTable: a.second (view)\n{padding}".encode('utf-8')
+                + "    <- a.na\xefve\n".encode('cp1252'))
+        report_file.write_bytes(data)
+
+        records = list(iter_dependencies_report(str(report_file), chunk_size=16))
+
+        assert [name for name, _ in records] == ["a.cafÃ©", "a.second"]
+        assert records[1][1]["dependencies"][-1] == "a.na\xefve"
+
+    def test_valid_utf8_read_once(self, monkeypatch):
+        """Test that a valid UTF-8 report is decoded in a single pass"""
+        report_file = Path(self.test_dir) / "report.txt"
+        report_file.write_text("Table: a.café (table)\n    <- a.naïve\n\nTable: a.second (view)\n",
+                               encoding='utf-8')
+        opened = []
+
+        def counting_open(file, mode='r', *args, **kwargs):
+            opened.append(mode)
+            return open(file, mode, *args, **kwargs)
+
+        monkeypatch.setattr(parser, 'open', counting_open, raising=False)
+
+        records = list(iter_dependencies_report(str(report_file), chunk_size=16))
+
+        assert [name for name, _ in records] == ["a.café", "a.second"]
+        assert records[0][1]["dependencies"] == ["a.naïve"]
+        assert opened.count('r') == 1
+
+    def test_iter_matches_parse(self):
+        """Test that the streaming records match the parsed dictionary"""
+        report_file = Path(self.test_dir) / "report.txt"
+        lines = []
+        for i in range(200):
+            lines.append(f"Table: s{i % 7}.t{i} (table)")
+            lines.append("  Dependencies (1):")
+            lines.append(f"    <- s0.t{i // 2}")
+            lines.append("      INNER JOIN ON a.id = b.id")
+            lines.append("  Dependents (1):")
+            lines.append(f"    -> s1.t{i * 2}")
+            lines.append("")
+        report_file.write_text("\n".join(lines), encoding='utf-8')
+        
+        records = list(iter_dependencies_report(str(report_file), chunk_size=64))
+        
+        assert dict(records) == parse_dependencies_report(str(report_file))
+        assert len(records) == 200
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,170 @@
+"""Tests for topology and reachability modules"""
+import random
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+from dataform_viz.graph import GraphBuilder
+from dataform_viz.lineage import LineageIndex
+from dataform_viz.reachability import ReachabilityIndex, reachability_path_for
+from dataform_viz.topology import (
+    find_cycles, level_widths, strongly_connected_components, topological_levels,
+)
+from dataform_viz.visualizer import DependencyVisualizer
+from dataform_viz.cli import main
+
+
+def build_graph(edges):
+    """edges: {table: [dependencies]}"""
+    builder = GraphBuilder()
+    for table, deps in edges.items():
+        builder.add_table(table, "table", deps, [], None)
+    return builder.build(derive_dependents=True)
+
+
+CYCLIC = {
+    "s.a": [],
+    "s.b": ["s.a", "s.d"],
+    "s.c": ["s.b"],
+    "s.d": ["s.c"],      # b -> c -> d -> b
+    "s.e": ["s.d", "raw.x"],
+    "s.f": ["s.f"],      # self loop
+}
+
+
+class TestTopology:
+    """Tests for strongly connected components"""
+
+    def test_components_in_topological_order(self):
+        """Test that cycles collapse and dependencies get smaller ids"""
+        graph = build_graph(CYCLIC)
+        component, count = strongly_connected_components(graph)
+        comp = {name: component[graph.node_id(name)] for name in graph}
+
+        assert comp["s.b"] == comp["s.c"] == comp["s.d"]
+        assert count == graph.node_count - 2
+        assert comp["s.a"] < comp["s.b"] < comp["s.e"]
+        assert component[graph.node_id("raw.x")] < comp["s.e"]
+
+    def test_find_cycles(self):
+        """Test that multi-table cycles and self loops are reported"""
+        assert find_cycles(build_graph(CYCLIC)) == [["s.b", "s.c", "s.d"], ["s.f"]]
+        assert find_cycles(build_graph({"s.a": [], "s.b": ["s.a"]})) == []
+
+    def test_topological_levels(self):
+        """Test levels, shared cycle levels and ignored referenced-only names"""
+        graph = build_graph(CYCLIC)
+        levels = topological_levels(graph)
+        level = {name: levels[graph.node_id(name)] for name in graph}
+
+        assert level == {"s.a": 0, "s.b": 1, "s.c": 1, "s.d": 1, "s.e": 2, "s.f": 0}
+        assert levels[graph.node_id("raw.x")] == -1
+        assert level_widths(levels) == [2, 3, 1]
+
+    def test_deep_chain_without_recursion(self):
+        """Test that long chains do not hit the recursion limit"""
+        chain = {f"s.t{i}": ([f"s.t{i - 1}"] if i else []) for i in range(5000)}
+        _, count = strongly_connected_components(build_graph(chain))
+
+        assert count == 5000
+
+
+class TestReachabilityIndex:
+    """Tests for the bitset reachability index"""
+
+    def test_reaches(self):
+        """Test reachability through cycles and referenced-only sources"""
+        index = ReachabilityIndex.build(build_graph(CYCLIC))
+
+        assert index.reaches("s.a", "s.e")
+        assert index.reaches("raw.x", "s.e")
+        assert index.reaches("s.d", "s.b") and index.reaches("s.b", "s.d")
+        assert index.reaches("s.f", "s.f") and index.reaches("s.a", "s.a")
+        assert not index.reaches("s.e", "s.a")
+        assert not index.reaches("s.a", "s.f")
+        with pytest.raises(ValueError):
+            index.reaches("s.a", "missing.table")
+
+    def test_matches_bfs_on_random_dag(self):
+        """Test every pair against lineage BFS"""
+        rng = random.Random(42)
+        edges = {f"s.t{i}": [f"s.t{rng.randrange(i)}" for _ in range(rng.randint(0, 3)) if i]
+                 for i in range(120)}
+        graph = build_graph(edges)
+        index = ReachabilityIndex.build(graph)
+        lineage = LineageIndex(graph)
+
+        for source in graph:
+            downstream = {name for name, _ in lineage.downstream(source)} | {source}
+            for target in graph:
+                assert index.reaches(source, target) == (target in downstream)
+
+    def test_serialization_roundtrip(self):
+        """Test to_bytes/from_bytes"""
+        graph = build_graph(CYCLIC)
+        index = ReachabilityIndex.build(graph)
+
+        restored = ReachabilityIndex.from_bytes(graph, index.to_bytes())
+
+        for source in graph:
+            for target in graph:
+                assert restored.reaches(source, target) == index.reaches(source, target)
+
+
+class TestReachabilitySidecar:
+    """Tests for the <report>.reachability sidecar"""
+
+    def setup_method(self):
+        """Create temporary report"""
+        self.test_dir = tempfile.mkdtemp()
+        self.report_file = Path(self.test_dir) / "report.txt"
+        self.report_file.write_text("""Table: s.a (table)
+  Dependencies (0):
+  Dependents (1):
+    -> s.b
+
+Table: s.b (view)
+  Dependencies (1):
+    <- s.a
+  Dependents (0):
+""", encoding='utf-8')
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def test_written_and_reused(self):
+        """Test that the sidecar is written and loaded on the next run"""
+        viz = DependencyVisualizer(str(self.report_file))
+        assert viz.reaches("s.a", "s.b")
+        viz.cache.wait()
+        sidecar = reachability_path_for(str(self.report_file))
+        assert sidecar.exists()
+
+        sidecar.write_bytes(sidecar.read_bytes()[:10])
+        # A truncated sidecar is rebuilt
+        assert DependencyVisualizer(str(self.report_file)).reaches("s.a", "s.b")
+
+
+class TestLevelsCommand:
+    """Tests for the levels subcommand"""
+
+    setup_method = TestReachabilitySidecar.setup_method
+    teardown_method = TestReachabilitySidecar.teardown_method
+
+    def test_levels_command(self, capsys, monkeypatch):
+        """Test the levels subcommand"""
+        monkeypatch.setattr('sys.argv', [
+            'dataform-deps', '--report', str(self.report_file), '--no-cache',
+            'levels', '--tables'
+        ])
+
+        assert main() == 0
+
+        out = capsys.readouterr().out
+        assert "2 tables in 2 levels (max parallelism 1)" in out
+        assert "s.b" in out and "cycle" not in out
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
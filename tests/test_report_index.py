@@ -0,0 +1,125 @@
+"""Tests for report_index module"""
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+from dataform_viz.parser import parse_dependencies_report
+from dataform_viz.report_index import ReportIndex, index_path_for
+from dataform_viz.visualizer import DependencyVisualizer
+
+
+REPORT = """DEBUG: main() started
+
+--- Dataform Dependency Analysis ---
+
+Table: staging.customers (table)
+  Dependencies (1):
+    <- source.raw_customers
+      LEFT JOIN ON c.id = r.id
+  Dependents (2):
+    -> analytics.summary
+    -> reports.customer_report
+
+Table: analytics.summary (view)
+  Dependencies (2):
+    <- staging.customers
+    <- staging.orders
+  Dependents (0):
+
+Table: staging.orders (incremental)
+  Dependencies (0):
+  Dependents (1):
+    -> analytics.summary
+
+Table: reports.customer_report (view)
+  Dependencies (1):
+    <- staging.customers
+  Dependents (0):
+
+Tip: Pass a table name as an argument to filter results.
+"""
+
+
+class TestReportIndex:
+    """Tests for the table offset index"""
+
+    def setup_method(self):
+        """Create temporary report"""
+        self.test_dir = tempfile.mkdtemp()
+        self.report_file = Path(self.test_dir) / "report.txt"
+        self.report_file.write_text(REPORT, encoding='utf-8')
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def test_blocks_match_full_parse(self):
+        """Test that every indexed block decodes to the parsed record"""
+        index = ReportIndex.build(str(self.report_file))
+        parsed = parse_dependencies_report(str(self.report_file))
+
+        assert index.names() == list(parsed)
+        for name in parsed:
+            assert index.get(name) == parsed[name]
+            assert index.table_type(name) == parsed[name]['type']
+
+    def test_block_span_points_at_header(self):
+        """Test that offsets point at the Table: header bytes"""
+        index = ReportIndex.build(str(self.report_file))
+        offset, length = index.block_span("staging.orders")
+
+        block = self.report_file.read_bytes()[offset:offset + length]
+
+        assert block.startswith(b"Table: staging.orders (incremental)")
+        assert b"Table: reports" not in block
+
+    def test_iter_schema(self):
+        """Test iterating over a single schema"""
+        index = ReportIndex.build(str(self.report_file))
+
+        names = [name for name, _ in index.iter_schema("staging")]
+
+        assert names == ["staging.customers", "staging.orders"]
+
+    def test_utf16_report(self):
+        """Test indexing a UTF-16 report with CRLF line endings"""
+        self.report_file.write_bytes(REPORT.replace('\n', '\r\n').encode('utf-16'))
+
+        index = ReportIndex.build(str(self.report_file))
+
+        assert index.encoding == 'utf-16-le'
+        assert index.get("analytics.summary") == parse_dependencies_report(str(self.report_file))["analytics.summary"]
+
+    def test_sidecar_is_reused_and_invalidated(self):
+        """Test that the sidecar index is written, reused and rebuilt when stale"""
+        ReportIndex.load_or_build(str(self.report_file))
+        assert index_path_for(str(self.report_file)).exists()
+
+        assert ReportIndex._load(str(self.report_file), index_path_for(str(self.report_file))) is not None
+
+        self.report_file.write_text(REPORT + "Table: extra.one (table)\n", encoding='utf-8')
+        index = ReportIndex.load_or_build(str(self.report_file))
+        assert "extra.one" in index
+
+    def test_visualizer_lookup_without_full_parse(self):
+        """Test get_table and schema rendering through the index"""
+        viz = DependencyVisualizer(str(self.report_file), use_index=True)
+
+        assert viz.get_table("staging.orders")['dependents'] == ["analytics.summary"]
+        assert viz.get_table("missing.table") is None
+
+        output_dir = Path(self.test_dir) / "output"
+        count = viz.generate_schema_svgs("staging", output_dir=str(output_dir))
+
+        assert count == 2
+        assert viz.tables is None
+        indexed_svg = (output_dir / "dependencies_staging" / "staging_customers.svg").read_text()
+
+        full = DependencyVisualizer(str(self.report_file), use_cache=False)
+        full_dir = Path(self.test_dir) / "full"
+        full.generate_schema_svgs("staging", output_dir=str(full_dir))
+        assert indexed_svg == (full_dir / "dependencies_staging" / "staging_customers.svg").read_text()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,152 @@
+"""Tests for schema_graph module"""
+import json
+import random
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+from dataform_viz.graph import GraphBuilder
+from dataform_viz.schema_graph import SchemaGraph
+from dataform_viz.visualizer import DependencyVisualizer
+from dataform_viz.cli import main
+
+
+REPORT = """Table: staging.customers (table)
+  Dependencies (1):
+    <- source.raw_customers
+  Dependents (1):
+    -> mart.customer_360
+
+Table: staging.orders (table)
+  Dependencies (2):
+    <- source.raw_orders
+    <- staging.customers
+  Dependents (1):
+    -> mart.customer_360
+
+Table: mart.customer_360 (table)
+  Dependencies (2):
+    <- staging.customers
+    <- staging.orders
+  Dependents (1):
+    -> mart.revenue
+
+Table: mart.revenue (view)
+  Dependencies (1):
+    <- mart.customer_360
+  Dependents (0):
+"""
+
+
+def random_graph(seed, tables=300, schemas=12):
+    """Random graph plus its records, for comparing incremental and full aggregation"""
+    rng = random.Random(seed)
+    names = [f"s{rng.randrange(schemas)}.t{i}" for i in range(tables)]
+    records = {}
+    builder = GraphBuilder()
+    for name in names:
+        deps = rng.sample(names, rng.randrange(4))
+        records[name] = deps
+        builder.add_table(name, "table", deps, [], None)
+    return builder.build(derive_dependents=True), records
+
+
+class TestSchemaGraph:
+    """Tests for the aggregation and its incremental updates"""
+
+    def setup_method(self):
+        """Parse the report"""
+        self.test_dir = tempfile.mkdtemp()
+        self.report_file = Path(self.test_dir) / "report.txt"
+        self.report_file.write_text(REPORT, encoding='utf-8')
+        self.viz = DependencyVisualizer(str(self.report_file), use_cache=False)
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def test_weights(self):
+        """Test edge weights, internal edges and table counts"""
+        schema_graph = self.viz.schema_graph()
+
+        assert schema_graph.edges() == [
+            ("source", "staging", 2),
+            ("staging", "mart", 2),
+        ]
+        assert schema_graph.weight("staging", "staging") == 1
+        assert schema_graph.weight("mart", "mart") == 1
+        assert schema_graph.table_counts == {"staging": 2, "mart": 2}
+        assert schema_graph.schemas() == ["mart", "source", "staging"]
+        assert schema_graph.levels() == {"source": 0, "staging": 1, "mart": 2}
+
+    def test_update_and_remove(self):
+        """Test that one table adjusts only its own edges"""
+        schema_graph = self.viz.schema_graph()
+
+        schema_graph.update_table("mart.revenue", ["mart.customer_360", "source.fx_rates"])
+        assert schema_graph.upstream("mart") == [("staging", 2), ("source", 1)]
+
+        assert schema_graph.remove_table("staging.orders") is True
+        assert schema_graph.remove_table("staging.orders") is False
+        assert schema_graph.edges() == [
+            ("source", "mart", 1),
+            ("source", "staging", 1),
+            ("staging", "mart", 2),
+        ]
+        assert schema_graph.weight("staging", "staging") == 0
+        assert schema_graph.table_counts["staging"] == 1
+
+    def test_incremental_matches_full_aggregation(self):
+        """Test random updates against rebuilding from scratch"""
+        graph, records = random_graph(seed=7)
+        schema_graph = SchemaGraph.from_graph(graph)
+        rng = random.Random(11)
+        names = list(records)
+
+        for _ in range(200):
+            name = rng.choice(names)
+            if rng.random() < 0.2:
+                records.pop(name, None)
+                schema_graph.remove_table(name)
+            else:
+                records[name] = rng.sample(names, rng.randrange(5))
+                schema_graph.update_table(name, records[name])
+
+        builder = GraphBuilder()
+        for name, deps in records.items():
+            builder.add_table(name, "table", deps, [], None)
+        expected = SchemaGraph.from_graph(builder.build())
+        assert schema_graph.edges(include_internal=True) == expected.edges(include_internal=True)
+        assert schema_graph.table_counts == expected.table_counts
+
+    def test_svgs(self):
+        """Test the overview and neighbor diagrams"""
+        output_dir = Path(self.test_dir) / "out"
+
+        overview, count = self.viz.generate_schema_graph_svgs(str(output_dir), exclude_patterns=['sou*'])
+
+        assert count == 2
+        content = overview.read_text(encoding='utf-8')
+        assert content.count('<path ') == 2
+        assert "2 tables" in content
+        neighbors = (output_dir / "schema_neighbors" / "staging.svg").read_text(encoding='utf-8')
+        assert '>source<' in neighbors and '>mart<' in neighbors
+        assert neighbors.count('fill="#1565c0">2</text>') == 2
+        assert not (output_dir / "schema_neighbors" / "source.svg").exists()
+
+    def test_cli_json(self, capsys, monkeypatch):
+        """Test the schema-graph subcommand's JSON output"""
+        monkeypatch.setattr('sys.argv', [
+            'dataform-deps', '--report', str(self.report_file), '--no-cache',
+            'schema-graph', '--format', 'json', '--schema', 'mart'
+        ])
+
+        assert main() == 0
+
+        result = json.loads(capsys.readouterr().out)
+        assert result['schemas'] == {'mart': {'tables': 2, 'internal_edges': 1}}
+        assert result['edges'] == [{'source': 'staging', 'reader': 'mart', 'weight': 2}]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
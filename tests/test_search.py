@@ -0,0 +1,165 @@
+"""Tests for search module"""
+import json
+import re
+import shutil
+import subprocess
+import tempfile
+import pytest
+from pathlib import Path
+from dataform_viz.master_index import generate_master_index
+from dataform_viz.search import SEARCH_JS, TrigramIndex, normalize, query_trigrams
+from dataform_viz.cli import main
+
+
+NAMES = [
+    "staging.customers",
+    "staging.orders",
+    "mart.customer_360",
+    "mart.revenue_daily",
+    "mart.revenue_monthly",
+    "finance.customer_ledger",
+    "source.raw_customers",
+    "ops.daily_snapshot",
+]
+
+REPORT = """Table: staging.customers (table)
+  Dependencies (1):
+    <- source.raw_customers
+  Dependents (1):
+    -> mart.customer_360
+
+Table: mart.customer_360 (table)
+  Dependencies (1):
+    <- staging.customers
+  Dependents (1):
+    -> mart.revenue_daily
+
+Table: mart.revenue_daily (view)
+  Dependencies (1):
+    <- mart.customer_360
+  Dependents (0):
+"""
+
+
+def decode_postings(encoded):
+    """Inverse of the base-36 delta encoding used by to_compact()"""
+    ids = []
+    previous = 0
+    for part in encoded.split(','):
+        previous += int(part, 36)
+        ids.append(previous)
+    return ids
+
+
+class TestTrigramIndex:
+    """Tests for the index and its ranking"""
+
+    def setup_method(self):
+        """Index the sample names"""
+        self.index = TrigramIndex(NAMES)
+
+    def names(self, query, limit=20):
+        return [name for name, _ in self.index.search(query, limit)]
+
+    def test_normalize(self):
+        """Test separator folding and query padding"""
+        assert normalize("Mart.Customer_360") == "mart customer 360"
+        assert query_trigrams("cu") == [" cu"]
+        assert query_trigrams("") == []
+
+    def test_ranking(self):
+        """Test that exact and word-prefix matches rank first"""
+        assert self.names("customer_360")[0] == "mart.customer_360"
+        assert self.names("revenue")[:2] == ["mart.revenue_daily", "mart.revenue_monthly"]
+        # A whole word beats a word prefix
+        assert self.names("daily")[:2] == ["mart.revenue_daily", "ops.daily_snapshot"]
+        assert set(self.names("cust", limit=4)) == {
+            "staging.customers", "mart.customer_360", "finance.customer_ledger", "source.raw_customers"
+        }
+        assert len(self.names("cust", limit=2)) == 2
+
+    def test_typos_and_misses(self):
+        """Test fuzzy matches and queries without results"""
+        assert self.names("revnue dialy")[0] == "mart.revenue_daily"
+        assert self.names("custmer ledger")[0] == "finance.customer_ledger"
+        assert self.names("zzzz") == []
+        assert self.names("  ") == []
+        assert self.names("customers", limit=0) == []
+
+    def test_common_trigrams_only_add_to_scores(self):
+        """Test that a query made of very common trigrams still ranks correctly"""
+        names = [f"mart.table_{i}" for i in range(2000)] + ["mart.customers"]
+        index = TrigramIndex(names)
+
+        assert index.search("mart.customers", limit=1)[0][0] == "mart.customers"
+        assert index.search("table 1999", limit=1)[0][0] == "mart.table_1999"
+
+    def test_compact_round_trip(self):
+        """Test that the serialized posting lists decode to the original ids"""
+        compact = json.loads(json.dumps(self.index.to_compact()))
+
+        assert compact['names'] == NAMES
+        for gram, encoded in compact['grams'].items():
+            assert decode_postings(encoded) == list(self.index._postings[gram])
+
+    @pytest.mark.skipif(shutil.which('node') is None, reason="node not installed")
+    def test_browser_search_matches_python(self):
+        """Test that the embedded JS returns the same ranking"""
+        queries = ["cust", "revnue dialy", "mart", "customer_360", "zzzz"]
+        script = (f"const SEARCH_INDEX = {json.dumps(self.index.to_compact())};\n{SEARCH_JS}\n"
+                  f"console.log(JSON.stringify({json.dumps(queries)}.map(q => SearchIndex.search(q, 5))));")
+
+        output = subprocess.run(['node', '-e', script], capture_output=True, text=True, check=True).stdout
+
+        expected = [[NAMES.index(name) for name in self.names(query, 5)] for query in queries]
+        assert json.loads(output) == expected
+
+
+class TestSearchOutputs:
+    """Tests for the CLI command and the master index"""
+
+    def setup_method(self):
+        """Create a report"""
+        self.test_dir = tempfile.mkdtemp()
+        self.report_file = Path(self.test_dir) / "report.txt"
+        self.report_file.write_text(REPORT, encoding='utf-8')
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def test_cli(self, capsys, monkeypatch):
+        """Test the search subcommand"""
+        monkeypatch.setattr('sys.argv', [
+            'dataform-deps', '--report', str(self.report_file), '--no-cache',
+            'search', 'revenu', '--format', 'json', '--limit', '1'
+        ])
+
+        assert main() == 0
+
+        result = json.loads(capsys.readouterr().out)
+        assert [(r['name'], r['type']) for r in result] == [('mart.revenue_daily', 'view')]
+        assert result[0]['score'] > 1
+
+    def test_master_index_embeds_index(self):
+        """Test that the master index carries the compact index in sidebar order"""
+        schemas = {
+            'mart': {'svgs': [{'file': 'dependencies_mart/mart_customer_360.svg',
+                               'name': 'mart.customer_360', 'display_name': 'customer_360'}]},
+            'staging': {'svgs': [{'file': 'dependencies_staging/staging_customers.svg',
+                                  'name': 'staging.customers', 'display_name': 'customers'}]},
+        }
+
+        html = generate_master_index(schemas)
+
+        assert 'id="search-box"' in html
+        index = json.loads(re.search(r'const SEARCH_INDEX = (.*);', html).group(1))
+        entries = json.loads(re.search(r'const SEARCH_ENTRIES = (.*);', html).group(1))
+        assert index['names'] == ['mart.customer_360', 'staging.customers']
+        assert entries[1] == ['dependencies_staging/staging_customers.svg', 'staging.customers',
+                              'staging', 'staging_customers']
+        assert 'const SearchIndex' in html
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
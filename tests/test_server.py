@@ -0,0 +1,222 @@
+"""Tests for server module"""
+import http.client
+import json
+import os
+import socket
+import threading
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from dataform_viz.cli import main
+from dataform_viz.server import GraphService, SvgCache, make_server
+
+
+REPORT = """Table: staging.customers (table)
+  Dependencies (1):
+    <- source.raw_customers
+  Dependents (1):
+    -> mart.customer_360
+
+Table: mart.customer_360 (table)
+  Dependencies (1):
+    <- staging.customers
+      LEFT JOIN ON c.id = s.customer_id
+  Dependents (1):
+    -> mart.revenue
+
+Table: mart.revenue (view)
+  Dependencies (1):
+    <- mart.customer_360
+  Dependents (0):
+"""
+
+EXTRA = """
+Table: mart.churn (view)
+  Dependencies (1):
+    <- mart.customer_360
+  Dependents (0):
+"""
+
+
+class TestSvgCache:
+    """Tests for the rendered-diagram LRU"""
+
+    def test_lru_eviction(self):
+        """Test hits, misses and eviction of the least recently used entry"""
+        cache = SvgCache(max_entries=2)
+        renders = []
+
+        def render(text):
+            renders.append(text)
+            return text
+
+        etag_a, body_a = cache.get_or_render(('a',), lambda: render('<svg>a</svg>'))
+        cache.get_or_render(('b',), lambda: render('<svg>b</svg>'))
+        assert cache.get_or_render(('a',), lambda: render('x')) == (etag_a, body_a)
+        cache.get_or_render(('c',), lambda: render('<svg>c</svg>'))   # evicts b
+        cache.get_or_render(('b',), lambda: render('<svg>b</svg>'))
+
+        assert body_a == b'<svg>a</svg>'
+        assert renders == ['<svg>a</svg>', '<svg>b</svg>', '<svg>c</svg>', '<svg>b</svg>']
+        assert cache.stats == {'hits': 1, 'misses': 4, 'evictions': 2}
+
+
+class TestServer:
+    """Tests for the HTTP API on localhost"""
+
+    def setup_method(self):
+        """Start a server on a free port"""
+        self.test_dir = tempfile.mkdtemp()
+        self.report_file = Path(self.test_dir) / "report.txt"
+        self.report_file.write_text(REPORT, encoding='utf-8')
+        self.service = GraphService(str(self.report_file), use_cache=False, svg_cache_size=8)
+        self.server = make_server(self.service, port=0, quiet=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        host, port = self.server.server_address[:2]
+        self.base = f"http://{host}:{port}"
+
+    def teardown_method(self):
+        """Stop the server and clean up"""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.test_dir)
+
+    def get(self, path, headers=None):
+        with urlopen(Request(self.base + path, headers=headers or {}), timeout=5) as response:
+            return response.status, dict(response.headers), response.read()
+
+    def get_json(self, path):
+        return json.loads(self.get(path)[2])
+
+    def test_neighbors(self):
+        """Test direct neighbors with types and join info"""
+        result = self.get_json('/neighbors?table=mart.customer_360')
+
+        assert result['type'] == 'table'
+        assert result['dependencies'] == [{'name': 'staging.customers', 'type': 'table'}]
+        assert result['dependents'] == [{'name': 'mart.revenue', 'type': 'view'}]
+        assert result['join_info'] == {
+            'staging.customers': {'type': 'LEFT JOIN', 'condition': 'c.id = s.customer_id'}
+        }
+
+    def test_lineage_and_search(self):
+        """Test transitive lineage and name search"""
+        result = self.get_json('/lineage?table=mart.revenue&direction=upstream&depth=2')
+        assert [(e['name'], e['distance']) for e in result['upstream']] == [
+            ('mart.customer_360', 1), ('staging.customers', 2)
+        ]
+        assert 'downstream' not in result
+
+        assert self.get_json('/search?q=CUSTOMER')['results'] == [
+            'staging.customers', 'mart.customer_360'
+        ]
+
+    def test_errors(self):
+        """Test status codes for unknown tables, bad parameters and paths"""
+        for path, status in [('/neighbors?table=nope.nope', 404), ('/neighbors', 400),
+                             ('/lineage?table=mart.revenue&depth=x', 400), ('/missing', 404)]:
+            with pytest.raises(HTTPError) as excinfo:
+                self.get(path)
+            assert excinfo.value.code == status
+            assert 'error' in json.loads(excinfo.value.read())
+
+    def test_svg_etag(self):
+        """Test that diagrams are cached and revalidated with ETags"""
+        status, headers, body = self.get('/svg/table?table=mart.customer_360')
+        assert status == 200
+        assert headers['Content-Type'] == 'image/svg+xml'
+        assert body.startswith(b'<?xml') and b'customer_360' in body
+
+        with pytest.raises(HTTPError) as excinfo:
+            self.get('/svg/table?table=mart.customer_360', {'If-None-Match': headers['ETag']})
+        assert excinfo.value.code == 304
+
+        self.get('/svg/lineage?table=mart.revenue')
+        stats = self.get_json('/stats')['svg_cache']
+        assert stats['hits'] == 1 and stats['misses'] == 2 and stats['entries'] == 2
+
+    def test_hot_reload(self):
+        """Test that a changed report is reloaded and the diagram cache dropped"""
+        _, headers, _ = self.get('/svg/table?table=mart.customer_360')
+        assert self.get_json('/health') == {'status': 'ok', 'tables': 3, 'generation': 1}
+
+        self.report_file.write_text(REPORT + EXTRA, encoding='utf-8')
+        stat = os.stat(self.report_file)
+        os.utime(self.report_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert self.get_json('/health') == {'status': 'ok', 'tables': 4, 'generation': 2}
+        assert self.get_json('/search?q=churn')['results'] == ['mart.churn']
+        # Rendered again after the reload; the content (and ETag) did not change
+        with pytest.raises(HTTPError) as excinfo:
+            self.get('/svg/table?table=mart.customer_360', {'If-None-Match': headers['ETag']})
+        assert excinfo.value.code == 304
+        stats = self.get_json('/stats')
+        assert stats['reloads'] == 1
+        assert stats['svg_cache']['misses'] == 2
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="Unix sockets not available")
+class TestUnixSocket:
+    """Tests for serving on a Unix socket"""
+
+    def setup_method(self):
+        """Create temporary report"""
+        self.test_dir = tempfile.mkdtemp()
+        self.report_file = Path(self.test_dir) / "report.txt"
+        self.report_file.write_text(REPORT, encoding='utf-8')
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def test_neighbors_over_socket(self):
+        """Test a query over the socket"""
+        socket_path = str(Path(self.test_dir) / "deps.sock")
+        service = GraphService(str(self.report_file), use_cache=False)
+        server = make_server(service, socket_path=socket_path, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            conn = http.client.HTTPConnection('localhost', timeout=5)
+            conn.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.sock.connect(socket_path)
+            conn.request('GET', '/neighbors?table=mart.revenue')
+            result = json.loads(conn.getresponse().read())
+            conn.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert result['dependencies'] == [{'name': 'mart.customer_360', 'type': 'table'}]
+
+    def test_only_stale_sockets_are_replaced(self):
+        """Test that a leftover socket is removed but any other file is kept"""
+        service = GraphService(str(self.report_file), use_cache=False)
+        socket_path = str(Path(self.test_dir) / "deps.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()
+
+        make_server(service, socket_path=socket_path, quiet=True).server_close()
+
+        with pytest.raises(ValueError, match="not a socket"):
+            make_server(service, socket_path=str(self.report_file), quiet=True)
+        assert self.report_file.read_text(encoding='utf-8') == REPORT
+
+
+class TestServeCommand:
+    """Tests for the serve subcommand"""
+
+    def test_sqlite_backend_rejected(self, capsys, monkeypatch):
+        """Test that serve refuses the SQLite backend instead of ignoring it"""
+        monkeypatch.setattr('sys.argv', ['dataform-deps', '--backend', 'sqlite', 'serve', '--port', '0'])
+
+        assert main() == 1
+        assert "--backend sqlite" in capsys.readouterr().err
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,217 @@
+"""Tests for sql_lexer module"""
+import random
+import time
+import pytest
+from dataform_viz.dataform_check import parse_joins_from_query
+from dataform_viz.sql_lexer import (
+    COMMENT, STRING, WORD, JoinClause, iter_tokens, scan_query, scan_query_spans,
+)
+
+
+QUERY = """WITH orders AS (
+  SELECT * FROM `proj.staging.orders`  -- JOIN fake ON 1 = 1
+),
+enriched AS (SELECT o.*, EXTRACT(YEAR FROM o.created_at) AS y FROM orders o)
+SELECT *
+FROM enriched e
+LEFT OUTER JOIN proj.staging.customers AS c
+  ON c.id = e.customer_id /* trailing ) comment */ AND c.note != 'LEFT JOIN x ON'
+JOIN `proj`.`mart`.`fx` fx USING (currency, day)
+WHERE e.y > 2020"""
+
+
+class TestTokenizer:
+    """Tests for comments, literals and quoted identifiers"""
+
+    def test_token_kinds(self):
+        """Test that keywords inside comments and strings stay inside them"""
+        tokens = list(iter_tokens("SELECT 'a -- b', \"it''s\" # note\nFROM `my-proj`.ds.t /* x */ -- end"))
+
+        assert [(kind, text) for kind, text, _, _ in tokens] == [
+            (WORD, "SELECT"), (STRING, "'a -- b'"), ('punct', ","), (STRING, "\"it''s\""),
+            (COMMENT, "# note"), (WORD, "FROM"), (WORD, "`my-proj`.ds.t"),
+            (COMMENT, "/* x */"), (COMMENT, "-- end"),
+        ]
+
+    def test_triple_quoted_and_unterminated(self):
+        """Test triple-quoted and raw strings, and literals that never close"""
+        kinds = [kind for kind, _, _, _ in iter_tokens("r'''a\n'b'\n''' x")]
+        assert kinds == [STRING, WORD]
+
+        assert [kind for kind, _, _, _ in iter_tokens("'open\nJOIN")] == [STRING, WORD]
+        assert [kind for kind, _, _, _ in iter_tokens("/* open JOIN")] == [COMMENT]
+        assert [kind for kind, _, _, _ in iter_tokens("`open JOIN")] == [WORD]
+
+    def test_minus_and_comment(self):
+        """Test that '--' starts a comment even right after a word"""
+        texts = [text for _, text, _, _ in iter_tokens("a-b--c\nd")]
+        assert texts == ["a-b", "--c", "d"]
+
+
+class TestScanQuery:
+    """Tests for CTE and join extraction"""
+
+    def test_ctes_and_joins(self):
+        """Test CTE sources, join types, aliases and conditions"""
+        ctes, joins = scan_query(QUERY)
+
+        assert ctes == {"orders": "proj.staging.orders", "enriched": "orders"}
+        assert joins == [
+            JoinClause("LEFT OUTER JOIN", "proj.staging.customers", "c",
+                       "c.id = e.customer_id AND c.note != 'LEFT JOIN x ON'"),
+            JoinClause("JOIN", "proj.mart.fx", "fx", "currency, day", using=True),
+        ]
+
+    def test_condition_boundaries(self):
+        """Test conditions ending at clause keywords, joins, parentheses and the end"""
+        _, joins = scan_query(
+            "SELECT * FROM (SELECT * FROM a INNER JOIN b ON a.k = b.k AND LEFT(a.s, 2) = 'x') t "
+            "FULL OUTER JOIN c ON c.k IN (SELECT k FROM d JOIN e ON e.k = d.k) "
+            "CROSS JOIN f "
+            "RIGHT JOIN g ON g.k = t.k;"
+            "SELECT 1 FROM h JOIN i ON TRUE"
+        )
+
+        assert [(join.join_type, join.table, join.condition) for join in joins] == [
+            ("INNER JOIN", "b", "a.k = b.k AND LEFT(a.s, 2) = 'x'"),
+            ("FULL OUTER JOIN", "c", "c.k IN (SELECT k FROM d JOIN e ON e.k = d.k)"),
+            ("JOIN", "e", "e.k = d.k"),
+            ("RIGHT JOIN", "g", "g.k = t.k"),
+            ("JOIN", "i", "TRUE"),
+        ]
+
+    def test_spans_cut_on_demand(self):
+        """Test that spans give the same conditions and blank spans are detected"""
+        sql = QUERY + " JOIN z ON /* nothing */ `` WHERE 1 = 1"
+        ctes, spans, query_text = scan_query_spans(sql)
+
+        assert (ctes, [JoinClause(span.join_type, span.table, span.alias,
+                                  query_text.text(span.start, span.end), span.using)
+                       for span in spans]) == scan_query(sql)
+        assert [query_text.is_blank(span.start, span.end) for span in spans] == [False, False, True]
+
+    def test_nested_and_recursive_ctes(self):
+        """Test that the first FROM in a CTE body wins, also for nested WITH"""
+        ctes, _ = scan_query(
+            "WITH RECURSIVE outer_cte AS (WITH inner_cte AS (SELECT * FROM src.t) SELECT * FROM inner_cte), "
+            "sub AS (SELECT * FROM (SELECT * FROM src.u)), "
+            "no_source AS (SELECT 1) "
+            "SELECT * FROM outer_cte"
+        )
+
+        assert ctes == {"outer_cte": "src.t", "inner_cte": "src.t", "sub": "src.u"}
+
+    def test_parse_joins_from_query(self):
+        """Test CTE resolution and dependency matching on top of the scanner"""
+        dependencies = [
+            {"schema": "staging", "name": "orders"},
+            {"schema": "staging", "name": "customers"},
+            {"schema": "mart", "name": "fx"},
+        ]
+
+        assert parse_joins_from_query(QUERY.replace("FROM enriched e", "FROM x e\nJOIN enriched USING (id)"),
+                                      dependencies, log=None) == {
+            "staging.orders": {"type": "JOIN", "condition": "USING (id)"},
+            "staging.customers": {"type": "LEFT OUTER JOIN",
+                                  "condition": "c.id = e.customer_id AND c.note != 'LEFT JOIN x ON'"},
+            "mart.fx": {"type": "JOIN", "condition": "USING (currency, day)"},
+        }
+
+
+FUZZ_PIECES = [
+    "SELECT", "FROM", "JOIN", "LEFT", "OUTER", "ON", "USING", "WITH", "AS", "WHERE", "EXTRACT",
+    "a.b", "`p-1.d.t`", "x", "(", ")", ",", ";", "=", "'", "'s'", '"', "'''", "--", "#", "/*", "*/",
+    "\n", " ", "`", "-", "r'", "\\",
+]
+
+
+def generated_query(rng, joins):
+    """Well-formed query with CTEs and joins"""
+    ctes = ", ".join(f"c{i} AS (SELECT * FROM s.t{i} WHERE v > (1))" for i in range(3))
+    lines = [f"WITH {ctes}", "SELECT *", "FROM c0"]
+    for i in range(joins):
+        kind = rng.choice(["JOIN", "LEFT JOIN", "INNER JOIN", "FULL OUTER JOIN"])
+        if rng.random() < 0.3:
+            lines.append(f"{kind} s.t{i} USING (k{i})")
+        else:
+            lines.append(f"{kind} `s.t{i}` j{i} ON j{i}.k = c0.k AND f(j{i}.v, 'x') > {i}")
+    lines.append("WHERE c0.v > 0")
+    return "\n".join(lines)
+
+
+class TestFuzz:
+    """Random and adversarial input"""
+
+    def test_random_input_never_fails(self):
+        """Test token soup for crashes and output invariants"""
+        rng = random.Random(1)
+        for _ in range(500):
+            sql = " ".join(rng.choice(FUZZ_PIECES) for _ in range(rng.randint(0, 80)))
+            ctes, joins = scan_query(sql)
+            for join in joins:
+                assert join.table and '`' not in join.table
+                assert '\n' not in join.condition and '`' not in join.condition
+            assert all(name and source for name, source in ctes.items())
+
+    def test_comments_and_whitespace_do_not_change_results(self):
+        """Test that comments between tokens are transparent"""
+        rng = random.Random(2)
+        noise = ["/* JOIN z ON y */", "-- ) WHERE FROM\n", "# (\n", "\n\n", "\t"]
+        for _ in range(50):
+            tokens = [text for _, text, _, _ in iter_tokens(generated_query(rng, rng.randint(1, 12)))]
+            expected = scan_query(" ".join(tokens))
+            noisy = " ".join(token + (" " + rng.choice(noise) if rng.random() < 0.3 else "") for token in tokens)
+            assert scan_query(noisy) == expected
+
+    @staticmethod
+    def best_time(sql):
+        best = None
+        for _ in range(3):
+            start = time.perf_counter()
+            scan_query(sql)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    @pytest.mark.parametrize("block", [
+        # Parenthesis inside a literal in every CTE
+        "c{i} AS (SELECT '(' AS p FROM s.t{i}), ",
+        # Conditions that never meet a terminator
+        "JOIN t{i} ON a = b AND c = d ",
+        # Unbalanced open parentheses and dangling keywords
+        "( LEFT JOIN ON FROM WITH x AS ( ",
+    ])
+    def test_linear_time(self, block):
+        """Test that 4x the input takes roughly 4x the time, not 16x"""
+        small = "WITH " + "".join(block.format(i=i) for i in range(2000))
+        large = "WITH " + "".join(block.format(i=i) for i in range(8000))
+
+        small_time = self.best_time(small)
+        large_time = self.best_time(large)
+
+        assert large_time < small_time * 8 + 0.05
+
+    def test_nested_conditions_linear_time(self):
+        """Test that ON conditions nested in each other are not each cut out"""
+        def nested(n):
+            return "SELECT * FROM a " + "".join(
+                f"JOIN t{i} j{i} ON (j{i}.k = a.k AND j{i}.v IN (SELECT v FROM b{i} " for i in range(n)
+            ) + "))" * n
+
+        def best_time(sql):
+            best = None
+            for _ in range(3):
+                start = time.perf_counter()
+                parse_joins_from_query(sql, [{"schema": "s", "name": "other"}], log=None)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            return best
+
+        small_time = best_time(nested(500))
+        large_time = best_time(nested(2000))
+
+        assert large_time < small_time * 8 + 0.05
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,196 @@
+"""Tests for sqlite_store module"""
+import json
+import os
+import pickle
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+from dataform_viz.graph import DependencyGraph
+from dataform_viz.lineage import LineageIndex
+from dataform_viz.rendering import plain_info
+from dataform_viz.sqlite_store import SqliteGraph, build_store, load_store, store_path_for
+from dataform_viz.visualizer import DependencyVisualizer
+from dataform_viz.cli import main
+
+
+REPORT = """Table: staging.customers (table)
+  Dependencies (1):
+    <- source.raw_customers
+  Dependents (1):
+    -> mart.customer_360
+
+Table: staging.orders (view)
+  Dependencies (2):
+    <- source.raw_orders
+    <- staging.customers
+      INNER JOIN ON o.customer_id = c.id
+  Dependents (1):
+    -> mart.customer_360
+
+Table: mart.customer_360 (table)
+  Dependencies (2):
+    <- staging.customers
+      LEFT JOIN ON c.id = s.customer_id
+    <- staging.orders
+  Dependents (2):
+    -> mart.revenue
+    -> staging.feedback
+
+Table: mart.revenue (view)
+  Dependencies (1):
+    <- mart.customer_360
+  Dependents (0):
+
+Table: staging.feedback (table)
+  Dependencies (1):
+    <- mart.customer_360
+  Dependents (1):
+    -> staging.customers
+"""
+
+
+class TestSqliteStore:
+    """Tests for the store against the in-memory graph"""
+
+    def setup_method(self):
+        """Parse the report both ways"""
+        self.test_dir = tempfile.mkdtemp()
+        self.report_file = Path(self.test_dir) / "report.txt"
+        self.report_file.write_text(REPORT, encoding='utf-8')
+        self.graph = DependencyGraph.from_report(str(self.report_file))
+        self.store = load_store(str(self.report_file))
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        self.store.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_mapping_matches_memory(self):
+        """Test records, order, membership and schema partition"""
+        assert list(self.store) == list(self.graph)
+        assert len(self.store) == 5
+        for name in self.graph:
+            assert self.store[name] == plain_info(self.graph[name])
+        assert "source.raw_orders" not in self.store
+        assert self.store.get("source.raw_orders") is None
+        assert self.store.type_view()["staging.orders"] == {'type': 'view'}
+        assert self.store.schemas() == self.graph.schemas()
+        assert [name for name, _ in self.store.iter_schema("staging")] == [
+            "staging.customers", "staging.orders", "staging.feedback"
+        ]
+
+    def test_closures_match_lineage_index(self):
+        """Test recursive CTE closures (including a cycle) against the BFS engine"""
+        lineage = LineageIndex(self.graph)
+        for name in self.graph:
+            for depth in (None, 1, 2):
+                assert sorted(self.store.upstream(name, depth)) == sorted(lineage.upstream(name, depth))
+                assert sorted(self.store.downstream(name, depth)) == sorted(lineage.downstream(name, depth))
+        assert self.store.upstream("mart.revenue", 0) == []
+        with pytest.raises(ValueError):
+            self.store.upstream("nope.nope")
+
+    def test_induced_edges_and_to_graph(self):
+        """Test edge queries and materializing the store"""
+        names = ["staging.customers", "staging.orders", "mart.customer_360"]
+        assert sorted(self.store.induced_edges(names)) == sorted(
+            LineageIndex(self.graph).induced_edges(names))
+
+        graph = self.store.to_graph()
+        assert list(graph) == list(self.graph)
+        for name in self.graph:
+            assert plain_info(graph[name]) == plain_info(self.graph[name])
+
+    def test_replaced_record(self):
+        """Test that a later record for the same table wins"""
+        db_path = Path(self.test_dir) / "dup.sqlite"
+        records = [
+            ("a.x", {'type': 'table', 'dependencies': ["a.y"], 'dependents': [], 'join_info': {}}),
+            ("a.y", {'type': 'view', 'dependencies': [], 'dependents': ["a.x"], 'join_info': {}}),
+            ("a.x", {'type': 'view', 'dependencies': ["a.z"], 'dependents': [], 'join_info': {}}),
+        ]
+
+        assert build_store(records, str(db_path), batch_size=1) == 2
+
+        store = SqliteGraph(str(db_path))
+        assert list(store) == ["a.x", "a.y"]
+        assert store["a.x"] == {'type': 'view', 'dependencies': ["a.z"],
+                                'dependents': [], 'join_info': {}}
+        store.close()
+
+    def test_validation_and_pickle(self):
+        """Test reuse, rebuild on change and pickling by path"""
+        stats = {}
+        load_store(str(self.report_file), stats=stats).close()
+        assert stats == {'hits': 1, 'misses': 0}
+
+        self.report_file.write_text(REPORT.replace("(view)", "(table)"), encoding='utf-8')
+        stat = os.stat(self.report_file)
+        os.utime(self.report_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        store = load_store(str(self.report_file), stats=stats)
+        assert stats == {'hits': 1, 'misses': 1}
+        assert store.type_of("mart.revenue") == 'table'
+
+        clone = pickle.loads(pickle.dumps(store))
+        assert clone.db_path == str(store_path_for(str(self.report_file)))
+        assert clone["mart.revenue"]['type'] == 'table'
+        clone.close()
+        store.close()
+
+
+class TestSqliteBackend:
+    """Tests for DependencyVisualizer(backend='sqlite') and --backend"""
+
+    setup_method = TestSqliteStore.setup_method
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def test_same_svgs_as_memory(self):
+        """Test that both backends render identical diagrams"""
+        outputs = {}
+        for backend in ('memory', 'sqlite'):
+            viz = DependencyVisualizer(str(self.report_file), use_cache=False, backend=backend)
+            output_dir = Path(self.test_dir) / backend
+            viz.generate_all_schemas(output_dir=str(output_dir), exclude_patterns=[], jobs=2)
+            assert viz.render_failures == []
+            outputs[backend] = {
+                path.relative_to(output_dir): path.read_text(encoding='utf-8')
+                for path in output_dir.rglob('*.svg')
+            }
+
+        assert len(outputs['sqlite']) == 5
+        assert outputs['sqlite'] == outputs['memory']
+
+    def test_unknown_backend(self):
+        """Test that a bad backend name is rejected"""
+        with pytest.raises(ValueError):
+            DependencyVisualizer(str(self.report_file), backend='postgres')
+
+    def test_cli_lineage_and_levels(self, capsys, monkeypatch):
+        """Test CTE lineage and a CSR-based command on the sqlite backend"""
+        monkeypatch.setattr('sys.argv', [
+            'dataform-deps', '--report', str(self.report_file), '--backend', 'sqlite',
+            'lineage', 'mart.revenue', '--direction', 'upstream', '--format', 'json'
+        ])
+        assert main() == 0
+        result = json.loads(capsys.readouterr().out)
+        assert result['upstream'][0] == {'name': 'mart.customer_360', 'distance': 1, 'type': 'table'}
+        assert store_path_for(str(self.report_file)).exists()
+
+        levels = {}
+        for backend in ('memory', 'sqlite'):
+            monkeypatch.setattr('sys.argv', [
+                'dataform-deps', '--report', str(self.report_file), '--no-cache',
+                '--backend', backend, 'levels', '--tables', '--format', 'json'
+            ])
+            assert main() == 0
+            levels[backend] = json.loads(capsys.readouterr().out)
+        assert levels['sqlite'] == levels['memory']
+        assert levels['sqlite']['widths'] == [1, 1, 1, 2]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,229 @@
+"""Tests for sqlx_scanner module"""
+import json
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+from dataform_viz.cleanup import find_config_blocks
+from dataform_viz.dataform_check import build_dependency_graph
+from dataform_viz.sqlx_scanner import scan_project
+from dataform_viz.cli import main
+
+
+PROJECT = {
+    "dataform.json": '{"defaultSchema": "mart", "defaultDatabase": "p"}',
+    "includes/wwim_utils.js": 'const PROJECT_ID = "p";\nconst RAW = "raw";\nconst STAGING = \'staging\';\n',
+    "definitions/sources.js": """
+declare({schema: "raw", name: "orders"});
+declare({
+  database: wwim_utils.PROJECT_ID,
+  schema: wwim_utils.RAW,
+  name: "customers",
+});
+""",
+    "definitions/staging/stg_orders.sqlx": """config {
+  type: "table",
+  schema: "staging",
+}
+SELECT * FROM ${ref("orders")}
+""",
+    "definitions/staging/stg_customers.sqlx": """config {
+  type: "view",
+  schema: wwim_utils.STAGING,
+  name: "customers",
+  description: "name: {not a key}, type: x",
+}
+SELECT * FROM ${ref({schema: wwim_utils.RAW, name: "customers", database: wwim_utils.PROJECT_ID})}
+""",
+    "definitions/mart/summary.sqlx": """config {
+  type: "incremental",
+  dependencies: ["stg_orders"],
+  columns: {name: "not the table name"},
+}
+js {
+  const label = "${ref('ignored')}";
+}
+pre_operations {
+  DELETE FROM ${self()} WHERE day IN (SELECT day FROM ${ref("raw", "orders")})
+}
+SELECT *
+FROM ${ref("stg_orders")} o
+LEFT JOIN ${ ref("staging", "customers") } c ON c.id = o.customer_id
+-- lookup only: ${resolve("raw", "customers")}
+WHERE o.region = "${wwim_utils.RAW}"
+""",
+    "definitions/mart/dynamic.sqlx": """config { type: "table" }
+SELECT * FROM ${ref(tableName)} JOIN ${ref("nope")} USING (id)
+""",
+    "definitions/mart/check.sqlx": """config { type: "assertion" }
+SELECT * FROM ${ref("summary")} WHERE id IS NULL
+""",
+}
+
+COMPILED = [
+    {"target": {"database": "p", "schema": "staging", "name": "stg_orders"}, "type": "table",
+     "dependencyTargets": [{"database": "p", "schema": "raw", "name": "orders"}],
+     "query": "SELECT * FROM `p.raw.orders`"},
+    {"target": {"database": "p", "schema": "staging", "name": "customers"}, "type": "view",
+     "dependencyTargets": [{"database": "p", "schema": "raw", "name": "customers"}],
+     "query": "SELECT * FROM `p.raw.customers`"},
+    {"target": {"database": "p", "schema": "mart", "name": "summary"}, "type": "incremental",
+     "dependencyTargets": [{"database": "p", "schema": "staging", "name": "stg_orders"},
+                           {"database": "p", "schema": "staging", "name": "customers"},
+                           {"database": "p", "schema": "raw", "name": "orders"}],
+     "query": "SELECT *\nFROM `p.staging.stg_orders` o\n"
+              "LEFT JOIN `p.staging.customers` c ON c.id = o.customer_id\nWHERE o.region = \"raw\""},
+    {"target": {"database": "p", "schema": "mart", "name": "dynamic"}, "type": "table",
+     "dependencyTargets": [{"database": "p", "schema": "mart", "name": "summary"}],
+     "query": "SELECT * FROM `p.mart.summary`"},
+]
+
+
+class TestFindConfigBlocks:
+    """Tests for the lifted config block finder"""
+
+    def test_nested_braces_and_keyword(self):
+        """Test brace matching, other keywords and unbalanced blocks"""
+        text = 'config { a: {b: 1} }\nSELECT 1\npre_operations { x }\nmyconfig { y }\nconfig { open'
+
+        assert [block for _, _, block in find_config_blocks(text)] == ["config { a: {b: 1} }"]
+        assert [block for _, _, block in find_config_blocks(text, "pre_operations")] == ["pre_operations { x }"]
+
+
+class TestScanProject:
+    """Tests for the static scan"""
+
+    def setup_method(self):
+        """Write the fixture project"""
+        self.test_dir = tempfile.mkdtemp()
+        for name, content in PROJECT.items():
+            path = Path(self.test_dir) / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding='utf-8')
+
+    def teardown_method(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.test_dir)
+
+    def test_targets_dependencies_and_queries(self):
+        """Test config parsing, ref forms, constants and query rewriting"""
+        result = scan_project(self.test_dir)
+        tables = {f"{t['target']['schema']}.{t['target']['name']}": t for t in result.tables}
+
+        assert list(tables) == ["mart.dynamic", "mart.summary", "staging.customers", "staging.stg_orders"]
+        assert tables["staging.stg_orders"]["dependencyTargets"] == [{"schema": "raw", "name": "orders"}]
+        assert tables["staging.customers"]["type"] == "view"
+        assert tables["staging.customers"]["dependencyTargets"] == [{"schema": "raw", "name": "customers"}]
+        summary = tables["mart.summary"]
+        assert summary["fileName"] == "definitions/mart/summary.sqlx"
+        # config dependencies first, then refs in the query, then refs in operations; resolve() adds none
+        assert summary["dependencyTargets"] == [
+            {"schema": "staging", "name": "stg_orders"},
+            {"schema": "staging", "name": "customers"},
+            {"schema": "raw", "name": "orders"},
+        ]
+        assert summary["query"].startswith("SELECT *\nFROM `staging.stg_orders` o\n")
+        assert "lookup only: `raw.customers`" in summary["query"]
+        assert 'o.region = "raw"' in summary["query"]
+        assert "config" not in summary["query"] and "DELETE" not in summary["query"]
+
+    def test_reports_what_cannot_be_resolved(self):
+        """Test dynamic refs, unknown names, ambiguity and unscanned JavaScript"""
+        (Path(self.test_dir) / "definitions" / "more.js").write_text(
+            'declare({schema: "other", name: "orders"});\npublish("x", {type: "table"});\n', encoding='utf-8')
+
+        result = scan_project(self.test_dir)
+        messages = [f"{file_name}: {message}" for file_name, message in result.unresolved]
+
+        assert "definitions/more.js: publish() calls are not scanned" in messages
+        assert "definitions/mart/dynamic.sqlx: cannot evaluate ${ref(tableName)} statically" in messages
+        assert 'definitions/mart/dynamic.sqlx: unknown table in ${ref("nope")}' in messages
+        assert 'definitions/staging/stg_orders.sqlx: ambiguous in ${ref("orders")}' in messages
+        dynamic = next(t for t in result.tables if t["target"]["name"] == "dynamic")
+        assert dynamic["dependencyTargets"] == []
+        assert "${ref(tableName)}" in dynamic["query"]
+
+    def test_comments_in_config_blocks(self):
+        """Test that // and /* */ comments do not hide keys or open strings"""
+        mart = Path(self.test_dir) / "definitions" / "mart"
+        (mart / "commented.sqlx").write_text("""config {
+  // Leading comment line
+  type: "view", // don't materialize
+  schema: "s1", /* it's a "block" comment, name: "wrong" */
+  dependencies: [
+    "stg_orders", // it's staged
+    /* tableName */ helpers.tableName,
+  ],
+}
+SELECT * FROM ${ref({name: "orders", // the raw one
+                     schema: "raw"})}
+""", encoding='utf-8')
+        (mart / "reader.sqlx").write_text('config { type: "view" }\nSELECT * FROM ${ref("commented")}\n',
+                                          encoding='utf-8')
+        (Path(self.test_dir) / "definitions" / "sources.js").write_text(
+            'declare({schema: "raw", /* it\'s raw */ name: "orders"});\n'
+            'declare({schema: "raw", name: "customers"}); // don\'t edit\n',
+            encoding='utf-8')
+
+        result = scan_project(self.test_dir)
+        tables = {f"{t['target']['schema']}.{t['target']['name']}": t for t in result.tables}
+        messages = [f"{file_name}: {message}" for file_name, message in result.unresolved]
+
+        assert tables["s1.commented"]["type"] == "view"
+        assert tables["s1.commented"]["dependencyTargets"] == [
+            {"schema": "staging", "name": "stg_orders"},
+            {"schema": "raw", "name": "orders"},
+        ]
+        assert tables["mart.reader"]["dependencyTargets"] == [{"schema": "s1", "name": "commented"}]
+        assert ("definitions/mart/commented.sqlx: cannot evaluate dependencies entry "
+                "helpers.tableName statically") in messages
+        assert not any("config block has no type" in message for message in messages)
+
+    def test_process_pool_matches_in_process(self):
+        """Test that jobs does not change the result"""
+        definitions = Path(self.test_dir) / "definitions" / "generated"
+        definitions.mkdir()
+        for i in range(150):
+            ref = f'${{ref("gen_{i - 1}")}}' if i else '${ref("orders")}'
+            (definitions / f"gen_{i}.sqlx").write_text(
+                f'config {{ type: "view", schema: "gen" }}\nSELECT * FROM {ref}\n', encoding='utf-8')
+
+        sequential = scan_project(self.test_dir, jobs=1)
+
+        assert scan_project(self.test_dir, jobs=3) == sequential
+        assert len(sequential.tables) == 154
+
+    def test_cli_compare_and_save(self, capsys, monkeypatch):
+        """Test scan --compare against compiled output and --save as a report"""
+        compiled_file = Path(self.test_dir) / "compiled.json"
+        compiled_file.write_text(json.dumps({"tables": COMPILED}), encoding='utf-8')
+        monkeypatch.setattr('sys.argv', ['dataform-deps', '--jobs', '1', 'scan', self.test_dir,
+                                         '--compare', str(compiled_file)])
+
+        assert main() == 0
+
+        captured = capsys.readouterr()
+        assert captured.out.splitlines()[0] == "- edge  mart.summary -> mart.dynamic"
+        assert captured.out.splitlines()[-1] == "1 edge removed"
+        assert "✓ Scanned 6 files: 4 tables" in captured.err
+
+        report = Path(self.test_dir) / "report.txt"
+        monkeypatch.setattr('sys.argv', ['dataform-deps', 'scan', self.test_dir, '--save', str(report)])
+        assert main() == 0
+        monkeypatch.setattr('sys.argv', ['dataform-deps', '--report', str(report), '--no-cache',
+                                         'search', 'summary', '--format', 'json'])
+        assert main() == 0
+        assert json.loads(capsys.readouterr().out)[0]['name'] == "mart.summary"
+
+    def test_graph_matches_compiled_joins(self):
+        """Test that rewritten refs give the compiled join info"""
+        static = build_dependency_graph(scan_project(self.test_dir).tables, log=None)
+        compiled = build_dependency_graph(COMPILED, log=None)
+
+        assert static["mart.summary"]["join_info"] == compiled["mart.summary"]["join_info"] == {
+            "staging.customers": {"type": "LEFT JOIN", "condition": "c.id = o.customer_id"}
+        }
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
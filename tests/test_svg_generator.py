@@ -6,6 +6,7 @@ import shutil
 import re
 from dataform_viz.visualizer import DependencyVisualizer
 from dataform_viz.svg_generator import generate_table_svg
+from dataform_viz.rendering import render_svgs
 
 
 class TestSVGGeneration:
@@ -172,6 +173,17 @@ Table: reports.customer_report (view)
         assert 'staging' in results
         assert 'analytics' in results
     
+    def test_exclude_patterns_full_glob(self):
+        """Test that exclude patterns support full glob syntax"""
+        viz = DependencyVisualizer(str(self.report_file))
+        
+        results = viz.generate_all_schemas(
+            output_dir=str(self.output_dir),
+            exclude_patterns=['sourc?', '[rx]*s']
+        )
+        
+        assert sorted(results) == ['analytics', 'staging']
+    
     def test_svg_file_naming(self):
         """Test that SVG files are named correctly"""
         viz = DependencyVisualizer(str(self.report_file))
@@ -235,5 +247,101 @@ Table: reports.customer_report (view)
         assert 'customer_summary' in content
 
 
+class TestParallelRendering:
+    """Tests for process-pool rendering"""
+    
+    setup_method = TestSVGGeneration.setup_method
+    teardown_method = TestSVGGeneration.teardown_method
+    
+    def _render_all(self, jobs):
+        output_dir = self.output_dir / f"jobs_{jobs}"
+        viz = DependencyVisualizer(str(self.report_file), use_cache=False)
+        results = viz.generate_all_schemas(output_dir=str(output_dir), jobs=jobs)
+        files = {p.relative_to(output_dir).as_posix(): p.read_bytes()
+                 for p in output_dir.rglob("*.svg")}
+        return results, files, viz.render_failures
+    
+    def test_output_independent_of_jobs(self):
+        """Test that 1 and several workers produce identical files"""
+        serial = self._render_all(1)
+        parallel = self._render_all(3)
+        
+        assert serial == parallel
+        assert len(serial[1]) == 5
+    
+    def test_failures_reported_per_table(self):
+        """Test that one failing table does not stop the others"""
+        viz = DependencyVisualizer(str(self.report_file), use_cache=False)
+        tables = viz.load_report()
+        good = self.output_dir / "good.svg"
+        tasks = [
+            ("staging.customers", {'type': 'table'}, self.output_dir / "bad.svg"),
+            ("staging.orders", dict(tables["staging.orders"]), good),
+        ]
+        
+        failures = render_svgs(tasks, tables, jobs=2, batch_size=1)
+        
+        assert [name for name, _ in failures] == ["staging.customers"]
+        assert "KeyError" in failures[0][1]
+        assert good.exists()
+
+
+class TestIncrementalRendering:
+    """Tests for skipping unchanged diagrams via the render manifest"""
+    
+    setup_method = TestSVGGeneration.setup_method
+    teardown_method = TestSVGGeneration.teardown_method
+    
+    def _generate(self, **kwargs):
+        viz = DependencyVisualizer(str(self.report_file), use_cache=False)
+        viz.generate_all_schemas(output_dir=str(self.output_dir), exclude_patterns=[], **kwargs)
+        return viz.render_stats
+    
+    def test_second_run_skips_everything(self):
+        """Test that an unchanged report renders nothing"""
+        assert self._generate() == {'rendered': 5, 'skipped': 0, 'removed': 0}
+        
+        assert self._generate() == {'rendered': 0, 'skipped': 5, 'removed': 0}
+    
+    def test_force_rerenders(self):
+        """Test that force ignores the manifest"""
+        self._generate()
+        
+        assert self._generate(force=True)['rendered'] == 5
+    
+    def test_neighbor_type_change_rerenders_neighbors(self):
+        """Test that a type change re-renders the table and the diagrams showing it"""
+        self._generate()
+        report = self.report_file.read_text(encoding='utf-8')
+        self.report_file.write_text(
+            report.replace("Table: staging.orders (table)", "Table: staging.orders (view)"),
+            encoding='utf-8'
+        )
+        
+        stats = self._generate()
+        
+        # staging.orders itself and analytics.customer_summary, which depends on it
+        assert stats == {'rendered': 2, 'skipped': 3, 'removed': 0}
+    
+    def test_deleted_table_svg_removed(self):
+        """Test that diagrams of removed tables are deleted"""
+        self._generate()
+        report = self.report_file.read_text(encoding='utf-8')
+        kept = report.split("Table: reports.customer_report")[0]
+        self.report_file.write_text(kept, encoding='utf-8')
+        
+        stats = self._generate()
+        
+        assert stats['removed'] == 1
+        assert not (self.output_dir / "dependencies_reports").exists()
+    
+    def test_missing_svg_rerendered(self):
+        """Test that a deleted output file is rendered again"""
+        self._generate()
+        (self.output_dir / "dependencies_staging" / "staging_orders.svg").unlink()
+        
+        assert self._generate()['rendered'] == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])